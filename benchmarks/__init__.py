@@ -0,0 +1 @@
+"""Performance benchmarks that run against a real PostgreSQL database."""
@@ -0,0 +1,65 @@
+"""Compare two ``benchmarks.repositories`` reports and flag regressions.
+
+Usage:
+
+    python -m benchmarks.compare base.json head.json --threshold 0.2
+
+A case regresses when it runs more SQL statements per call than before, or
+when its p50 latency grew by more than ``--threshold`` (a fraction) and by at
+least ``--min-ms``, which keeps sub-millisecond noise out. Exits with status 1
+when any case regressed, so it can gate a CI job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+
+def _load(path: str) -> tuple[str | None, dict[tuple[int, str], dict]]:
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    results = {(r["scale"], r["case"]): r for r in report["results"]}
+    return report.get("commit"), results
+
+
+def compare(
+    base: dict[tuple[int, str], dict],
+    head: dict[tuple[int, str], dict],
+    threshold: float,
+    min_ms: float,
+) -> list[str]:
+    regressions = []
+    for key in sorted(base.keys() & head.keys()):
+        before, after = base[key], head[key]
+        scale, case = key
+        if after["queries_per_call"] > before["queries_per_call"]:
+            regressions.append(
+                f"{case} @ {scale}: queries per call "
+                f"{before['queries_per_call']:g} -> {after['queries_per_call']:g}"
+            )
+        grown = after["p50_ms"] - before["p50_ms"]
+        if grown >= min_ms and grown > before["p50_ms"] * threshold:
+            regressions.append(
+                f"{case} @ {scale}: p50 "
+                f"{before['p50_ms']:.3f} ms -> {after['p50_ms']:.3f} ms"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--min-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    base_commit, base = _load(args.base)
+    head_commit, head = _load(args.head)
+    regressions = compare(base, head, args.threshold, args.min_ms)
+    print(f"{base_commit} -> {head_commit}: {len(regressions)} regression(s)")
+    for line in regressions:
+        print(f"  {line}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,326 @@
+"""Load the dispatcher with synthetic updates and measure handler latency.
+
+Builds the same ``Dispatcher`` as ``bot.main.startup`` - Redis FSM storage,
+middlewares and every router - and feeds it real ``Update`` objects from
+``tests/helpers/aiogram.py``. The bot talks to a recording session instead of
+the Bot API, so outgoing calls are counted but never sent. Each flow runs
+``--users`` virtual users concurrently, every one sending its updates in
+order, and reports throughput, p50/p95/p99 latency per update and the SQL
+statements and API calls each update caused.
+
+Usage:
+
+    python -m benchmarks.dispatcher --users 50 --iterations 20 --output load.json
+
+Flows:
+
+- ``start``: ``/start`` from an unregistered user (registration);
+- ``drill``: "learn new words" followed by correct answers;
+- ``test``: "ready" in a testing subsection followed by correct answers;
+- ``stats``: ``/stats`` followed by the last-week report.
+
+The database and Redis from the regular settings are used, so run it against
+a development environment. Seeded rows live in a dedicated section and user
+id range and are removed, together with their Redis keys, when the run
+finishes. Drill latency includes the 0.7 s pause the handler makes after a
+correct answer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime
+import itertools
+import json
+import statistics
+import time as timer
+import typing as t
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.types import Update
+from sqlalchemy import delete, event
+
+from benchmarks.repositories import _commit
+from bot.cache import (
+    HashRedisStorage,
+    Leaderboard,
+    ReviewQueueCache,
+    TestingProgress,
+    close_redis,
+    init_redis,
+)
+from bot.config_data.settings import settings
+from bot.db.init import engine, get_session_maker, init_async_session
+from bot.db.models import NewWords, TestingExercise, User
+from bot.main import build_dispatcher
+from bot.services.content_catalog import new_words_catalog, testing_catalog
+from bot.services.distractors import distractor_index
+from bot.states import UserFSM
+from bot.utils import get_bot_instance, init_bot_instance
+from tests.factories import (
+    build_new_word,
+    build_testing_exercise,
+    build_user,
+    build_user_word_learning,
+)
+from tests.helpers.aiogram import RecordingSession, callback_update, message_update
+
+FIRST_USER_ID = 9_200_000_000
+USERS_PER_FLOW = 100_000
+BENCH_SECTION = "__bench_dispatcher__"
+BENCH_SUBSECTION = "bench"
+
+
+@dataclass
+class Harness:
+    bot: Bot
+    dp: Dispatcher
+    storage: HashRedisStorage
+    session: RecordingSession
+
+    def __post_init__(self) -> None:
+        self._update_ids = itertools.count(1)
+
+    def key(self, user_id: int) -> StorageKey:
+        return StorageKey(bot_id=self.bot.id, chat_id=user_id, user_id=user_id)
+
+    def message(self, user_id: int, text: str) -> Update:
+        return message_update(
+            next(self._update_ids),
+            text=text,
+            user_id=user_id,
+            full_name=f"Bench {user_id}",
+            username=f"bench_{user_id}",
+        )
+
+    def callback(self, user_id: int, data: str) -> Update:
+        return callback_update(
+            next(self._update_ids),
+            data=data,
+            user_id=user_id,
+            full_name=f"Bench {user_id}",
+            username=f"bench_{user_id}",
+        )
+
+
+Flow = t.Callable[[Harness, int, int], t.AsyncIterator[Update]]
+
+
+async def start_flow(h: Harness, user_id: int, iterations: int):
+    for _ in range(iterations):
+        # back to the default state, so /start registers the user again
+        await h.storage.set_state(h.key(user_id), None)
+        yield h.message(user_id, "/start")
+
+
+async def drill_flow(h: Harness, user_id: int, iterations: int):
+    yield h.callback(user_id, "learn_new_words")
+    for _ in range(iterations):
+        yield h.callback(user_id, "correct")
+
+
+async def test_flow(h: Harness, user_id: int, iterations: int):
+    await h.storage.set_data(
+        h.key(user_id), {"section": BENCH_SECTION, "subsection": BENCH_SUBSECTION}
+    )
+    yield h.callback(user_id, "ready_for_test")
+    for _ in range(iterations):
+        data = await h.storage.get_data(h.key(user_id))
+        yield h.message(user_id, data["current_answer"])
+
+
+async def stats_flow(h: Harness, user_id: int, iterations: int):
+    await h.storage.set_state(h.key(user_id), UserFSM.default)
+    for _ in range(iterations):
+        yield h.message(user_id, "/stats")
+        yield h.callback(user_id, "stats_last_week")
+
+
+FLOWS: dict[str, Flow] = {
+    "start": start_flow,
+    "drill": drill_flow,
+    "test": test_flow,
+    "stats": stats_flow,
+}
+
+
+def flow_users(flow: str, users: int) -> list[int]:
+    first = FIRST_USER_ID + list(FLOWS).index(flow) * USERS_PER_FLOW
+    return list(range(first, first + users))
+
+
+async def seed(users: int, iterations: int) -> None:
+    # every answer needs one more exercise than there are answers
+    exercises = iterations + 1
+    words = [
+        build_new_word(
+            section=BENCH_SECTION,
+            subsection=BENCH_SUBSECTION,
+            exercise_id=exercise_id,
+            russian=f"слово {exercise_id}",
+            english=f"word {exercise_id}",
+        )
+        for exercise_id in range(1, exercises + 1)
+    ]
+    rows = [
+        *words,
+        *(
+            build_testing_exercise(
+                section=BENCH_SECTION,
+                subsection=BENCH_SUBSECTION,
+                exercise_id=exercise_id,
+                test=f"{exercise_id}. She ... English.",
+            )
+            for exercise_id in range(1, exercises + 1)
+        ),
+    ]
+    for flow in ("drill", "test", "stats"):
+        for user_id in flow_users(flow, users):
+            rows.append(
+                build_user(
+                    id_=None,
+                    user_id=user_id,
+                    full_name=f"Bench {user_id}",
+                    tg_login=f"bench_{user_id}",
+                    registration_date=datetime.now(),
+                )
+            )
+    for user_id in flow_users("drill", users):
+        for word in words:
+            rows.append(
+                build_user_word_learning(
+                    user_id=user_id,
+                    section=BENCH_SECTION,
+                    subsection=BENCH_SUBSECTION,
+                    exercise_id=word.id,
+                    next_review_date=date.today(),
+                    add_date=date.today(),
+                    new_word=word,
+                )
+            )
+    async with get_session_maker()() as session, session.begin():
+        session.add_all(rows)
+    testing_catalog.invalidate()
+    new_words_catalog.invalidate()
+    distractor_index.invalidate()
+
+
+async def cleanup(h: Harness, redis, users: int) -> None:
+    async with get_session_maker()() as session, session.begin():
+        await session.execute(
+            delete(User).where(
+                User.user_id.between(
+                    FIRST_USER_ID, FIRST_USER_ID + len(FLOWS) * USERS_PER_FLOW
+                )
+            )
+        )
+        await session.execute(delete(NewWords).where(NewWords.section == BENCH_SECTION))
+        await session.execute(
+            delete(TestingExercise).where(TestingExercise.section == BENCH_SECTION)
+        )
+    leaderboard = Leaderboard(redis)
+    review_queue = ReviewQueueCache(redis)
+    testing_progress = TestingProgress(redis)
+    for flow in FLOWS:
+        for user_id in flow_users(flow, users):
+            await h.storage.set_state(h.key(user_id), None)
+            await h.storage.set_data(h.key(user_id), {})
+            await leaderboard.remove(user_id)
+            await review_queue.invalidate(user_id, date.today())
+            await testing_progress.reset(user_id, BENCH_SECTION, BENCH_SUBSECTION)
+    await testing_progress.invalidate_exercises(BENCH_SECTION, BENCH_SUBSECTION)
+    testing_catalog.invalidate()
+    new_words_catalog.invalidate()
+    distractor_index.invalidate()
+
+
+async def run_flow(h: Harness, name: str, users: int, iterations: int) -> dict:
+    flow = FLOWS[name]
+    latencies = []
+    statements = 0
+
+    def count_statement(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    async def drive(user_id: int) -> None:
+        async for update in flow(h, user_id, iterations):
+            started = timer.perf_counter()
+            await h.dp.feed_update(h.bot, update)
+            latencies.append((timer.perf_counter() - started) * 1000)
+
+    calls_before = len(h.session.calls)
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    started = timer.perf_counter()
+    try:
+        await asyncio.gather(*(drive(user_id) for user_id in flow_users(name, users)))
+    finally:
+        elapsed = timer.perf_counter() - started
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    updates = len(latencies)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "flow": name,
+        "users": users,
+        "updates": updates,
+        "updates_per_s": round(updates / elapsed, 1),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+        "queries_per_update": round(statements / updates, 2),
+        "api_calls_per_update": round(
+            (len(h.session.calls) - calls_before) / updates, 2
+        ),
+    }
+
+
+async def main(users: int, iterations: int, flows: list[str]) -> dict:
+    init_async_session()
+    redis = init_redis(settings.redis_dsn)
+    storage = HashRedisStorage(redis=redis)
+    await init_bot_instance(token=settings.bot_token)
+    bot = await get_bot_instance()
+    session = RecordingSession()
+    bot.session = session
+    h = Harness(bot=bot, dp=build_dispatcher(storage), storage=storage, session=session)
+
+    results = []
+    await cleanup(h, redis, users)  # leftovers of an interrupted run
+    try:
+        await seed(users, iterations)
+        await testing_catalog.ensure_loaded()
+        await new_words_catalog.ensure_loaded()
+        for name in flows:
+            result = await run_flow(h, name, users, iterations)
+            print(json.dumps(result))
+            results.append(result)
+    finally:
+        await cleanup(h, redis, users)
+        await close_redis()
+        await engine.dispose()
+    return {
+        "commit": _commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "users": users,
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="virtual users per flow")
+    parser.add_argument(
+        "--iterations", type=int, default=10, help="flow repetitions per user"
+    )
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    report = asyncio.run(main(args.users, args.iterations, args.flows))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,255 @@
+"""Compare update throughput of long polling and the webhook server.
+
+Starts a fake Bot API on localhost that serves ``--updates`` synthetic
+messages and answers every other method, then delivers the same updates to a
+dispatcher twice: once through ``Dispatcher.start_polling`` fetching them with
+``getUpdates``, and once by POSTing them to the webhook application from
+``bot.utils.webhook`` the way Telegram does, over ``--connections`` parallel
+connections and with the secret token header. The handler answers every
+message through the fake API after ``--work-ms`` of simulated work, so both
+modes pay for the same outgoing calls. Neither the database nor Redis is used:
+the benchmark measures ingestion, not the bot's handlers.
+
+Usage:
+
+    python -m benchmarks.ingestion --updates 5000 --work-ms 5 --output ingest.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import time as timer
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+from aiohttp import ClientSession, web
+
+from benchmarks.repositories import _commit
+from bot.utils.webhook import SECRET_HEADER, UpdateQueue, build_webhook_app
+from tests.helpers.aiogram import message_update
+
+TOKEN = "1234567890:benchmark-token"
+SECRET = "benchmark-secret"
+FIRST_USER_ID = 1_000_000
+USERS = 500
+
+
+class FakeBotApi:
+    """Just enough of the Bot API for polling and sending messages."""
+
+    def __init__(self, updates: list[dict]) -> None:
+        self.updates = updates
+        self.calls = 0
+        self._message_ids = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        method = request.match_info["method"].lower()
+        params = await request.post()
+        if method == "getme":
+            result = {"id": 1, "is_bot": True, "first_name": "Bench"}
+        elif method == "getupdates":
+            result = await self._get_updates(params)
+        elif method == "sendmessage":
+            self._message_ids += 1
+            result = {
+                "message_id": self._message_ids,
+                "date": int(datetime.now().timestamp()),
+                "chat": {"id": int(params["chat_id"]), "type": "private"},
+                "text": params["text"],
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def _get_updates(self, params) -> list[dict]:
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        batch = self.updates[offset : offset + limit]
+        if not batch:
+            await asyncio.sleep(0.05)  # an empty long poll
+        return batch
+
+
+def make_updates(count: int) -> list[dict]:
+    return [
+        message_update(
+            update_id,
+            text=f"answer {update_id}",
+            user_id=FIRST_USER_ID + update_id % USERS,
+        ).model_dump(mode="json", exclude_none=True)
+        for update_id in range(count)
+    ]
+
+
+def make_dispatcher(expected: int, work_ms: float) -> tuple[Dispatcher, asyncio.Event]:
+    router = Router()
+    done = asyncio.Event()
+    handled = 0
+
+    @router.message()
+    async def answer(message: Message) -> None:
+        nonlocal handled
+        if work_ms:
+            await asyncio.sleep(work_ms / 1000)
+        await message.answer(f"ok {message.text}")
+        handled += 1
+        if handled == expected:
+            done.set()
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp, done
+
+
+def make_bot(api_url: str) -> Bot:
+    return Bot(
+        token=TOKEN,
+        session=AiohttpSession(api=TelegramAPIServer.from_base(api_url)),
+    )
+
+
+async def run_polling(api: FakeBotApi, api_url: str, work_ms: float) -> float:
+    dp, done = make_dispatcher(len(api.updates), work_ms)
+    bot = make_bot(api_url)
+    started = timer.perf_counter()
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False))
+    await done.wait()
+    elapsed = timer.perf_counter() - started
+    await dp.stop_polling()
+    await polling
+    return elapsed
+
+
+async def run_webhook(
+    api: FakeBotApi,
+    api_url: str,
+    work_ms: float,
+    connections: int,
+    max_in_flight: int,
+    workers: int,
+) -> tuple[float, int]:
+    dp, done = make_dispatcher(len(api.updates), work_ms)
+    bot = make_bot(api_url)
+    queue = UpdateQueue(dp, bot, max_in_flight=max_in_flight, workers=workers)
+    runner = web.AppRunner(build_webhook_app(bot, queue, "/webhook", SECRET))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    pending = iter(api.updates)
+    refused = 0
+
+    async def deliver(session: ClientSession) -> None:
+        nonlocal refused
+        for update in pending:
+            while True:
+                async with session.post(
+                    f"http://{host}:{port}/webhook",
+                    json=update,
+                    headers={SECRET_HEADER: SECRET},
+                ) as response:
+                    if response.status == 200:
+                        break
+                refused += 1
+                await asyncio.sleep(0.01)  # Telegram retries refused updates
+
+    queue.start()
+    started = timer.perf_counter()
+    try:
+        async with ClientSession() as session:
+            await asyncio.gather(*(deliver(session) for _ in range(connections)))
+        await done.wait()
+        elapsed = timer.perf_counter() - started
+    finally:
+        await runner.cleanup()
+        await queue.stop()
+        await bot.session.close()
+    return elapsed, refused
+
+
+async def main(
+    updates: int, work_ms: float, connections: int, max_in_flight: int, workers: int
+) -> dict:
+    api = FakeBotApi(make_updates(updates))
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    api_url = f"http://{host}:{port}"
+    results = []
+    try:
+        api.calls = 0
+        elapsed = await run_polling(api, api_url, work_ms)
+        results.append(
+            {
+                "mode": "polling",
+                "seconds": round(elapsed, 3),
+                "updates_per_s": round(updates / elapsed, 1),
+                "api_calls": api.calls,
+            }
+        )
+        print(json.dumps(results[-1]))
+
+        api.calls = 0
+        elapsed, refused = await run_webhook(
+            api, api_url, work_ms, connections, max_in_flight, workers
+        )
+        results.append(
+            {
+                "mode": "webhook",
+                "seconds": round(elapsed, 3),
+                "updates_per_s": round(updates / elapsed, 1),
+                "api_calls": api.calls,
+                "refused": refused,
+            }
+        )
+        print(json.dumps(results[-1]))
+    finally:
+        await runner.cleanup()
+    return {
+        "commit": _commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "updates": updates,
+        "work_ms": work_ms,
+        "connections": connections,
+        "max_in_flight": max_in_flight,
+        "workers": workers,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument(
+        "--work-ms", type=float, default=0, help="simulated handler work per update"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=40, help="parallel webhook deliveries"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    report = asyncio.run(
+        main(
+            args.updates,
+            args.work_ms,
+            args.connections,
+            args.max_in_flight,
+            args.workers,
+        )
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,489 @@
+"""Benchmark every repository query and the service calls handlers make.
+
+Seeds a throwaway schema with synthetic users, content and progress built by
+``tests/factories`` at each requested scale, then times every case and counts
+the SQL statements it runs. Results are written as JSON, so two runs can be
+compared with ``python -m benchmarks.compare``.
+
+Usage:
+
+    python -m benchmarks.repositories --scale 1000 10000 100000 \\
+        --repeat 20 --output bench.json
+
+The database from the regular ``POSTGRES_*`` settings is used; everything is
+created in the ``--schema`` schema, which is dropped when the run finishes.
+Methods that insert or delete rows (``add*``, ``delete*``) are left out, as
+repeating them would change the data the other cases are measured on.
+Services run without Redis, so their database paths are measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+import itertools
+import json
+import random
+import statistics
+import subprocess
+import time as timer
+import typing as t
+
+from sqlalchemy import event, insert, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from bot.config_data.settings import settings
+from bot.db.models import (
+    Base,
+    NewWords,
+    TestingExercise,
+    User,
+    UserProgress,
+    UserWordsLearning,
+)
+from bot.db.repositories.daily_statistics import DailyStatisticsRepository
+from bot.db.repositories.new_words import NewWordsRepository
+from bot.db.repositories.testing import TestingRepository
+from bot.db.repositories.user import UserRepository
+from bot.db.repositories.user_progress import UserProgressRepository
+from bot.db.repositories.user_words_learning import UserWordsLearningRepository
+from bot.services.content_catalog import ContentCatalog
+from bot.services.distractors import DistractorIndex
+from bot.services.new_words import NewWordsService
+from bot.services.testing import TestingService
+from bot.services.user import UserService
+from bot.services.user_progress import UserProgressService
+from bot.services.user_words_learning import UserWordsLearningService
+from tests.factories import (
+    build_new_word,
+    build_testing_exercise,
+    build_user,
+    build_user_progress,
+    build_user_word_learning,
+)
+
+SECTIONS = 4
+SUBSECTIONS = 10
+EXERCISES = 25
+PROGRESS_PER_USER = 20
+WORDS_PER_USER = 20
+INSERT_CHUNK = 5000
+FIRST_USER_ID = 1_000_000
+TODAY = date.today()
+
+SECTION = "Section 1"
+SUBSECTION = "Subsection 1"
+
+
+@dataclass
+class Bench:
+    """Repositories and services bound to the benchmark schema."""
+
+    scale: int
+    daily_statistics: DailyStatisticsRepository
+    new_words: NewWordsRepository
+    testing: TestingRepository
+    users: UserRepository
+    user_progress: UserProgressRepository
+    user_words_learning: UserWordsLearningRepository
+    new_words_service: NewWordsService
+    testing_service: TestingService
+    user_service: UserService
+    user_progress_service: UserProgressService
+    user_words_learning_service: UserWordsLearningService
+
+    @classmethod
+    def bind(cls, scale: int, session_maker) -> Bench:
+        new_words = NewWordsRepository(session_maker)
+        testing = TestingRepository(session_maker)
+        users = UserRepository(session_maker)
+        user_progress = UserProgressRepository(session_maker)
+        user_words_learning = UserWordsLearningRepository(session_maker)
+        return cls(
+            scale=scale,
+            daily_statistics=DailyStatisticsRepository(session_maker),
+            new_words=new_words,
+            testing=testing,
+            users=users,
+            user_progress=user_progress,
+            user_words_learning=user_words_learning,
+            new_words_service=NewWordsService(
+                repository=new_words, catalog=ContentCatalog(lambda: new_words)
+            ),
+            testing_service=TestingService(
+                repository=testing, catalog=ContentCatalog(lambda: testing)
+            ),
+            user_service=UserService(repository=users),
+            user_progress_service=UserProgressService(repository=user_progress),
+            user_words_learning_service=UserWordsLearningService(
+                repository=user_words_learning,
+                distractors=DistractorIndex(repository=new_words),
+            ),
+        )
+
+    def user_id(self, call: int) -> int:
+        """A different user for every call, spread over the whole table."""
+        return FIRST_USER_ID + (call * 7919) % self.scale
+
+
+Case = t.Callable[[Bench, int], t.Awaitable]
+
+
+async def _consume(rows: t.AsyncIterator) -> None:
+    async for _ in rows:
+        pass
+
+
+REPOSITORY_CASES: dict[str, Case] = {
+    "daily_statistics.add_counts": lambda b, u: b.daily_statistics.add_counts(
+        TODAY, {"total_testing_exercises": 1}
+    ),
+    "daily_statistics.aggregate": lambda b, u: b.daily_statistics.aggregate(
+        TODAY - timedelta(days=30), TODAY
+    ),
+    "new_words.get_max_exercise_id": lambda b, u: b.new_words.get_max_exercise_id(
+        SECTION, SUBSECTION
+    ),
+    "new_words.list_exercises": lambda b, u: b.new_words.list_exercises(SUBSECTION),
+    "new_words.count_exercises": lambda b, u: b.new_words.count_exercises(
+        SECTION, SUBSECTION
+    ),
+    "new_words.count_by_subsection": lambda b, u: b.new_words.count_by_subsection(),
+    "new_words.get_subsection_names": lambda b, u: b.new_words.get_subsection_names(
+        SECTION
+    ),
+    "new_words.list_russian_words": lambda b, u: b.new_words.list_russian_words(),
+    "new_words.update_exercise": lambda b, u: b.new_words.update_exercise(
+        SECTION, SUBSECTION, 1, "слово", "word"
+    ),
+    "testing.get_max_exercise_id": lambda b, u: b.testing.get_max_exercise_id(
+        SECTION, SUBSECTION
+    ),
+    "testing.list_exercises": lambda b, u: b.testing.list_exercises(SUBSECTION),
+    "testing.count_exercises": lambda b, u: b.testing.count_exercises(
+        SECTION, SUBSECTION
+    ),
+    "testing.get_exercise": lambda b, u: b.testing.get_exercise(SECTION, SUBSECTION, 1),
+    "testing.list_exercise_ids": lambda b, u: b.testing.list_exercise_ids(
+        SECTION, SUBSECTION
+    ),
+    "testing.list_solved": lambda b, u: b.testing.list_solved(
+        b.user_id(u), SECTION, SUBSECTION
+    ),
+    "testing.count_by_subsection": lambda b, u: b.testing.count_by_subsection(),
+    "testing.update_exercise": lambda b, u: b.testing.update_exercise(
+        SECTION, SUBSECTION, 1, "She ... English.", "speaks"
+    ),
+    "user.get_by_user_id": lambda b, u: b.users.get_by_user_id(b.user_id(u)),
+    "user.list_page": lambda b, u: b.users.list_page(20, after_id=b.scale // 2),
+    "user.list_page_search": lambda b, u: b.users.list_page(20, query="user_12"),
+    "user.list_ids_page": lambda b, u: b.users.list_ids_page(b.scale // 2, 500),
+    "user.set_timezone": lambda b, u: b.users.set_timezone(b.user_id(u), "UTC"),
+    "user.set_reminder_time": lambda b, u: b.users.set_reminder_time(
+        b.user_id(u), "09:00"
+    ),
+    "user_progress.record_attempt": lambda b, u: b.user_progress.record_attempt(
+        b.user_id(u), "Testing", SECTION, SUBSECTION, 1, True, TODAY
+    ),
+    "user_progress.count_by_type_in_interval": (
+        lambda b, u: b.user_progress.count_by_type_in_interval(
+            b.user_id(u), "Testing", TODAY - timedelta(days=7), TODAY
+        )
+    ),
+    "user_progress.get_user_points": lambda b, u: b.user_progress.get_user_points(
+        b.user_id(u)
+    ),
+    "user_progress.count_users_with_points_greater": (
+        lambda b, u: b.user_progress.count_users_with_points_greater(500)
+    ),
+    "user_progress.total_users": lambda b, u: b.user_progress.total_users(),
+    "user_progress.list_users_ordered_by_points": (
+        lambda b, u: b.user_progress.list_users_ordered_by_points(b.scale // 2, 50)
+    ),
+    "user_progress.list_users_by_ids": lambda b, u: b.user_progress.list_users_by_ids(
+        [b.user_id(u + i) for i in range(50)]
+    ),
+    "user_progress.stream_points": lambda b, u: _consume(
+        b.user_progress.stream_points()
+    ),
+    "user_words_learning.due_words": lambda b, u: b.user_words_learning.due_words(
+        b.user_id(u), TODAY
+    ),
+    "user_words_learning.count_active_learning": (
+        lambda b, u: b.user_words_learning.count_active_learning(b.user_id(u), 3)
+    ),
+    "user_words_learning.count_learned": (
+        lambda b, u: b.user_words_learning.count_learned(b.user_id(u), 5)
+    ),
+    "user_words_learning.count_all_by_user": (
+        lambda b, u: b.user_words_learning.count_all_by_user(b.user_id(u))
+    ),
+    "user_words_learning.count_all_today_by_user": (
+        lambda b, u: b.user_words_learning.count_all_today_by_user(b.user_id(u))
+    ),
+    "user_words_learning.count_due_in_reminder_slots": (
+        lambda b, u: b.user_words_learning.count_due_in_reminder_slots(
+            [(time(9, 0), "UTC")], TODAY
+        )
+    ),
+    "user_words_learning.distinct_subsections": (
+        lambda b, u: b.user_words_learning.distinct_subsections(b.user_id(u))
+    ),
+    "user_words_learning.subsection_stats": (
+        lambda b, u: b.user_words_learning.subsection_stats(b.user_id(u), 3, 5)
+    ),
+    "user_words_learning.record_answer": (
+        lambda b, u: b.user_words_learning.record_answer(
+            b.user_id(u), SECTION, SUBSECTION, 1, True, TODAY
+        )
+    ),
+    "user_words_learning.list_new_words": (
+        lambda b, u: b.user_words_learning.list_new_words(SECTION, SUBSECTION)
+    ),
+    "user_words_learning.max_custom_word_id": (
+        lambda b, u: b.user_words_learning.max_custom_word_id(b.user_id(u))
+    ),
+}
+
+SERVICE_CASES: dict[str, Case] = {
+    "NewWordsService.get_subsection_names": (
+        lambda b, u: b.new_words_service.get_subsection_names(SECTION)
+    ),
+    "TestingService.get_section_names": (
+        lambda b, u: b.testing_service.get_section_names()
+    ),
+    "TestingService.get_random_testing_exercise": (
+        lambda b, u: b.testing_service.get_random_testing_exercise(
+            SECTION, SUBSECTION, b.user_id(u)
+        )
+    ),
+    "TestingService.get_completion_counts": (
+        lambda b, u: b.testing_service.get_completion_counts(
+            b.user_id(u), SECTION, SUBSECTION
+        )
+    ),
+    "UserProgressService.mark_exercise_completed": (
+        lambda b, u: b.user_progress_service.mark_exercise_completed(
+            b.user_id(u), "Testing", SUBSECTION, SECTION, 2, True
+        )
+    ),
+    "UserProgressService.get_activity_by_user": (
+        lambda b, u: b.user_progress_service.get_activity_by_user(b.user_id(u), 7)
+    ),
+    "UserProgressService.get_user_rank_and_total": (
+        lambda b, u: b.user_progress_service.get_user_rank_and_total(b.user_id(u))
+    ),
+    "UserProgressService.get_leaderboard_page": (
+        lambda b, u: b.user_progress_service.get_leaderboard_page()
+    ),
+    "UserService.get_users_page": lambda b, u: b.user_service.get_users_page(),
+    "UserService.get_user_info_text": (
+        lambda b, u: b.user_service.get_user_info_text(b.user_id(u))
+    ),
+    "UserWordsLearningService.get_random_word_exercise": (
+        lambda b, u: b.user_words_learning_service.get_random_word_exercise(
+            b.user_id(u)
+        )
+    ),
+    "UserWordsLearningService.get_user_stats": (
+        lambda b, u: b.user_words_learning_service.get_user_stats(b.user_id(u))
+    ),
+    "UserWordsLearningService.get_due_counts_to_remind": (
+        lambda b, u: b.user_words_learning_service.get_due_counts_to_remind(
+            datetime.combine(TODAY, time(9, 0))
+        )
+    ),
+}
+
+
+def _values(obj) -> dict:
+    return {
+        attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs
+    }
+
+
+def _content() -> list[tuple[str, str, int]]:
+    return [
+        (f"Section {section}", f"Subsection {subsection}", exercise_id)
+        for section in range(1, SECTIONS + 1)
+        for subsection in range(1, SUBSECTIONS + 1)
+        for exercise_id in range(1, EXERCISES + 1)
+    ]
+
+
+def _users(scale: int, rng: random.Random) -> t.Iterator[dict]:
+    for index in range(scale):
+        yield _values(
+            build_user(
+                id_=index + 1,
+                user_id=FIRST_USER_ID + index,
+                full_name=f"User {index}",
+                tg_login=f"user_{index}",
+                points=rng.randint(0, 1000),
+                reminder_time=time(rng.randrange(24), rng.choice((0, 15, 30, 45))),
+                time_zone="UTC",
+            )
+        )
+
+
+def _user_progress(scale: int, rng: random.Random) -> t.Iterator[dict]:
+    content = _content()
+    for index in range(scale):
+        for section, subsection, exercise_id in rng.sample(content, PROGRESS_PER_USER):
+            yield _values(
+                build_user_progress(
+                    user_id=FIRST_USER_ID + index,
+                    section=section,
+                    subsection=subsection,
+                    exercise_id=exercise_id,
+                    attempts=rng.randint(1, 3),
+                    success=rng.random() < 0.7,
+                    progress_date=TODAY - timedelta(days=rng.randrange(30)),
+                )
+            )
+
+
+def _user_words_learning(scale: int, rng: random.Random) -> t.Iterator[dict]:
+    content = _content()
+    for index in range(scale):
+        for section, subsection, exercise_id in rng.sample(content, WORDS_PER_USER):
+            yield _values(
+                build_user_word_learning(
+                    user_id=FIRST_USER_ID + index,
+                    section=section,
+                    subsection=subsection,
+                    exercise_id=exercise_id,
+                    attempts=rng.randint(0, 8),
+                    success=rng.randint(0, 6),
+                    next_review_date=TODAY + timedelta(days=rng.randrange(-3, 7)),
+                    add_date=TODAY - timedelta(days=rng.randrange(60)),
+                )
+            )
+
+
+def _seed_tables(scale: int) -> list[tuple[type, t.Iterator[dict]]]:
+    """Generated rows of every table, in foreign-key order."""
+    rng = random.Random(scale)
+    return [
+        (
+            NewWords,
+            (
+                _values(build_new_word(section=s, subsection=ss, exercise_id=i))
+                for s, ss, i in _content()
+            ),
+        ),
+        (
+            TestingExercise,
+            (
+                _values(build_testing_exercise(section=s, subsection=ss, exercise_id=i))
+                for s, ss, i in _content()
+            ),
+        ),
+        (User, _users(scale, rng)),
+        (UserProgress, _user_progress(scale, rng)),
+        (UserWordsLearning, _user_words_learning(scale, rng)),
+    ]
+
+
+async def seed(engine: AsyncEngine, schema: str, scale: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.run_sync(Base.metadata.create_all)
+    for model, rows in _seed_tables(scale):
+        while chunk := list(itertools.islice(rows, INSERT_CHUNK)):
+            async with engine.begin() as conn:
+                await conn.execute(insert(model), chunk)
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+
+async def measure(
+    engine: AsyncEngine, bench: Bench, name: str, case: Case, repeat: int
+):
+    statements = 0
+
+    def count_statement(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    await case(bench, repeat)  # warm-up: connections, prepared statements
+    timings = []
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        for call in range(repeat):
+            started = timer.perf_counter()
+            await case(bench, call)
+            timings.append((timer.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "scale": bench.scale,
+        "case": name,
+        "queries_per_call": statements / repeat,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(scales: list[int], repeat: int, schema: str, cases: str) -> dict:
+    engine = create_async_engine(
+        settings.build_postgres_dsn(),
+        connect_args={"server_settings": {"search_path": schema}},
+    )
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    selected = {**REPOSITORY_CASES, **SERVICE_CASES}
+    selected = {name: case for name, case in selected.items() if cases in name}
+    results = []
+    try:
+        for scale in scales:
+            await seed(engine, schema, scale)
+            bench = Bench.bind(scale, session_maker)
+            for name, case in selected.items():
+                result = await measure(engine, bench, name, case, repeat)
+                print(json.dumps(result))
+                results.append(result)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await engine.dispose()
+    return {
+        "commit": _commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--schema", default="benchmarks")
+    parser.add_argument(
+        "--cases", default="", help="only run cases whose name contains this text"
+    )
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    report = asyncio.run(main(args.scale, args.repeat, args.schema, args.cases))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,113 @@
+"""Benchmark ``UserWordsLearningService.get_user_stats`` against PostgreSQL.
+
+Seeds a synthetic user with a growing number of vocabulary subsections and
+reports the latency and the number of SQL statements per stats request.
+
+Usage:
+
+    python -m benchmarks.user_stats --subsections 1 10 40 80 --repeat 20
+
+The database from the regular ``POSTGRES_*`` settings is used. Seeded rows live
+in a dedicated section and are removed when the run finishes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import delete, event
+
+from bot.db.init import engine, get_session_maker, init_async_session
+from bot.db.models import NewWords, User, UserWordsLearning
+from bot.services.user_words_learning import UserWordsLearningService
+
+BENCH_USER_ID = 9_000_000_001
+BENCH_SECTION = "__bench_user_stats__"
+WORDS_PER_SUBSECTION = 10
+
+
+async def seed(subsections: int) -> None:
+    async with get_session_maker()() as session, session.begin():
+        session.add(User(user_id=BENCH_USER_ID, full_name="bench", points=0))
+        for sub in range(subsections):
+            for word_id in range(1, WORDS_PER_SUBSECTION + 1):
+                session.add(
+                    NewWords(
+                        section=BENCH_SECTION,
+                        subsection=f"bench-{sub}",
+                        id=word_id,
+                        russian=f"слово {sub}-{word_id}",
+                        english=f"word {sub}-{word_id}",
+                    )
+                )
+        await session.flush()
+        for sub in range(subsections):
+            for word_id in range(1, WORDS_PER_SUBSECTION + 1):
+                session.add(
+                    UserWordsLearning(
+                        user_id=BENCH_USER_ID,
+                        section=BENCH_SECTION,
+                        subsection=f"bench-{sub}",
+                        exercise_id=word_id,
+                        attempts=word_id,
+                        success=word_id // 2,
+                    )
+                )
+
+
+async def cleanup() -> None:
+    async with get_session_maker()() as session, session.begin():
+        await session.execute(delete(User).where(User.user_id == BENCH_USER_ID))
+        await session.execute(delete(NewWords).where(NewWords.section == BENCH_SECTION))
+
+
+async def measure(subsections: int, repeat: int) -> dict:
+    statements = 0
+
+    def count_statement(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    await seed(subsections)
+    service = UserWordsLearningService()
+    timings = []
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await service.get_user_stats(BENCH_USER_ID)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+        await cleanup()
+
+    return {
+        "subsections": subsections,
+        "queries_per_call": statements / repeat,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p95_ms": round(sorted(timings)[int(0.95 * (len(timings) - 1))], 3),
+    }
+
+
+async def main(subsection_counts: list[int], repeat: int) -> None:
+    init_async_session()
+    await cleanup()
+    try:
+        for subsections in subsection_counts:
+            print(json.dumps(await measure(subsections, repeat)))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--subsections", type=int, nargs="+", default=[1, 5, 10, 20, 40, 80]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.subsections, args.repeat))
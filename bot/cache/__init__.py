@@ -0,0 +1,25 @@
+from .broadcasts import BroadcastCheckpoints
+from .client import close_redis, get_redis, init_redis
+from .fsm_storage import HashRedisStorage
+from .leader_lock import LeaderLock
+from .leaderboard import Leaderboard
+from .review_queue import ReviewQueueCache
+from .testing_progress import PendingProgress, ProgressSnapshot, TestingProgress
+from .update_stream import StreamEntry, UpdateStream, update_user_id
+
+__all__ = [
+    "BroadcastCheckpoints",
+    "HashRedisStorage",
+    "LeaderLock",
+    "Leaderboard",
+    "PendingProgress",
+    "ProgressSnapshot",
+    "ReviewQueueCache",
+    "StreamEntry",
+    "TestingProgress",
+    "UpdateStream",
+    "close_redis",
+    "get_redis",
+    "init_redis",
+    "update_user_id",
+]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from redis.asyncio import Redis
+
+from .leader_lock import LeaderLock
+
+_ACTIVE_KEY = "broadcasts:active"
+_COUNTERS = ("sent", "blocked", "failed")
+
+
+class BroadcastCheckpoints:
+    """
+    Progress of running broadcasts, kept in Redis so they survive restarts.
+
+    A checkpoint holds the text, the last users.id whose batch fully finished
+    and the delivery counters. Broadcasts stay in the active set until
+    finished, which is what startup uses to resume them.
+
+    The process sending a broadcast holds its lease and renews it after every
+    page, so a broadcast is only resumed once its runner is gone.
+    """
+
+    LEASE_SECONDS = 5 * 60
+
+    def __init__(self, redis: Redis) -> None:
+        self._redis = redis
+
+    @staticmethod
+    def _key(broadcast_id: str) -> str:
+        return f"broadcast:{broadcast_id}"
+
+    async def start(self, broadcast_id: str, text: str) -> None:
+        """Register the broadcast unless a checkpoint for it already exists."""
+        key = self._key(broadcast_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hsetnx(key, "text", text)
+            pipe.hsetnx(key, "last_id", 0)
+            for counter in _COUNTERS:
+                pipe.hsetnx(key, counter, 0)
+            pipe.sadd(_ACTIVE_KEY, broadcast_id)
+            await pipe.execute()
+
+    async def load(self, broadcast_id: str) -> dict | None:
+        data = await self._redis.hgetall(self._key(broadcast_id))
+        if not data:
+            return None
+        data = {k.decode(): v.decode() for k, v in data.items()}
+        return {
+            "text": data["text"],
+            "last_id": int(data["last_id"]),
+            **{counter: int(data.get(counter, 0)) for counter in _COUNTERS},
+        }
+
+    async def save(self, broadcast_id: str, last_id: int, **counters: int) -> None:
+        await self._redis.hset(
+            self._key(broadcast_id), mapping={"last_id": last_id, **counters}
+        )
+
+    async def finish(self, broadcast_id: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.srem(_ACTIVE_KEY, broadcast_id)
+            pipe.delete(self._key(broadcast_id))
+            await pipe.execute()
+
+    async def active_ids(self) -> list[str]:
+        return sorted(m.decode() for m in await self._redis.smembers(_ACTIVE_KEY))
+
+    def lease(self, broadcast_id: str, owner: str) -> LeaderLock:
+        """The lease held by the process sending the broadcast."""
+        return LeaderLock(
+            self._redis, f"broadcast:{broadcast_id}", owner, self.LEASE_SECONDS
+        )
+
+    async def runner(self, broadcast_id: str) -> str | None:
+        """Holder of the broadcast's lease; None when nobody is sending it."""
+        return await self.lease(broadcast_id, owner="").holder()
@@ -0,0 +1,29 @@
+from redis.asyncio import Redis
+
+from bot.loggers import get_logger
+
+logger = get_logger(__name__)
+
+_redis: Redis | None = None
+
+
+def init_redis(dsn: str) -> Redis:
+    logger.info("Initializing Redis client...")
+    global _redis
+    _redis = Redis.from_url(dsn)
+    return _redis
+
+
+def get_redis() -> Redis:
+    if _redis is None:
+        raise RuntimeError(
+            "Redis client not initialized. Did you forget to call init_redis()?"
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+import json
+from typing import Any
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+
+# Marks "leave the FSM state as it is" where None would clear it.
+KEEP_STATE: Any = object()
+
+
+def _dumps(value: Any) -> str:
+    # Cyrillic words stay UTF-8 instead of 6-byte \u escapes.
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _loads_fields(fields: Mapping[bytes, bytes]) -> dict[str, Any]:
+    return {k.decode(): json.loads(v) for k, v in fields.items()}
+
+
+class HashRedisStorage(RedisStorage):
+    """
+    FSM storage keeping the data of every chat in a Redis hash, one field per key.
+
+    aiogram's RedisStorage keeps the data as one JSON string, so changing a
+    single key reads and rewrites the whole dict in two round trips, and two
+    callbacks of one user changing different keys overwrite each other.
+    Here a change writes only the changed fields, optionally together with
+    the new state in the same transaction, and single keys are read with
+    HGET/HMGET. Each field holds its value as compact JSON.
+
+    The hash lives under the "fields" part of the key. Data RedisStorage
+    stored under "data" before the switch is fetched in the same round trip
+    as the hash, and the first access that finds it moves it into the hash,
+    so chats keep their data across the deploy.
+    """
+
+    def _data_key(self, key: StorageKey) -> str:
+        return self.key_builder.build(key, "fields")
+
+    def _legacy_key(self, key: StorageKey) -> str:
+        return self.key_builder.build(key, "data")
+
+    def _state_value(self, state: StateType) -> str:
+        return state.state if isinstance(state, State) else state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+
+        redis_key = self._data_key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(redis_key, self._legacy_key(key))
+            if data:
+                pipe.hset(redis_key, mapping={k: _dumps(v) for k, v in data.items()})
+                if self.data_ttl is not None:
+                    pipe.expire(redis_key, self.data_ttl)
+            await pipe.execute()
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._data_key(key))
+            pipe.get(self._legacy_key(key))
+            fields, legacy = await pipe.execute()
+        if legacy is not None:
+            return await self._migrate(key, legacy)
+        return _loads_fields(fields)
+
+    async def get_value(
+        self, storage_key: StorageKey, dict_key: str, default: Any | None = None
+    ) -> Any | None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hget(self._data_key(storage_key), dict_key)
+            pipe.get(self._legacy_key(storage_key))
+            value, legacy = await pipe.execute()
+        if legacy is not None:
+            return (await self._migrate(storage_key, legacy)).get(dict_key, default)
+        return default if value is None else json.loads(value)
+
+    async def get_values(self, key: StorageKey, *fields: str) -> list[Any]:
+        """Values of ``fields`` in one HMGET; None for missing ones."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(self._data_key(key), fields)
+            pipe.get(self._legacy_key(key))
+            values, legacy = await pipe.execute()
+        if legacy is not None:
+            data = await self._migrate(key, legacy)
+            return [data.get(field) for field in fields]
+        return [None if value is None else json.loads(value) for value in values]
+
+    async def update_data(
+        self, key: StorageKey, data: Mapping[str, Any]
+    ) -> dict[str, Any]:
+        # written and read back in one transaction, as FSMContext expects the
+        # whole data in return
+        redis_key = self._data_key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if data:
+                self._write_fields(pipe, redis_key, data)
+            pipe.hgetall(redis_key)
+            pipe.get(self._legacy_key(key))
+            *_, fields, legacy = await pipe.execute()
+        if legacy is not None:
+            return await self._migrate(key, legacy)
+        return _loads_fields(fields)
+
+    async def merge_data(
+        self,
+        key: StorageKey,
+        data: Mapping[str, Any],
+        state: StateType = KEEP_STATE,
+    ) -> None:
+        """
+        Write ``data`` over the current data, and set ``state`` unless it is
+        KEEP_STATE, in one round trip.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if data:
+                self._write_fields(pipe, self._data_key(key), data)
+            if state is not KEEP_STATE:
+                state_key = self.key_builder.build(key, "state")
+                if state is None:
+                    pipe.delete(state_key)
+                else:
+                    pipe.set(state_key, self._state_value(state), ex=self.state_ttl)
+            pipe.get(self._legacy_key(key))
+            *_, legacy = await pipe.execute()
+        if legacy is not None:
+            await self._migrate(key, legacy)
+
+    async def _migrate(self, key: StorageKey, legacy: bytes | str) -> dict[str, Any]:
+        """
+        Move data stored by RedisStorage into the hash and return the result.
+
+        Fields written since the switch are newer, so they are kept.
+        """
+        if isinstance(legacy, bytes):
+            legacy = legacy.decode("utf-8")
+        data = self.json_loads(legacy)
+        redis_key = self._data_key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for field, value in data.items():
+                pipe.hsetnx(redis_key, field, _dumps(value))
+            if data and self.data_ttl is not None:
+                pipe.expire(redis_key, self.data_ttl)
+            pipe.delete(self._legacy_key(key))
+            pipe.hgetall(redis_key)
+            *_, fields = await pipe.execute()
+        return _loads_fields(fields)
+
+    def _write_fields(self, pipe, redis_key: str, data: Mapping[str, Any]) -> None:
+        pipe.hset(redis_key, mapping={k: _dumps(v) for k, v in data.items()})
+        if self.data_ttl is not None:
+            pipe.expire(redis_key, self.data_ttl)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from redis.asyncio import Redis
+
+# Renew and release only the lease we hold: a lease that expired and was taken
+# by another process must not be extended or deleted by its previous holder.
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLock:
+    """
+    A leadership lease in Redis: one key holding the current leader's ID.
+
+    The key expires after ``lease_seconds`` unless the holder renews it, so a
+    leader that dies or loses Redis is replaced once its lease runs out.
+    """
+
+    def __init__(
+        self, redis: Redis, name: str, owner: str, lease_seconds: float
+    ) -> None:
+        self._redis = redis
+        self._key = f"leader:{name}"
+        self._owner = owner
+        self._lease_ms = int(lease_seconds * 1000)
+
+    async def acquire(self) -> bool:
+        """Take the lease if nobody holds it."""
+        return bool(
+            await self._redis.set(self._key, self._owner, nx=True, px=self._lease_ms)
+        )
+
+    async def renew(self) -> bool:
+        """Extend the lease; False when it is no longer ours."""
+        renewed = await self._redis.eval(
+            RENEW_SCRIPT, 1, self._key, self._owner, self._lease_ms
+        )
+        return bool(renewed)
+
+    async def release(self) -> None:
+        await self._redis.eval(RELEASE_SCRIPT, 1, self._key, self._owner)
+
+    async def holder(self) -> str | None:
+        owner = await self._redis.get(self._key)
+        return owner.decode() if owner else None
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterable
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+_KEY = "leaderboard:points"
+_BUILT_KEY = "leaderboard:built"
+_VERSION_KEY = "leaderboard:version"
+
+# Publish a rebuilt set only if no points were written since the rebuild read
+# the version: the rows it was built from may miss them. A dropped rebuild
+# leaves the leaderboard unbuilt, so the next reader tries again.
+PUBLISH_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    redis.call('DEL', KEYS[2])
+    return 0
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('RENAME', KEYS[2], KEYS[3])
+else
+    redis.call('DEL', KEYS[3])
+end
+redis.call('SET', KEYS[4], 1, 'EX', ARGV[2])
+return 1
+"""
+
+
+class Leaderboard:
+    """
+    Users ranked by points in a Redis sorted set.
+
+    The set is built from the database once a day and kept in sync by
+    writing a user's new total whenever their points change, so rank and
+    page lookups cost O(log n) instead of scanning users. Every write bumps a
+    version key, which keeps a rebuild that read the rows before it from
+    publishing an outdated set. Ranks count the users with strictly more
+    points, so tied users share a rank.
+    """
+
+    REBUILD_SECONDS = 24 * 60 * 60
+    BUILD_CHUNK = 1000
+
+    def __init__(self, redis: Redis) -> None:
+        self._redis = redis
+
+    async def is_built(self) -> bool:
+        return bool(await self._redis.exists(_BUILT_KEY))
+
+    async def rebuild(self, rows: AsyncIterable[tuple[int, int]]) -> bool:
+        """
+        Replace the set with ``(user_id, points)`` rows from the database.
+
+        Returns False when points changed meanwhile and the rebuild was dropped.
+        """
+        version = int(await self._redis.get(_VERSION_KEY) or 0)
+        building_key = f"{_KEY}:building:{uuid4().hex}"
+        chunk: dict[str, int] = {}
+        async for user_id, points in rows:
+            chunk[str(user_id)] = points
+            if len(chunk) >= self.BUILD_CHUNK:
+                await self._redis.zadd(building_key, chunk)
+                chunk = {}
+        if chunk:
+            await self._redis.zadd(building_key, chunk)
+
+        return bool(
+            await self._redis.eval(
+                PUBLISH_SCRIPT,
+                4,
+                _VERSION_KEY,
+                building_key,
+                _KEY,
+                _BUILT_KEY,
+                version,
+                self.REBUILD_SECONDS,
+            )
+        )
+
+    async def set_points(self, user_id: int, points: int) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(_KEY, {str(user_id): points})
+            pipe.incr(_VERSION_KEY)
+            await pipe.execute()
+
+    async def remove(self, user_id: int) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(_KEY, str(user_id))
+            pipe.incr(_VERSION_KEY)
+            await pipe.execute()
+
+    async def rank(self, user_id: int) -> tuple[int, int] | None:
+        """(rank, total users), or None when the user is not ranked yet."""
+        score = await self._redis.zscore(_KEY, str(user_id))
+        if score is None:
+            return None
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zcount(_KEY, f"({score}", "+inf")
+            pipe.zcard(_KEY)
+            higher, total = await pipe.execute()
+        return higher + 1, total
+
+    async def page(self, offset: int, limit: int) -> list[tuple[int, int]]:
+        """``(user_id, points)`` by descending points, starting at ``offset``."""
+        items = await self._redis.zrevrange(
+            _KEY, offset, offset + limit - 1, withscores=True
+        )
+        return [(int(member), int(score)) for member, score in items]
+
+    async def position(self, user_id: int) -> int | None:
+        """Zero-based offset of the user in page order, for neighbourhood pages."""
+        return await self._redis.zrevrank(_KEY, str(user_id))
+
+    async def total(self) -> int:
+        return await self._redis.zcard(_KEY)
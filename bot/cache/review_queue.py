@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import date
+import json
+
+from redis.asyncio import Redis
+
+_BUILT_FIELD = "__built__"
+
+
+class ReviewQueueCache:
+    """
+    Per-user queue of today's vocabulary exercises, options included.
+
+    The queue is built once from the database, then each answer removes its
+    exercise, so a drill step does not have to reload the user's words.
+    Keys carry the date, so a new day always starts from a fresh queue.
+    """
+
+    TTL_SECONDS = 2 * 60 * 60
+
+    def __init__(self, redis: Redis) -> None:
+        self._redis = redis
+
+    @staticmethod
+    def _queue_key(user_id: int, day: date) -> str:
+        return f"review_queue:{user_id}:{day.isoformat()}"
+
+    @classmethod
+    def _items_key(cls, user_id: int, day: date) -> str:
+        return f"{cls._queue_key(user_id, day)}:items"
+
+    @staticmethod
+    def _member(section: str, subsection: str, exercise_id: int) -> str:
+        return json.dumps([section, subsection, exercise_id], ensure_ascii=False)
+
+    async def is_built(self, user_id: int, day: date) -> bool:
+        return bool(await self._redis.exists(self._items_key(user_id, day)))
+
+    async def fill(self, user_id: int, day: date, exercises: list[dict]) -> None:
+        queue_key = self._queue_key(user_id, day)
+        items_key = self._items_key(user_id, day)
+        payloads = {
+            self._member(e["section"], e["subsection"], e["exercise_id"]): json.dumps(
+                e, ensure_ascii=False
+            )
+            for e in exercises
+        }
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(queue_key, items_key)
+            # The marker keeps an emptied queue distinguishable from a missing one.
+            pipe.hset(items_key, mapping={_BUILT_FIELD: 1, **payloads})
+            if payloads:
+                pipe.rpush(queue_key, *payloads.values())
+                pipe.expire(queue_key, self.TTL_SECONDS)
+            pipe.expire(items_key, self.TTL_SECONDS)
+            await pipe.execute()
+
+    async def peek(self, user_id: int, day: date) -> dict | None:
+        payload = await self._redis.lindex(self._queue_key(user_id, day), 0)
+        return json.loads(payload) if payload is not None else None
+
+    async def count(self, user_id: int, day: date) -> int | None:
+        """Exercises left for today, or None when the queue is not built."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.exists(self._items_key(user_id, day))
+            pipe.llen(self._queue_key(user_id, day))
+            built, length = await pipe.execute()
+        return length if built else None
+
+    async def remove(
+        self,
+        user_id: int,
+        day: date,
+        section: str,
+        subsection: str,
+        exercise_id: int,
+    ) -> None:
+        items_key = self._items_key(user_id, day)
+        member = self._member(section, subsection, exercise_id)
+        payload = await self._redis.hget(items_key, member)
+        if payload is None:
+            return
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._queue_key(user_id, day), 1, payload)
+            pipe.hdel(items_key, member)
+            await pipe.execute()
+
+    async def invalidate(self, user_id: int, day: date) -> None:
+        await self._redis.delete(
+            self._queue_key(user_id, day), self._items_key(user_id, day)
+        )
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+# Exercise ids start at 1, so bit 0 of a bitmap marks it as built: a bitmap
+# that only received SETBITs after expiring is never mistaken for a full one.
+_BUILT_BIT = 0
+
+# Store rebuilt bitmaps only if their version key still holds the version read
+# with the snapshot they were rebuilt for: a change committed in the meantime
+# bumped it, and the rows the bitmaps were built from may miss that change.
+FILL_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+for i = 2, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[i + 1], 'EX', ARGV[2])
+end
+return 1
+"""
+
+
+def _bitmap(offsets: Iterable[int]) -> bytes:
+    offsets = [_BUILT_BIT, *offsets]
+    bitmap = bytearray(max(offsets) // 8 + 1)
+    for offset in offsets:
+        bitmap[offset // 8] |= 0x80 >> (offset % 8)
+    return bytes(bitmap)
+
+
+def _offsets(bitmap: bytes | None) -> set[int] | None:
+    """Set bits of a Redis bitmap, or None when it is missing or not built."""
+    if not bitmap or not bitmap[0] & (0x80 >> _BUILT_BIT):
+        return None
+    return {
+        index * 8 + bit
+        for index, byte in enumerate(bitmap)
+        for bit in range(8)
+        if byte & (0x80 >> bit)
+    } - {_BUILT_BIT}
+
+
+@dataclass
+class ProgressSnapshot:
+    """A subsection's exercise ids and the ids a user has already solved."""
+
+    exercise_ids: set[int] | None
+    done: set[int] | None
+    first_try: set[int]
+    # versions to pass to fill_exercises() and fill_user()
+    exercises_version: int = 0
+    user_version: int = 0
+
+    def available(self) -> list[int]:
+        return sorted(self.exercise_ids - self.done)
+
+    def counts(self) -> tuple[int, int, int]:
+        """First-try successes, successes and total exercises."""
+        return (
+            len(self.first_try & self.exercise_ids),
+            len(self.done & self.exercise_ids),
+            len(self.exercise_ids),
+        )
+
+
+class PendingProgress:
+    """
+    Testing progress written by one update and not committed yet.
+
+    The bitmaps change only after the commit, so snapshots read later in the
+    same update merge this in, e.g. to tell that the answer just given
+    completed the subsection.
+    """
+
+    def __init__(self) -> None:
+        self._solved: dict[tuple[int, str, str], dict[int, bool]] = {}
+        self._reset: set[tuple[int, str, str]] = set()
+
+    def mark_done(
+        self,
+        user_id: int,
+        section: str,
+        subsection: str,
+        exercise_id: int,
+        first_try: bool,
+    ) -> None:
+        self._solved.setdefault((user_id, section, subsection), {})[
+            exercise_id
+        ] = first_try
+
+    def reset(self, user_id: int, section: str, subsection: str) -> None:
+        self._solved.pop((user_id, section, subsection), None)
+        self._reset.add((user_id, section, subsection))
+
+    def apply(
+        self, user_id: int, section: str, subsection: str, snapshot: ProgressSnapshot
+    ) -> None:
+        """Merge the pending changes into a snapshot with built user bitmaps."""
+        key = (user_id, section, subsection)
+        if key in self._reset:
+            snapshot.done, snapshot.first_try = set(), set()
+        for exercise_id, first_try in self._solved.get(key, {}).items():
+            snapshot.done.add(exercise_id)
+            if first_try:
+                snapshot.first_try.add(exercise_id)
+
+
+class TestingProgress:
+    """
+    Testing progress as Redis bitmaps indexed by exercise id.
+
+    One bitmap per subsection holds its exercise ids and two per user and
+    subsection hold the solved ids and those solved on the first try, so the
+    next exercise and the completion counts come from a single round-trip.
+    Bitmaps are built from the database on first use; answers set their bit
+    and admin edits drop the subsection bitmap, once their rows are
+    committed. Both also bump a version key, which keeps a rebuild that read
+    the rows before them from storing its outdated bitmaps.
+    """
+
+    TTL_SECONDS = 7 * 24 * 60 * 60
+
+    def __init__(self, redis: Redis) -> None:
+        self._redis = redis
+
+    @staticmethod
+    def _exercises_key(section: str, subsection: str) -> str:
+        return f"testing_exercises:{section}:{subsection}"
+
+    @staticmethod
+    def _exercises_version_key(section: str, subsection: str) -> str:
+        return f"testing_exercises:{section}:{subsection}:version"
+
+    @staticmethod
+    def _user_key(user_id: int, section: str, subsection: str, kind: str) -> str:
+        return f"testing_progress:{user_id}:{section}:{subsection}:{kind}"
+
+    async def snapshot(
+        self, user_id: int, section: str, subsection: str
+    ) -> ProgressSnapshot:
+        """Parts that are not built yet come back as None."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._exercises_key(section, subsection))
+            pipe.get(self._user_key(user_id, section, subsection, "done"))
+            pipe.get(self._user_key(user_id, section, subsection, "first"))
+            pipe.get(self._exercises_version_key(section, subsection))
+            pipe.get(self._user_key(user_id, section, subsection, "version"))
+            (
+                exercises,
+                done,
+                first_try,
+                exercises_version,
+                user_version,
+            ) = await pipe.execute()
+        done, first_try = _offsets(done), _offsets(first_try)
+        return ProgressSnapshot(
+            exercise_ids=_offsets(exercises),
+            # both user bitmaps are built together, so losing one loses both
+            done=done if first_try is not None else None,
+            first_try=first_try or set(),
+            exercises_version=int(exercises_version or 0),
+            user_version=int(user_version or 0),
+        )
+
+    async def fill_exercises(
+        self,
+        section: str,
+        subsection: str,
+        exercise_ids: Iterable[int],
+        version: int,
+    ) -> None:
+        await self._redis.eval(
+            FILL_SCRIPT,
+            2,
+            self._exercises_version_key(section, subsection),
+            self._exercises_key(section, subsection),
+            version,
+            self.TTL_SECONDS,
+            _bitmap(exercise_ids),
+        )
+
+    async def fill_user(
+        self,
+        user_id: int,
+        section: str,
+        subsection: str,
+        solved: Iterable[tuple[int, bool]],
+        version: int,
+    ) -> None:
+        """Store ``(exercise_id, first_try)`` pairs of the solved exercises."""
+        solved = list(solved)
+        await self._redis.eval(
+            FILL_SCRIPT,
+            3,
+            self._user_key(user_id, section, subsection, "version"),
+            self._user_key(user_id, section, subsection, "done"),
+            self._user_key(user_id, section, subsection, "first"),
+            version,
+            self.TTL_SECONDS,
+            _bitmap(exercise_id for exercise_id, _ in solved),
+            _bitmap(exercise_id for exercise_id, first in solved if first),
+        )
+
+    async def mark_done(
+        self,
+        user_id: int,
+        section: str,
+        subsection: str,
+        exercise_id: int,
+        first_try: bool,
+    ) -> None:
+        done_key = self._user_key(user_id, section, subsection, "done")
+        first_key = self._user_key(user_id, section, subsection, "first")
+        version_key = self._user_key(user_id, section, subsection, "version")
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.setbit(done_key, exercise_id, 1)
+            if first_try:
+                pipe.setbit(first_key, exercise_id, 1)
+            pipe.incr(version_key)
+            pipe.expire(done_key, self.TTL_SECONDS)
+            pipe.expire(first_key, self.TTL_SECONDS)
+            pipe.expire(version_key, self.TTL_SECONDS)
+            await pipe.execute()
+
+    async def reset(self, user_id: int, section: str, subsection: str) -> None:
+        version_key = self._user_key(user_id, section, subsection, "version")
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(
+                self._user_key(user_id, section, subsection, "done"),
+                self._user_key(user_id, section, subsection, "first"),
+            )
+            pipe.incr(version_key)
+            pipe.expire(version_key, self.TTL_SECONDS)
+            await pipe.execute()
+
+    async def invalidate_exercises(self, section: str, subsection: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._exercises_key(section, subsection))
+            pipe.incr(self._exercises_version_key(section, subsection))
+            await pipe.execute()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from aiogram.types import Update
+from aiogram.types.update import UpdateTypeLookupError
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+_GROUP = "workers"
+
+
+def update_user_id(update: Update) -> int:
+    """ID of the user an update came from; 0 for updates without one."""
+    try:
+        user = getattr(update.event, "from_user", None)
+    except UpdateTypeLookupError:
+        return 0
+    return user.id if user else 0
+
+
+@dataclass
+class StreamEntry:
+    entry_id: bytes
+    payload: bytes
+    deliveries: int = 1
+
+
+class UpdateStream:
+    """
+    Raw Telegram updates in Redis Streams, partitioned by user ID.
+
+    Every partition is a stream read by one consumer group. A partition is
+    read only by the worker holding its lease, as the consumer named after
+    the partition: updates of a user always land in the same partition and
+    are read by a single consumer, so they are handled in order and the
+    user's FSM state is never written concurrently, short of a takeover while
+    the previous owner is still handling a batch. Entries stay pending until
+    acknowledged, so whoever takes the partition over after a crash gets the
+    updates that were read but not handled.
+    """
+
+    MAX_LENGTH = 100_000
+
+    def __init__(self, redis: Redis, partitions: int) -> None:
+        self._redis = redis
+        self.partitions = partitions
+
+    @staticmethod
+    def _key(partition: int) -> str:
+        return f"updates:{partition}"
+
+    @staticmethod
+    def _consumer(partition: int) -> str:
+        return f"partition-{partition}"
+
+    def partition(self, user_id: int) -> int:
+        return user_id % self.partitions
+
+    async def offer(self, update: Update) -> bool:
+        """Append an update to its user's partition."""
+        partition = self.partition(update_user_id(update))
+        await self._redis.xadd(
+            self._key(partition),
+            {"update": update.model_dump_json(exclude_unset=True)},
+            maxlen=self.MAX_LENGTH,
+            approximate=True,
+        )
+        return True
+
+    async def ensure_group(self, partition: int) -> None:
+        try:
+            await self._redis.xgroup_create(
+                self._key(partition), _GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(
+        self, partition: int, count: int, block_ms: int
+    ) -> list[StreamEntry]:
+        """Entries never read before, waiting up to ``block_ms`` for some."""
+        response = await self._redis.xreadgroup(
+            _GROUP,
+            self._consumer(partition),
+            {self._key(partition): ">"},
+            count=count,
+            block=block_ms,
+        )
+        return [
+            StreamEntry(entry_id, fields[b"update"])
+            for _, entries in response or []
+            for entry_id, fields in entries
+        ]
+
+    async def read_pending(self, partition: int, count: int) -> list[StreamEntry]:
+        """Entries read earlier but not acknowledged, read again."""
+        key, consumer = self._key(partition), self._consumer(partition)
+        pending = await self._redis.xpending_range(
+            key, _GROUP, min="-", max="+", count=count, consumername=consumer
+        )
+        if not pending:
+            return []
+        deliveries = {p["message_id"]: p["times_delivered"] + 1 for p in pending}
+        # XCLAIM counts the redelivery and returns the entries still in the
+        # stream; those trimmed meanwhile are acknowledged and dropped.
+        claimed = await self._redis.xclaim(
+            key, _GROUP, consumer, min_idle_time=0, message_ids=list(deliveries)
+        )
+        entries = [
+            StreamEntry(entry_id, fields[b"update"], deliveries[entry_id])
+            for entry_id, fields in claimed
+            if fields
+        ]
+        trimmed = deliveries.keys() - {entry.entry_id for entry in entries}
+        if trimmed:
+            await self._redis.xack(key, _GROUP, *trimmed)
+        return entries
+
+    async def ack(self, partition: int, entry_id: bytes) -> None:
+        await self._redis.xack(self._key(partition), _GROUP, entry_id)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy import URL
 
@@ -21,6 +23,24 @@ class Settings(BaseSettings):
     owner_tg_link: str
     developer_tg_id: int
 
+    # Webhook mode: updates are received on an aiohttp server behind a reverse
+    # proxy instead of long polling, which is used while webhook_url is empty.
+    webhook_url: str | None = None
+    webhook_secret: str | None = None
+    webhook_path: str = "/webhook"
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_max_in_flight: int = 100
+    webhook_workers: int = 20
+
+    # Split deployment: a "receiver" only appends updates to Redis Streams and
+    # "worker" processes handle the stream partitions in worker_partitions
+    # (all of them when empty), each partition by the worker holding its
+    # lease; "standalone" receives and handles updates.
+    bot_role: Literal["standalone", "receiver", "worker"] = "standalone"
+    stream_partitions: int = 8
+    worker_partitions: list[int] = []
+
     def build_postgres_dsn(self) -> URL:
         return URL.create(
             "postgresql+asyncpg",
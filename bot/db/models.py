@@ -5,12 +5,15 @@ from sqlalchemy import (
     Boolean,
     Date,
     DateTime,
+    Float,
     ForeignKey,
     ForeignKeyConstraint,
     Index,
     Integer,
+    LargeBinary,
     String,
     Time,
+    func,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -39,6 +42,10 @@ class TestingExercise(Base):
     answer: Mapped[str] = mapped_column(String(256), nullable=False)
 
 
+# list_exercises looks subsections up without their section.
+Index("ix_testing_exercises_subsection", TestingExercise.subsection)
+
+
 class NewWords(Base):
     __tablename__ = "new_words"
     section: Mapped[str] = mapped_column(String(64), primary_key=True, nullable=False)
@@ -53,6 +60,9 @@ class NewWords(Base):
     )
 
 
+Index("ix_new_words_subsection", NewWords.subsection)
+
+
 class UserWordsLearning(Base):
     __tablename__ = "user_words_learning"
     user_id: Mapped[int] = mapped_column(
@@ -93,6 +103,13 @@ Index(
     UserWordsLearning.section,
     UserWordsLearning.subsection,
 )
+# Today's words of a user; covers the exercise key for index-only scans.
+Index(
+    "ix_user_words_learning_due",
+    UserWordsLearning.user_id,
+    UserWordsLearning.next_review_date,
+    postgresql_include=["section", "subsection", "exercise_id"],
+)
 
 
 class UserProgress(Base):
@@ -118,6 +135,15 @@ class UserProgress(Base):
     date: Mapped[date] = mapped_column(Date, nullable=False)
 
 
+# Activity counts of a user by exercise type over a date interval.
+Index(
+    "ix_user_progress_activity",
+    UserProgress.user_id,
+    UserProgress.exercise_type,
+    UserProgress.date,
+)
+
+
 class User(Base):
     __tablename__ = "users"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -130,6 +156,18 @@ class User(Base):
     time_zone: Mapped[str | None] = mapped_column(String)
 
 
+# Serves the reminder dispatcher's per-minute lookup.
+Index("ix_users_reminder_slot", User.reminder_time, User.time_zone)
+# Ranks and leaderboard pages.
+Index("ix_users_points", User.points.desc(), User.user_id)
+# Prefix search by login in the admin user browser.
+Index(
+    "ix_users_tg_login_lower",
+    func.lower(User.tg_login).label("tg_login_lower"),
+    postgresql_ops={"tg_login_lower": "text_pattern_ops"},
+)
+
+
 class DailyStatistics(Base):
     __tablename__ = "daily_statistics"
     date: Mapped[date] = mapped_column(Date, primary_key=True, nullable=False)
@@ -144,3 +182,12 @@ class DailyStatistics(Base):
 
 
 Index("ix_daily_statistics_date", DailyStatistics.date)
+
+
+class ScheduledJob(Base):
+    """A pickled APScheduler job, as stored by PostgresJobStore."""
+
+    __tablename__ = "scheduled_jobs"
+    id: Mapped[str] = mapped_column(String(191), primary_key=True)
+    next_run_time: Mapped[float | None] = mapped_column(Float(25))
+    job_state: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
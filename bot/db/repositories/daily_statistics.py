@@ -3,12 +3,20 @@ from __future__ import annotations
 from datetime import date
 import typing as t
 
-from sqlalchemy import func, select, update
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.db.init import get_session_maker
 from bot.db.models import DailyStatistics
 
+_COUNTER_COLUMNS = (
+    "total_new_words",
+    "total_testing_exercises",
+    "total_irregular_verbs",
+    "new_users",
+)
+
 
 class DailyStatisticsRepository:
 
@@ -17,39 +25,27 @@ class DailyStatisticsRepository:
     ) -> None:
         self._session_maker = session_maker or get_session_maker()
 
-    # ───────────────────────── helpers ───────────────────────── #
-
-    async def _scalar(self, stmt):
-        async with self._session_maker() as session:
-            return (await session.execute(stmt)).scalar_one_or_none()
-
-    # ───────────────────────── CRUD ──────────────────────────── #
+    # ───────────────────────── WRITE ─────────────────────────── #
 
-    async def get_by_date(self, day: date) -> DailyStatistics | None:
-        stmt = select(DailyStatistics).filter_by(date=day)
-        return await self._scalar(stmt)
+    async def add_counts(self, day: date, counts: t.Mapping[str, int]) -> None:
+        """
+        Add ``counts`` (column name -> amount) to the row of ``day``.
 
-    async def create_blank_for_date(self, day: date) -> DailyStatistics:
-        stats = DailyStatistics(
-            date=day,
-            total_new_words=0,
-            total_testing_exercises=0,
-            total_irregular_verbs=0,
-            new_users=0,
+        A single INSERT ... ON CONFLICT DO UPDATE creates the row on the first
+        write of the day, so no prior read is needed.
+        """
+        columns = {name: 0 for name in _COUNTER_COLUMNS}
+        columns.update(counts)
+        stmt = insert(DailyStatistics).values(date=day, **columns)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyStatistics.date],
+            set_={
+                name: getattr(DailyStatistics, name) + getattr(stmt.excluded, name)
+                for name in counts
+            },
         )
         async with self._session_maker() as session, session.begin():
-            session.add(stats)
-        return stats
-
-    async def increment_field(
-        self, day: date, field_name: str, amount: int = 1
-    ) -> None:
-        async with self._session_maker() as session, session.begin():
-            await session.execute(
-                update(DailyStatistics)
-                .where(DailyStatistics.date == day)
-                .values({field_name: getattr(DailyStatistics, field_name) + amount})
-            )
+            await session.execute(stmt)
 
     # ──────────────────────── aggregation ────────────────────── #
 
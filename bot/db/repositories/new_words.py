@@ -2,7 +2,20 @@ from __future__ import annotations
 
 import typing as t
 
-from sqlalchemy import delete, distinct, func, select, update
+from sqlalchemy import (
+    Integer,
+    Row,
+    String,
+    column,
+    delete,
+    distinct,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.db.init import get_session_maker
@@ -46,6 +59,20 @@ class NewWordsRepository:
             )
             return result.scalar() or 0
 
+    async def count_by_subsection(self) -> list[Row]:
+        """Section, subsection and exercise count, ordered by both names."""
+        async with self._session_maker() as session:
+            result = await session.execute(
+                select(
+                    NewWords.section,
+                    NewWords.subsection,
+                    func.count().label("count"),
+                )
+                .group_by(NewWords.section, NewWords.subsection)
+                .order_by(NewWords.section, NewWords.subsection)
+            )
+            return list(result.fetchall())
+
     async def get_subsection_names(self, section: str) -> list[str]:
         async with self._session_maker() as session:
             result = await session.execute(
@@ -55,8 +82,56 @@ class NewWordsRepository:
             )
             return list(result.scalars().all())
 
+    async def list_russian_words(self) -> list[Row]:
+        """Section, subsection and Russian translation of every word."""
+        async with self._session_maker() as session:
+            result = await session.execute(
+                select(NewWords.section, NewWords.subsection, NewWords.russian)
+            )
+            return list(result.fetchall())
+
     # ────────────────────────────── WRITE ──────────────────────────────── #
 
+    async def add_exercises(
+        self, section: str, subsection: str, rows: list[tuple[str, str]]
+    ) -> None:
+        """
+        Append ``(russian, english)`` rows to a subsection in one INSERT ... SELECT.
+
+        Ids continue from the subsection's current maximum and are computed
+        inside the statement, so the whole batch is one round-trip.
+        """
+        if not rows:
+            return
+        batch = values(
+            column("ord", Integer),
+            column("russian", String),
+            column("english", String),
+            name="batch",
+        ).data(
+            [
+                (ord_, russian, english)
+                for ord_, (russian, english) in enumerate(rows, start=1)
+            ]
+        )
+        max_id = (
+            select(func.coalesce(func.max(NewWords.id), 0))
+            .filter_by(section=section, subsection=subsection)
+            .scalar_subquery()
+        )
+        stmt = insert(NewWords).from_select(
+            ["section", "subsection", "id", "russian", "english"],
+            select(
+                literal(section),
+                literal(subsection),
+                max_id + batch.c.ord,
+                batch.c.russian,
+                batch.c.english,
+            ),
+        )
+        async with self._session_maker() as session, session.begin():
+            await session.execute(stmt)
+
     async def add_exercise(self, exercise: NewWords) -> None:
         async with self._session_maker() as session, session.begin():
             session.add(exercise)
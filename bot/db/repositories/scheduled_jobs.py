@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import typing as t
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.db.init import get_session_maker
+from bot.db.models import ScheduledJob
+
+
+class ScheduledJobRepository:
+
+    def __init__(
+        self, session_maker: t.Callable[[], AsyncSession] | None = None
+    ) -> None:
+        self._session_maker = session_maker or get_session_maker()
+
+    # ───────────────────────── READ ──────────────────────────── #
+
+    async def get_all(self) -> list[tuple[str, bytes]]:
+        """(id, job_state) of every stored job."""
+        stmt = select(ScheduledJob.id, ScheduledJob.job_state).order_by(
+            ScheduledJob.next_run_time, ScheduledJob.id
+        )
+        async with self._session_maker() as session:
+            rows = (await session.execute(stmt)).fetchall()
+        return [(row.id, row.job_state) for row in rows]
+
+    # ───────────────────────── WRITE ─────────────────────────── #
+
+    async def save(
+        self, job_id: str, next_run_time: float | None, job_state: bytes
+    ) -> None:
+        stmt = insert(ScheduledJob).values(
+            id=job_id, next_run_time=next_run_time, job_state=job_state
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ScheduledJob.id],
+            set_={
+                "next_run_time": stmt.excluded.next_run_time,
+                "job_state": stmt.excluded.job_state,
+            },
+        )
+        async with self._session_maker() as session, session.begin():
+            await session.execute(stmt)
+
+    async def delete(self, job_id: str) -> None:
+        async with self._session_maker() as session, session.begin():
+            await session.execute(delete(ScheduledJob).where(ScheduledJob.id == job_id))
+
+    async def delete_all(self) -> None:
+        async with self._session_maker() as session, session.begin():
+            await session.execute(delete(ScheduledJob))
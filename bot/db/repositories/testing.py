@@ -2,7 +2,19 @@ from __future__ import annotations
 
 import typing as t
 
-from sqlalchemy import delete, distinct, func, select, update
+from sqlalchemy import (
+    Integer,
+    Row,
+    String,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.db.init import get_session_maker
@@ -48,46 +60,98 @@ class TestingRepository:
             )
             return result.scalar() or 0
 
-    async def get_available_exercises(
-        self, section: str, subsection: str, user_id: int
-    ) -> list[TestingExercise]:
+    async def get_exercise(
+        self, section: str, subsection: str, exercise_id: int
+    ) -> TestingExercise | None:
         async with self._session_maker() as session:
-            completed_ex_ids = select(UserProgress.exercise_id).where(
-                UserProgress.user_id == user_id,
-                UserProgress.exercise_section == section,
-                UserProgress.exercise_subsection == subsection,
-                UserProgress.success.is_(True),
+            result = await session.execute(
+                select(TestingExercise).filter_by(
+                    section=section, subsection=subsection, id=exercise_id
+                )
             )
+            return result.scalar_one_or_none()
 
+    async def list_exercise_ids(self, section: str, subsection: str) -> list[int]:
+        async with self._session_maker() as session:
             result = await session.execute(
-                select(TestingExercise).where(
-                    TestingExercise.section == section,
-                    TestingExercise.subsection == subsection,
-                    TestingExercise.id.not_in(completed_ex_ids),
+                select(TestingExercise.id).filter_by(
+                    section=section, subsection=subsection
                 )
             )
             return list(result.scalars().all())
 
-    async def get_section_names(self) -> list[str]:
+    async def list_solved(
+        self, user_id: int, section: str, subsection: str
+    ) -> list[Row]:
+        """Exercise id and first-try flag of the user's solved exercises."""
         async with self._session_maker() as session:
             result = await session.execute(
-                select(distinct(TestingExercise.section)).order_by(
-                    TestingExercise.section
+                select(
+                    UserProgress.exercise_id,
+                    (UserProgress.attempts == 1).label("first_try"),
+                ).where(
+                    UserProgress.user_id == user_id,
+                    UserProgress.exercise_type == "Testing",
+                    UserProgress.exercise_section == section,
+                    UserProgress.exercise_subsection == subsection,
+                    UserProgress.success.is_(True),
                 )
             )
-            return list(result.scalars().all())
+            return list(result.fetchall())
 
-    async def get_subsection_names(self, section: str) -> list[str]:
+    async def count_by_subsection(self) -> list[Row]:
+        """Section, subsection and exercise count, ordered by both names."""
         async with self._session_maker() as session:
             result = await session.execute(
-                select(distinct(TestingExercise.subsection))
-                .filter_by(section=section)
-                .order_by(TestingExercise.subsection)
+                select(
+                    TestingExercise.section,
+                    TestingExercise.subsection,
+                    func.count().label("count"),
+                )
+                .group_by(TestingExercise.section, TestingExercise.subsection)
+                .order_by(TestingExercise.section, TestingExercise.subsection)
             )
-            return list(result.scalars().all())
+            return list(result.fetchall())
 
     # ────────────────────────────── WRITE ──────────────────────────────── #
 
+    async def add_exercises(
+        self, section: str, subsection: str, rows: list[tuple[str, str]]
+    ) -> None:
+        """
+        Append ``(test, answer)`` rows to a subsection in one INSERT ... SELECT.
+
+        Ids continue from the subsection's current maximum and are computed
+        inside the statement, so the whole batch is one round-trip.
+        """
+        if not rows:
+            return
+        batch = values(
+            column("ord", Integer),
+            column("test", String),
+            column("answer", String),
+            name="batch",
+        ).data(
+            [(ord_, test, answer) for ord_, (test, answer) in enumerate(rows, start=1)]
+        )
+        max_id = (
+            select(func.coalesce(func.max(TestingExercise.id), 0))
+            .filter_by(section=section, subsection=subsection)
+            .scalar_subquery()
+        )
+        stmt = insert(TestingExercise).from_select(
+            ["section", "subsection", "id", "test", "answer"],
+            select(
+                literal(section),
+                literal(subsection),
+                max_id + batch.c.ord,
+                batch.c.test,
+                batch.c.answer,
+            ),
+        )
+        async with self._session_maker() as session, session.begin():
+            await session.execute(stmt)
+
     async def add_exercise(self, exercise: TestingExercise) -> None:
         async with self._session_maker() as session, session.begin():
             session.add(exercise)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import typing as t
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import Row, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.db.init import get_session_maker
@@ -32,9 +32,48 @@ class UserRepository:
         stmt = select(User).where(User.user_id == user_id)
         return await self._scalar(stmt)
 
-    async def list_all(self) -> list[User]:
-        stmt = select(User).order_by(User.id)
-        return list(await self._scalars(stmt))
+    async def list_page(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        query: str | None = None,
+    ) -> list[Row]:
+        """
+        (id, user_id, full_name, tg_login) of up to ``limit`` users, by id.
+
+        Keyset pagination on users.id: pass ``after_id`` for the next page or
+        ``before_id`` for the previous one. ``query`` matches a Telegram ID
+        exactly or a login by prefix, case-insensitively.
+        """
+        stmt = select(User.id, User.user_id, User.full_name, User.tg_login)
+        if query:
+            login = func.lower(User.tg_login).startswith(
+                query.lstrip("@").lower(), autoescape=True
+            )
+            stmt = stmt.where(
+                or_(User.user_id == int(query), login) if query.isdigit() else login
+            )
+        if before_id is not None:
+            stmt = stmt.where(User.id < before_id).order_by(User.id.desc())
+        else:
+            if after_id is not None:
+                stmt = stmt.where(User.id > after_id)
+            stmt = stmt.order_by(User.id)
+        async with self._session_maker() as session:
+            rows = list((await session.execute(stmt.limit(limit))).fetchall())
+        return rows[::-1] if before_id is not None else rows
+
+    async def list_ids_page(self, after_id: int, limit: int) -> list[Row]:
+        """(id, user_id) of the next ``limit`` users after ``after_id``, by id."""
+        stmt = (
+            select(User.id, User.user_id)
+            .where(User.id > after_id)
+            .order_by(User.id)
+            .limit(limit)
+        )
+        async with self._session_maker() as session:
+            return list((await session.execute(stmt)).fetchall())
 
     # ───────────────────────── WRITE ─────────────────────────── #
 
@@ -4,17 +4,20 @@ from datetime import date
 import typing as t
 
 from sqlalchemy import (
+    Boolean,
+    Row,
     delete,
     desc,
     func,
+    literal_column,
     select,
     update,
 )
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.db.init import get_session_maker
 from bot.db.models import (
-    TestingExercise,
     User,
     UserProgress,
 )
@@ -42,7 +45,7 @@ class UserProgressRepository:
 
     # ───────────────────────────── WRITE ────────────────────────── #
 
-    async def update_progress_attempt(
+    async def record_attempt(
         self,
         user_id: int,
         exercise_type: str,
@@ -50,38 +53,51 @@ class UserProgressRepository:
         subsection: str,
         exercise_id: int,
         success: bool,
-    ) -> int:
-        async with self._session_maker() as session, session.begin():
-            stmt = (
-                update(UserProgress)
-                .where(
-                    UserProgress.user_id == user_id,
-                    UserProgress.exercise_type == exercise_type,
-                    UserProgress.exercise_section == section,
-                    UserProgress.exercise_subsection == subsection,
-                    UserProgress.exercise_id == exercise_id,
-                )
-                .values(
-                    attempts=UserProgress.attempts + 1,
-                    success=success,
-                    date=date.today(),
-                )
+        today: date,
+    ) -> Row | None:
+        """
+        Upsert the user's progress on an exercise and update their points
+        in one statement.
+
+        Returns a (first_try, points) row: first_try is True when the progress
+        row was inserted, and points is the user's new total.
+        """
+        upsert = insert(UserProgress).values(
+            user_id=user_id,
+            exercise_type=exercise_type,
+            exercise_section=section,
+            exercise_subsection=subsection,
+            exercise_id=exercise_id,
+            attempts=1,
+            success=success,
+            date=today,
+        )
+        attempted = (
+            upsert.on_conflict_do_update(
+                index_elements=UserProgress.__table__.primary_key.columns,
+                set_={
+                    "attempts": UserProgress.attempts + 1,
+                    "success": upsert.excluded.success,
+                    "date": upsert.excluded.date,
+                },
             )
-            result = await session.execute(stmt)
-            return result.rowcount
-
-    async def add_progress_entry(self, entry: UserProgress) -> None:
-        async with self._session_maker() as session, session.begin():
-            session.add(entry)
-
-    async def update_user_points(self, user_id: int, delta: int) -> None:
-        async with self._session_maker() as session, session.begin():
-            stmt = (
-                update(User)
-                .where(User.user_id == user_id)
-                .values(points=User.points + delta)
+            # xmax is 0 only for a freshly inserted row version
+            .returning(literal_column("xmax = 0", Boolean).label("inserted")).cte(
+                "attempted"
             )
-            await session.execute(stmt)
+        )
+        stmt = (
+            update(User)
+            .where(User.user_id == user_id)
+            .values(points=User.points + (1 if success else -1))
+            .returning(
+                select(attempted.c.inserted).scalar_subquery().label("first_try"),
+                User.points,
+            )
+            .add_cte(attempted)
+        )
+        async with self._session_maker() as session, session.begin():
+            return (await session.execute(stmt)).one_or_none()
 
     async def delete_progress_by_subsection(
         self, user_id: int, section: str, subsection: str
@@ -96,36 +112,6 @@ class UserProgressRepository:
 
     # ───────────────────────────── READ ─────────────────────────── #
 
-    # --- counts for Testing section ---
-    async def count_success_testing(
-        self, user_id: int, section: str, subsection: str, first_try_only: bool = False
-    ) -> int:
-        stmt = (
-            select(func.count())
-            .select_from(UserProgress)
-            .where(
-                UserProgress.user_id == user_id,
-                UserProgress.exercise_type == "Testing",
-                UserProgress.exercise_section == section,
-                UserProgress.exercise_subsection == subsection,
-                UserProgress.success.is_(True),
-            )
-        )
-        if first_try_only:
-            stmt = stmt.where(UserProgress.attempts == 1)
-        return await self._scalar(stmt) or 0
-
-    async def count_testing_exercises_total(self, section: str, subsection: str) -> int:
-        stmt = (
-            select(func.count())
-            .select_from(TestingExercise)
-            .where(
-                TestingExercise.section == section,
-                TestingExercise.subsection == subsection,
-            )
-        )
-        return await self._scalar(stmt) or 0
-
     # --- generic activity ---
     async def count_by_type_in_interval(
         self,
@@ -159,12 +145,33 @@ class UserProgressRepository:
         stmt = select(func.count()).select_from(User)
         return await self._scalar(stmt) or 0
 
-    async def list_users_ordered_by_points(self):
-        stmt = select(
-            User.id,
-            User.user_id,
-            User.full_name,
-            User.tg_login,
-            User.points,
-        ).order_by(desc(User.points))
+    async def list_users_ordered_by_points(
+        self, offset: int = 0, limit: int | None = None
+    ) -> list[Row]:
+        stmt = (
+            select(
+                User.id,
+                User.user_id,
+                User.full_name,
+                User.tg_login,
+                User.points,
+            )
+            .order_by(desc(User.points), User.user_id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return await self._fetchall(stmt)
+
+    async def list_users_by_ids(self, user_ids: list[int]) -> list[Row]:
+        stmt = select(User.user_id, User.full_name, User.tg_login).where(
+            User.user_id.in_(user_ids)
+        )
         return await self._fetchall(stmt)
+
+    async def stream_points(self, batch_size: int = 1000) -> t.AsyncIterator[Row]:
+        """Yield (user_id, points) of all users through a server-side cursor."""
+        stmt = select(User.user_id, User.points).execution_options(yield_per=batch_size)
+        async with self._session_maker() as session:
+            result = await session.stream(stmt)
+            async for row in result:
+                yield row
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, time, timedelta
 import typing as t
 
-from sqlalchemy import distinct, func, select, update
+from sqlalchemy import (
+    Date,
+    Float,
+    Integer,
+    Row,
+    cast,
+    distinct,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
 from bot.db.init import get_session_maker
 from bot.db.models import (
@@ -13,6 +24,26 @@ from bot.db.models import (
     User,
     UserWordsLearning,
 )
+from bot.services.utils import (
+    BASE_INTERVAL,
+    GROWTH_FACTOR,
+    MAX_INTERVAL_DAYS,
+    TARGET_SUCCESS_RATE,
+)
+
+
+def _review_interval_days(success, attempts):
+    """SQL counterpart of bot.services.utils.calculate_next_review_date."""
+    success_rate = cast(success, Float) / attempts
+    interval = (
+        BASE_INTERVAL
+        * func.power(GROWTH_FACTOR, success)
+        * (1 + (success_rate - TARGET_SUCCESS_RATE) * 2)
+    )
+    return cast(
+        func.greatest(1, func.least(MAX_INTERVAL_DAYS, func.floor(interval))),
+        Integer,
+    )
 
 
 class UserWordsLearningRepository:
@@ -24,44 +55,25 @@ class UserWordsLearningRepository:
 
     # ─────────────────────────────── READ ──────────────────────────────── #
 
-    async def words_to_learn_today(self, user_id: int) -> list[UserWordsLearning]:
-        async with self._session_maker() as session:
-            stmt = (
-                select(UserWordsLearning)
-                .filter(
-                    UserWordsLearning.user_id == user_id,
-                    UserWordsLearning.next_review_date <= date.today(),
-                )
-                .options(joinedload(UserWordsLearning.new_word))
+    async def due_words(self, user_id: int, today: date) -> list[Row]:
+        """Exercise key and both translations of every word due by ``today``."""
+        stmt = (
+            select(
+                UserWordsLearning.section,
+                UserWordsLearning.subsection,
+                UserWordsLearning.exercise_id,
+                NewWords.russian,
+                NewWords.english,
             )
-            result = await session.execute(stmt)
-            return list(result.scalars().all())
-
-    async def all_words_by_section_subsection(
-        self, user_id: int, section: str, subsection: str
-    ) -> list[UserWordsLearning]:
-        async with self._session_maker() as session:
-            stmt = (
-                select(UserWordsLearning)
-                .filter(
-                    UserWordsLearning.user_id == user_id,
-                    UserWordsLearning.section == section,
-                    UserWordsLearning.subsection == subsection,
-                )
-                .options(joinedload(UserWordsLearning.new_word))
+            .join(UserWordsLearning.new_word)
+            .where(
+                UserWordsLearning.user_id == user_id,
+                UserWordsLearning.next_review_date <= today,
             )
-            result = await session.execute(stmt)
-            return list(result.scalars().all())
-
-    async def all_words_by_user(self, user_id: int) -> list[UserWordsLearning]:
+        )
         async with self._session_maker() as session:
-            stmt = (
-                select(UserWordsLearning)
-                .filter(UserWordsLearning.user_id == user_id)
-                .options(joinedload(UserWordsLearning.new_word))
-            )
             result = await session.execute(stmt)
-            return list(result.scalars().all())
+            return list(result.fetchall())
 
     async def count_active_learning(self, user_id: int, active_rate: int) -> int:
         async with self._session_maker() as session:
@@ -73,18 +85,6 @@ class UserWordsLearningRepository:
 
             return result.scalar() or 0
 
-    async def count_active_in_subsection(
-        self, user_id: int, subsection: str, learning_rate: int
-    ) -> int:
-        async with self._session_maker() as session:
-            stmt = select(func.count(UserWordsLearning.exercise_id)).where(
-                UserWordsLearning.subsection == subsection,
-                UserWordsLearning.user_id == user_id,
-                UserWordsLearning.success <= learning_rate,
-            )
-            result = await session.execute(stmt)
-            return result.scalar()
-
     async def count_learned(self, user_id: int, learned_rate: int) -> int:
         async with self._session_maker() as session:
             stmt = select(func.count(UserWordsLearning.exercise_id)).where(
@@ -111,6 +111,28 @@ class UserWordsLearningRepository:
             result = await session.execute(stmt)
             return result.scalar() or 0
 
+    async def count_due_in_reminder_slots(
+        self, slots: list[tuple[time, str]], today: date
+    ) -> list[Row]:
+        """
+        (user_id, due) for users with a reminder at one of ``slots`` and at
+        least one word due by ``today``, in a single grouped query.
+        """
+        if not slots:
+            return []
+        stmt = (
+            select(UserWordsLearning.user_id, func.count().label("due"))
+            .join(User, User.user_id == UserWordsLearning.user_id)
+            .where(
+                tuple_(User.reminder_time, User.time_zone).in_(slots),
+                UserWordsLearning.next_review_date <= today,
+            )
+            .group_by(UserWordsLearning.user_id)
+        )
+        async with self._session_maker() as session:
+            result = await session.execute(stmt)
+            return list(result.fetchall())
+
     async def distinct_subsections(self, user_id: int) -> list[str]:
         async with self._session_maker() as session:
             stmt = select(distinct(UserWordsLearning.subsection)).filter(
@@ -119,100 +141,88 @@ class UserWordsLearningRepository:
             result = await session.execute(stmt)
             return list(result.scalars().all())
 
-    async def count_learned_in_subsection(
-        self, user_id: int, subsection: str, learned_rate: int
-    ) -> int:
-        async with self._session_maker() as session:
-            stmt = select(func.count(UserWordsLearning.exercise_id)).where(
-                UserWordsLearning.subsection == subsection,
-                UserWordsLearning.user_id == user_id,
-                UserWordsLearning.success >= learned_rate,
+    async def subsection_stats(
+        self, user_id: int, active_rate: int, learned_rate: int
+    ) -> list[Row]:
+        """One row per subsection: learned/active/today/total/success/attempts."""
+        stmt = (
+            select(
+                UserWordsLearning.subsection,
+                func.count()
+                .filter(UserWordsLearning.success >= learned_rate)
+                .label("learned"),
+                func.count()
+                .filter(UserWordsLearning.success <= active_rate)
+                .label("active"),
+                func.count()
+                .filter(UserWordsLearning.next_review_date <= date.today())
+                .label("today"),
+                func.count().label("total"),
+                func.coalesce(func.sum(UserWordsLearning.success), 0).label("success"),
+                func.coalesce(func.sum(UserWordsLearning.attempts), 0).label(
+                    "attempts"
+                ),
             )
-            result = await session.execute(stmt)
-            return result.scalar() or 0
-
-    async def count_today_in_subsection(self, user_id: int, subsection: str) -> int:
+            .where(UserWordsLearning.user_id == user_id)
+            .group_by(UserWordsLearning.subsection)
+            .order_by(UserWordsLearning.subsection)
+        )
         async with self._session_maker() as session:
-            stmt = select(func.count(UserWordsLearning.exercise_id)).where(
-                UserWordsLearning.subsection == subsection,
-                UserWordsLearning.user_id == user_id,
-                UserWordsLearning.next_review_date <= date.today(),
-            )
             result = await session.execute(stmt)
-            return result.scalar() or 0
+            return list(result.fetchall())
 
-    async def count_total_in_subsection(self, user_id: int, subsection: str) -> int:
-        async with self._session_maker() as session:
-            stmt = select(func.count(UserWordsLearning.exercise_id)).where(
-                UserWordsLearning.subsection == subsection,
-                UserWordsLearning.user_id == user_id,
-            )
-            result = await session.execute(stmt)
-            return result.scalar() or 0
+    # ────────────────────────────── WRITE ──────────────────────────────── #
 
-    async def sum_success_in_subsection(self, user_id: int, subsection: str) -> int:
-        async with self._session_maker() as session:
-            stmt = select(func.sum(UserWordsLearning.success)).where(
-                UserWordsLearning.subsection == subsection,
-                UserWordsLearning.user_id == user_id,
-            )
-            result = await session.execute(stmt)
-            return result.scalar() or 0
+    async def record_answer(
+        self,
+        user_id: int,
+        section: str,
+        subsection: str,
+        exercise_id: int,
+        success: bool,
+        today: date,
+    ) -> int | None:
+        """
+        Update the user's review state for a word and their points in one statement.
 
-    async def sum_attempts_in_subsection(self, user_id: int, subsection: str) -> int:
-        async with self._session_maker() as session:
-            stmt = select(func.sum(UserWordsLearning.attempts)).where(
-                UserWordsLearning.subsection == subsection,
-                UserWordsLearning.user_id == user_id,
+        Returns the user's new points, or None when the user has no such word
+        in learning.
+        """
+        success_value = (
+            UserWordsLearning.success + 1 if success else UserWordsLearning.success
+        )
+        attempts_value = UserWordsLearning.attempts + 1
+        if success:
+            next_review_date = cast(literal(today), Date) + _review_interval_days(
+                success_value, attempts_value
             )
-            result = await session.execute(stmt)
-            return result.scalar() or 0
+        else:
+            next_review_date = cast(literal(today + timedelta(days=1)), Date)
 
-    async def learning_info(
-        self, user_id: int, section: str, subsection: str, exercise_id: int
-    ) -> UserWordsLearning | None:
-        async with self._session_maker() as session:
-            stmt = select(UserWordsLearning).where(
+        answered = (
+            update(UserWordsLearning)
+            .where(
                 UserWordsLearning.user_id == user_id,
                 UserWordsLearning.section == section,
                 UserWordsLearning.subsection == subsection,
                 UserWordsLearning.exercise_id == exercise_id,
             )
-            result = await session.execute(stmt)
-            return result.scalars().first()
-
-    # ────────────────────────────── WRITE ──────────────────────────────── #
-
-    async def update_user_points(self, user_id: int, delta: int) -> None:
-        async with self._session_maker() as session, session.begin():
-            await session.execute(
-                update(User)
-                .where(User.user_id == user_id)
-                .values(points=User.points + delta)
+            .values(
+                success=success_value,
+                attempts=attempts_value,
+                next_review_date=next_review_date,
             )
-
-    async def update_learning_progress(
-        self,
-        section: str,
-        subsection: str,
-        exercise_id: int,
-        success_value: int,
-        next_review_date: date,
-    ) -> None:
+            .returning(UserWordsLearning.user_id)
+            .cte("answered")
+        )
+        stmt = (
+            update(User)
+            .where(User.user_id.in_(select(answered.c.user_id)))
+            .values(points=User.points + (1 if success else -1))
+            .returning(User.points)
+        )
         async with self._session_maker() as session, session.begin():
-            await session.execute(
-                update(UserWordsLearning)
-                .where(
-                    UserWordsLearning.section == section,
-                    UserWordsLearning.subsection == subsection,
-                    UserWordsLearning.exercise_id == exercise_id,
-                )
-                .values(
-                    success=success_value,
-                    next_review_date=next_review_date,
-                    attempts=UserWordsLearning.attempts + 1,
-                )
-            )
+            return (await session.execute(stmt)).scalar()
 
     async def list_new_words(self, section: str, subsection: str) -> list[NewWords]:
         async with self._session_maker() as session:
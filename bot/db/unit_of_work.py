@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import inspect
+import typing as t
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+from bot.loggers import get_logger
+
+logger = get_logger(__name__)
+
+AfterCommit = t.Callable[[], t.Awaitable[None] | None]
+
+
+class _NoopTransaction:
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+
+class _SharedSession:
+    """
+    Proxy handed to repositories instead of a fresh session.
+
+    Closing it does nothing and ``begin()`` joins the unit-of-work
+    transaction, so repository code written for a sessionmaker keeps working.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self._session, name)
+
+    def begin(self) -> _NoopTransaction:
+        return _NoopTransaction()
+
+    async def __aenter__(self) -> _SharedSession:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+
+class UnitOfWork:
+    """
+    Request-scoped session shared by every repository of one update.
+
+    A unit of work is passed to repositories in place of a sessionmaker.
+    The underlying session (and its pooled connection) is opened on first use
+    and committed once when the unit of work exits without an error.
+
+    A handler that catches a failed write has to contain it in savepoint(),
+    since a failed flush leaves the whole transaction unusable, and calls
+    commit() itself when it must not report success before the commit.
+
+    Caches derived from the written rows are updated in after_commit()
+    callbacks, so no reader can rebuild them from rows that are not
+    committed yet or are rolled back.
+    """
+
+    def __init__(self, session_maker: t.Callable[[], AsyncSession]) -> None:
+        self._session_maker = session_maker
+        self._session: AsyncSession | None = None
+        self._after_commit: list[AfterCommit] = []
+
+    def __call__(self) -> _SharedSession:
+        return _SharedSession(self._get_session())
+
+    def savepoint(self) -> AsyncSessionTransaction:
+        """Nested transaction: a write failing inside it rolls back only itself."""
+        return self._get_session().begin_nested()
+
+    def after_commit(self, callback: AfterCommit) -> None:
+        """
+        Run ``callback`` after the next successful commit; it is dropped on
+        rollback. A failing callback is logged, as the commit has happened.
+        """
+        self._after_commit.append(callback)
+
+    def _get_session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_maker()
+        return self._session
+
+    async def __aenter__(self) -> UnitOfWork:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                await self.rollback()
+        finally:
+            await self.close()
+
+    async def commit(self) -> None:
+        if self._session is not None and self._session.in_transaction():
+            try:
+                await self._session.commit()
+            except SQLAlchemyError:
+                self._after_commit.clear()
+                await self._session.rollback()
+                raise
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                await _call(callback)
+            except Exception:
+                logger.exception("After-commit callback %r failed", callback)
+
+    async def rollback(self) -> None:
+        self._after_commit.clear()
+        if self._session is not None and self._session.in_transaction():
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        self._after_commit.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+async def after_commit(unit_of_work: UnitOfWork | None, callback: AfterCommit) -> None:
+    """
+    Run ``callback`` once the writes made so far are committed: when
+    ``unit_of_work`` commits, or right away without one, since repositories
+    on a plain sessionmaker commit every call.
+    """
+    if unit_of_work is None:
+        await _call(callback)
+    else:
+        unit_of_work.after_commit(callback)
+
+
+async def _call(callback: AfterCommit) -> None:
+    result = callback()
+    if inspect.isawaitable(result):
+        await result
@@ -2,12 +2,15 @@ from datetime import date, datetime, timedelta
 import logging
 
 from aiogram import F, Router
-from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
+from aiohttp import ClientError
+from sqlalchemy.exc import IntegrityError
 
 from bot.config_data.settings import settings
+from bot.db.unit_of_work import UnitOfWork
 from bot.keyboards import keyboard_builder, keyboard_builder_users
 from bot.lexicon import (
     AdminMenuButtons,
@@ -17,11 +20,16 @@ from bot.lexicon import (
     TestingSections,
     testing_section_mapping,
 )
+from bot.services.content_import import (
+    ContentImportService,
+    ImportReport,
+    document_lines,
+)
 from bot.services.daily_statistics import DailyStatisticsService
 from bot.services.new_words import NewWordsService
 from bot.services.testing import TestingService
 from bot.services.user import UserService
-from bot.services.user_progress import UserProgressService
+from bot.services.user_progress import LEADERBOARD_PAGE_SIZE, UserProgressService
 from bot.services.user_words_learning import UserWordsLearningService
 from bot.states import AdminFSM, UserFSM
 from bot.utils import (
@@ -36,6 +44,8 @@ from bot.utils import (
 
 admin_router: Router = Router()
 
+MAX_REPORTED_IMPORT_ERRORS = 20
+
 
 @admin_router.message(Command(commands=["admin"]))
 async def admin_command(
@@ -255,7 +265,8 @@ async def admin_testing_management(
             f"""Введи предложение и ответ к нему для добавления в раздел\n{section_subsection}\n
 В формате: \nEnglish sentence=+=Answer
 \nМожно отправить несколько упражнений, тогда каждое упражнение должно начинаться с новой строки
-и сообщение должно содержать не более 4096 символов(лимит Telegram)""",
+и сообщение должно содержать не более 4096 символов(лимит Telegram)
+\nБольшие списки можно прислать файлом CSV/TSV с двумя колонками""",
             reply_markup=await keyboard_builder(
                 1, AdminMenuButtons.MAIN_MENU, AdminMenuButtons.EXIT
             ),
@@ -283,43 +294,87 @@ async def admin_testing_management(
         await state.set_state(AdminFSM.deleting_exercise_testing)
 
 
+IMPORT_DOCUMENT_FORMAT = (
+    "Нужен текстовый файл в кодировке UTF-8: CSV/TSV с двумя колонками "
+    "или по одному упражнению в строке"
+)
+
+
+async def _import_lines(message: Message) -> list[str] | None:
+    """
+    Lines of a pasted message or of an uploaded CSV/TSV document.
+
+    None when the document cannot be downloaded or decoded; the admin has
+    been told why by then.
+    """
+    if message.document is None:
+        return (message.text or "").split("\n")
+    try:
+        file = await message.bot.download(message.document)
+        return document_lines(file.read(), message.document.file_name or "")
+    except (TelegramAPIError, ClientError, TimeoutError):
+        text = "❌Не удалось скачать файл, отправь его ещё раз"
+    except UnicodeDecodeError:
+        text = "❌Не удалось прочитать файл"
+    await message.answer(
+        f"{text}\n{IMPORT_DOCUMENT_FORMAT}",
+        reply_markup=await keyboard_builder(
+            1, AdminMenuButtons.MAIN_MENU, AdminMenuButtons.EXIT
+        ),
+    )
+    return None
+
+
+async def _answer_import_conflict(message: Message) -> None:
+    # a concurrent change of the subsection took the exercise ids first
+    await message.answer(
+        "❌Раздел одновременно изменили, ничего не добавлено\n"
+        "Отправь упражнения ещё раз",
+        reply_markup=await keyboard_builder(
+            1, AdminMenuButtons.MAIN_MENU, AdminMenuButtons.EXIT
+        ),
+    )
+
+
+async def _answer_import_report(message: Message, report: ImportReport) -> None:
+    added = get_word_declension(count=report.added, word="упражнение")
+    text = f"✅Успешно добавлено {added}"
+    if report.errors:
+        text += f"\n\n❗️Не добавлено строк: {len(report.errors)}"
+        for number, error in report.errors[:MAX_REPORTED_IMPORT_ERRORS]:
+            text += f"\n\n{number}: {error}"
+    text += "\n\nможешь отправить ещё и я добавлю"
+    await message.answer(
+        text[:4000],
+        reply_markup=await keyboard_builder(
+            1, AdminMenuButtons.MAIN_MENU, AdminMenuButtons.EXIT
+        ),
+    )
+
+
 @admin_router.message(StateFilter(AdminFSM.adding_exercise_testing))  # ADD
 async def admin_adding_sentence_testing(
     message: Message,
     state: FSMContext,
-    testing_service: TestingService,
+    content_import_service: ContentImportService,
+    unit_of_work: UnitOfWork,
 ):
+    data = await state.get_data()
+    subsection, section = data.get("admin_subsection"), data.get("admin_section")
+    lines = await _import_lines(message)
+    if lines is None:
+        return
     try:
-        data = await state.get_data()
-        subsection, section = data.get("admin_subsection"), data.get("admin_section")
-        sentences = message.text.split("\n")
-        count_sentences = len(sentences)
-        if count_sentences > 1:
-            for group_sentences in sentences:
-                test, answer = group_sentences.split("=+=")
-                await testing_service.add_testing_exercise(
-                    section=section, subsection=subsection, test=test, answer=answer
-                )
-        else:
-            test, answer = message.text.split("=+=")
-            await testing_service.add_testing_exercise(
-                section=section, subsection=subsection, test=test, answer=answer
+        async with unit_of_work.savepoint():
+            report = await content_import_service.import_testing(
+                section, subsection, lines
             )
-
-        await message.answer(
-            f"""✅Успешно добавлено {get_word_declension(count=count_sentences, word="упражнение")},
-можешь отправить ещё и я добавлю""",
-            reply_markup=await keyboard_builder(
-                1, AdminMenuButtons.MAIN_MENU, AdminMenuButtons.EXIT
-            ),
-        )
-
-    except Exception as e:
-        await message.answer(
-            "❗️Что-то пошло не так, попробуй еще раз\n\nПроверь формат текста",
-            reply_markup=await keyboard_builder(1, AdminMenuButtons.EXIT),
-        )
-        await message.answer(str(e))
+        # committed before the report, which must not claim rows that are lost
+        await unit_of_work.commit()
+    except IntegrityError:
+        await _answer_import_conflict(message)
+        return
+    await _answer_import_report(message, report)
 
 
 @admin_router.message(StateFilter(AdminFSM.editing_exercise_testing))  # EDIT
@@ -356,6 +411,7 @@ async def admin_edit_sentence_testing(
     message: Message,
     state: FSMContext,
     testing_service: TestingService,
+    unit_of_work: UnitOfWork,
 ):
     data = await state.get_data()
     subsection, section, index_testing_edit = (
@@ -365,13 +421,15 @@ async def admin_edit_sentence_testing(
     )
     try:
         test, answer = message.text.split("=+=")
-        await testing_service.edit_testing_exercise(
-            section=section,
-            subsection=subsection,
-            test=test,
-            answer=answer,
-            index=index_testing_edit,
-        )
+        async with unit_of_work.savepoint():
+            await testing_service.edit_testing_exercise(
+                section=section,
+                subsection=subsection,
+                test=test,
+                answer=answer,
+                index=index_testing_edit,
+            )
+        await unit_of_work.commit()
         await message.answer(
             "✅Успешно изменено",
             reply_markup=await keyboard_builder(1, AdminMenuButtons.MAIN_MENU),
@@ -434,6 +492,63 @@ async def admin_deleting_sentence_testing(
 ########################################## Users ##########################################
 
 
+async def _leaderboard_message(
+    user_progress_service: UserProgressService, offset: int
+) -> tuple[str, InlineKeyboardMarkup]:
+    users_ranks_and_points, total = await user_progress_service.get_leaderboard_page(
+        offset=offset, medals_rank=True
+    )
+    rank_info = f"""<pre>Рейтинг всех пользователей ({total}):\n
+[{'№'.center(6)}] [{'Баллы'.center(7)}] [{'Имя'.center(20)}]\n"""
+    for user in users_ranks_and_points:
+        # medal emojis are rendered two columns wide
+        width = 6 if user.get("rank").isdigit() else 5
+        rank_info += f"[{user.get('rank').center(width)}] [{user.get('points').center(7)}] [{user.get('full_name').center(20)}]\n"
+    rank_info += "</pre>"
+
+    pages = {}
+    if offset > 0:
+        pages[f"leaderboard_page:{max(offset - LEADERBOARD_PAGE_SIZE, 0)}"] = (
+            AdminMenuButtons.PREV_PAGE
+        )
+    if offset + LEADERBOARD_PAGE_SIZE < total:
+        pages[f"leaderboard_page:{offset + LEADERBOARD_PAGE_SIZE}"] = (
+            AdminMenuButtons.NEXT_PAGE
+        )
+    markup = await keyboard_builder(
+        1, **pages, admin_close_without_state_changes=AdminMenuButtons.CLOSE
+    )
+    return rank_info, markup
+
+
+async def _users_page_message(
+    user_service: UserService,
+    state: FSMContext,
+    after_id: int | None = None,
+    before_id: int | None = None,
+) -> tuple[str, InlineKeyboardMarkup]:
+    query = (await state.get_data()).get("admin_users_query")
+    page = await user_service.get_users_page(
+        after_id=after_id, before_id=before_id, query=query
+    )
+    if query:
+        text = f"Результаты поиска «{query}»:" if page.users else "Никого не нашлось"
+    else:
+        text = "Выбери пользователя:"
+
+    navigation = {}
+    if page.users and page.has_prev:
+        navigation[f"users_page:prev:{page.users[0]['id']}"] = (
+            AdminMenuButtons.PREV_PAGE
+        )
+    if page.users and page.has_next:
+        navigation[f"users_page:next:{page.users[-1]['id']}"] = (
+            AdminMenuButtons.NEXT_PAGE
+        )
+    navigation["search_user"] = AdminMenuButtons.SEARCH_USER
+    return text, await keyboard_builder_users(page.users, **navigation)
+
+
 @admin_router.callback_query(F.data == AdminMenuButtons.USERS)
 async def admin_users(
     callback: CallbackQuery,
@@ -442,33 +557,59 @@ async def admin_users(
     user_service: UserService,
 ):
     await callback.answer()
-    users = await user_service.get_all_users()
-    users_ranks_and_points = await user_progress_service.get_all_users_ranks_and_points(
-        medals_rank=True
-    )
-    rank_info = f"""<pre>Рейтинг всех пользователей:\n
-[{'№'.center(6)}] [{'Баллы'.center(7)}] [{'Имя'.center(20)}]\n"""
-    count = 0
-    for user in users_ranks_and_points:
-        if count < 3:
-            rank_info += f"[{user.get('rank').center(5)}] [{user.get('points').center(7)}] [{user.get('full_name').center(20)}]\n"
-        else:
-            rank_info += f"[{user.get('rank').center(6)}] [{user.get('points').center(7)}] [{user.get('full_name').center(20)}]\n"
-        count += 1
-    rank_info += "</pre>"
+    rank_info, markup = await _leaderboard_message(user_progress_service, offset=0)
+    await callback.message.answer(rank_info, reply_markup=markup)
+    await update_state_data(state, admin_users_query=None)
+    text, markup = await _users_page_message(user_service, state)
+    await callback.message.answer(text, reply_markup=markup)
+    await state.set_state(AdminFSM.see_user_management)
 
-    await callback.message.answer(
-        rank_info,
-        reply_markup=await keyboard_builder(
-            1, admin_close_without_state_changes=AdminMenuButtons.CLOSE
-        ),
-    )
-    await callback.message.answer(
-        "Выбери пользователя:", reply_markup=await keyboard_builder_users(users)
-    )
+
+@admin_router.callback_query(F.data.startswith("users_page:"))
+async def admin_users_page(
+    callback: CallbackQuery,
+    state: FSMContext,
+    user_service: UserService,
+):
+    await callback.answer()
+    _, direction, user_id = callback.data.split(":")
+    if direction == "prev":
+        page = {"before_id": int(user_id)}
+    else:
+        page = {"after_id": int(user_id)}
+    text, markup = await _users_page_message(user_service, state, **page)
+    await callback.message.edit_text(text, reply_markup=markup)
+
+
+@admin_router.callback_query(F.data == "search_user")
+async def admin_search_user(callback: CallbackQuery, state: FSMContext):
+    await callback.answer()
+    await callback.message.answer("Введи логин или Telegram ID пользователя:")
+    await state.set_state(AdminFSM.searching_user)
+
+
+@admin_router.message(StateFilter(AdminFSM.searching_user))
+async def admin_searching_user(
+    message: Message,
+    state: FSMContext,
+    user_service: UserService,
+):
+    await update_state_data(state, admin_users_query=(message.text or "").strip())
+    text, markup = await _users_page_message(user_service, state)
+    await message.answer(text, reply_markup=markup)
     await state.set_state(AdminFSM.see_user_management)
 
 
+@admin_router.callback_query(F.data.startswith("leaderboard_page:"))
+async def admin_leaderboard_page(
+    callback: CallbackQuery, user_progress_service: UserProgressService
+):
+    await callback.answer()
+    offset = int(callback.data.split(":", 1)[1])
+    rank_info, markup = await _leaderboard_message(user_progress_service, offset)
+    await callback.message.edit_text(rank_info, reply_markup=markup)
+
+
 @admin_router.callback_query(
     F.data == AdminMenuButtons.CLOSE, StateFilter(AdminFSM.see_user_management)
 )
@@ -571,6 +712,7 @@ async def admin_adding_words_to_user(
     state: FSMContext,
     user_service: UserService,
     user_words_learning_service: UserWordsLearningService,
+    unit_of_work: UnitOfWork,
 ):
     try:
         user_id = (await state.get_data()).get("admin_user_id_management")
@@ -579,17 +721,22 @@ async def admin_adding_words_to_user(
         count_exercises = len(lines)
         word_declension = get_word_declension(count=count_exercises, word="Слово")
 
+        # words added before a failing line are kept, as each line is
+        # written in its own savepoint
         if count_exercises > 1:
             for line in lines:
                 words = check_line(line)
+                async with unit_of_work.savepoint():
+                    await user_words_learning_service.admin_add_words_to_learning(
+                        user_id=user_id, russian=words.russian, english=words.english
+                    )
+        else:
+            words = check_line(message.text)
+            async with unit_of_work.savepoint():
                 await user_words_learning_service.admin_add_words_to_learning(
                     user_id=user_id, russian=words.russian, english=words.english
                 )
-        else:
-            words = check_line(message.text)
-            await user_words_learning_service.admin_add_words_to_learning(
-                user_id=user_id, russian=words.russian, english=words.english
-            )
+        await unit_of_work.commit()
 
         await message.answer(
             f"""✅Успешно добавлено {word_declension}
@@ -812,7 +959,8 @@ async def admin_words_management(
 Введи слово и перевод к нему <b><i>в формате: \nСлово=+=Word или Слово|Word
 Пробелы вокруг слов, порядок русский/английский <u>не важен</u></i></b>
 \nМожно отправить несколько упражнений, тогда каждое упражнение должно начинаться с новой строки
-и сообщение должно содержать не более 4096 символов(лимит Telegram)""",
+и сообщение должно содержать не более 4096 символов(лимит Telegram)
+\nБольшие списки можно прислать файлом CSV/TSV с двумя колонками""",
             reply_markup=await keyboard_builder(
                 1, AdminMenuButtons.MAIN_MENU, AdminMenuButtons.EXIT
             ),
@@ -844,45 +992,25 @@ async def admin_words_management(
 async def admin_adding_words(
     message: Message,
     state: FSMContext,
-    new_words_service: NewWordsService,
+    content_import_service: ContentImportService,
+    unit_of_work: UnitOfWork,
 ):
+    data = await state.get_data()
+    subsection, section = data.get("admin_subsection"), data.get("admin_section")
+    lines = await _import_lines(message)
+    if lines is None:
+        return
     try:
-        data = await state.get_data()
-        subsection, section = data.get("admin_subsection"), data.get("admin_section")
-        lines = message.text.split("\n")
-        count_sentences = len(lines)
-
-        if count_sentences > 1:
-            for line in lines:
-                words = check_line(line)
-                await new_words_service.add_new_words_exercise(
-                    section=section,
-                    subsection=subsection,
-                    russian=words.russian,
-                    english=words.english,
-                )
-        else:
-            words = check_line(message.text)
-            await new_words_service.add_new_words_exercise(
-                section=section,
-                subsection=subsection,
-                russian=words.russian,
-                english=words.english,
+        async with unit_of_work.savepoint():
+            report = await content_import_service.import_words(
+                section, subsection, lines
             )
-
-        await message.answer(
-            f"""✅Успешно добавлено {get_word_declension(count=count_sentences, word="упражнение")},
-можешь отправить ещё и я добавлю""",
-            reply_markup=await keyboard_builder(
-                1, AdminMenuButtons.MAIN_MENU, AdminMenuButtons.EXIT
-            ),
-        )
-
-    except Exception as e:
-        await message.answer(
-            text="❗" + str(e),
-            reply_markup=await keyboard_builder(1, AdminMenuButtons.EXIT),
-        )
+        # committed before the report, which must not claim rows that are lost
+        await unit_of_work.commit()
+    except IntegrityError:
+        await _answer_import_conflict(message)
+        return
+    await _answer_import_report(message, report)
 
 
 @admin_router.message(StateFilter(AdminFSM.editing_exercise_words))  # EDIT words
@@ -919,6 +1047,7 @@ async def admin_edit_words(
     message: Message,
     state: FSMContext,
     new_words_service: NewWordsService,
+    unit_of_work: UnitOfWork,
 ):
     data = await state.get_data()
     subsection, section, index_words_edit = (
@@ -928,13 +1057,15 @@ async def admin_edit_words(
     )
     try:
         words = check_line(message.text)
-        await new_words_service.edit_new_words_exercise(
-            section=section,
-            subsection=subsection,
-            russian=words.russian,
-            english=words.english,
-            index=index_words_edit,
-        )
+        async with unit_of_work.savepoint():
+            await new_words_service.edit_new_words_exercise(
+                section=section,
+                subsection=subsection,
+                russian=words.russian,
+                english=words.english,
+                index=index_words_edit,
+            )
+        await unit_of_work.commit()
         await message.answer(
             "✅Успешно изменено",
             reply_markup=await keyboard_builder(1, AdminMenuButtons.MAIN_MENU),
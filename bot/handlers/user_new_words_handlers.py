@@ -21,6 +21,7 @@ from bot.services.new_words import NewWordsService
 from bot.services.user_words_learning import UserWordsLearningService
 from bot.states import WordsLearningFSM
 from bot.utils import (
+    get_state_values,
     get_word_declension,
     send_long_message,
     send_message_to_admin,
@@ -47,8 +48,7 @@ async def start_new_words(
         await update_state_data(state, hard_mode_words=True)
 
     await callback.answer()
-    user_data = await state.get_data()
-    hard_mode = user_data.get("hard_mode_words")
+    hard_mode = await state.get_value("hard_mode_words")
 
     if hard_mode:
         keyboard = await keyboard_builder(
@@ -203,12 +203,8 @@ async def learn_new_words(
         # The user has already pressed button "I know this word" -> User has word to answer
         # -> get word data from state data warehouse
         if from_hard_mode:
-            user_data = await state.get_data()
-            word_russian, word_english, word_id, options = (
-                user_data.get("word_russian"),
-                user_data.get("word_english"),
-                user_data.get("exercise_id"),
-                user_data.get("options"),
+            word_russian, word_english, word_id, options = await get_state_values(
+                state, "word_russian", "word_english", "exercise_id", "options"
             )
 
         # The user doesn't have word to answer -> get random word data
@@ -231,7 +227,7 @@ async def learn_new_words(
                 word_english=word_english,
                 options=options,
             )
-        hard_mode_user = (await state.get_data()).get("hard_mode_words")
+        hard_mode_user = await state.get_value("hard_mode_words")
 
         # The user received a new word, them must decide whether them knows it or not
         if hard_mode_user and not from_hard_mode:
@@ -296,11 +292,8 @@ async def correct_answer_learning_words(
     await asyncio.sleep(0.7)
     await callback.message.delete()
     user_id = callback.from_user.id
-    user_data = await state.get_data()
-    section, subsection, exercise_id = (
-        user_data.get("words_section"),
-        user_data.get("words_subsection"),
-        user_data.get("words_exercise_id"),
+    section, subsection, exercise_id = await get_state_values(
+        state, "words_section", "words_subsection", "words_exercise_id"
     )
     await user_words_learning_service.set_progress(
         user_id=user_id,
@@ -328,22 +321,22 @@ async def not_correct_answer_learning_words(
     user_words_learning_service: UserWordsLearningService,
     daily_statistics_service: DailyStatisticsService,
 ):
-    user_data = await state.get_data()
-    word_russian, word_english = user_data.get("word_russian"), user_data.get(
-        "word_english"
+    word_russian, word_english, section, subsection, exercise_id = (
+        await get_state_values(
+            state,
+            "word_russian",
+            "word_english",
+            "words_section",
+            "words_subsection",
+            "words_exercise_id",
+        )
     )
 
     await callback.message.edit_text(f"😕\n{word_russian} — {word_english}")
     await asyncio.sleep(1)
     await callback.message.edit_text(f"{word_russian} — {word_english}")
     await asyncio.sleep(0.2)
-    data = await state.get_data()
     user_id = callback.from_user.id
-    section, subsection, exercise_id = (
-        data.get("words_section"),
-        data.get("words_subsection"),
-        data.get("words_exercise_id"),
-    )
     await user_words_learning_service.set_progress(
         user_id=user_id,
         section=section,
@@ -404,8 +397,12 @@ async def add_new_words_selected_section(
                 back_to_main_menu_new_words=BasicButtons.MAIN_MENU_NEW_WORDS,
             ),
         )
-        await state.set_state(WordsLearningFSM.selecting_subsection)
-        await update_state_data(state, section=section, subsection=None)
+        await update_state_data(
+            state,
+            new_state=WordsLearningFSM.selecting_subsection,
+            section=section,
+            subsection=None,
+        )
     elif len(buttons) == 0:
         await callback.answer("В этом разделе больше нет тем для добавления 🧐")
 
@@ -419,8 +416,7 @@ async def add_new_words_selecting_subsection(
     new_words_service: NewWordsService,
 ):
     await callback.answer()
-    user_data = await state.get_data()
-    section = user_data.get("section")
+    section = await state.get_value("section")
     subsection = callback.data
     quantity = await new_words_service.get_count_new_words_exercises_in_subsection(
         section=section, subsection=subsection
@@ -438,8 +434,9 @@ async def add_new_words_selecting_subsection(
             back_to_main_menu_new_words=BasicButtons.MAIN_MENU_NEW_WORDS,
         ),
     )
-    await state.set_state(WordsLearningFSM.selected_subsection)
-    await update_state_data(state, subsection=subsection)
+    await update_state_data(
+        state, new_state=WordsLearningFSM.selected_subsection, subsection=subsection
+    )
 
 
 @user_new_words_router.callback_query(StateFilter(WordsLearningFSM.selected_subsection))
@@ -449,12 +446,8 @@ async def add_new_words_confirm(
     user_words_learning_service: UserWordsLearningService,
 ):
     await callback.answer()
-    user_data = await state.get_data()
-    section, subsection, user_id = (
-        user_data.get("section"),
-        user_data.get("subsection"),
-        callback.from_user.id,
-    )
+    section, subsection = await get_state_values(state, "section", "subsection")
+    user_id = callback.from_user.id
     user_answer = callback.data
 
     if user_answer == "add_words":
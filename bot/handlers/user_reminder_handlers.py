@@ -10,7 +10,7 @@ from bot.keyboards import keyboard_builder
 from bot.lexicon import BasicButtons, MessageTexts
 from bot.services.user import UserService
 from bot.states import UserFSM
-from bot.utils import schedule_reminders, time_zones
+from bot.utils import time_zones
 
 user_reminder_router: Router = Router()
 
@@ -90,7 +90,6 @@ async def set_timezone(
     await user_service.set_timezone(
         user_id=callback.from_user.id, timezone=callback.data.split("|")[1]
     )
-    await schedule_reminders()
 
 
 @user_reminder_router.callback_query(F.data == BasicButtons.CHANGE_REMINDER_TIME)
@@ -115,7 +114,6 @@ async def turn_off_reminder(
 ):
     await callback.answer()
     await user_service.set_reminder_time(user_id=callback.from_user.id, time=None)
-    await schedule_reminders()
     await callback.message.answer(
         """Напоминания выключены,
 ты всегда можешь их включить нажав команду /reminder в меню""",
@@ -131,7 +129,6 @@ async def set_reminder_time(
     try:
         time = datetime.strptime(message.text, "%H:%M").time()
         await user_service.set_reminder_time(user_id=message.from_user.id, time=time)
-        await schedule_reminders()
         await message.delete()
         await message.answer(
             f'Отлично, буду напоминать тебе заниматься каждый день в {time.strftime("%H:%M")}'
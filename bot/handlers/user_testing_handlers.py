@@ -109,8 +109,12 @@ async def choosing_section_testing(
             BasicButtons.MAIN_MENU,
         ),
     )
-    await state.set_state(TestingFSM.selecting_subsection)
-    await update_state_data(state, section=callback.data, subsection=None)
+    await update_state_data(
+        state,
+        new_state=TestingFSM.selecting_subsection,
+        section=callback.data,
+        subsection=None,
+    )
 
 
 @user_testing_router.callback_query(
@@ -133,8 +137,9 @@ Are you ready?""",
             ready_for_test=BasicButtons.READY,
         ),
     )
-    await update_state_data(state, subsection=subsection)
-    await state.set_state(TestingFSM.selected_subsection)
+    await update_state_data(
+        state, new_state=TestingFSM.selected_subsection, subsection=subsection
+    )
 
 
 @user_testing_router.callback_query(F.data == "ready_for_test")
@@ -167,7 +172,7 @@ async def chose_subsection_testing(
         test, answer, id_exercise = exercise
     else:
         first_try_count, success_count, total_exercises_count = (
-            await user_progress_service.get_counts_completed_exercises_testing(
+            await testing_service.get_completion_counts(
                 user_id=user_id, section=section, subsection=subsection
             )
         )
@@ -183,9 +188,12 @@ async def chose_subsection_testing(
         )
         return
     await callback.message.answer(test)
-    await state.set_state(TestingFSM.in_process)
     await update_state_data(
-        state, current_test=test, current_answer=answer.strip(), current_id=id_exercise
+        state,
+        new_state=TestingFSM.in_process,
+        current_test=test,
+        current_answer=answer.strip(),
+        current_id=id_exercise,
     )
 
 
@@ -228,7 +236,7 @@ async def in_process_testing(
 
         if not exercise:
             first_try_count, success_count, total_exercises_count = (
-                await user_progress_service.get_counts_completed_exercises_testing(
+                await testing_service.get_completion_counts(
                     user_id=user_id, section=section, subsection=subsection
                 )
             )
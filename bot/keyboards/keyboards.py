@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 import random
 from typing import Union
 
@@ -71,7 +72,9 @@ async def keyboard_builder_words_learning(
     return kb_builder.as_markup()
 
 
-async def keyboard_builder_users(users: tuple) -> InlineKeyboardMarkup:
+async def keyboard_builder_users(
+    users: Iterable[dict], **navigation: ButtonEnumType
+) -> InlineKeyboardMarkup:
     kb_builder: InlineKeyboardBuilder = InlineKeyboardBuilder()
     buttons: list[InlineKeyboardButton] = []
     for user in users:
@@ -81,10 +84,17 @@ async def keyboard_builder_users(users: tuple) -> InlineKeyboardMarkup:
                 callback_data=str(user.get("user_id")),
             )
         )
-    buttons.append(
+    kb_builder.row(*buttons, width=1)
+    kb_builder.row(
+        *(
+            InlineKeyboardButton(text=button, callback_data=callback)
+            for callback, button in navigation.items()
+        ),
+        width=2,
+    )
+    kb_builder.row(
         InlineKeyboardButton(
             text=AdminMenuButtons.EXIT, callback_data=AdminMenuButtons.EXIT
         )
     )
-    kb_builder.row(*buttons, width=1)
     return kb_builder.as_markup()
@@ -279,6 +279,9 @@ class AdminMenuButtons(StrEnum):
     SEE_ACTIVITY_MONTH = "Посмотреть активность за месяц"
 
     USERS = "Пользователи"
+    PREV_PAGE = "⬅️Назад"
+    NEXT_PAGE = "➡️Дальше"
+    SEARCH_USER = "🔍Найти пользователя"
     DEL_USER = "Удалить пользователя"
     ADD_WORDS_TO_USER_LEARNING = "Добавить пользователю слова"
     SEE_INDIVIDUAL_WORDS = "Посмотреть слова пользователя"
@@ -292,6 +295,12 @@ class AdminMenuButtons(StrEnum):
 class ServiceMessages(StrEnum):
     BOT_ON = "✅ Бот запущен"
     BOT_OFF = "❌ Бот остановлен"
+    BROADCAST_REPORT = (
+        "📣 Рассылка завершена\n"
+        "Отправлено: {sent}\n"
+        "Заблокировали бота: {blocked}\n"
+        "Ошибок: {failed}"
+    )
 
 
 list_right_answers = [
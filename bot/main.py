@@ -1,13 +1,25 @@
 """Entry-point for Telegram bot.
 
-Creates DB session, starts Aiogram dispatcher and background jobs.
+Creates DB session, starts Aiogram dispatcher and background jobs. Updates are
+received by long polling, or by a webhook server when ``WEBHOOK_URL`` is set.
+
+With ``BOT_ROLE=receiver`` received updates are only appended to Redis Streams,
+and ``BOT_ROLE=worker`` processes handle them; the default ``standalone`` role
+receives and handles updates in one process.
 """
 
 import asyncio
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.redis import RedisStorage
-
+from aiogram.fsm.storage.base import BaseStorage
+
+from bot.cache import (
+    HashRedisStorage,
+    UpdateStream,
+    close_redis,
+    get_redis,
+    init_redis,
+)
 from bot.config_data.settings import settings
 from bot.db.init import init_async_session
 from bot.handlers import (
@@ -26,27 +38,39 @@ from bot.lexicon.lexicon_ru import ServiceMessages
 from bot.loggers import get_logger
 from bot.middlewares.errors import ErrorHandlingMiddleware
 from bot.middlewares.services import ServicesMiddleware
+from bot.services.content_catalog import new_words_catalog, testing_catalog
+from bot.services.daily_statistics import daily_statistics_buffer
 from bot.utils import (
+    StreamWorker,
+    UpdateQueue,
+    broadcast_job_store,
     get_bot_instance,
     init_bot_instance,
+    poll_into_stream,
+    reminder_dispatcher,
+    run_webhook,
     schedule_reminders,
     scheduler,
+    scheduler_leadership,
     send_message_to_admin,
+    stop_on_signals,
 )
 
 logger = get_logger(__name__)
 
 
-async def startup() -> tuple[Bot, Dispatcher]:
-    init_async_session()
+def build_dispatcher(storage: BaseStorage) -> Dispatcher:
+    """Dispatcher with the middlewares and routers every update goes through.
 
-    storage = RedisStorage.from_url(settings.redis_dsn)
-    await init_bot_instance(token=settings.bot_token)
-    bot: Bot = await get_bot_instance()
+    Needs the session maker and Redis to be initialized. Routers can only be
+    attached once, so it is built once per process.
+    """
     dp = Dispatcher(storage=storage)
 
-    dp.update.middleware.register(ServicesMiddleware())
+    # Errors are handled outside the services unit of work, so a failed
+    # handler rolls back before the user is notified.
     dp.update.middleware.register(ErrorHandlingMiddleware())
+    dp.update.middleware.register(ServicesMiddleware())
     dp.include_routers(
         user_commands_router,
         admin_router,
@@ -58,15 +82,56 @@ async def startup() -> tuple[Bot, Dispatcher]:
         user_new_words_router,
         fallback_router,
     )
-
-    await set_main_menu(bot)
-    await bot.delete_webhook(drop_pending_updates=True)
-
-    scheduler.start()
+    return dp
+
+
+async def _set_up_receiving(bot: Bot, dp: Dispatcher) -> None:
+    if settings.webhook_url:
+        if not settings.webhook_secret:
+            raise RuntimeError("WEBHOOK_SECRET is required when WEBHOOK_URL is set")
+        # Every worker process sets the same webhook, so pending updates are
+        # kept: they may belong to a worker that is still running.
+        await bot.set_webhook(
+            settings.webhook_url,
+            secret_token=settings.webhook_secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+    else:
+        await bot.delete_webhook(drop_pending_updates=True)
+
+
+async def _start_background_jobs() -> None:
+    # Jobs can be added and removed in every replica, but only the elected
+    # scheduler leader runs them and resumes interrupted broadcasts.
+    scheduler.start(paused=True)
+    reminder_dispatcher.start()
+    daily_statistics_buffer.start()
     try:
         await schedule_reminders()
     except Exception:
         logger.exception("Failed to schedule reminders during startup")
+    scheduler_leadership.start()
+    try:
+        await testing_catalog.ensure_loaded()
+        await new_words_catalog.ensure_loaded()
+    except Exception:
+        logger.exception("Failed to load content catalog during startup")
+
+
+async def startup() -> tuple[Bot, Dispatcher]:
+    init_async_session()
+    redis = init_redis(settings.redis_dsn)
+
+    storage = HashRedisStorage(redis=redis)
+    await init_bot_instance(token=settings.bot_token)
+    bot: Bot = await get_bot_instance()
+    dp = build_dispatcher(storage)
+
+    await set_main_menu(bot)
+    if settings.bot_role != "worker":
+        await _set_up_receiving(bot, dp)
+    if settings.bot_role != "receiver":
+        await _start_background_jobs()
     await send_message_to_admin(ServiceMessages.BOT_ON)
 
     logger.info("Bot started")
@@ -76,17 +141,67 @@ async def startup() -> tuple[Bot, Dispatcher]:
 async def shutdown(bot: Bot) -> None:
     logger.info("Shutting down...")
     await send_message_to_admin(ServiceMessages.BOT_OFF)
-    scheduler.shutdown(wait=False)
+    await scheduler_leadership.stop()
+    await broadcast_job_store.stop()
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    await reminder_dispatcher.stop()
+    await daily_statistics_buffer.stop()
     await bot.session.close()
+    await close_redis()
     logger.info("Bot stopped")
 
 
+def _update_stream() -> UpdateStream:
+    return UpdateStream(get_redis(), settings.stream_partitions)
+
+
+async def receive_with_webhook(bot: Bot, dp: Dispatcher) -> None:
+    options = dict(
+        host=settings.webhook_host,
+        port=settings.webhook_port,
+        path=settings.webhook_path,
+        secret=settings.webhook_secret,
+    )
+    if settings.bot_role == "receiver":
+        await run_webhook(bot, _update_stream(), **options)
+        return
+    queue = UpdateQueue(
+        dp,
+        bot,
+        max_in_flight=settings.webhook_max_in_flight,
+        workers=settings.webhook_workers,
+    )
+    queue.start()
+    try:
+        await run_webhook(bot, queue, **options)
+    finally:
+        # the server has stopped accepting, so the queue can drain
+        await queue.stop()
+
+
+async def consume_update_stream(bot: Bot, dp: Dispatcher) -> None:
+    partitions = settings.worker_partitions or list(range(settings.stream_partitions))
+    worker = StreamWorker(_update_stream(), dp, bot, partitions)
+    with stop_on_signals() as stopped:
+        await worker.run(stopped)
+
+
 async def main() -> None:
     bot: Bot | None = None
     try:
         bot, dp = await startup()
 
-        await dp.start_polling(bot, handle_signals=True)
+        if settings.bot_role == "worker":
+            await consume_update_stream(bot, dp)
+        elif settings.webhook_url:
+            await receive_with_webhook(bot, dp)
+        elif settings.bot_role == "receiver":
+            await poll_into_stream(
+                bot, _update_stream(), dp.resolve_used_update_types()
+            )
+        else:
+            await dp.start_polling(bot, handle_signals=True)
     except asyncio.CancelledError:
         logger.info("Polling cancelled")
     except Exception as e:
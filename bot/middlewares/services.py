@@ -1,5 +1,12 @@
 from aiogram import BaseMiddleware
 
+from bot.cache import (
+    Leaderboard,
+    PendingProgress,
+    ReviewQueueCache,
+    TestingProgress,
+    get_redis,
+)
 from bot.db.init import get_session_maker
 from bot.db.repositories.daily_statistics import DailyStatisticsRepository
 from bot.db.repositories.new_words import NewWordsRepository
@@ -7,6 +14,8 @@ from bot.db.repositories.testing import TestingRepository
 from bot.db.repositories.user import UserRepository
 from bot.db.repositories.user_progress import UserProgressRepository
 from bot.db.repositories.user_words_learning import UserWordsLearningRepository
+from bot.db.unit_of_work import UnitOfWork
+from bot.services.content_import import ContentImportService
 from bot.services.daily_statistics import DailyStatisticsService
 from bot.services.new_words import NewWordsService
 from bot.services.testing import TestingService
@@ -19,27 +28,58 @@ class ServicesMiddleware(BaseMiddleware):
     """
     Injects all services into update data dictionary.
     Services are created lazily - a new instance for each update,
-    but use a common sessionmaker.
+    and share one request-scoped unit of work that is committed
+    once the handler returns.
     """
 
     def __init__(self) -> None:
         self._session_maker = get_session_maker()
+        self._review_queue = ReviewQueueCache(get_redis())
+        self._leaderboard = Leaderboard(get_redis())
+        self._testing_progress = TestingProgress(get_redis())
 
     async def __call__(self, handler, event, data):
-        sm = self._session_maker
-
-        data.update(
-            testing_service=TestingService(repository=TestingRepository(sm)),
-            user_progress_service=UserProgressService(
-                repository=UserProgressRepository(sm)
-            ),
-            user_service=UserService(repository=UserRepository(sm)),
-            new_words_service=NewWordsService(repository=NewWordsRepository(sm)),
-            user_words_learning_service=UserWordsLearningService(
-                repository=UserWordsLearningRepository(sm)
-            ),
-            daily_statistics_service=DailyStatisticsService(
-                repository=DailyStatisticsRepository(sm)
-            ),
-        )
-        return await handler(event, data)
+        async with UnitOfWork(self._session_maker) as uow:
+            # answers of this update, seen by snapshots read before the commit
+            pending_progress = PendingProgress()
+            data.update(
+                unit_of_work=uow,
+                testing_service=TestingService(
+                    repository=TestingRepository(uow),
+                    progress=self._testing_progress,
+                    unit_of_work=uow,
+                    pending_progress=pending_progress,
+                ),
+                user_progress_service=UserProgressService(
+                    repository=UserProgressRepository(uow),
+                    leaderboard=self._leaderboard,
+                    testing_progress=self._testing_progress,
+                    unit_of_work=uow,
+                    pending_progress=pending_progress,
+                ),
+                user_service=UserService(
+                    repository=UserRepository(uow), leaderboard=self._leaderboard
+                ),
+                new_words_service=NewWordsService(
+                    repository=NewWordsRepository(uow), unit_of_work=uow
+                ),
+                content_import_service=ContentImportService(
+                    new_words_repository=NewWordsRepository(uow),
+                    testing_repository=TestingRepository(uow),
+                    testing_progress=self._testing_progress,
+                    unit_of_work=uow,
+                ),
+                user_words_learning_service=UserWordsLearningService(
+                    repository=UserWordsLearningRepository(uow),
+                    review_queue=self._review_queue,
+                    leaderboard=self._leaderboard,
+                    unit_of_work=uow,
+                ),
+                # Global counters commit on their own: holding the shared
+                # daily row lock until the end of every update would
+                # serialize all active users.
+                daily_statistics_service=DailyStatisticsService(
+                    repository=DailyStatisticsRepository(self._session_maker)
+                ),
+            )
+            return await handler(event, data)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import typing as t
+
+from redis.asyncio import Redis
+from sqlalchemy import Row
+
+from bot.cache.client import get_redis
+from bot.db.repositories.new_words import NewWordsRepository
+from bot.db.repositories.testing import TestingRepository
+
+
+class CatalogSource(t.Protocol):
+    async def count_by_subsection(self) -> list[Row]: ...
+
+
+class ContentCatalog:
+    """
+    In-process catalog of sections, their subsections and exercise counts.
+
+    Content only changes through the admin write paths, which call
+    invalidate() once their writes are committed, so menu navigation is
+    served from memory. invalidate() bumps a version counter in Redis shared
+    by all processes, and every read compares it with the version the
+    catalog was loaded at: one GET instead of the database queries. The
+    catalog also reloads once REFRESH_SECONDS have passed, which bounds
+    staleness when the content was changed around the admin paths.
+    """
+
+    REFRESH_SECONDS = 10 * 60
+
+    def __init__(
+        self,
+        repository_factory: t.Callable[[], CatalogSource],
+        name: str,
+        redis: Redis | None = None,
+    ) -> None:
+        self._repository_factory = repository_factory
+        self._version_key = f"catalog:{name}:version"
+        self._redis = redis
+        self._sections: dict[str, dict[str, int]] = {}
+        self._loaded_at: float | None = None
+        self._loaded_version: int | None = None
+        self._lock = asyncio.Lock()
+
+    async def invalidate(self) -> None:
+        self._loaded_at = None
+        await self._get_redis().incr(self._version_key)
+
+    async def ensure_loaded(self) -> None:
+        version = await self._shared_version()
+        if self._is_fresh(version):
+            return
+        async with self._lock:
+            if not self._is_fresh(version):
+                await self._load(version)
+
+    async def sections(self) -> list[str]:
+        await self.ensure_loaded()
+        return list(self._sections)
+
+    async def subsections(self, section: str) -> list[str]:
+        await self.ensure_loaded()
+        return list(self._sections.get(section, {}))
+
+    async def count(self, section: str, subsection: str) -> int:
+        await self.ensure_loaded()
+        return self._sections.get(section, {}).get(subsection, 0)
+
+    # ───────────────────────────── HELPERS ─────────────────────────────── #
+
+    def _get_redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def _shared_version(self) -> int:
+        return int(await self._get_redis().get(self._version_key) or 0)
+
+    def _is_fresh(self, version: int) -> bool:
+        return (
+            self._loaded_at is not None
+            and self._loaded_version == version
+            and time.monotonic() - self._loaded_at < self.REFRESH_SECONDS
+        )
+
+    async def _load(self, version: int) -> None:
+        # the version is read before the rows, so a change committed during
+        # the load bumps it past the loaded one and is picked up next read
+        rows = await self._repository_factory().count_by_subsection()
+
+        sections: dict[str, dict[str, int]] = {}
+        # Rows come ordered by section and subsection, dicts keep that order.
+        for row in rows:
+            sections.setdefault(row.section, {})[row.subsection] = row.count
+
+        self._sections = sections
+        self._loaded_at = time.monotonic()
+        self._loaded_version = version
+
+
+testing_catalog = ContentCatalog(TestingRepository, "testing")
+new_words_catalog = ContentCatalog(NewWordsRepository, "new_words")
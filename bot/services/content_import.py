@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import csv
+from dataclasses import dataclass, field
+from functools import partial
+import io
+
+from bot.cache.testing_progress import TestingProgress
+from bot.db.repositories.new_words import NewWordsRepository
+from bot.db.repositories.testing import TestingRepository
+from bot.db.unit_of_work import UnitOfWork, after_commit
+from bot.services.content_catalog import (
+    ContentCatalog,
+    new_words_catalog,
+    testing_catalog,
+)
+from bot.services.distractors import DistractorIndex, distractor_index
+from bot.utils.new_words_parser import check_line
+
+MAX_FIELD_LENGTH = 256
+TESTING_SEPARATOR = "=+="
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import: rows added and (line number, error) pairs."""
+
+    added: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+def document_lines(data: bytes, filename: str) -> list[str]:
+    """
+    Turn an uploaded CSV/TSV document into "first=+=second" lines.
+
+    Rows that do not have exactly two columns are kept joined as they are,
+    so they are reported by line number like any other malformed line.
+    Other files are read as plain text, one exercise per line.
+    """
+    text = data.decode("utf-8-sig")
+    name = filename.lower()
+    if not name.endswith((".csv", ".tsv")):
+        return text.splitlines()
+
+    delimiter = "\t" if name.endswith(".tsv") else ","
+    lines = []
+    for row in csv.reader(io.StringIO(text), delimiter=delimiter):
+        cells = [cell.strip() for cell in row]
+        if len(cells) == 2:
+            lines.append(TESTING_SEPARATOR.join(cells))
+        else:
+            lines.append(delimiter.join(cells))
+    return lines
+
+
+class ContentImportService:
+    """
+    Bulk import of word and testing exercises pasted or uploaded by admins.
+
+    Every line is validated first; the valid ones are then inserted into the
+    subsection with one statement and the invalid ones are returned in the
+    report with their line numbers, so they can be fixed and sent again.
+    """
+
+    def __init__(
+        self,
+        new_words_repository: NewWordsRepository | None = None,
+        testing_repository: TestingRepository | None = None,
+        distractors: DistractorIndex | None = None,
+        words_catalog: ContentCatalog | None = None,
+        tests_catalog: ContentCatalog | None = None,
+        testing_progress: TestingProgress | None = None,
+        unit_of_work: UnitOfWork | None = None,
+    ) -> None:
+        self._new_words_repo = new_words_repository or NewWordsRepository()
+        self._testing_repo = testing_repository or TestingRepository()
+        self._distractors = distractors or distractor_index
+        self._words_catalog = words_catalog or new_words_catalog
+        self._tests_catalog = tests_catalog or testing_catalog
+        self._testing_progress = testing_progress
+        self._unit_of_work = unit_of_work
+
+    # ──────────────────────────── PUBLIC API ───────────────────────────── #
+
+    async def import_words(
+        self, section: str, subsection: str, lines: Iterable[str]
+    ) -> ImportReport:
+        rows, report = self._validate(lines, self._parse_words_line)
+        await self._new_words_repo.add_exercises(section, subsection, rows)
+        if rows:
+            await after_commit(self._unit_of_work, self._distractors.invalidate)
+            await after_commit(self._unit_of_work, self._words_catalog.invalidate)
+        report.added = len(rows)
+        return report
+
+    async def import_testing(
+        self, section: str, subsection: str, lines: Iterable[str]
+    ) -> ImportReport:
+        rows, report = self._validate(lines, self._parse_testing_line)
+        await self._testing_repo.add_exercises(section, subsection, rows)
+        if rows:
+            await after_commit(self._unit_of_work, self._tests_catalog.invalidate)
+            if self._testing_progress is not None:
+                await after_commit(
+                    self._unit_of_work,
+                    partial(
+                        self._testing_progress.invalidate_exercises,
+                        section,
+                        subsection,
+                    ),
+                )
+        report.added = len(rows)
+        return report
+
+    # ───────────────────────────── HELPERS ─────────────────────────────── #
+
+    @staticmethod
+    def _validate(lines, parse) -> tuple[list[tuple[str, str]], ImportReport]:
+        rows: list[tuple[str, str]] = []
+        report = ImportReport()
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                first, second = parse(line)
+                if max(len(first), len(second)) > MAX_FIELD_LENGTH:
+                    raise ValueError(f'Длиннее {MAX_FIELD_LENGTH} символов\n"{line}"')
+            except ValueError as e:
+                report.errors.append((number, str(e)))
+            else:
+                rows.append((first, second))
+        return rows, report
+
+    @staticmethod
+    def _parse_words_line(line: str) -> tuple[str, str]:
+        words = check_line(line)
+        return words.russian, words.english
+
+    @staticmethod
+    def _parse_testing_line(line: str) -> tuple[str, str]:
+        parts = line.split(TESTING_SEPARATOR)
+        if len(parts) != 2 or not parts[0].strip() or not parts[1].strip():
+            raise ValueError(f'Ожидается формат "English sentence=+=Answer"\n"{line}"')
+        test, answer = parts
+        # non-breaking space → plain space, as for single exercises
+        return test, answer.replace(chr(160), "")
@@ -1,8 +1,67 @@
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
 from datetime import date
 
 from bot.db.repositories.daily_statistics import DailyStatisticsRepository
+from bot.loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class DailyStatisticsBuffer:
+    """
+    Write-behind buffer for the daily statistics counters.
+
+    Increments are summed in memory per day and written by flush() with one
+    upsert per day, from a background task every FLUSH_SECONDS and on stop().
+    Answers therefore never wait on, or lock, the shared row of today. If a
+    flush fails the counts are kept and retried on the next one.
+    """
+
+    FLUSH_SECONDS = 10
+
+    def __init__(self, repository: DailyStatisticsRepository | None = None) -> None:
+        self._repository = repository
+        self._pending: dict[date, Counter[str]] = {}
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def add(self, day: date, field: str, amount: int = 1) -> None:
+        self._pending.setdefault(day, Counter())[field] += amount
+
+    async def flush(self) -> None:
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            repository = self._repository or DailyStatisticsRepository()
+            for day, counts in pending.items():
+                try:
+                    await repository.add_counts(day, dict(counts))
+                except Exception:
+                    logger.exception(f"Failed to flush daily statistics for {day}")
+                    self._pending.setdefault(day, Counter()).update(counts)
+
+    def start(self) -> None:
+        """Start flushing periodically in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="daily-statistics-flush")
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.FLUSH_SECONDS)
+            await self.flush()
+
+
+daily_statistics_buffer = DailyStatisticsBuffer()
 
 
 class DailyStatisticsService:
@@ -13,8 +72,13 @@ class DailyStatisticsService:
         "new_user": "new_users",
     }
 
-    def __init__(self, repository: DailyStatisticsRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: DailyStatisticsRepository | None = None,
+        buffer: DailyStatisticsBuffer | None = None,
+    ) -> None:
         self._repo = repository or DailyStatisticsRepository()
+        self._buffer = buffer or daily_statistics_buffer
 
     # ─────────────────────────── PUBLIC API ─────────────────────────── #
 
@@ -23,15 +87,9 @@ class DailyStatisticsService:
         if field is None:
             return
 
-        today = date.today()
-
-        # ensure row exists
-        stats = await self._repo.get_by_date(today)
-        if stats is None:
-            await self._repo.create_blank_for_date(today)
-
-        # increment field
-        await self._repo.increment_field(today, field)
+        self._buffer.add(date.today(), field)
 
     async def get(self, start_date: date, end_date: date) -> dict[str, int]:
+        # write buffered counts first so the report includes them
+        await self._buffer.flush()
         return await self._repo.aggregate(start_date, end_date)
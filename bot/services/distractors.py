@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+from redis.asyncio import Redis
+
+from bot.cache.client import get_redis
+from bot.db.repositories.new_words import NewWordsRepository
+
+_VERSION_KEY = "distractors:version"
+
+
+class DistractorIndex:
+    """
+    In-process pools of Russian translations used as wrong answer options.
+
+    Pools are keyed by (section, subsection) and built from NewWords, plus one
+    global pool of the shared sections for subsections too small to fill the
+    options. Sampling draws a few random positions from a pool, so its cost
+    does not depend on the pool size. Like the content catalogs, the index
+    reloads lazily once the version counter in Redis, bumped by invalidate()
+    in any process, differs from the loaded one, or once REFRESH_SECONDS have
+    passed.
+    """
+
+    REFRESH_SECONDS = 10 * 60
+
+    def __init__(
+        self,
+        repository: NewWordsRepository | None = None,
+        redis: Redis | None = None,
+    ) -> None:
+        self._repository = repository
+        self._redis = redis
+        self._pools: dict[tuple[str, str], tuple[str, ...]] = {}
+        self._global_pool: tuple[str, ...] = ()
+        self._loaded_at: float | None = None
+        self._loaded_version: int | None = None
+        self._lock = asyncio.Lock()
+
+    async def invalidate(self) -> None:
+        self._loaded_at = None
+        await self._get_redis().incr(_VERSION_KEY)
+
+    async def ensure_loaded(self) -> None:
+        version = await self._shared_version()
+        if self._is_fresh(version):
+            return
+        async with self._lock:
+            if not self._is_fresh(version):
+                await self._load(version)
+
+    def sample(
+        self, section: str, subsection: str, exclude: str, k: int = 3
+    ) -> list[str]:
+        options = self._pick(self._pools.get((section, subsection), ()), exclude, k)
+        # if not enough in same subsection, take from all shared words
+        if len(options) < k:
+            options = self._pick(self._global_pool, exclude, k)
+        return options
+
+    # ───────────────────────────── HELPERS ─────────────────────────────── #
+
+    def _get_redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def _shared_version(self) -> int:
+        return int(await self._get_redis().get(_VERSION_KEY) or 0)
+
+    def _is_fresh(self, version: int) -> bool:
+        return (
+            self._loaded_at is not None
+            and self._loaded_version == version
+            and time.monotonic() - self._loaded_at < self.REFRESH_SECONDS
+        )
+
+    async def _load(self, version: int) -> None:
+        # the version is read before the rows, as in ContentCatalog._load()
+        repository = self._repository or NewWordsRepository()
+        rows = await repository.list_russian_words()
+
+        pools: dict[tuple[str, str], dict[str, None]] = {}
+        shared: dict[str, None] = {}
+        for row in rows:
+            word = row.russian.capitalize()
+            pools.setdefault((row.section, row.subsection), {})[word] = None
+            # Personal words live in a section named after their owner's id.
+            if not row.section.isdigit():
+                shared[word] = None
+
+        self._pools = {key: tuple(words) for key, words in pools.items()}
+        self._global_pool = tuple(shared)
+        self._loaded_at = time.monotonic()
+        self._loaded_version = version
+
+    @staticmethod
+    def _pick(pool: tuple[str, ...], exclude: str, k: int) -> list[str]:
+        # One spare draw leaves room for dropping the correct answer.
+        drawn = random.sample(pool, k=min(k + 1, len(pool)))
+        return [word for word in drawn if word != exclude][:k]
+
+
+distractor_index = DistractorIndex()
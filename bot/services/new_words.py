@@ -2,12 +2,24 @@ from __future__ import annotations
 
 from bot.db.models import NewWords
 from bot.db.repositories.new_words import NewWordsRepository
+from bot.db.unit_of_work import UnitOfWork, after_commit
+from bot.services.content_catalog import ContentCatalog, new_words_catalog
+from bot.services.distractors import DistractorIndex, distractor_index
 
 
 class NewWordsService:
 
-    def __init__(self, repository: NewWordsRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: NewWordsRepository | None = None,
+        distractors: DistractorIndex | None = None,
+        catalog: ContentCatalog | None = None,
+        unit_of_work: UnitOfWork | None = None,
+    ) -> None:
         self._repo = repository or NewWordsRepository()
+        self._distractors = distractors or distractor_index
+        self._catalog = catalog or new_words_catalog
+        self._unit_of_work = unit_of_work
 
     # ──────────────────────────── PUBLIC API ───────────────────────────── #
 
@@ -29,6 +41,8 @@ class NewWordsService:
             english=english,
         )
         await self._repo.add_exercise(exercise)
+        await after_commit(self._unit_of_work, self._distractors.invalidate)
+        await after_commit(self._unit_of_work, self._catalog.invalidate)
 
     async def delete_new_words_exercise(
         self,
@@ -37,6 +51,8 @@ class NewWordsService:
         index: int,
     ) -> None:
         await self._repo.delete_exercise(section, subsection, index)
+        await after_commit(self._unit_of_work, self._distractors.invalidate)
+        await after_commit(self._unit_of_work, self._catalog.invalidate)
 
     async def edit_new_words_exercise(
         self,
@@ -47,13 +63,16 @@ class NewWordsService:
         index: int,
     ) -> None:
         await self._repo.update_exercise(section, subsection, index, russian, english)
+        await after_commit(self._unit_of_work, self._distractors.invalidate)
 
     async def get_count_new_words_exercises_in_subsection(
         self,
         section: str,
         subsection: str,
     ) -> int:
-        return await self._repo.count_exercises(section, subsection)
+        if section.isdigit():
+            return await self._repo.count_exercises(section, subsection)
+        return await self._catalog.count(section, subsection)
 
     async def get_new_words_exercises(self, subsection: str | int) -> str:
         subsection_str = str(subsection)
@@ -61,4 +80,8 @@ class NewWordsService:
         return "".join(f"{ex.id}) {ex.russian} – {ex.english}\n" for ex in exercises)
 
     async def get_subsection_names(self, section: str) -> list[str]:
-        return await self._repo.get_subsection_names(section)
+        # Personal words live in a section named after their owner's id and
+        # change with every word a user adds, so they bypass the catalog.
+        if section.isdigit():
+            return await self._repo.get_subsection_names(section)
+        return await self._catalog.subsections(section)
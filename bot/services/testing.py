@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+from functools import partial
 import random
 
+from bot.cache.testing_progress import (
+    PendingProgress,
+    ProgressSnapshot,
+    TestingProgress,
+)
 from bot.db.models import TestingExercise
 from bot.db.repositories.testing import TestingRepository
+from bot.db.unit_of_work import UnitOfWork, after_commit
+from bot.services.content_catalog import ContentCatalog, testing_catalog
 
 
 class TestingService:
@@ -12,8 +20,19 @@ class TestingService:
     Depends on a repository; can be easily mocked in tests.
     """
 
-    def __init__(self, repository: TestingRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: TestingRepository | None = None,
+        catalog: ContentCatalog | None = None,
+        progress: TestingProgress | None = None,
+        unit_of_work: UnitOfWork | None = None,
+        pending_progress: PendingProgress | None = None,
+    ) -> None:
         self._repo = repository or TestingRepository()
+        self._catalog = catalog or testing_catalog
+        self._progress = progress
+        self._unit_of_work = unit_of_work
+        self._pending_progress = pending_progress
 
     # ──────────────────────────── PUBLIC API ───────────────────────────── #
 
@@ -35,6 +54,7 @@ class TestingService:
             answer=answer.replace(chr(160), ""),  # non-breaking space → plain space
         )
         await self._repo.add_exercise(exercise)
+        await self._invalidate(section, subsection)
 
     async def get_testing_exercises(self, subsection: str) -> str:
         exercises = await self._repo.list_exercises(subsection)
@@ -48,7 +68,7 @@ class TestingService:
         section: str,
         subsection: str,
     ) -> int:
-        return await self._repo.count_exercises(section, subsection)
+        return await self._catalog.count(section, subsection)
 
     async def get_random_testing_exercise(
         self,
@@ -56,19 +76,34 @@ class TestingService:
         subsection: str,
         user_id: int,
     ) -> tuple[str, str, int] | None:
-        exercises = await self._repo.get_available_exercises(
-            section, subsection, user_id
-        )
-        if not exercises:
+        snapshot = await self._snapshot(user_id, section, subsection)
+        available = snapshot.available()
+        if not available:
             return None
-        chosen = random.choice(exercises)
+        chosen = await self._repo.get_exercise(
+            section, subsection, random.choice(available)
+        )
+        if chosen is None:
+            # deleted after the subsection bitmap was built; the deletion is
+            # committed already, so the bitmap is dropped right away
+            await self._catalog.invalidate()
+            if self._progress is not None:
+                await self._progress.invalidate_exercises(section, subsection)
+            return await self.get_random_testing_exercise(section, subsection, user_id)
         return chosen.test, chosen.answer, chosen.id
 
+    async def get_completion_counts(
+        self, user_id: int, section: str, subsection: str
+    ) -> tuple[int, int, int]:
+        """First-try successes, successes and total exercises in a subsection."""
+        snapshot = await self._snapshot(user_id, section, subsection)
+        return snapshot.counts()
+
     async def get_section_names(self) -> list[str]:
-        return await self._repo.get_section_names()
+        return await self._catalog.sections()
 
     async def get_subsection_names(self, section: str) -> list[str]:
-        return await self._repo.get_subsection_names(section)
+        return await self._catalog.subsections(section)
 
     async def edit_testing_exercise(
         self,
@@ -84,3 +119,63 @@ class TestingService:
         self, section: str, subsection: str, index: int
     ) -> None:
         await self._repo.delete_exercise(section, subsection, index)
+        await self._invalidate(section, subsection)
+
+    # ───────────────────────────── HELPERS ─────────────────────────────── #
+
+    async def _snapshot(
+        self, user_id: int, section: str, subsection: str
+    ) -> ProgressSnapshot:
+        if self._progress is None:
+            snapshot = ProgressSnapshot(exercise_ids=None, done=None, first_try=set())
+        else:
+            snapshot = await self._progress.snapshot(user_id, section, subsection)
+
+        if snapshot.exercise_ids is None:
+            snapshot.exercise_ids = set(
+                await self._repo.list_exercise_ids(section, subsection)
+            )
+            if self._progress is not None:
+                await after_commit(
+                    self._unit_of_work,
+                    partial(
+                        self._progress.fill_exercises,
+                        section,
+                        subsection,
+                        snapshot.exercise_ids,
+                        snapshot.exercises_version,
+                    ),
+                )
+        if snapshot.done is None:
+            solved = [
+                (row.exercise_id, bool(row.first_try))
+                for row in await self._repo.list_solved(user_id, section, subsection)
+            ]
+            snapshot.done = {exercise_id for exercise_id, _ in solved}
+            snapshot.first_try = {exercise_id for exercise_id, first in solved if first}
+            # stored after the commit, since the rows may include an answer
+            # of this update that could still be rolled back
+            if self._progress is not None:
+                await after_commit(
+                    self._unit_of_work,
+                    partial(
+                        self._progress.fill_user,
+                        user_id,
+                        section,
+                        subsection,
+                        solved,
+                        snapshot.user_version,
+                    ),
+                )
+        if self._pending_progress is not None:
+            # answers of this update reach the bitmaps only after the commit
+            self._pending_progress.apply(user_id, section, subsection, snapshot)
+        return snapshot
+
+    async def _invalidate(self, section: str, subsection: str) -> None:
+        await after_commit(self._unit_of_work, self._catalog.invalidate)
+        if self._progress is not None:
+            await after_commit(
+                self._unit_of_work,
+                partial(self._progress.invalidate_exercises, section, subsection),
+            )
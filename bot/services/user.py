@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import time as tm
 
+from bot.cache.leaderboard import Leaderboard
 from bot.datetime_utils import get_utc_now
 from bot.db.models import User
 from bot.db.repositories.user import UserRepository
@@ -9,11 +11,25 @@ from bot.loggers import get_logger
 
 logger = get_logger(__name__)
 
+USERS_PAGE_SIZE = 20
+
+
+@dataclass
+class UsersPage:
+    users: list[dict]
+    has_prev: bool
+    has_next: bool
+
 
 class UserService:
 
-    def __init__(self, repository: UserRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: UserRepository | None = None,
+        leaderboard: Leaderboard | None = None,
+    ) -> None:
         self._repo = repository or UserRepository()
+        self._leaderboard = leaderboard
 
     # ─────────────────────────── PUBLIC API ─────────────────────────── #
 
@@ -39,10 +55,14 @@ class UserService:
             time_zone=None,
         )
         await self._repo.add(user)
+        if self._leaderboard is not None:
+            await self._leaderboard.set_points(user_id, 0)
         logger.info(f"User {full_name} added successfully.")
 
     async def delete_user(self, user_id: int) -> None:
         await self._repo.delete_by_user_id(user_id)
+        if self._leaderboard is not None:
+            await self._leaderboard.remove(user_id)
 
     async def set_timezone(self, user_id: int, timezone: str | None) -> None:
         await self._repo.set_timezone(user_id, timezone)
@@ -50,21 +70,46 @@ class UserService:
     async def set_reminder_time(self, user_id: int, time: tm | None) -> None:
         await self._repo.set_reminder_time(user_id, time)
 
-    async def get_all_users(self) -> tuple[dict, ...]:
-        users = await self._repo.list_all()
-        return tuple(
+    async def get_users_page(
+        self,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        query: str | None = None,
+        limit: int = USERS_PAGE_SIZE,
+    ) -> UsersPage:
+        """
+        One page of the admin user browser, ordered by internal id.
+
+        Pass the last id of the current page as ``after_id`` to go forward or
+        its first id as ``before_id`` to go back.
+        """
+        rows = await self._repo.list_page(
+            limit + 1, after_id=after_id, before_id=before_id, query=query
+        )
+        more = len(rows) > limit
+        if before_id is not None:
+            rows = rows[1:] if more else rows
+            has_prev, has_next = more, True
+        else:
+            rows = rows[:limit]
+            has_prev, has_next = after_id is not None, more
+        users = [
             {
-                "id": u.id,
-                "user_id": u.user_id,
-                "full_name": u.full_name,
-                "tg_login": u.tg_login,
-                "registration_date": u.registration_date,
-                "points": u.points,
-                "reminder_time": u.reminder_time,
-                "time_zone": u.time_zone,
+                "id": row.id,
+                "user_id": row.user_id,
+                "full_name": row.full_name,
+                "tg_login": row.tg_login,
             }
-            for u in users
-        )
+            for row in rows
+        ]
+        return UsersPage(users=users, has_prev=has_prev, has_next=has_next)
+
+    async def get_user_ids_page(
+        self, after_id: int, limit: int
+    ) -> list[tuple[int, int]]:
+        """(id, user_id) pairs for keyset iteration over all users."""
+        rows = await self._repo.list_ids_page(after_id, limit)
+        return [(row.id, row.user_id) for row in rows]
 
     async def get_user(self, user_id: int) -> dict | None:
         user = await self._repo.get_by_user_id(user_id)
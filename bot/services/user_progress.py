@@ -1,15 +1,33 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timedelta
+from functools import partial
 
-from bot.db.models import UserProgress
+from bot.cache.leaderboard import Leaderboard
+from bot.cache.testing_progress import PendingProgress, TestingProgress
 from bot.db.repositories.user_progress import UserProgressRepository
+from bot.db.unit_of_work import UnitOfWork, after_commit
+
+LEADERBOARD_PAGE_SIZE = 50
+
+_MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
 
 
 class UserProgressService:
 
-    def __init__(self, repository: UserProgressRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: UserProgressRepository | None = None,
+        leaderboard: Leaderboard | None = None,
+        testing_progress: TestingProgress | None = None,
+        unit_of_work: UnitOfWork | None = None,
+        pending_progress: PendingProgress | None = None,
+    ) -> None:
         self._repo = repository or UserProgressRepository()
+        self._leaderboard = leaderboard
+        self._testing_progress = testing_progress
+        self._unit_of_work = unit_of_work
+        self._pending_progress = pending_progress
 
     # ───────────────────────── mark / update ───────────────────────── #
 
@@ -26,52 +44,58 @@ class UserProgressService:
         Returns True if this was the user's first attempt to solve
         a specific exercise (i.e. there was no record yet), otherwise False.
         """
-        rowcount = await self._repo.update_progress_attempt(
+        attempt = await self._repo.record_attempt(
             user_id,
             exercise_type,
             section,
             subsection,
             exercise_id,
             success,
+            date.today(),
         )
-
-        await self._repo.update_user_points(user_id, 1 if success else -1)
-
-        first_try = rowcount == 0
-        if first_try:
-            entry = UserProgress(
-                user_id=user_id,
-                exercise_type=exercise_type,
-                exercise_section=section,
-                exercise_subsection=subsection,
-                exercise_id=exercise_id,
-                attempts=1,
-                success=success,
-                date=date.today(),
+        if attempt is None:
+            return False
+        if self._leaderboard is not None:
+            await after_commit(
+                self._unit_of_work,
+                partial(self._leaderboard.set_points, user_id, attempt.points),
             )
-            await self._repo.add_progress_entry(entry)
-
-        return first_try
+        if (
+            self._testing_progress is not None
+            and exercise_type == "Testing"
+            and success
+        ):
+            if self._pending_progress is not None:
+                self._pending_progress.mark_done(
+                    user_id, section, subsection, exercise_id, bool(attempt.first_try)
+                )
+            await after_commit(
+                self._unit_of_work,
+                partial(
+                    self._testing_progress.mark_done,
+                    user_id,
+                    section,
+                    subsection,
+                    exercise_id,
+                    bool(attempt.first_try),
+                ),
+            )
+        return bool(attempt.first_try)
 
     async def delete_progress_by_subsection(
         self, user_id: int, section: str, subsection: str
     ) -> None:
         await self._repo.delete_progress_by_subsection(user_id, section, subsection)
+        if self._testing_progress is not None:
+            if self._pending_progress is not None:
+                self._pending_progress.reset(user_id, section, subsection)
+            await after_commit(
+                self._unit_of_work,
+                partial(self._testing_progress.reset, user_id, section, subsection),
+            )
 
     # ───────────────────────── statistics & info ──────────────────────── #
 
-    async def get_counts_completed_exercises_testing(
-        self, user_id: int, section: str, subsection: str
-    ) -> tuple[int, int, int]:
-        first_try_success = await self._repo.count_success_testing(
-            user_id, section, subsection, first_try_only=True
-        )
-        success = await self._repo.count_success_testing(
-            user_id, section, subsection, first_try_only=False
-        )
-        total = await self._repo.count_testing_exercises_total(section, subsection)
-        return first_try_success, success, total
-
     async def get_activity_by_user(self, user_id: int, interval: int = 0) -> str:
         """
         interval = 0 → today, 7 → last week, 30 → last month.
@@ -111,45 +135,79 @@ class UserProgressService:
     async def get_user_rank_and_total(
         self, user_id: int, medals_rank: bool = False
     ) -> tuple[str | int, int]:
-        points = await self._repo.get_user_points(user_id)
-        higher = await self._repo.count_users_with_points_greater(points)
-        total = await self._repo.total_users()
-        rank: int | str = higher + 1
-
+        rank_and_total = None
+        if self._leaderboard is not None and await self._ensure_leaderboard():
+            rank_and_total = await self._leaderboard.rank(user_id)
+            if rank_and_total is None:
+                # not ranked yet, e.g. registered after the last rebuild
+                points = await self._repo.get_user_points(user_id)
+                await self._leaderboard.set_points(user_id, points)
+                rank_and_total = await self._leaderboard.rank(user_id)
+
+        if rank_and_total is None:
+            points = await self._repo.get_user_points(user_id)
+            higher = await self._repo.count_users_with_points_greater(points)
+            total = await self._repo.total_users()
+            rank_and_total = higher + 1, total
+
+        rank, total = rank_and_total
         if medals_rank:
-            if rank == 1:
-                rank = "🥇"
-            elif rank == 2:
-                rank = "🥈"
-            elif rank == 3:
-                rank = "🥉"
-
+            rank = _MEDALS.get(rank, rank)
         return rank, total
 
-    async def get_all_users_ranks_and_points(
-        self, medals_rank: bool = False
-    ) -> list[dict[str, str]]:
-        users = await self._repo.list_users_ordered_by_points()
-        users_with_ranks: list[dict[str, str]] = []
-
-        for idx, user in enumerate(users, start=1):
-            rank_display: str | int = idx
-            if medals_rank:
-                if idx == 1:
-                    rank_display = "🥇"
-                elif idx == 2:
-                    rank_display = "🥈"
-                elif idx == 3:
-                    rank_display = "🥉"
-
-            users_with_ranks.append(
+    async def get_leaderboard_page(
+        self,
+        offset: int = 0,
+        limit: int = LEADERBOARD_PAGE_SIZE,
+        medals_rank: bool = False,
+    ) -> tuple[list[dict[str, str]], int]:
+        """
+        One page of users ordered by points, and the total number of users.
+
+        Ranks are positions in that order, starting at ``offset + 1``.
+        """
+        if self._leaderboard is not None and await self._ensure_leaderboard():
+            scores = await self._leaderboard.page(offset, limit)
+            names = {
+                user.user_id: user
+                for user in await self._repo.list_users_by_ids(
+                    [user_id for user_id, _ in scores]
+                )
+            }
+            users = [
+                (user_id, names[user_id].full_name, names[user_id].tg_login, points)
+                for user_id, points in scores
+                if user_id in names
+            ]
+            total = await self._leaderboard.total()
+        else:
+            rows = await self._repo.list_users_ordered_by_points(offset, limit)
+            users = [
+                (row.user_id, row.full_name, row.tg_login, row.points) for row in rows
+            ]
+            total = await self._repo.total_users()
+
+        page = []
+        for position, (user_id, full_name, tg_login, points) in enumerate(
+            users, start=offset + 1
+        ):
+            rank_display = _MEDALS.get(position, position) if medals_rank else position
+            page.append(
                 {
                     "rank": str(rank_display),
-                    "user_id": str(user.user_id),
-                    "full_name": user.full_name,
-                    "tg_login": user.tg_login,
-                    "points": str(user.points),
+                    "user_id": str(user_id),
+                    "full_name": full_name,
+                    "tg_login": tg_login,
+                    "points": str(points),
                 }
             )
-
-        return users_with_ranks
+        return page, total
+
+    async def _ensure_leaderboard(self) -> bool:
+        """False when the leaderboard cannot be used and the database is read."""
+        if await self._leaderboard.is_built():
+            return True
+        rows = self._repo.stream_points()
+        return await self._leaderboard.rebuild(
+            (row.user_id, row.points) async for row in rows
+        )
@@ -1,59 +1,58 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import date, datetime
+from functools import partial
 import random
 
+from bot.cache.leaderboard import Leaderboard
+from bot.cache.review_queue import ReviewQueueCache
 from bot.db.models import NewWords, UserWordsLearning
 from bot.db.repositories.user_words_learning import UserWordsLearningRepository
-from bot.services.utils import calculate_next_review_date
+from bot.db.unit_of_work import UnitOfWork, after_commit
+from bot.services.distractors import DistractorIndex, distractor_index
+from bot.services.utils import reminder_slots
 
 
 class UserWordsLearningService:
     ACTIVE_LEARNING_RATE = 3
     LEARNED_RATE = 5
 
-    def __init__(self, repository: UserWordsLearningRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: UserWordsLearningRepository | None = None,
+        review_queue: ReviewQueueCache | None = None,
+        distractors: DistractorIndex | None = None,
+        leaderboard: Leaderboard | None = None,
+        unit_of_work: UnitOfWork | None = None,
+    ) -> None:
         self._user_words_learning_repo = repository or UserWordsLearningRepository()
+        self._review_queue = review_queue
+        self._distractors = distractors or distractor_index
+        self._leaderboard = leaderboard
+        self._unit_of_work = unit_of_work
 
     # ──────────────────────────── PUBLIC API ───────────────────────────── #
 
     async def get_random_word_exercise(self, user_id: int) -> dict | None:
-        words_today = await self._user_words_learning_repo.words_to_learn_today(user_id)
-        if not words_today:
-            return None
-
-        exercise = random.choice(words_today)
-
-        same_sub_words = (
-            await self._user_words_learning_repo.all_words_by_section_subsection(
-                user_id, exercise.new_word.section, exercise.new_word.subsection
-            )
-        )
-        options = [
-            w.new_word.russian.capitalize()
-            for w in same_sub_words
-            if w.new_word.russian != exercise.new_word.russian
-        ]
-
-        # if not enough in same section, take from all user words
-        if len(options) < 3:
-            all_words = await self._user_words_learning_repo.all_words_by_user(user_id)
-            options = [
-                w.new_word.russian.capitalize()
-                for w in all_words
-                if w.new_word.russian != exercise.new_word.russian
-            ]
-
-        options = random.sample(options, k=3)
-
-        return {
-            "russian": exercise.new_word.russian.capitalize(),
-            "english": exercise.new_word.english.capitalize(),
-            "section": exercise.new_word.section,
-            "subsection": exercise.new_word.subsection,
-            "exercise_id": exercise.exercise_id,
-            "options": options,
-        }
+        today = date.today()
+        if self._review_queue is not None and await self._review_queue.is_built(
+            user_id, today
+        ):
+            return await self._review_queue.peek(user_id, today)
+
+        words_today = await self._user_words_learning_repo.due_words(user_id, today)
+        if words_today:
+            await self._distractors.ensure_loaded()
+
+        if self._review_queue is None:
+            if not words_today:
+                return None
+            return self._build_exercise(random.choice(words_today))
+
+        exercises = [self._build_exercise(w) for w in words_today]
+        random.shuffle(exercises)
+        await self._review_queue.fill(user_id, today, exercises)
+        return exercises[0] if exercises else None
 
     async def get_count_active_learning_exercises(self, user_id: int) -> int:
         return await self._user_words_learning_repo.count_active_learning(
@@ -69,53 +68,38 @@ class UserWordsLearningService:
         return await self._user_words_learning_repo.count_all_by_user(user_id)
 
     async def get_count_all_exercises_for_today_by_user(self, user_id: int) -> int:
+        if self._review_queue is not None:
+            count = await self._review_queue.count(user_id, date.today())
+            if count is not None:
+                return count
         return await self._user_words_learning_repo.count_all_today_by_user(user_id)
 
+    async def get_due_counts_to_remind(self, utc_minute: datetime) -> dict[int, int]:
+        """Words due today per user whose reminder falls on ``utc_minute``."""
+        rows = await self._user_words_learning_repo.count_due_in_reminder_slots(
+            reminder_slots(utc_minute), date.today()
+        )
+        return {row.user_id: row.due for row in rows}
+
     async def get_added_subsections_by_user(self, user_id: int):
         return await self._user_words_learning_repo.distinct_subsections(user_id)
 
     async def get_user_stats(self, user_id: int) -> dict:
-        stats: dict[str, dict] = {}
-        subsections = await self._user_words_learning_repo.distinct_subsections(user_id)
-
-        for subsection in subsections:
-            learned = await self._user_words_learning_repo.count_learned_in_subsection(
-                user_id, subsection, self.LEARNED_RATE
-            )
-            active = await self._user_words_learning_repo.count_active_in_subsection(
-                user_id, subsection, self.ACTIVE_LEARNING_RATE
-            )
-            today = await self._user_words_learning_repo.count_today_in_subsection(
-                user_id, subsection
-            )
-            total = await self._user_words_learning_repo.count_total_in_subsection(
-                user_id, subsection
-            )
-
-            total_success = (
-                await self._user_words_learning_repo.sum_success_in_subsection(
-                    user_id, subsection
-                )
-            )
-            total_attempts = (
-                await self._user_words_learning_repo.sum_attempts_in_subsection(
-                    user_id, subsection
-                )
-            )
-
-            success_rate = (
-                (total_success / total_attempts) * 100 if total_attempts else 0
-            )
-
-            stats[subsection] = {
-                "learned": learned,
-                "for_today_learning": today,
-                "active_learning": active,
-                "total_words_in_subsection": total,
-                "success_rate": success_rate,
+        rows = await self._user_words_learning_repo.subsection_stats(
+            user_id, self.ACTIVE_LEARNING_RATE, self.LEARNED_RATE
+        )
+        return {
+            row.subsection: {
+                "learned": row.learned,
+                "for_today_learning": row.today,
+                "active_learning": row.active,
+                "total_words_in_subsection": row.total,
+                "success_rate": (
+                    (row.success / row.attempts) * 100 if row.attempts else 0
+                ),
             }
-
-        return stats
+            for row in rows
+        }
 
     async def set_progress(
         self,
@@ -125,32 +109,20 @@ class UserWordsLearningService:
         exercise_id: int,
         success: bool,
     ) -> None:
-        info = await self._user_words_learning_repo.learning_info(
-            user_id, section, subsection, exercise_id
+        today = date.today()
+        points = await self._user_words_learning_repo.record_answer(
+            user_id, section, subsection, exercise_id, success, today
         )
-        if info is None:
-            return  # safety guard
-
-        success_value = info.success
-        attempts = info.attempts + 1
-
-        if success:
-            await self._user_words_learning_repo.update_user_points(user_id, +1)
-            success_value += 1
-            next_review_date = calculate_next_review_date(
-                success_attempts=success_value, total_attempts=attempts
+        if points is not None and self._leaderboard is not None:
+            await after_commit(
+                self._unit_of_work,
+                partial(self._leaderboard.set_points, user_id, points),
+            )
+        # Answered words are never due again today, whatever the outcome.
+        if self._review_queue is not None:
+            await self._review_queue.remove(
+                user_id, today, section, subsection, exercise_id
             )
-        else:
-            await self._user_words_learning_repo.update_user_points(user_id, -1)
-            next_review_date = date.today() + timedelta(days=1)
-
-        await self._user_words_learning_repo.update_learning_progress(
-            section,
-            subsection,
-            exercise_id,
-            success_value,
-            next_review_date,
-        )
 
     async def add_words_to_learning(
         self, section: str, subsection: str, user_id: int
@@ -171,6 +143,7 @@ class UserWordsLearningService:
             await self._user_words_learning_repo.add_user_words_learning_entries(
                 entries
             )
+            await self._invalidate_review_queue(user_id)
 
     async def admin_add_words_to_learning(
         self, russian: str, english: str, user_id: int
@@ -196,3 +169,29 @@ class UserWordsLearningService:
             exercise_id=next_id,
         )
         await self._user_words_learning_repo.add_user_words_learning_entry(entry)
+        await after_commit(self._unit_of_work, self._distractors.invalidate)
+        await self._invalidate_review_queue(user_id)
+
+    # ───────────────────────────── HELPERS ─────────────────────────────── #
+
+    def _build_exercise(self, word) -> dict:
+        russian = word.russian.capitalize()
+        return {
+            "russian": russian,
+            "english": word.english.capitalize(),
+            "section": word.section,
+            "subsection": word.subsection,
+            "exercise_id": word.exercise_id,
+            "options": self._distractors.sample(
+                word.section, word.subsection, exclude=russian
+            ),
+        }
+
+    async def _invalidate_review_queue(self, user_id: int) -> None:
+        # dropped once the new words are committed, or the next read could
+        # rebuild the queue without them
+        if self._review_queue is not None:
+            await after_commit(
+                self._unit_of_work,
+                partial(self._review_queue.invalidate, user_id, date.today()),
+            )
@@ -1,4 +1,14 @@
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
+
+# Spaced-repetition tuning. UserWordsLearningRepository.record_answer evaluates
+# the same formula in SQL, so keep both in sync when changing it.
+BASE_INTERVAL = 1
+GROWTH_FACTOR = 1.7
+TARGET_SUCCESS_RATE = 0.75
+MAX_INTERVAL_DAYS = 36500
+
+# Offsets offered by bot.utils.time_zones, stored as "+3", "-5", "+0".
+REMINDER_UTC_OFFSETS = range(-12, 13)
 
 
 def calculate_success_rate(success_attempts, total_attempts):
@@ -8,16 +18,13 @@ def calculate_success_rate(success_attempts, total_attempts):
 
 
 def calculate_next_interval(success_attempts, success_rate):
-    base_interval = 1
-    growth_factor = 1.7
-
-    standard_interval = base_interval * (growth_factor**success_attempts)
+    standard_interval = BASE_INTERVAL * (GROWTH_FACTOR**success_attempts)
 
     # coefficient of adaptation
-    if success_rate >= 0.75:  # high success, increase interval
-        adjustment_factor = 1 + (success_rate - 0.75) * 2
-    elif success_rate < 0.75:  # low success, decrease interval
-        adjustment_factor = 1 - (0.75 - success_rate) * 2
+    if success_rate >= TARGET_SUCCESS_RATE:  # high success, increase interval
+        adjustment_factor = 1 + (success_rate - TARGET_SUCCESS_RATE) * 2
+    elif success_rate < TARGET_SUCCESS_RATE:  # low success, decrease interval
+        adjustment_factor = 1 - (TARGET_SUCCESS_RATE - success_rate) * 2
     else:
         adjustment_factor = 1
 
@@ -28,7 +35,20 @@ def calculate_next_interval(success_attempts, success_rate):
 def calculate_next_review_date(success_attempts, total_attempts):
     success_rate = calculate_success_rate(success_attempts, total_attempts)
     next_interval_days = calculate_next_interval(success_attempts, success_rate)
+    next_interval_days = min(next_interval_days, MAX_INTERVAL_DAYS)
     next_review_date = date.today() + timedelta(days=next_interval_days)
     if next_review_date <= date.today():
         next_review_date = date.today() + timedelta(days=1)
     return next_review_date
+
+
+def reminder_slots(utc_minute: datetime) -> list[tuple[time, str]]:
+    """(reminder_time, time_zone) pairs whose local time is ``utc_minute``."""
+    slots = []
+    for offset in REMINDER_UTC_OFFSETS:
+        local_time = (utc_minute + timedelta(hours=offset)).time()
+        local_time = local_time.replace(second=0, microsecond=0, tzinfo=None)
+        # Older rows may store positive offsets without the sign.
+        for spelling in dict.fromkeys((f"{offset:+d}", str(offset))):
+            slots.append((local_time, spelling))
+    return slots
@@ -65,6 +65,7 @@ class AdminFSM(StatesGroup):
     # Users
     see_user_info = State()
     see_user_management = State()
+    searching_user = State()
     user_managing = State()
     adding_words_to_user = State()
     deleting_user = State()
@@ -1,4 +1,11 @@
 from .bot_init import get_bot_instance, init_bot_instance
+from .broadcast import (
+    BroadcastEngine,
+    BroadcastReport,
+    resume_broadcasts,
+    run_broadcast,
+)
+from .leader_election import LeaderElection
 from .message_to_admin import send_message_to_admin
 from .message_to_users import (
     send_message_to_all_users,
@@ -6,14 +13,21 @@ from .message_to_users import (
     send_reminder_to_user,
 )
 from .new_words_parser import check_line
+from .rate_limit import TokenBucket, telegram_send_limiter
+from .reminders import ReminderDispatcher, reminder_dispatcher
 from .scheduling import (
+    broadcast_job_store,
     delete_scheduled_broadcasts,
     schedule_broadcast,
     schedule_reminders,
     scheduler,
+    scheduler_leadership,
 )
 from .send_long_message import send_long_message
-from .state_data_updater import update_state_data
+from .shutdown import stop_on_signals
+from .state_data_updater import get_state_values, update_state_data
 from .text_helpers import get_word_declension
 from .time_zones import time_zones
+from .update_streaming import StreamWorker, poll_into_stream
 from .url_builders import word_with_youglish_link
+from .webhook import UpdateQueue, build_webhook_app, run_webhook
@@ -0,0 +1,206 @@
+import asyncio
+from dataclasses import asdict, dataclass
+import os
+import socket
+from uuid import uuid4
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+
+from bot.cache import BroadcastCheckpoints, LeaderLock, get_redis
+from bot.lexicon.lexicon_ru import ServiceMessages
+from bot.loggers import get_logger
+from bot.services.user import UserService
+
+from .bot_init import get_bot_instance
+from .message_to_admin import send_message_to_admin
+from .rate_limit import TokenBucket, telegram_send_limiter
+
+logger = get_logger(__name__)
+
+# Keeps resumed broadcasts referenced until they finish.
+_background_tasks: set[asyncio.Task] = set()
+# IDs of the broadcasts this process is sending.
+_running_broadcasts: set[str] = set()
+
+
+@dataclass
+class BroadcastReport:
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+
+
+class BroadcastEngine:
+    """
+    Sends one text to every user with bounded concurrency.
+
+    Users are read in pages ordered by users.id. Each page is sent
+    concurrently through the shared token bucket, then the last id of the
+    page and the counters are checkpointed, so a restarted broadcast resumes
+    after the last finished page. A flood-wait from Telegram pauses every
+    sender for ``retry_after`` seconds before the message is retried.
+
+    A broadcast is sent by the holder of its lease only, which is renewed
+    after every page; a runner that cannot renew it stops. A page still being
+    sent when its lease expires may be sent again by the next runner.
+
+    Parameters:
+    - bot (Bot): Bot used to send the messages.
+    - checkpoints (BroadcastCheckpoints): Where progress is stored.
+    - user_service (UserService, optional): Source of user IDs.
+    - limiter (TokenBucket, optional): Rate limit shared with other bulk senders.
+    - concurrency (int, optional): Messages in flight at most.
+    """
+
+    PAGE_SIZE = 500
+    MAX_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        bot: Bot,
+        checkpoints: BroadcastCheckpoints,
+        user_service: UserService | None = None,
+        limiter: TokenBucket = telegram_send_limiter,
+        concurrency: int = 8,
+    ) -> None:
+        self._bot = bot
+        self._checkpoints = checkpoints
+        self._user_service = user_service or UserService()
+        self._limiter = limiter
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._resume_at = 0.0
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+    async def run(self, broadcast_id: str, text: str) -> BroadcastReport | None:
+        """
+        Send the broadcast, or resume it from its checkpoint.
+
+        Returns None without finishing it when it is already being sent, by
+        this process or under a lease held elsewhere, or when the lease is lost.
+        """
+        if broadcast_id in _running_broadcasts:
+            return None
+        lease = self._checkpoints.lease(broadcast_id, self._owner)
+        if not await lease.acquire():
+            logger.info(f"Broadcast {broadcast_id} is already being sent")
+            return None
+        _running_broadcasts.add(broadcast_id)
+        try:
+            return await self._send(broadcast_id, text, lease)
+        finally:
+            _running_broadcasts.discard(broadcast_id)
+            try:
+                await lease.release()
+            except Exception:
+                logger.exception(f"Failed to release the lease of {broadcast_id}")
+
+    async def _send(
+        self, broadcast_id: str, text: str, lease: LeaderLock
+    ) -> BroadcastReport | None:
+        await self._checkpoints.start(broadcast_id, text)
+        state = await self._checkpoints.load(broadcast_id)
+        text, last_id = state["text"], state["last_id"]
+        report = BroadcastReport(
+            sent=state["sent"], blocked=state["blocked"], failed=state["failed"]
+        )
+        if last_id:
+            logger.info(f"Resuming broadcast {broadcast_id} after users.id {last_id}")
+
+        while page := await self._user_service.get_user_ids_page(
+            last_id, self.PAGE_SIZE
+        ):
+            outcomes = await asyncio.gather(
+                *(self._deliver(user_id, text) for _, user_id in page)
+            )
+            for outcome in outcomes:
+                setattr(report, outcome, getattr(report, outcome) + 1)
+            last_id = page[-1][0]
+            # the checkpoint belongs to the lease holder
+            if not await lease.renew():
+                logger.warning(f"Lost the lease of broadcast {broadcast_id}, stopping")
+                return None
+            await self._checkpoints.save(broadcast_id, last_id, **asdict(report))
+
+        await self._checkpoints.finish(broadcast_id)
+        logger.info(f"Broadcast {broadcast_id} finished: {report}")
+        return report
+
+    async def _deliver(self, user_id: int, text: str) -> str:
+        """Send to one user; returns the name of the report counter to bump."""
+        async with self._semaphore:
+            for _ in range(self.MAX_ATTEMPTS):
+                await self._wait_for_flood_control()
+                await self._limiter.acquire()
+                try:
+                    await self._bot.send_message(user_id, text=text)
+                    return "sent"
+                except TelegramRetryAfter as e:
+                    logger.warning(f"Flood control, pausing for {e.retry_after}s")
+                    self._pause(e.retry_after)
+                except TelegramForbiddenError:
+                    return "blocked"
+                except TelegramAPIError as e:
+                    logger.error(f"Failed to send broadcast to user {user_id}:\n{e}")
+                    return "failed"
+            return "failed"
+
+    def _pause(self, seconds: float) -> None:
+        loop = asyncio.get_running_loop()
+        self._resume_at = max(self._resume_at, loop.time() + seconds)
+
+    async def _wait_for_flood_control(self) -> None:
+        delay = self._resume_at - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_broadcast(
+    text: str, broadcast_id: str | None = None
+) -> BroadcastReport | None:
+    """
+    Broadcast a message to all users and report the outcome to the admins.
+    Returns None, without a report, when the broadcast is sent elsewhere.
+
+    Parameters:
+    - text (str): The message text to send.
+    - broadcast_id (str, optional): Stable ID used for checkpointing. A new one
+      is generated when omitted.
+    """
+    bot: Bot = await get_bot_instance()
+    if bot is None:
+        raise Exception("Bot instance is not available")
+    engine = BroadcastEngine(bot=bot, checkpoints=BroadcastCheckpoints(get_redis()))
+    report = await engine.run(broadcast_id or uuid4().hex, text)
+    if report is None:
+        return None
+    await send_message_to_admin(
+        ServiceMessages.BROADCAST_REPORT.format(**asdict(report))
+    )
+    return report
+
+
+async def resume_broadcasts() -> None:
+    """
+    Restart, in the background, broadcasts interrupted by a shutdown or crash.
+
+    Broadcasts still sent by this process or under a live lease are skipped.
+    """
+    checkpoints = BroadcastCheckpoints(get_redis())
+    for broadcast_id in await checkpoints.active_ids():
+        if broadcast_id in _running_broadcasts:
+            continue
+        if await checkpoints.runner(broadcast_id) is not None:
+            logger.info(f"Broadcast {broadcast_id} is being sent elsewhere")
+            continue
+        state = await checkpoints.load(broadcast_id)
+        if state is None:
+            await checkpoints.finish(broadcast_id)
+            continue
+        task = asyncio.create_task(run_broadcast(state["text"], broadcast_id))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
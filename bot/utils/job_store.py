@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import pickle
+import time
+
+from apscheduler.job import Job
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.util import datetime_to_utc_timestamp
+
+from bot.db.repositories.scheduled_jobs import ScheduledJobRepository
+from bot.loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Write:
+    kind: str  # "save", "remove" or "clear"
+    job_id: str | None = None
+    job: Job | None = None
+    next_run_time: float | None = None
+    job_state: bytes = b""
+
+
+class PostgresJobStore(MemoryJobStore):
+    """
+    APScheduler job store persisting jobs to Postgres without blocking.
+
+    APScheduler calls job stores synchronously from the event loop, so the
+    jobs are served from memory, while every change is queued and written to
+    the scheduled_jobs table in order by a background task through the
+    asyncpg engine. load() replaces the jobs in memory with those in the
+    table once the changes queued before it are written, keeping the changes
+    queued after it. A save that keeps failing is logged and dropped after
+    MAX_ATTEMPTS; removals are retried until written, since a job left in the
+    table would run again.
+
+    Jobs may have been removed by another replica since the last load, so a
+    due job is only handed to the scheduler once a load that started after
+    it fell due still found it; until then the store reloads and the
+    scheduler waits for it.
+
+    Parameters:
+    - repository (ScheduledJobRepository, optional): Where jobs are stored.
+    """
+
+    MAX_ATTEMPTS = 3
+    RETRY_SECONDS = 1.0
+    STOP_TIMEOUT_SECONDS = 10.0
+
+    def __init__(self, repository: ScheduledJobRepository | None = None) -> None:
+        super().__init__()
+        self._repository = repository
+        self._writes: deque[_Write | asyncio.Future] = deque()
+        self._queued = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: asyncio.Task | None = None
+        self._loaded_at = 0.0
+        self._checking: asyncio.Task | None = None
+
+    # ───────────────────── APScheduler interface ──────────────────── #
+
+    def add_job(self, job: Job) -> None:
+        super().add_job(job)
+        self._enqueue(self._save(job))
+
+    def update_job(self, job: Job) -> None:
+        super().update_job(job)
+        self._enqueue(self._save(job))
+
+    def remove_job(self, job_id: str) -> None:
+        super().remove_job(job_id)
+        self._enqueue(_Write("remove", job_id))
+
+    def remove_all_jobs(self) -> None:
+        super().remove_all_jobs()
+        self._enqueue(_Write("clear"))
+
+    def get_due_jobs(self, now) -> list[Job]:
+        due = super().get_due_jobs(now)
+        checked = [
+            job
+            for job in due
+            if datetime_to_utc_timestamp(job.next_run_time) <= self._loaded_at
+        ]
+        if len(checked) < len(due) and self._checking is None:
+            self._checking = asyncio.create_task(
+                self._check_due_jobs(), name="job-store-check"
+            )
+        return checked
+
+    def get_next_run_time(self):
+        # the scheduler is woken up once the due jobs are checked
+        if self._checking is not None:
+            return None
+        return super().get_next_run_time()
+
+    def shutdown(self) -> None:
+        # forget the jobs without deleting them from the table
+        MemoryJobStore.remove_all_jobs(self)
+
+    # ─────────────────────────── PUBLIC API ─────────────────────────── #
+
+    async def load(self) -> None:
+        """Replace the jobs in memory with those stored in the table."""
+        loaded = asyncio.get_running_loop().create_future()
+        self._enqueue(loaded)
+        await loaded
+
+    async def flush(self) -> None:
+        """Wait until every queued change is written."""
+        await self._idle.wait()
+
+    async def stop(self) -> None:
+        """Write the queued changes and stop the background task."""
+        if self._checking is not None:
+            self._checking.cancel()
+            await asyncio.gather(self._checking, return_exceptions=True)
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self.flush(), self.STOP_TIMEOUT_SECONDS)
+            except TimeoutError:
+                logger.error(
+                    f"Stopping with {len(self._writes)} scheduled job changes "
+                    "not written"
+                )
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ─────────────────────────── internals ─────────────────────────── #
+
+    async def _check_due_jobs(self) -> None:
+        try:
+            while True:
+                try:
+                    await self.load()
+                    return
+                except Exception:
+                    logger.exception("Failed to check due jobs against the table")
+                    await asyncio.sleep(self.RETRY_SECONDS)
+        finally:
+            self._checking = None
+            if self._scheduler is not None and self._scheduler.running:
+                self._scheduler.wakeup()
+
+    @staticmethod
+    def _save(job: Job) -> _Write:
+        return _Write(
+            "save",
+            job.id,
+            job,
+            datetime_to_utc_timestamp(job.next_run_time),
+            pickle.dumps(job.__getstate__(), pickle.HIGHEST_PROTOCOL),
+        )
+
+    def _enqueue(self, write: _Write | asyncio.Future) -> None:
+        self._writes.append(write)
+        self._idle.clear()
+        self._queued.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="job-store-writes")
+
+    async def _run(self) -> None:
+        while True:
+            await self._queued.wait()
+            while self._writes:
+                write = self._writes[0]
+                if isinstance(write, asyncio.Future):
+                    await self._load(write)
+                else:
+                    await self._write(write)
+                self._writes.popleft()
+            self._queued.clear()
+            self._idle.set()
+
+    async def _write(self, write: _Write) -> None:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                repository = self._repository or ScheduledJobRepository()
+                if write.kind == "save":
+                    await repository.save(
+                        write.job_id, write.next_run_time, write.job_state
+                    )
+                elif write.kind == "remove":
+                    await repository.delete(write.job_id)
+                else:
+                    await repository.delete_all()
+                return
+            except Exception:
+                logger.exception(
+                    f"Failed to {write.kind} scheduled job {write.job_id or ''} "
+                    f"(attempt {attempt})"
+                )
+                if write.kind == "save" and attempt >= self.MAX_ATTEMPTS:
+                    return
+                await asyncio.sleep(self.RETRY_SECONDS)
+
+    async def _load(self, loaded: asyncio.Future) -> None:
+        started = time.time()
+        try:
+            repository = self._repository or ScheduledJobRepository()
+            rows = await repository.get_all()
+        except Exception as e:
+            if not loaded.done():
+                loaded.set_exception(e)
+            return
+
+        MemoryJobStore.remove_all_jobs(self)
+        for job_id, job_state in rows:
+            try:
+                MemoryJobStore.add_job(self, self._reconstitute(job_state))
+            except Exception:
+                logger.exception(f"Unable to restore scheduled job {job_id}")
+        # changes queued after the load are not in the table yet
+        for write in list(self._writes)[1:]:
+            if isinstance(write, _Write):
+                self._apply_in_memory(write)
+        self._loaded_at = started
+
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.wakeup()
+        if not loaded.done():
+            loaded.set_result(None)
+
+    def _reconstitute(self, job_state: bytes) -> Job:
+        job = Job.__new__(Job)
+        job.__setstate__(pickle.loads(job_state))
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _apply_in_memory(self, write: _Write) -> None:
+        if write.kind == "save":
+            if write.job_id in self._jobs_index:
+                MemoryJobStore.update_job(self, write.job)
+            else:
+                MemoryJobStore.add_job(self, write.job)
+        elif write.kind == "remove":
+            if write.job_id in self._jobs_index:
+                MemoryJobStore.remove_job(self, write.job_id)
+        else:
+            MemoryJobStore.remove_all_jobs(self)
@@ -0,0 +1,116 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import os
+import socket
+import time
+from uuid import uuid4
+
+from bot.cache import LeaderLock, get_redis
+from bot.loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class LeaderElection:
+    """
+    Elects one process among the replicas through a lease in Redis.
+
+    Every RENEW_SECONDS a follower tries to take the lease and the leader
+    renews it. The leader steps down when a renewal finds the lease taken, and
+    also when it could not renew for so long that the lease may have expired,
+    so two processes never both think they lead. A stopped leader releases the
+    lease right away; a crashed one is replaced once its lease expires.
+
+    Parameters:
+    - name (str): What is being led; replicas electing the same name compete.
+    - on_elected (callable): Coroutine run when this process becomes leader.
+    - on_demoted (callable): Coroutine run when it stops being leader.
+    - lock (LeaderLock, optional): Lease to compete for; built from the
+      shared Redis client on start when omitted.
+    """
+
+    LEASE_SECONDS = 30
+    RENEW_SECONDS = 10
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        lock: LeaderLock | None = None,
+    ) -> None:
+        self.name = name
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._lock = lock
+        self._task: asyncio.Task | None = None
+        self._valid_until = 0.0
+        self.is_leader = False
+
+    def start(self) -> None:
+        """Start competing for leadership in the background."""
+        if self._task is not None:
+            return
+        if self._lock is None:
+            self._lock = LeaderLock(
+                get_redis(), self.name, self.owner, self.LEASE_SECONDS
+            )
+        self._task = asyncio.create_task(self._run(), name=f"{self.name}-election")
+
+    async def stop(self) -> None:
+        """Stop competing and hand leadership over right away."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            await self._step_down()
+            try:
+                await self._lock.release()
+            except Exception:
+                logger.exception(f"Failed to release {self.name} leadership")
+
+    async def step(self) -> None:
+        """Take or renew the lease once."""
+        # the lease counts from before the request was sent and is given up
+        # one renewal interval before it could expire
+        started = time.monotonic()
+        try:
+            if self.is_leader:
+                held = await self._lock.renew()
+            else:
+                held = await self._lock.acquire()
+        except Exception:
+            logger.exception(f"Failed to refresh {self.name} leadership")
+            if self.is_leader and started >= self._valid_until:
+                await self._step_down()
+            return
+
+        if held:
+            self._valid_until = started + self.LEASE_SECONDS - self.RENEW_SECONDS
+            if not self.is_leader:
+                await self._take_over()
+        elif self.is_leader:
+            await self._step_down()
+
+    async def _run(self) -> None:
+        while True:
+            await self.step()
+            await asyncio.sleep(self.RENEW_SECONDS)
+
+    async def _take_over(self) -> None:
+        self.is_leader = True
+        logger.info(f"{self.owner} is now the {self.name} leader")
+        try:
+            await self._on_elected()
+        except Exception:
+            logger.exception(f"Failed to take over as {self.name} leader")
+
+    async def _step_down(self) -> None:
+        self.is_leader = False
+        logger.warning(f"{self.owner} is no longer the {self.name} leader")
+        try:
+            await self._on_demoted()
+        except Exception:
+            logger.exception(f"Failed to step down as {self.name} leader")
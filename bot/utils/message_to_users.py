@@ -1,35 +1,27 @@
 from aiogram import Bot
-from aiogram.exceptions import TelegramForbiddenError
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
 
 from bot.keyboards import keyboard_builder
 from bot.lexicon import BasicButtons, MessageTexts
 from bot.loggers import get_logger
-from bot.services.user import UserService
 from bot.services.user_words_learning import UserWordsLearningService
 
 from .bot_init import get_bot_instance
+from .broadcast import run_broadcast
+from .rate_limit import TokenBucket, telegram_send_limiter
 
 logger = get_logger(__name__)
 
 
-async def send_message_to_all_users(text: str):
+async def send_message_to_all_users(text: str, broadcast_id: str | None = None):
     """
     Send a message to all users.
 
     Parameters:
     - text (str): The message text to send.
+    - broadcast_id (str, optional): ID used to checkpoint and resume the broadcast.
     """
-    bot: Bot = await get_bot_instance()
-    user_service: UserService = UserService()
-    if bot is None:
-        raise Exception("Bot instance is not available")
-    users = await user_service.get_all_users()
-    for user in users:
-        user_id = user.get("user_id")
-        try:
-            await bot.send_message(user_id, text=text)
-        except TelegramForbiddenError as e:
-            logger.error(f"Failed to send broadcast message to user {user_id}:\n{e}")
+    await run_broadcast(text, broadcast_id)
 
 
 async def send_message_to_user(user_id: int, text: str, learning_button: bool = False):
@@ -57,25 +49,34 @@ async def send_message_to_user(user_id: int, text: str, learning_button: bool =
         logger.error(f"Failed to send message to user {user_id}:\n{e}")
 
 
-async def send_reminder_to_user(user_id: int):
+async def send_reminder_to_user(
+    user_id: int,
+    count_words_for_today: int | None = None,
+    limiter: TokenBucket = telegram_send_limiter,
+):
     """
     Send a reminder message to a user about their word learning tasks.
 
     Parameters:
     - user_id (int): The ID of the user.
+    - count_words_for_today (int, optional): Words due today, when the caller
+      already knows it (e.g. the reminder dispatcher). Queried otherwise.
+    - limiter (TokenBucket, optional): Rate limit paused when Telegram's
+      flood control answers, before the message is sent once more.
     """
     bot: Bot = await get_bot_instance()
-    user_words_learning_service: UserWordsLearningService = UserWordsLearningService()
-    count_words_for_today = (
-        await user_words_learning_service.get_count_all_exercises_for_today_by_user(
+    if count_words_for_today is None:
+        service = UserWordsLearningService()
+        count_words_for_today = await service.get_count_all_exercises_for_today_by_user(
             user_id=user_id
         )
-    )
     # active_learning_count = await user_words_learning_service.get_count_active_learning_exercises(user_id=user_id)
     try:
         if count_words_for_today > 0:
             word_form = get_word_declension(count_words_for_today)
-            await bot.send_message(
+            await _send_after_flood_control(
+                bot,
+                limiter,
                 user_id,
                 text=MessageTexts.REMINDER_WORDS_TO_LEARN.format(word_form),
                 reply_markup=await keyboard_builder(
@@ -96,6 +97,20 @@ async def send_reminder_to_user(user_id: int):
         logger.error(f"Failed to send message to user {user_id}:\n{e}")
 
 
+async def _send_after_flood_control(
+    bot: Bot, limiter: TokenBucket, user_id: int, **kwargs
+) -> None:
+    # Flood control applies to the whole bot: the shared limiter is paused for
+    # every bulk sender, then the message is retried once.
+    try:
+        await bot.send_message(user_id, **kwargs)
+    except TelegramRetryAfter as e:
+        logger.warning(f"Flood control, pausing for {e.retry_after}s")
+        limiter.pause(e.retry_after)
+        await limiter.acquire()
+        await bot.send_message(user_id, **kwargs)
+
+
 def get_word_declension(count: int) -> str:
     """
     Get the correct word declension for the given count.
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket limiting how often an action may happen.
+
+    Parameters:
+    - rate (float): Tokens added per second.
+    - capacity (int, optional): Largest burst allowed. Defaults to one second of rate.
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None) -> None:
+        self._rate = rate
+        self._capacity = capacity or max(1, int(rate))
+        self._tokens = float(self._capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds``, e.g. while flood control lasts."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1 or self._updated_at < self._paused_until:
+                await asyncio.sleep(
+                    max(
+                        (1 - self._tokens) / self._rate,
+                        self._paused_until - self._updated_at,
+                    )
+                )
+                self._refill()
+            self._tokens -= 1
+
+
+# Shared by every bulk sender (reminders, broadcasts) so that together they stay
+# under Telegram's ~30 messages per second limit.
+telegram_send_limiter = TokenBucket(rate=25)
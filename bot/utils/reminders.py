@@ -0,0 +1,109 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+
+from bot.datetime_utils import get_utc_now
+from bot.loggers import get_logger
+from bot.services.user_words_learning import UserWordsLearningService
+
+from .message_to_users import send_reminder_to_user
+from .rate_limit import TokenBucket, telegram_send_limiter
+
+logger = get_logger(__name__)
+
+
+class ReminderDispatcher:
+    """
+    Sends daily reminders from a single once-a-minute job.
+
+    Each tick asks the database, in one grouped query, which users have a
+    reminder at the current minute in their time zone and how many words they
+    have due, and puts those with due words on a queue. A few workers drain
+    the queue through a token bucket, so a busy minute never blocks the next
+    tick nor exceeds Telegram's sending limits.
+
+    Parameters:
+    - send (callable, optional): Coroutine sending a reminder to one user,
+      called with the user's ID and due word count.
+    - limiter (TokenBucket, optional): Rate limit shared with other bulk senders.
+    - workers (int, optional): Number of concurrent senders.
+    """
+
+    # Minutes a late tick may catch up on, e.g. after the event loop stalled.
+    MAX_CATCH_UP = timedelta(minutes=5)
+
+    def __init__(
+        self,
+        send: Callable[[int, int], Awaitable[None]] = send_reminder_to_user,
+        limiter: TokenBucket = telegram_send_limiter,
+        workers: int = 4,
+    ) -> None:
+        self._send = send
+        self._limiter = limiter
+        self._workers_count = workers
+        self._queue: asyncio.Queue[tuple[int, int]] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._last_minute: datetime | None = None
+
+    def start(self) -> None:
+        """Start the sending workers."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"reminder-worker-{i}")
+            for i in range(self._workers_count)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the sending workers; reminders still queued are dropped."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def tick(
+        self,
+        now: datetime | None = None,
+        user_words_learning_service: UserWordsLearningService | None = None,
+    ) -> int:
+        """
+        Queue reminders for every minute since the previous tick.
+
+        Returns:
+        - int: Number of reminders queued.
+        """
+        service = user_words_learning_service or UserWordsLearningService()
+        queued = 0
+        for minute in self._minutes_to_dispatch(now or get_utc_now()):
+            due_counts = await service.get_due_counts_to_remind(minute)
+            for user_id, count in due_counts.items():
+                self._queue.put_nowait((user_id, count))
+                queued += 1
+        if queued:
+            logger.info(f"Queued {queued} reminders")
+        return queued
+
+    def _minutes_to_dispatch(self, now: datetime) -> list[datetime]:
+        minute = now.replace(second=0, microsecond=0)
+        last = self._last_minute
+        if last is not None and minute <= last:
+            return []
+        self._last_minute = minute
+        if last is None or minute - last > self.MAX_CATCH_UP:
+            return [minute]
+        steps = (minute - last) // timedelta(minutes=1)
+        return [last + timedelta(minutes=i) for i in range(1, steps + 1)]
+
+    async def _worker(self) -> None:
+        while True:
+            user_id, count = await self._queue.get()
+            try:
+                await self._limiter.acquire()
+                await self._send(user_id, count)
+            except Exception:
+                logger.exception(f"Failed to send reminder to user {user_id}")
+            finally:
+                self._queue.task_done()
+
+
+reminder_dispatcher = ReminderDispatcher()
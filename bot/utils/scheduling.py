@@ -1,55 +1,93 @@
 from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 
 from apscheduler.jobstores.memory import MemoryJobStore
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
 
-from bot.services.user import UserService
-from bot.utils import send_message_to_all_users, send_reminder_to_user
+from bot.loggers import get_logger
+from bot.utils import send_message_to_all_users
+
+from .broadcast import resume_broadcasts
+from .job_store import PostgresJobStore
+from .leader_election import LeaderElection
+from .reminders import reminder_dispatcher
+
+logger = get_logger(__name__)
+
+broadcast_job_store = PostgresJobStore()
 
 jobstores = {
     "reminders": MemoryJobStore(),
-    "broadcasts": SQLAlchemyJobStore(url="sqlite:///jobs.sqlite"),
+    "broadcasts": broadcast_job_store,
 }
 
 scheduler = AsyncIOScheduler(jobstores=jobstores)
 
+BROADCAST_SYNC_JOB_ID = "broadcasts:sync"
+
+
+async def _lead_scheduler() -> None:
+    # Run the broadcasts scheduled by any replica rather than those this one
+    # remembers, and pick up new ones every minute.
+    try:
+        await broadcast_job_store.load()
+    except Exception:
+        logger.exception("Failed to load scheduled broadcasts")
+    scheduler.add_job(
+        func=broadcast_job_store.load,
+        trigger="interval",
+        minutes=1,
+        jobstore="reminders",
+        id=BROADCAST_SYNC_JOB_ID,
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+        name="Broadcast job sync",
+    )
+    scheduler.resume()
+    await resume_broadcasts()
+
+
+async def _follow_scheduler() -> None:
+    scheduler.pause()
+
+
+# Every replica keeps the scheduler started but paused, so jobs can be added
+# and removed anywhere, and only the elected leader runs them.
+scheduler_leadership = LeaderElection(
+    "scheduler", on_elected=_lead_scheduler, on_demoted=_follow_scheduler
+)
+
+
+REMINDER_DISPATCH_JOB_ID = "reminders:dispatch"
+
 
 async def schedule_reminders():
     """
-    Schedule daily reminders for all users based on their preferred time and time zone.
+    Schedule the once-a-minute reminder dispatcher job.
 
     This function:
-    - Fetches all users from the database.
-    - Removes any existing reminder jobs.
-    - Schedules new reminder jobs for each user with a specified reminder time and time zone.
+    - Adds (or replaces) a single cron job that runs every minute.
+    - The job queues reminders for users whose reminder time is now in their
+      time zone; see ReminderDispatcher.
 
     Notes:
-    - Each user's reminder time and time zone are used to schedule the job.
-    - The job sends a reminder message to the user at the specified time.
+    - Reminder settings are read from the database on each tick, so changing
+      them needs no rescheduling and startup does no per-user work.
     """
-    user_service: UserService = UserService()
-
-    users = await user_service.get_all_users()
-    scheduler.remove_all_jobs(jobstore="reminders")
-    for user in users:
-        username = user.get("tg_login")
-        reminder_time = user.get("reminder_time")
-        user_tz_offset = user.get("time_zone")
-        user_id = user.get("user_id")
-        if reminder_time and user_tz_offset:
-            user_tz = timezone(timedelta(hours=int(user_tz_offset)))
-            scheduler.add_job(
-                func=send_reminder_to_user,
-                trigger="cron",
-                hour=reminder_time.hour,
-                minute=reminder_time.minute,
-                timezone=user_tz,
-                kwargs={"user_id": user_id},
-                jobstore="reminders",
-                name=f"Reminder for @{username} ({user_id})",
-            )
+    scheduler.add_job(
+        func=reminder_dispatcher.tick,
+        trigger="cron",
+        minute="*",
+        jobstore="reminders",
+        id=REMINDER_DISPATCH_JOB_ID,
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=30,
+        name="Reminder dispatcher",
+    )
 
 
 async def schedule_broadcast(date_time: datetime, text: str):
@@ -63,6 +101,8 @@ async def schedule_broadcast(date_time: datetime, text: str):
     This function:
     - Creates a timezone-aware datetime object for the specified time.
     - Schedules a job to send the broadcast message at the specified date and time.
+    - Fixes the broadcast ID up front, so a run interrupted by a restart
+      resumes from its checkpoint instead of starting over.
     """
     tz = timezone(timedelta(hours=3))
     date_time = date_time.replace(tzinfo=tz)
@@ -70,8 +110,10 @@ async def schedule_broadcast(date_time: datetime, text: str):
     scheduler.add_job(
         func=send_message_to_all_users,
         trigger=trigger,
-        kwargs={"text": text},
+        kwargs={"text": text, "broadcast_id": uuid4().hex},
         jobstore="broadcasts",
+        # the store checks a due job against the table before it runs
+        misfire_grace_time=10 * 60,
         name=f'Broadcast {date_time.strftime("%H:%M (UTC+3) %d.%m.%Y")}',
     )
 
@@ -0,0 +1,20 @@
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+import signal
+
+_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+@contextmanager
+def stop_on_signals() -> Iterator[asyncio.Event]:
+    """Event set when the process receives SIGINT or SIGTERM."""
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in _SIGNALS:
+        loop.add_signal_handler(signum, stopped.set)
+    try:
+        yield stopped
+    finally:
+        for signum in _SIGNALS:
+            loop.remove_signal_handler(signum)
@@ -1,28 +1,50 @@
 from enum import Enum
+from typing import Any
 
 from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StateType
 
+from bot.cache.fsm_storage import KEEP_STATE, HashRedisStorage
 
-async def update_state_data(state: FSMContext, **kwargs):
+
+async def update_state_data(
+    state: FSMContext, *, new_state: StateType = KEEP_STATE, **kwargs
+):
     """
     Update state data with the provided key-value pairs.
 
     Parameters:
     - state (FSMContext): The current FSMContext object.
+    - new_state (State, optional): State to switch to along with the update.
     - kwargs: Key-value pairs to add or update in the state data.
 
     This function:
-    - Retrieves the current state data.
     - Converts Enum values to their names.
-    - Updates the state data with the provided key-value pairs.
-    - Sets the updated data back to the state.
+    - Writes only the given keys, so concurrent updates of other keys are kept.
+    - With a HashRedisStorage, writes them and the new state in one round
+      trip without reading the current data.
     """
-    data = await state.get_data()
-
     for key, value in kwargs.items():
         if isinstance(value, Enum):
             kwargs[key] = value.name
 
-    data.update(kwargs)
+    if isinstance(state.storage, HashRedisStorage):
+        await state.storage.merge_data(state.key, kwargs, new_state)
+        return
+
+    await state.update_data(**kwargs)
+    if new_state is not KEEP_STATE:
+        await state.set_state(new_state)
+
 
-    await state.set_data(data)
+async def get_state_values(state: FSMContext, *keys: str) -> list[Any]:
+    """
+    Values of ``keys`` in the state data, None for missing ones.
+
+    With a HashRedisStorage only these keys are read, in one HMGET.
+    """
+    if isinstance(state.storage, HashRedisStorage):
+        return await state.storage.get_values(state.key, *keys)
+
+    data = await state.get_data()
+    return [data.get(key) for key in keys]
@@ -0,0 +1,175 @@
+import asyncio
+from functools import partial
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from pydantic import ValidationError
+
+from bot.cache.update_stream import StreamEntry, UpdateStream, update_user_id
+from bot.loggers import get_logger
+
+from .leader_election import LeaderElection
+
+logger = get_logger(__name__)
+
+
+async def poll_into_stream(
+    bot: Bot, stream: UpdateStream, allowed_updates: list[str], timeout: int = 30
+) -> None:
+    """
+    Long-poll Telegram and append every update to the stream, until cancelled.
+
+    The offset only moves past an update once it is in the stream, so updates
+    that could not be stored are fetched again on the next poll.
+    """
+    offset = None
+    while True:
+        try:
+            updates = await bot.get_updates(
+                offset=offset,
+                timeout=timeout,
+                allowed_updates=allowed_updates,
+                request_timeout=timeout + 10,
+            )
+            for update in updates:
+                await stream.offer(update)
+                offset = update.update_id + 1
+        except Exception:
+            logger.exception("Failed to move updates into the stream")
+            await asyncio.sleep(1)
+
+
+class StreamWorker:
+    """
+    Handles the updates of the stream partitions this process owns.
+
+    A partition is owned by the holder of its lease, elected like the
+    scheduler leader, so workers configured with overlapping partitions never
+    read one partition at once, and the partitions of a worker that died are
+    taken over once their leases expire. A worker that loses a lease stops
+    reading the partition after the batch it is handling.
+
+    Each owned partition is read in batches by its own task. Within a batch the
+    updates of different users are handled concurrently and those of one user
+    one after another, and every update is acknowledged once handled. On
+    start the updates a previous owner read but never acknowledged are
+    handled first; an update delivered more than MAX_DELIVERIES times is
+    dropped, so one that crashes the process cannot block its partition.
+
+    Parameters:
+    - stream (UpdateStream): Stream to read.
+    - dispatcher (Dispatcher): Dispatcher handling the updates.
+    - bot (Bot): Bot the updates were sent to.
+    - partitions (list[int]): Partitions this process competes for.
+    - batch (int, optional): Updates read from a partition at once.
+    - block_ms (int, optional): How long a read waits for new updates, which
+      is also how long stopping may take.
+    """
+
+    MAX_DELIVERIES = 3
+
+    def __init__(
+        self,
+        stream: UpdateStream,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        partitions: list[int],
+        batch: int = 100,
+        block_ms: int = 5000,
+    ) -> None:
+        self._stream = stream
+        self._dispatcher = dispatcher
+        self._bot = bot
+        self._partitions = partitions
+        self._batch = batch
+        self._block_ms = block_ms
+        self._owned: dict[int, tuple[asyncio.Task, asyncio.Event]] = {}
+
+    async def run(self, stopped: asyncio.Event) -> None:
+        """Consume the partitions leased to this process until ``stopped`` is set."""
+        logger.info(f"Competing for update partitions {self._partitions}")
+        elections = [
+            LeaderElection(
+                f"partition:{partition}",
+                on_elected=partial(self._take_partition, partition),
+                on_demoted=partial(self._release_partition, partition),
+            )
+            for partition in self._partitions
+        ]
+        for election in elections:
+            election.start()
+        try:
+            await stopped.wait()
+        finally:
+            # leases are released once the current batches are handled
+            await asyncio.gather(*(election.stop() for election in elections))
+
+    async def _take_partition(self, partition: int) -> None:
+        released = asyncio.Event()
+        task = asyncio.create_task(
+            self._own(partition, released), name=f"partition-{partition}"
+        )
+        self._owned[partition] = (task, released)
+
+    async def _release_partition(self, partition: int) -> None:
+        task, released = self._owned.pop(partition)
+        released.set()
+        await task
+
+    async def _own(self, partition: int, released: asyncio.Event) -> None:
+        try:
+            await self._consume(partition, released)
+        except Exception:
+            logger.exception(f"Stopped consuming update partition {partition}")
+
+    async def _consume(self, partition: int, stopped: asyncio.Event) -> None:
+        await self._stream.ensure_group(partition)
+        while entries := await self._stream.read_pending(partition, self._batch):
+            logger.warning(
+                f"Handling {len(entries)} unacknowledged updates of partition "
+                f"{partition}"
+            )
+            await self.handle_batch(partition, entries)
+        while not stopped.is_set():
+            try:
+                entries = await self._stream.read(
+                    partition, self._batch, self._block_ms
+                )
+            except Exception:
+                logger.exception(f"Failed to read update partition {partition}")
+                await asyncio.sleep(1)
+                continue
+            await self.handle_batch(partition, entries)
+
+    async def handle_batch(self, partition: int, entries: list[StreamEntry]) -> None:
+        by_user: dict[int, list[tuple[StreamEntry, Update]]] = {}
+        for entry in entries:
+            if entry.deliveries > self.MAX_DELIVERIES:
+                logger.error(
+                    f"Dropping update {entry.entry_id!r} of partition {partition} "
+                    f"after {entry.deliveries - 1} deliveries"
+                )
+                await self._stream.ack(partition, entry.entry_id)
+                continue
+            try:
+                update = Update.model_validate_json(
+                    entry.payload, context={"bot": self._bot}
+                )
+            except ValidationError:
+                logger.exception(f"Dropping malformed update {entry.entry_id!r}")
+                await self._stream.ack(partition, entry.entry_id)
+                continue
+            by_user.setdefault(update_user_id(update), []).append((entry, update))
+        await asyncio.gather(
+            *(self._handle_user(partition, items) for items in by_user.values())
+        )
+
+    async def _handle_user(
+        self, partition: int, items: list[tuple[StreamEntry, Update]]
+    ) -> None:
+        for entry, update in items:
+            try:
+                await self._dispatcher.feed_update(self._bot, update)
+            except Exception:
+                logger.exception(f"Failed to handle update {update.update_id}")
+            await self._stream.ack(partition, entry.entry_id)
@@ -0,0 +1,143 @@
+import asyncio
+from hmac import compare_digest
+from typing import Protocol
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+
+from bot.loggers import get_logger
+
+from .shutdown import stop_on_signals
+
+logger = get_logger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdateSink(Protocol):
+    """Where the webhook puts accepted updates."""
+
+    async def offer(self, update: Update) -> bool:
+        """Take an update; False to make Telegram deliver it again later."""
+
+
+class UpdateQueue:
+    """
+    Bounded queue between the webhook endpoint and the dispatcher.
+
+    The endpoint only validates and enqueues an update, so Telegram gets its
+    answer right away, and a fixed number of workers feed the queued updates
+    to the dispatcher. Once ``max_in_flight`` updates are waiting the endpoint
+    refuses new ones and Telegram delivers them again later, so a burst never
+    grows memory or the number of concurrent handlers without bound.
+
+    Parameters:
+    - dispatcher (Dispatcher): Dispatcher handling the updates.
+    - bot (Bot): Bot the updates were sent to.
+    - max_in_flight (int, optional): Updates that may wait for a worker.
+    - workers (int, optional): Number of updates handled concurrently.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        max_in_flight: int = 100,
+        workers: int = 20,
+    ) -> None:
+        self._dispatcher = dispatcher
+        self._bot = bot
+        self._workers_count = workers
+        self._queue: asyncio.Queue[Update] = asyncio.Queue(maxsize=max_in_flight)
+        self._workers: list[asyncio.Task] = []
+
+    async def offer(self, update: Update) -> bool:
+        """Queue an update; False when the queue is full."""
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def start(self) -> None:
+        """Start the handling workers."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"webhook-worker-{i}")
+            for i in range(self._workers_count)
+        ]
+
+    async def stop(self) -> None:
+        """Handle the updates already accepted, then cancel the workers."""
+        if self._workers:
+            await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while True:
+            update = await self._queue.get()
+            try:
+                await self._dispatcher.feed_update(self._bot, update)
+            except Exception:
+                logger.exception(f"Failed to handle update {update.update_id}")
+            finally:
+                self._queue.task_done()
+
+
+def build_webhook_app(
+    bot: Bot, sink: UpdateSink, path: str, secret: str
+) -> web.Application:
+    """
+    aiohttp application accepting Telegram updates on ``path``.
+
+    Requests without the secret token set on the webhook are rejected with
+    401, and updates the sink refuses with 503.
+    """
+
+    async def handle_update(request: web.Request) -> web.Response:
+        if not compare_digest(request.headers.get(SECRET_HEADER, ""), secret):
+            return web.Response(status=401)
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": bot})
+        except ValueError:  # malformed JSON or not an update
+            return web.Response(status=400)
+        if not await sink.offer(update):
+            logger.warning(f"Update sink is full, refused update {update.update_id}")
+            return web.Response(status=503)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(path, handle_update)
+    return app
+
+
+async def run_webhook(
+    bot: Bot,
+    sink: UpdateSink,
+    *,
+    host: str,
+    port: int,
+    path: str,
+    secret: str,
+) -> None:
+    """
+    Serve the webhook until the process receives SIGINT or SIGTERM.
+
+    The port is bound with SO_REUSEPORT, so several processes on one host can
+    serve the same port and the kernel spreads connections between them.
+    """
+    runner = web.AppRunner(build_webhook_app(bot, sink, path, secret))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port, reuse_port=True)
+    await site.start()
+    logger.info(f"Serving webhook on {host}:{port}{path}")
+    try:
+        with stop_on_signals() as stopped:
+            await stopped.wait()
+    finally:
+        await runner.cleanup()
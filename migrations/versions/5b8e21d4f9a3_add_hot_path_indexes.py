@@ -0,0 +1,67 @@
+"""add hot path indexes
+
+Revision ID: 5b8e21d4f9a3
+Revises: c41f0a9b2d7e
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8e21d4f9a3"
+down_revision: str | None = "c41f0a9b2d7e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_testing_exercises_subsection",
+        "testing_exercises",
+        ["subsection"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_new_words_subsection",
+        "new_words",
+        ["subsection"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_user_words_learning_due",
+        "user_words_learning",
+        ["user_id", "next_review_date"],
+        unique=False,
+        postgresql_include=["section", "subsection", "exercise_id"],
+    )
+    op.create_index(
+        "ix_user_progress_activity",
+        "user_progress",
+        ["user_id", "exercise_type", "date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_users_points",
+        "users",
+        [sa.text("points DESC"), "user_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_users_tg_login_lower",
+        "users",
+        [sa.text("lower(tg_login) text_pattern_ops")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_tg_login_lower", table_name="users")
+    op.drop_index("ix_users_points", table_name="users")
+    op.drop_index("ix_user_progress_activity", table_name="user_progress")
+    op.drop_index("ix_user_words_learning_due", table_name="user_words_learning")
+    op.drop_index("ix_new_words_subsection", table_name="new_words")
+    op.drop_index("ix_testing_exercises_subsection", table_name="testing_exercises")
@@ -0,0 +1,30 @@
+"""add users reminder slot index
+
+Revision ID: c41f0a9b2d7e
+Revises: a7ecfad8ed31
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f0a9b2d7e"
+down_revision: str | None = "a7ecfad8ed31"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_users_reminder_slot",
+        "users",
+        ["reminder_time", "time_zone"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_reminder_slot", table_name="users")
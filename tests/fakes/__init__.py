@@ -1,16 +1,20 @@
 """In-memory fakes for tests."""
 
 from .db import (
+    AsyncTransactionContext,
     FakeAsyncSession,
     FakeExecuteResult,
     FakeSessionMaker,
     row,
     statement_sql,
 )
+from .redis import FakeRedis
 
 __all__ = [
+    "AsyncTransactionContext",
     "FakeAsyncSession",
     "FakeExecuteResult",
+    "FakeRedis",
     "FakeSessionMaker",
     "row",
     "statement_sql",
@@ -48,6 +48,13 @@ class FakeExecuteResult:
     def one(self):
         return self._one_value
 
+    def one_or_none(self):
+        return self._one_value
+
+    async def __aiter__(self):
+        for value in self._fetchall_values:
+            yield value
+
 
 class AsyncTransactionContext:
     async def __aenter__(self):
@@ -64,7 +71,13 @@ class FakeAsyncSession:
         self.add = MagicMock()
         self.add_all = MagicMock()
         self.begin = MagicMock(return_value=AsyncTransactionContext())
+        self.begin_nested = MagicMock(return_value=AsyncTransactionContext())
         self.execute = AsyncMock(side_effect=self._execute)
+        self.stream = AsyncMock(side_effect=self._execute)
+        self.commit = AsyncMock()
+        self.rollback = AsyncMock()
+        self.close = AsyncMock()
+        self.in_transaction = MagicMock(side_effect=lambda: self.executed_statements)
 
     async def __aenter__(self):
         return self
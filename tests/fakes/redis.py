@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import asyncio
+
+from redis.exceptions import ResponseError
+
+from bot.cache.leader_lock import RELEASE_SCRIPT, RENEW_SCRIPT
+from bot.cache.leaderboard import PUBLISH_SCRIPT
+from bot.cache.testing_progress import FILL_SCRIPT
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakePipeline:
+    """Buffers commands and replays them against the owning FakeRedis."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        def buffer(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+
+        return buffer
+
+    async def execute(self):
+        commands, self._commands = self._commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class FakeRedis:
+    """Small in-memory subset of redis.asyncio.Redis; values come back as bytes."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, object] = {}
+        self.ttls: dict[str, int] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    # keys
+
+    async def exists(self, *keys) -> int:
+        return sum(key in self.data for key in keys)
+
+    async def delete(self, *keys) -> int:
+        deleted = 0
+        for key in keys:
+            if self.data.pop(key, None) is not None:
+                deleted += 1
+            self.ttls.pop(key, None)
+        return deleted
+
+    async def expire(self, key, seconds) -> bool:
+        if key not in self.data:
+            return False
+        self.ttls[key] = int(seconds)
+        return True
+
+    def _drop_if_empty(self, key) -> None:
+        if not self.data.get(key):
+            self.data.pop(key, None)
+            self.ttls.pop(key, None)
+
+    # lists
+
+    async def rpush(self, key, *values) -> int:
+        items = self.data.setdefault(key, [])
+        items.extend(_encode(v) for v in values)
+        return len(items)
+
+    async def lindex(self, key, index):
+        items = self.data.get(key, [])
+        try:
+            return items[index]
+        except IndexError:
+            return None
+
+    async def llen(self, key) -> int:
+        return len(self.data.get(key, []))
+
+    async def lrem(self, key, count, value) -> int:
+        items = self.data.get(key, [])
+        value = _encode(value)
+        removed = 0
+        while value in items and (count == 0 or removed < count):
+            items.remove(value)
+            removed += 1
+        self._drop_if_empty(key)
+        return removed
+
+    # hashes
+
+    async def hset(self, key, field=None, value=None, mapping=None) -> int:
+        items = self.data.setdefault(key, {})
+        pairs = dict(mapping or {})
+        if field is not None:
+            pairs[field] = value
+        added = sum(_encode(f) not in items for f in pairs)
+        items.update({_encode(f): _encode(v) for f, v in pairs.items()})
+        return added
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(_encode(field))
+
+    async def hmget(self, key, keys, *args) -> list:
+        items = self.data.get(key, {})
+        return [items.get(_encode(f)) for f in [*keys, *args]]
+
+    async def hsetnx(self, key, field, value) -> int:
+        items = self.data.setdefault(key, {})
+        if _encode(field) in items:
+            return 0
+        items[_encode(field)] = _encode(value)
+        return 1
+
+    async def hgetall(self, key) -> dict:
+        return dict(self.data.get(key, {}))
+
+    async def hdel(self, key, *fields) -> int:
+        items = self.data.get(key, {})
+        removed = sum(items.pop(_encode(f), None) is not None for f in fields)
+        self._drop_if_empty(key)
+        return removed
+
+    # sets
+
+    async def sadd(self, key, *members) -> int:
+        items = self.data.setdefault(key, set())
+        added = {_encode(m) for m in members} - items
+        items.update(added)
+        return len(added)
+
+    async def srem(self, key, *members) -> int:
+        items = self.data.get(key, set())
+        removed = {_encode(m) for m in members} & items
+        items.difference_update(removed)
+        self._drop_if_empty(key)
+        return len(removed)
+
+    async def smembers(self, key) -> set:
+        return set(self.data.get(key, set()))
+
+    # strings
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = _encode(value)
+        self.ttls.pop(key, None)
+        if ex is not None:
+            self.ttls[key] = int(ex)
+        if px is not None:
+            self.ttls[key] = int(px) / 1000
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def incr(self, key) -> int:
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = _encode(value)
+        return value
+
+    async def setbit(self, key, offset, value) -> int:
+        bitmap = bytearray(self.data.get(key, b""))
+        if len(bitmap) <= offset // 8:
+            bitmap.extend(bytes(offset // 8 + 1 - len(bitmap)))
+        mask = 0x80 >> (offset % 8)
+        previous = int(bool(bitmap[offset // 8] & mask))
+        if value:
+            bitmap[offset // 8] |= mask
+        else:
+            bitmap[offset // 8] &= ~mask
+        self.data[key] = bytes(bitmap)
+        return previous
+
+    async def rename(self, src, dst) -> bool:
+        if src not in self.data:
+            raise KeyError(src)
+        self.data[dst] = self.data.pop(src)
+        self.ttls.pop(dst, None)
+        return True
+
+    # scripts: the Lua scripts of the app, reimplemented
+
+    async def _renew_lease(self, keys, args) -> int:
+        (key,), (owner, lease_ms) = keys, args
+        if self.data.get(key) != _encode(owner):
+            return 0
+        self.ttls[key] = int(lease_ms) / 1000
+        return 1
+
+    async def _release_lease(self, keys, args) -> int:
+        (key,), (owner,) = keys, args
+        if self.data.get(key) != _encode(owner):
+            return 0
+        return await self.delete(key)
+
+    async def _fill_bitmaps(self, keys, args) -> int:
+        (version_key, *bitmap_keys), (version, ttl, *bitmaps) = keys, args
+        if self.data.get(version_key, b"0") != _encode(version):
+            return 0
+        for key, bitmap in zip(bitmap_keys, bitmaps):
+            await self.set(key, bitmap, ex=ttl)
+        return 1
+
+    async def _publish_leaderboard(self, keys, args) -> int:
+        (version_key, building_key, key, built_key), (version, ttl) = keys, args
+        if self.data.get(version_key, b"0") != _encode(version):
+            await self.delete(building_key)
+            return 0
+        if building_key in self.data:
+            await self.rename(building_key, key)
+        else:
+            await self.delete(key)
+        await self.set(built_key, 1, ex=ttl)
+        return 1
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        scripts = {
+            RENEW_SCRIPT: self._renew_lease,
+            RELEASE_SCRIPT: self._release_lease,
+            FILL_SCRIPT: self._fill_bitmaps,
+            PUBLISH_SCRIPT: self._publish_leaderboard,
+        }
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        return await scripts[script](keys, args)
+
+    # streams
+
+    @staticmethod
+    def _seq(entry_id) -> int:
+        return int(_encode(entry_id).split(b"-")[0])
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True) -> bytes:
+        stream = self.data.setdefault(name, {"entries": [], "groups": {}, "seq": 0})
+        stream["seq"] += 1
+        entry_id = f"{stream['seq']}-0".encode()
+        stream["entries"].append(
+            (entry_id, {_encode(k): _encode(v) for k, v in fields.items()})
+        )
+        if maxlen is not None:
+            del stream["entries"][:-maxlen]
+        return entry_id
+
+    async def xgroup_create(self, name, groupname, id="$", mkstream=False) -> bool:
+        if name not in self.data:
+            if not mkstream:
+                raise ResponseError("ERR The XGROUP subcommand requires the key")
+            self.data[name] = {"entries": [], "groups": {}, "seq": 0}
+        stream = self.data[name]
+        if groupname in stream["groups"]:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        last = 0 if id == "0" else stream["seq"]
+        stream["groups"][groupname] = {"last": last, "pending": {}}
+        return True
+
+    async def xreadgroup(
+        self, groupname, consumername, streams, count=None, block=None, noack=False
+    ):
+        response = []
+        for name, last_id in streams.items():
+            stream = self.data.get(name)
+            if stream is None:
+                continue
+            group = stream["groups"][groupname]
+            assert last_id == ">", "only new entries are supported"
+            entries = [
+                (entry_id, fields)
+                for entry_id, fields in stream["entries"]
+                if self._seq(entry_id) > group["last"]
+            ][:count]
+            for entry_id, _ in entries:
+                group["pending"][entry_id] = [consumername, 1]
+            if entries:
+                group["last"] = self._seq(entries[-1][0])
+                response.append([_encode(name), entries])
+        if not response and block is not None:
+            # a blocking read lets other tasks run, as real Redis would
+            await asyncio.sleep(0)
+        return response
+
+    async def xpending_range(
+        self, name, groupname, min, max, count, consumername=None, idle=None
+    ) -> list[dict]:
+        pending = self.data[name]["groups"][groupname]["pending"]
+        return [
+            {
+                "message_id": entry_id,
+                "consumer": _encode(consumer),
+                "time_since_delivered": 0,
+                "times_delivered": deliveries,
+            }
+            for entry_id, (consumer, deliveries) in sorted(
+                pending.items(), key=lambda item: self._seq(item[0])
+            )
+            if consumername is None or consumer == consumername
+        ][:count]
+
+    async def xclaim(
+        self, name, groupname, consumername, min_idle_time, message_ids
+    ) -> list:
+        stream = self.data[name]
+        pending = stream["groups"][groupname]["pending"]
+        entries = dict(stream["entries"])
+        claimed = []
+        for entry_id in message_ids:
+            if entry_id not in pending:
+                continue
+            if entry_id not in entries:  # trimmed: Redis 7 drops it from the PEL
+                del pending[entry_id]
+                continue
+            pending[entry_id] = [consumername, pending[entry_id][1] + 1]
+            claimed.append((entry_id, entries[entry_id]))
+        return claimed
+
+    async def xack(self, name, groupname, *ids) -> int:
+        pending = self.data[name]["groups"][groupname]["pending"]
+        return sum(pending.pop(_encode(i), None) is not None for i in ids)
+
+    # sorted sets
+
+    def _ordered(self, key) -> list[tuple[bytes, float]]:
+        scores = self.data.get(key, {})
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    async def zadd(self, key, mapping) -> int:
+        scores = self.data.setdefault(key, {})
+        added = sum(_encode(m) not in scores for m in mapping)
+        scores.update({_encode(m): float(s) for m, s in mapping.items()})
+        return added
+
+    async def zrem(self, key, *members) -> int:
+        scores = self.data.get(key, {})
+        removed = sum(scores.pop(_encode(m), None) is not None for m in members)
+        self._drop_if_empty(key)
+        return removed
+
+    async def zscore(self, key, member):
+        return self.data.get(key, {}).get(_encode(member))
+
+    async def zcard(self, key) -> int:
+        return len(self.data.get(key, {}))
+
+    async def zcount(self, key, min, max) -> int:
+        def bound(value, exclusive_op, inclusive_op):
+            value = str(value)
+            if value in ("-inf", "+inf"):
+                return lambda score: True
+            if value.startswith("("):
+                return lambda score: exclusive_op(score, float(value[1:]))
+            return lambda score: inclusive_op(score, float(value))
+
+        above = bound(min, float.__gt__, float.__ge__)
+        below = bound(max, float.__lt__, float.__le__)
+        scores = self.data.get(key, {}).values()
+        return sum(above(s) and below(s) for s in scores)
+
+    async def zrevrank(self, key, member):
+        members = [m for m, _ in self._ordered(key)]
+        try:
+            return members.index(_encode(member))
+        except ValueError:
+            return None
+
+    async def zrevrange(self, key, start, end, withscores=False):
+        items = self._ordered(key)
+        items = items[start:] if end == -1 else items[start : end + 1]
+        return items if withscores else [m for m, _ in items]
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+from collections.abc import AsyncGenerator
+from datetime import datetime, timezone
+import itertools
+import json
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import CallbackQuery, Chat, Message, MessageEntity, Update, User
+
 
 class FakeState:
     def __init__(self, data: dict | None = None) -> None:
         self._data = dict(data or {})
+        self.storage = None
         self.clear = AsyncMock(side_effect=self._clear)
         self.get_data = AsyncMock(side_effect=self._get_data)
+        self.get_value = AsyncMock(side_effect=self._get_value)
         self.set_data = AsyncMock(side_effect=self._set_data)
         self.set_state = AsyncMock()
         self.update_data = AsyncMock(side_effect=self._update_data)
@@ -19,6 +29,9 @@ class FakeState:
     async def _get_data(self):
         return dict(self._data)
 
+    async def _get_value(self, key: str, default=None):
+        return self._data.get(key, default)
+
     async def _set_data(self, data: dict):
         self._data = dict(data)
 
@@ -36,6 +49,7 @@ class FakeMessage:
         username: str | None = "test_user",
     ) -> None:
         self.text = text
+        self.document = None
         self.from_user = SimpleNamespace(
             id=user_id,
             full_name=full_name,
@@ -68,3 +82,108 @@ class FakeCallback:
             edit_text=AsyncMock(),
             delete=AsyncMock(),
         )
+
+
+def _telegram_user(user_id: int, full_name: str, username: str | None) -> User:
+    first_name, _, last_name = full_name.partition(" ")
+    return User(
+        id=user_id,
+        is_bot=False,
+        first_name=first_name,
+        last_name=last_name or None,
+        username=username,
+    )
+
+
+def message_update(
+    update_id: int,
+    *,
+    text: str,
+    user_id: int = 123,
+    full_name: str = "Test User",
+    username: str | None = "test_user",
+) -> Update:
+    """A real private-chat message update, as Telegram would deliver it."""
+    entities = None
+    if text.startswith("/"):
+        command = text.split()[0]
+        entities = [MessageEntity(type="bot_command", offset=0, length=len(command))]
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.now(timezone.utc),
+            chat=Chat(id=user_id, type="private"),
+            from_user=_telegram_user(user_id, full_name, username),
+            text=text,
+            entities=entities,
+        ),
+    )
+
+
+def callback_update(
+    update_id: int,
+    *,
+    data: str,
+    user_id: int = 123,
+    full_name: str = "Test User",
+    username: str | None = "test_user",
+) -> Update:
+    """A button press on a message the bot sent earlier."""
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(
+            id=str(update_id),
+            from_user=_telegram_user(user_id, full_name, username),
+            chat_instance=str(user_id),
+            data=data,
+            message=Message(
+                message_id=update_id,
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=user_id, type="private"),
+                text="...",
+            ),
+        ),
+    )
+
+
+class RecordingSession(BaseSession):
+    """
+    Bot session that records API calls instead of sending them.
+
+    Methods returning a message get a sent message back, everything else
+    gets ``True``, so handlers run as if Telegram accepted every call.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[TelegramMethod] = []
+        self._message_ids = itertools.count(1)
+
+    def _result(self, method: TelegramMethod):
+        if method.__returning__ is not Message:
+            return True
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(datetime.now(timezone.utc).timestamp()),
+            "chat": {"id": getattr(method, "chat_id", 0), "type": "private"},
+            "text": getattr(method, "text", None),
+        }
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls.append(method)
+        content = json.dumps({"ok": True, "result": self._result(method)})
+        return self.check_response(bot, method, 200, content).result
+
+    async def stream_content(
+        self,
+        url,
+        headers=None,
+        timeout=30,
+        chunk_size=65536,
+        raise_for_status=True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self) -> None:
+        pass
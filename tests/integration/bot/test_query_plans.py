@@ -0,0 +1,208 @@
+"""EXPLAIN checks that hot repository queries are served by indexes.
+
+Runs against the PostgreSQL from the regular ``POSTGRES_*`` settings and is
+skipped when it is not reachable. Tables are created in a throwaway schema and
+sequential scans are disabled for the session, so a plan that still scans a
+table sequentially means no index matches the query shape.
+"""
+
+from datetime import date, datetime, time
+import json
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from bot.config_data.settings import settings
+from bot.db.models import Base
+from bot.db.repositories.new_words import NewWordsRepository
+from bot.db.repositories.testing import TestingRepository as _TestingRepository
+from bot.db.repositories.user import UserRepository
+from bot.db.repositories.user_progress import UserProgressRepository
+from bot.db.repositories.user_words_learning import UserWordsLearningRepository
+from tests.factories import (
+    build_new_word,
+    build_testing_exercise,
+    build_user,
+    build_user_progress,
+    build_user_word_learning,
+)
+
+pytestmark = pytest.mark.integration
+
+SCHEMA = "query_plan_checks"
+TODAY = date(2026, 5, 1)
+
+HOT_QUERIES = {
+    "due_words": (
+        UserWordsLearningRepository,
+        lambda repo: repo.due_words(1001, TODAY),
+    ),
+    "count_all_today_by_user": (
+        UserWordsLearningRepository,
+        lambda repo: repo.count_all_today_by_user(1001),
+    ),
+    "count_due_in_reminder_slots": (
+        UserWordsLearningRepository,
+        lambda repo: repo.count_due_in_reminder_slots([(time(9, 0), "UTC")], TODAY),
+    ),
+    "count_by_type_in_interval": (
+        UserProgressRepository,
+        lambda repo: repo.count_by_type_in_interval(
+            1001, "Testing", date(2026, 4, 1), TODAY
+        ),
+    ),
+    "count_users_with_points_greater": (
+        UserProgressRepository,
+        lambda repo: repo.count_users_with_points_greater(10),
+    ),
+    "list_users_ordered_by_points": (
+        UserProgressRepository,
+        lambda repo: repo.list_users_ordered_by_points(offset=0, limit=50),
+    ),
+    "testing_list_exercises": (
+        _TestingRepository,
+        lambda repo: repo.list_exercises("Subsection 1"),
+    ),
+    "testing_list_solved": (
+        _TestingRepository,
+        lambda repo: repo.list_solved(1001, "Grammar", "Subsection 1"),
+    ),
+    "new_words_list_exercises": (
+        NewWordsRepository,
+        lambda repo: repo.list_exercises("Subsection 1"),
+    ),
+    "users_search_by_login": (
+        UserRepository,
+        lambda repo: repo.list_page(20, query="user_1"),
+    ),
+}
+
+
+def _seed_rows():
+    rows = []
+    words = {}
+    for user in range(1, 51):
+        rows.append(
+            build_user(
+                id_=user,
+                user_id=1000 + user,
+                tg_login=f"user_{user}",
+                points=user,
+                registration_date=datetime(2026, 1, 1),
+                reminder_time=time(9, 0),
+                time_zone="UTC",
+            )
+        )
+    for subsection in range(1, 6):
+        for exercise_id in range(1, 21):
+            rows.append(
+                build_testing_exercise(
+                    subsection=f"Subsection {subsection}", exercise_id=exercise_id
+                )
+            )
+            words[subsection, exercise_id] = build_new_word(
+                subsection=f"Subsection {subsection}", exercise_id=exercise_id
+            )
+            rows.append(words[subsection, exercise_id])
+    for user in range(1, 51):
+        for exercise_id in range(1, 11):
+            rows.append(
+                build_user_progress(
+                    user_id=1000 + user,
+                    subsection="Subsection 1",
+                    exercise_id=exercise_id,
+                    progress_date=TODAY,
+                )
+            )
+            rows.append(
+                build_user_word_learning(
+                    user_id=1000 + user,
+                    subsection="Subsection 1",
+                    exercise_id=exercise_id,
+                    next_review_date=TODAY,
+                    add_date=TODAY,
+                    # without a word the factory builds a duplicate one
+                    new_word=words[1, exercise_id],
+                )
+            )
+    return rows
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine(
+        settings.build_postgres_dsn(),
+        connect_args={
+            "server_settings": {"search_path": SCHEMA, "enable_seqscan": "off"}
+        },
+    )
+    try:
+        async with engine.connect():
+            pass
+    except (OSError, DBAPIError) as e:
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL is not available: {e}")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as session, session.begin():
+        session.add_all(_seed_rows())
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def _explain(engine, statement: str, parameters) -> dict:
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+async def test_hot_query_does_not_scan_tables_sequentially(engine, name):
+    repository_class, call = HOT_QUERIES[name]
+    repository = repository_class(
+        session_maker=sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await call(repository)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert statements
+    for statement, parameters in statements:
+        plan = await _explain(engine, statement, parameters)
+        seq_scans = [
+            node["Relation Name"]
+            for node in _plan_nodes(plan)
+            if node["Node Type"] == "Seq Scan"
+        ]
+        assert seq_scans == [], f"{name} scans {seq_scans} sequentially"
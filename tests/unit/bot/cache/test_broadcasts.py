@@ -0,0 +1,56 @@
+from bot.cache.broadcasts import BroadcastCheckpoints
+from tests.fakes import FakeRedis
+
+
+async def test_start_registers_broadcast_with_empty_progress():
+    checkpoints = BroadcastCheckpoints(FakeRedis())
+
+    await checkpoints.start("b1", "hello")
+
+    assert await checkpoints.active_ids() == ["b1"]
+    assert await checkpoints.load("b1") == {
+        "text": "hello",
+        "last_id": 0,
+        "sent": 0,
+        "blocked": 0,
+        "failed": 0,
+    }
+
+
+async def test_start_keeps_existing_checkpoint():
+    checkpoints = BroadcastCheckpoints(FakeRedis())
+    await checkpoints.start("b1", "hello")
+    await checkpoints.save("b1", 500, sent=498, blocked=1, failed=1)
+
+    await checkpoints.start("b1", "ignored")
+
+    state = await checkpoints.load("b1")
+    assert state["text"] == "hello"
+    assert state["last_id"] == 500
+    assert state["sent"] == 498
+
+
+async def test_finish_removes_checkpoint_and_active_entry():
+    redis = FakeRedis()
+    checkpoints = BroadcastCheckpoints(redis)
+    await checkpoints.start("b1", "hello")
+
+    await checkpoints.finish("b1")
+
+    assert await checkpoints.load("b1") is None
+    assert await checkpoints.active_ids() == []
+    assert redis.data == {}
+
+
+async def test_runner_is_the_holder_of_the_broadcast_lease():
+    redis = FakeRedis()
+    checkpoints = BroadcastCheckpoints(redis)
+    lease = checkpoints.lease("b1", "worker-1")
+
+    assert await lease.acquire()
+    assert not await checkpoints.lease("b1", "worker-2").acquire()
+    assert await checkpoints.runner("b1") == "worker-1"
+    assert redis.ttls["leader:broadcast:b1"] == BroadcastCheckpoints.LEASE_SECONDS
+
+    await lease.release()
+    assert await checkpoints.runner("b1") is None
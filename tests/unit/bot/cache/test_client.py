@@ -0,0 +1,20 @@
+import pytest
+
+from bot.cache import client as redis_client
+
+
+def test_get_redis_raises_when_not_initialized(monkeypatch):
+    monkeypatch.setattr(redis_client, "_redis", None)
+
+    with pytest.raises(RuntimeError, match="Redis client not initialized"):
+        redis_client.get_redis()
+
+
+async def test_init_and_close_redis(monkeypatch):
+    monkeypatch.setattr(redis_client, "_redis", None)
+
+    redis = redis_client.init_redis("redis://localhost")
+
+    assert redis_client.get_redis() is redis
+    await redis_client.close_redis()
+    assert redis_client._redis is None
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.storage.base import StorageKey
+import pytest
+
+from bot.cache.fsm_storage import HashRedisStorage
+from bot.states import WordsLearningFSM
+from tests.fakes import FakeRedis
+
+KEY = StorageKey(bot_id=1, chat_id=123, user_id=123)
+FIELDS_KEY = "fsm:123:123:fields"
+
+
+def make_storage(**kwargs):
+    redis = FakeRedis()
+    return HashRedisStorage(redis, **kwargs), redis
+
+
+async def test_data_is_stored_one_field_per_key_as_compact_json():
+    storage, redis = make_storage()
+
+    await storage.set_data(KEY, {"word": "дом", "options": ["a", "b"], "n": None})
+
+    assert redis.data[FIELDS_KEY] == {
+        b"word": '"дом"'.encode(),
+        b"options": b'["a","b"]',
+        b"n": b"null",
+    }
+    assert await storage.get_data(KEY) == {
+        "word": "дом",
+        "options": ["a", "b"],
+        "n": None,
+    }
+
+
+async def test_set_data_replaces_data_and_empty_data_deletes_it():
+    storage, redis = make_storage()
+    await storage.set_data(KEY, {"a": 1, "b": 2})
+
+    await storage.set_data(KEY, {"b": 3})
+    assert await storage.get_data(KEY) == {"b": 3}
+
+    await storage.set_data(KEY, {})
+    assert FIELDS_KEY not in redis.data
+    assert await storage.get_data(KEY) == {}
+
+
+async def test_set_data_rejects_non_dict():
+    storage, _ = make_storage()
+
+    with pytest.raises(DataNotDictLikeError):
+        await storage.set_data(KEY, [("a", 1)])
+
+
+async def test_get_value_and_get_values_read_single_fields():
+    storage, redis = make_storage()
+    await storage.set_data(KEY, {"a": 1, "b": [2]})
+
+    with patch.object(redis, "hgetall", side_effect=AssertionError):
+        assert await storage.get_value(KEY, "b") == [2]
+        assert await storage.get_value(KEY, "missing", "default") == "default"
+        assert await storage.get_values(KEY, "b", "missing", "a") == [[2], None, 1]
+
+
+async def test_update_data_returns_merged_data():
+    storage, _ = make_storage()
+    await storage.set_data(KEY, {"a": 1, "b": 2})
+
+    assert await storage.update_data(KEY, {"b": 3, "c": 4}) == {
+        "a": 1,
+        "b": 3,
+        "c": 4,
+    }
+    assert await storage.update_data(KEY, {}) == {"a": 1, "b": 3, "c": 4}
+
+
+async def test_concurrent_merges_of_different_keys_are_both_kept():
+    storage, _ = make_storage()
+
+    await asyncio.gather(
+        storage.merge_data(KEY, {"section": "Food"}),
+        storage.merge_data(KEY, {"hard_mode_words": True}),
+    )
+
+    assert await storage.get_data(KEY) == {"section": "Food", "hard_mode_words": True}
+
+
+async def test_merge_data_sets_or_keeps_state():
+    storage, _ = make_storage(data_ttl=60, state_ttl=60)
+    await storage.set_state(KEY, WordsLearningFSM.default)
+
+    await storage.merge_data(KEY, {"a": 1})
+    assert await storage.get_state(KEY) == WordsLearningFSM.default.state
+
+    await storage.merge_data(KEY, {}, WordsLearningFSM.in_process)
+    assert await storage.get_state(KEY) == WordsLearningFSM.in_process.state
+
+    await storage.merge_data(KEY, {"b": 2}, None)
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_data(KEY) == {"a": 1, "b": 2}
+
+
+async def test_data_ttl_is_applied_to_the_hash():
+    storage, redis = make_storage(data_ttl=60)
+
+    await storage.merge_data(KEY, {"a": 1})
+
+    assert redis.ttls[FIELDS_KEY] == 60
+
+
+async def test_data_stored_by_redis_storage_is_moved_into_the_hash():
+    storage, redis = make_storage(data_ttl=60)
+    await redis.set(
+        "fsm:123:123:data", json.dumps({"section": "Food", "current_id": 7})
+    )
+
+    assert await storage.get_value(KEY, "section") == "Food"
+
+    assert "fsm:123:123:data" not in redis.data
+    assert redis.ttls[FIELDS_KEY] == 60
+    assert await storage.get_data(KEY) == {"section": "Food", "current_id": 7}
+
+
+async def test_fields_written_before_the_move_win_over_old_data():
+    storage, redis = make_storage()
+    await redis.set("fsm:123:123:data", json.dumps({"section": "Food", "n": 1}))
+
+    await storage.merge_data(KEY, {"section": "Travel"})
+
+    assert await storage.get_values(KEY, "section", "n") == ["Travel", 1]
+    assert "fsm:123:123:data" not in redis.data
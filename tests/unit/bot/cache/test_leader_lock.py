@@ -0,0 +1,55 @@
+from bot.cache.leader_lock import LeaderLock
+from tests.fakes import FakeRedis
+
+
+def make_locks(redis):
+    return (
+        LeaderLock(redis, "scheduler", "first", lease_seconds=30),
+        LeaderLock(redis, "scheduler", "second", lease_seconds=30),
+    )
+
+
+async def test_acquire_is_exclusive():
+    redis = FakeRedis()
+    first, second = make_locks(redis)
+
+    assert await first.acquire()
+    assert not await second.acquire()
+    assert await first.holder() == "first"
+    assert redis.ttls["leader:scheduler"] == 30
+
+
+async def test_only_holder_renews_lease():
+    redis = FakeRedis()
+    first, second = make_locks(redis)
+    await first.acquire()
+    redis.ttls["leader:scheduler"] = 5
+
+    assert not await second.renew()
+    assert redis.ttls["leader:scheduler"] == 5
+    assert await first.renew()
+    assert redis.ttls["leader:scheduler"] == 30
+
+
+async def test_only_holder_releases_lease():
+    redis = FakeRedis()
+    first, second = make_locks(redis)
+    await first.acquire()
+
+    await second.release()
+    assert await first.holder() == "first"
+
+    await first.release()
+    assert await first.holder() is None
+    assert await second.acquire()
+
+
+async def test_expired_lease_cannot_be_renewed():
+    redis = FakeRedis()
+    first, second = make_locks(redis)
+    await first.acquire()
+    await redis.delete("leader:scheduler")
+    await second.acquire()
+
+    assert not await first.renew()
+    assert await first.holder() == "second"
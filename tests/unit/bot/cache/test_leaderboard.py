@@ -0,0 +1,70 @@
+from bot.cache.leaderboard import Leaderboard
+from tests.fakes import FakeRedis
+
+
+async def rows(*items):
+    for item in items:
+        yield item
+
+
+async def test_rebuild_replaces_set_and_marks_it_built():
+    redis = FakeRedis()
+    leaderboard = Leaderboard(redis)
+    await leaderboard.set_points(999, 100)
+
+    await leaderboard.rebuild(rows((1, 30), (2, 20)))
+
+    assert await leaderboard.is_built()
+    assert await leaderboard.page(0, 10) == [(1, 30), (2, 20)]
+    assert redis.ttls["leaderboard:built"] == Leaderboard.REBUILD_SECONDS
+    assert not [key for key in redis.data if ":building:" in key]
+
+
+async def test_rebuild_is_dropped_when_points_change_meanwhile():
+    redis = FakeRedis()
+    leaderboard = Leaderboard(redis)
+    await leaderboard.set_points(1, 30)
+
+    async def stale_rows():
+        yield 1, 30
+        # committed after the rows above were read
+        await leaderboard.set_points(2, 40)
+
+    assert not await leaderboard.rebuild(stale_rows())
+
+    assert not await leaderboard.is_built()
+    assert await leaderboard.page(0, 10) == [(2, 40), (1, 30)]
+    assert not [key for key in redis.data if ":building:" in key]
+    assert await leaderboard.rebuild(rows((1, 30), (2, 40)))
+
+
+async def test_rebuild_without_users_clears_set():
+    leaderboard = Leaderboard(FakeRedis())
+    await leaderboard.set_points(1, 5)
+
+    await leaderboard.rebuild(rows())
+
+    assert await leaderboard.is_built()
+    assert await leaderboard.total() == 0
+
+
+async def test_rank_counts_users_with_more_points():
+    leaderboard = Leaderboard(FakeRedis())
+    await leaderboard.rebuild(rows((1, 30), (2, 20), (3, 20), (4, 5)))
+
+    assert await leaderboard.rank(1) == (1, 4)
+    assert await leaderboard.rank(3) == (2, 4)
+    assert await leaderboard.rank(4) == (4, 4)
+    assert await leaderboard.rank(404) is None
+
+
+async def test_set_points_and_remove_keep_order_in_sync():
+    leaderboard = Leaderboard(FakeRedis())
+    await leaderboard.rebuild(rows((1, 30), (2, 20)))
+
+    await leaderboard.set_points(2, 31)
+    await leaderboard.remove(1)
+
+    assert await leaderboard.page(0, 10) == [(2, 31)]
+    assert await leaderboard.position(2) == 0
+    assert await leaderboard.position(1) is None
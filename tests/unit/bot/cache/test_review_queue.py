@@ -0,0 +1,77 @@
+from datetime import date
+
+from bot.cache.review_queue import ReviewQueueCache
+from tests.fakes import FakeRedis
+
+TODAY = date(2026, 5, 1)
+
+
+def exercise(exercise_id: int, subsection: str = "Travel") -> dict:
+    return {
+        "russian": "Дом",
+        "english": "House",
+        "section": "Vocabulary",
+        "subsection": subsection,
+        "exercise_id": exercise_id,
+        "options": ["Поезд", "Самолет", "Корабль"],
+    }
+
+
+async def test_fill_stores_queue_in_order_with_ttl():
+    redis = FakeRedis()
+    queue = ReviewQueueCache(redis)
+
+    await queue.fill(123, TODAY, [exercise(1), exercise(2)])
+
+    assert await queue.is_built(123, TODAY)
+    assert await queue.peek(123, TODAY) == exercise(1)
+    assert await queue.count(123, TODAY) == 2
+    assert redis.ttls == {
+        "review_queue:123:2026-05-01": ReviewQueueCache.TTL_SECONDS,
+        "review_queue:123:2026-05-01:items": ReviewQueueCache.TTL_SECONDS,
+    }
+
+
+async def test_count_is_none_until_queue_is_built():
+    queue = ReviewQueueCache(FakeRedis())
+
+    assert await queue.count(123, TODAY) is None
+    assert not await queue.is_built(123, TODAY)
+
+
+async def test_empty_queue_stays_built():
+    queue = ReviewQueueCache(FakeRedis())
+
+    await queue.fill(123, TODAY, [])
+
+    assert await queue.is_built(123, TODAY)
+    assert await queue.peek(123, TODAY) is None
+    assert await queue.count(123, TODAY) == 0
+
+
+async def test_remove_drops_answered_exercise_only():
+    queue = ReviewQueueCache(FakeRedis())
+    await queue.fill(123, TODAY, [exercise(1), exercise(1, "Food"), exercise(2)])
+
+    await queue.remove(123, TODAY, "Vocabulary", "Travel", 1)
+    await queue.remove(123, TODAY, "Vocabulary", "Travel", 99)
+
+    assert await queue.peek(123, TODAY) == exercise(1, "Food")
+    assert await queue.count(123, TODAY) == 2
+
+
+async def test_queue_is_scoped_by_user_and_day():
+    queue = ReviewQueueCache(FakeRedis())
+    await queue.fill(123, TODAY, [exercise(1)])
+
+    assert not await queue.is_built(456, TODAY)
+    assert not await queue.is_built(123, date(2026, 5, 2))
+
+
+async def test_invalidate_forces_rebuild():
+    queue = ReviewQueueCache(FakeRedis())
+    await queue.fill(123, TODAY, [exercise(1)])
+
+    await queue.invalidate(123, TODAY)
+
+    assert not await queue.is_built(123, TODAY)
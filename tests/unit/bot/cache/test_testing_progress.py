@@ -0,0 +1,96 @@
+from bot.cache.testing_progress import (
+    PendingProgress,
+    ProgressSnapshot,
+    TestingProgress as _TestingProgress,
+)
+from tests.fakes import FakeRedis
+
+
+async def test_snapshot_is_empty_until_bitmaps_are_built():
+    progress = _TestingProgress(FakeRedis())
+
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+
+    assert snapshot.exercise_ids is None
+    assert snapshot.done is None
+    assert snapshot.first_try == set()
+
+
+async def test_filled_bitmaps_give_available_ids_and_counts():
+    redis = FakeRedis()
+    progress = _TestingProgress(redis)
+    await progress.fill_exercises("Grammar", "Present Simple", [1, 2, 3, 10], 0)
+    await progress.fill_user(
+        123, "Grammar", "Present Simple", [(1, True), (2, False), (7, True)], 0
+    )
+
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+
+    assert snapshot.available() == [3, 10]
+    # exercise 7 was deleted, so it does not count
+    assert snapshot.counts() == (1, 2, 4)
+    assert redis.ttls["testing_exercises:Grammar:Present Simple"] == (
+        _TestingProgress.TTL_SECONDS
+    )
+
+
+async def test_mark_done_without_built_bitmap_does_not_look_built():
+    progress = _TestingProgress(FakeRedis())
+
+    await progress.mark_done(123, "Grammar", "Present Simple", 4, first_try=True)
+
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    assert snapshot.done is None
+
+
+async def test_invalidate_exercises_drops_subsection_bitmap():
+    progress = _TestingProgress(FakeRedis())
+    await progress.fill_exercises("Grammar", "Present Simple", [1], 0)
+
+    await progress.invalidate_exercises("Grammar", "Present Simple")
+
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    assert snapshot.exercise_ids is None
+
+
+async def test_rebuild_read_before_a_change_is_not_stored():
+    progress = _TestingProgress(FakeRedis())
+    stale = await progress.snapshot(123, "Grammar", "Present Simple")
+
+    # an exercise was deleted and an answer recorded while the stale
+    # snapshot was rebuilt from the old rows
+    await progress.invalidate_exercises("Grammar", "Present Simple")
+    await progress.mark_done(123, "Grammar", "Present Simple", 4, first_try=True)
+    await progress.fill_exercises(
+        "Grammar", "Present Simple", [1, 2], stale.exercises_version
+    )
+    await progress.fill_user(123, "Grammar", "Present Simple", [], stale.user_version)
+
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    assert snapshot.exercise_ids is None
+    assert snapshot.done is None
+
+    await progress.fill_exercises(
+        "Grammar", "Present Simple", [1], snapshot.exercises_version
+    )
+    await progress.fill_user(
+        123, "Grammar", "Present Simple", [(4, True)], snapshot.user_version
+    )
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    assert snapshot.exercise_ids == {1}
+    assert snapshot.done == {4}
+
+
+def test_pending_progress_merges_answers_after_a_reset():
+    pending = PendingProgress()
+    pending.mark_done(123, "Grammar", "Present Simple", 1, first_try=True)
+    pending.reset(123, "Grammar", "Present Simple")
+    pending.mark_done(123, "Grammar", "Present Simple", 2, first_try=True)
+    pending.mark_done(123, "Grammar", "Past Simple", 3, first_try=True)
+    snapshot = ProgressSnapshot(exercise_ids={1, 2, 3}, done={1, 3}, first_try={1})
+
+    pending.apply(123, "Grammar", "Present Simple", snapshot)
+
+    assert snapshot.done == {2}
+    assert snapshot.first_try == {2}
+    assert snapshot.counts() == (1, 1, 3)
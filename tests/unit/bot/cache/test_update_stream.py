@@ -0,0 +1,78 @@
+from aiogram.types import Update
+
+from bot.cache.update_stream import UpdateStream, update_user_id
+from tests.fakes import FakeRedis
+from tests.helpers.aiogram import callback_update, message_update
+
+
+async def make_stream(partitions=4):
+    stream = UpdateStream(FakeRedis(), partitions)
+    for partition in range(partitions):
+        await stream.ensure_group(partition)
+    return stream
+
+
+def test_update_user_id_reads_sender_of_any_update_type():
+    assert update_user_id(message_update(1, text="hi", user_id=42)) == 42
+    assert update_user_id(callback_update(2, data="ok", user_id=43)) == 43
+    assert update_user_id(Update(update_id=3)) == 0
+
+
+async def test_offer_appends_update_to_partition_of_its_user():
+    stream = await make_stream()
+
+    assert await stream.offer(message_update(1, text="hi", user_id=6))
+
+    assert await stream.read(1, count=10, block_ms=0) == []
+    [entry] = await stream.read(2, count=10, block_ms=0)
+    update = Update.model_validate_json(entry.payload)
+    assert update.message.text == "hi"
+    assert update.message.from_user.id == 6
+    assert entry.deliveries == 1
+
+
+async def test_ensure_group_can_be_called_again():
+    stream = await make_stream(partitions=1)
+
+    await stream.ensure_group(0)
+
+
+async def test_read_returns_each_entry_once():
+    stream = await make_stream(partitions=1)
+    await stream.offer(message_update(1, text="a"))
+    await stream.offer(message_update(2, text="b"))
+
+    first = await stream.read(0, count=1, block_ms=0)
+    second = await stream.read(0, count=10, block_ms=0)
+
+    assert len(first) == len(second) == 1
+    assert first[0].entry_id != second[0].entry_id
+    assert await stream.read(0, count=10, block_ms=0) == []
+
+
+async def test_unacknowledged_entries_are_read_again_with_delivery_count():
+    stream = await make_stream(partitions=1)
+    await stream.offer(message_update(1, text="a"))
+    await stream.offer(message_update(2, text="b"))
+    handled, crashed = await stream.read(0, count=10, block_ms=0)
+    await stream.ack(0, handled.entry_id)
+
+    [pending] = await stream.read_pending(0, count=10)
+
+    assert pending.entry_id == crashed.entry_id
+    assert pending.payload == crashed.payload
+    assert pending.deliveries == 2
+    [again] = await stream.read_pending(0, count=10)
+    assert again.deliveries == 3
+    await stream.ack(0, again.entry_id)
+    assert await stream.read_pending(0, count=10) == []
+
+
+async def test_read_pending_drops_trimmed_entries():
+    stream = await make_stream(partitions=1)
+    stream.MAX_LENGTH = 1
+    await stream.offer(message_update(1, text="a"))
+    await stream.read(0, count=10, block_ms=0)
+    await stream.offer(message_update(2, text="b"))  # trims the first one
+
+    assert await stream.read_pending(0, count=10) == []
@@ -1,6 +1,5 @@
 from datetime import date
 
-from bot.db.models import DailyStatistics
 from bot.db.repositories.daily_statistics import DailyStatisticsRepository
 from tests.fakes import (
     FakeAsyncSession,
@@ -11,48 +10,23 @@ from tests.fakes import (
 )
 
 
-async def test_get_by_date_filters_by_day():
-    stats = DailyStatistics(date=date(2026, 4, 28))
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=stats)])
-    repo = DailyStatisticsRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.get_by_date(date(2026, 4, 28))
-
-    assert result is stats
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "from daily_statistics" in sql
-    assert "daily_statistics.date = '2026-04-28'" in sql
-
-
-async def test_create_blank_for_date_adds_zeroed_statistics_row():
-    session = FakeAsyncSession()
-    repo = DailyStatisticsRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.create_blank_for_date(date(2026, 4, 28))
-
-    assert result.date == date(2026, 4, 28)
-    assert result.total_new_words == 0
-    assert result.total_testing_exercises == 0
-    assert result.total_irregular_verbs == 0
-    assert result.new_users == 0
-    session.begin.assert_called_once_with()
-    session.add.assert_called_once_with(result)
-
-
-async def test_increment_field_updates_selected_counter():
+async def test_add_counts_upserts_row_of_day():
     session = FakeAsyncSession([FakeExecuteResult()])
     repo = DailyStatisticsRepository(session_maker=FakeSessionMaker(session))
 
-    await repo.increment_field(
-        day=date(2026, 4, 28),
-        field_name="total_new_words",
-        amount=3,
-    )
+    await repo.add_counts(date(2026, 4, 28), {"total_new_words": 3, "new_users": 1})
 
     session.begin.assert_called_once_with()
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "update daily_statistics" in sql
-    assert "daily_statistics.date = '2026-04-28'" in sql
+    assert "insert into daily_statistics" in sql
+    assert "'2026-04-28', 0, 3, 0, 1" in sql
+    assert "on conflict (date) do update set" in sql
+    assert (
+        "total_new_words = (daily_statistics.total_new_words"
+        " + excluded.total_new_words)" in sql
+    )
+    assert "new_users = (daily_statistics.new_users + excluded.new_users)" in sql
+    assert "total_testing_exercises = " not in sql
 
 
 async def test_aggregate_maps_null_sums_to_zero():
@@ -4,6 +4,7 @@ from tests.fakes import (
     FakeAsyncSession,
     FakeExecuteResult,
     FakeSessionMaker,
+    row,
     statement_sql,
 )
 
@@ -35,6 +36,33 @@ async def test_get_subsection_names_returns_distinct_ordered_values():
     assert "order by new_words.subsection" in sql
 
 
+async def test_count_by_subsection_groups_and_orders_by_names():
+    counts = row(section="Vocabulary", subsection="Travel", count=8)
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=[counts])])
+    repo = NewWordsRepository(session_maker=FakeSessionMaker(session))
+
+    result = await repo.count_by_subsection()
+
+    assert result == [counts]
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert "group by new_words.section, new_words.subsection" in sql
+
+
+async def test_list_russian_words_selects_pool_columns_only():
+    word = row(section="Vocabulary", subsection="Travel", russian="поезд")
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=[word])])
+    repo = NewWordsRepository(session_maker=FakeSessionMaker(session))
+
+    result = await repo.list_russian_words()
+
+    assert result == [word]
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert sql.startswith(
+        "select new_words.section, new_words.subsection, new_words.russian"
+    )
+    assert "where" not in sql
+
+
 async def test_update_exercise_filters_by_composite_word_key():
     session = FakeAsyncSession([FakeExecuteResult()])
     repo = NewWordsRepository(session_maker=FakeSessionMaker(session))
@@ -124,3 +152,27 @@ async def test_delete_exercise_filters_by_composite_word_key():
     assert "new_words.section = 'vocabulary'" in sql
     assert "new_words.subsection = 'travel'" in sql
     assert "new_words.id = 7" in sql
+
+
+async def test_add_exercises_inserts_batch_with_one_statement():
+    session = FakeAsyncSession([FakeExecuteResult()])
+    repo = NewWordsRepository(session_maker=FakeSessionMaker(session))
+
+    await repo.add_exercises(
+        "Vocabulary", "Travel", [("поезд", "train"), ("дом", "house")]
+    )
+
+    assert len(session.executed_statements) == 1
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert sql.startswith("insert into new_words")
+    assert "coalesce(max(new_words.id)" in sql
+    assert "'поезд'" in sql and "'house'" in sql
+
+
+async def test_add_exercises_skips_empty_batch():
+    session = FakeAsyncSession([])
+    repo = NewWordsRepository(session_maker=FakeSessionMaker(session))
+
+    await repo.add_exercises("Vocabulary", "Travel", [])
+
+    assert session.executed_statements == []
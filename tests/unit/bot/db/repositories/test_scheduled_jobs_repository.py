@@ -0,0 +1,57 @@
+from sqlalchemy.dialects import postgresql
+
+from bot.db.repositories.scheduled_jobs import ScheduledJobRepository
+from tests.fakes import (
+    FakeAsyncSession,
+    FakeExecuteResult,
+    FakeSessionMaker,
+    row,
+    statement_sql,
+)
+
+
+async def test_get_all_returns_ids_and_states_in_run_order():
+    session = FakeAsyncSession(
+        [
+            FakeExecuteResult(
+                fetchall_values=[
+                    row(id="first", job_state=b"1"),
+                    row(id="second", job_state=b"2"),
+                ]
+            )
+        ]
+    )
+    repo = ScheduledJobRepository(session_maker=FakeSessionMaker(session))
+
+    assert await repo.get_all() == [("first", b"1"), ("second", b"2")]
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert "order by scheduled_jobs.next_run_time, scheduled_jobs.id" in sql
+
+
+async def test_save_upserts_job():
+    session = FakeAsyncSession([FakeExecuteResult()])
+    repo = ScheduledJobRepository(session_maker=FakeSessionMaker(session))
+
+    await repo.save("job", 1_700_000_000.0, b"state")
+
+    session.begin.assert_called_once_with()
+    statement = session.executed_statements[0]
+    sql = str(statement.compile(dialect=postgresql.dialect())).lower()
+    assert "insert into scheduled_jobs" in sql
+    assert "on conflict (id) do update set" in sql
+    assert "next_run_time = excluded.next_run_time" in sql
+    assert "job_state = excluded.job_state" in sql
+
+
+async def test_delete_removes_one_job_and_delete_all_every_job():
+    session = FakeAsyncSession()
+    repo = ScheduledJobRepository(session_maker=FakeSessionMaker(session))
+
+    await repo.delete("job")
+    await repo.delete_all()
+
+    first, second = (
+        statement_sql(statement).lower() for statement in session.executed_statements
+    )
+    assert first == "delete from scheduled_jobs where scheduled_jobs.id = 'job'"
+    assert second == "delete from scheduled_jobs"
@@ -4,29 +4,50 @@ from tests.fakes import (
     FakeAsyncSession,
     FakeExecuteResult,
     FakeSessionMaker,
+    row,
     statement_sql,
 )
 
 
-async def test_get_available_exercises_excludes_completed_successes_for_user():
+async def test_get_exercise_filters_by_composite_exercise_key():
     exercise = build_testing_exercise()
-    session = FakeAsyncSession([FakeExecuteResult(scalar_values=[exercise])])
+    session = FakeAsyncSession([FakeExecuteResult(scalar_value=exercise)])
     repo = _TestingRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.get_available_exercises(
-        section="Grammar",
-        subsection="Present Simple",
-        user_id=123,
-    )
+    result = await repo.get_exercise("Grammar", "Present Simple", 3)
+
+    assert result is exercise
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert "testing_exercises.section = 'grammar'" in sql
+    assert "testing_exercises.subsection = 'present simple'" in sql
+    assert "testing_exercises.id = 3" in sql
+
+
+async def test_list_exercise_ids_selects_ids_of_subsection():
+    session = FakeAsyncSession([FakeExecuteResult(scalar_values=[1, 2, 4])])
+    repo = _TestingRepository(session_maker=FakeSessionMaker(session))
+
+    result = await repo.list_exercise_ids("Grammar", "Present Simple")
 
-    assert result == [exercise]
+    assert result == [1, 2, 4]
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "testing_exercises" in sql
-    assert "user_progress" in sql
+    assert sql.startswith("select testing_exercises.id \nfrom testing_exercises")
+
+
+async def test_list_solved_selects_successes_with_first_try_flag():
+    solved = row(exercise_id=2, first_try=True)
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=[solved])])
+    repo = _TestingRepository(session_maker=FakeSessionMaker(session))
+
+    result = await repo.list_solved(123, "Grammar", "Present Simple")
+
+    assert result == [solved]
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert "user_progress.attempts = 1 as first_try" in sql
     assert "user_progress.user_id = 123" in sql
-    assert "user_progress.exercise_section = 'grammar'" in sql
-    assert "user_progress.exercise_subsection = 'present simple'" in sql
+    assert "user_progress.exercise_type = 'testing'" in sql
     assert "user_progress.success is true" in sql
+    assert "testing_exercises" not in sql
 
 
 async def test_add_exercise_adds_orm_object_inside_transaction():
@@ -137,30 +158,28 @@ async def test_count_exercises_returns_zero_when_no_rows():
     assert result == 0
 
 
-async def test_get_section_names_returns_distinct_ordered_sections():
-    session = FakeAsyncSession(
-        [FakeExecuteResult(scalar_values=["Grammar", "Vocabulary"])]
-    )
+async def test_count_by_subsection_groups_and_orders_by_names():
+    counts = row(section="Grammar", subsection="Present Simple", count=5)
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=[counts])])
     repo = _TestingRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.get_section_names()
+    result = await repo.count_by_subsection()
 
-    assert result == ["Grammar", "Vocabulary"]
+    assert result == [counts]
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "select distinct" in sql
-    assert "order by testing_exercises.section" in sql
+    assert "count(*) as count" in sql
+    assert "group by testing_exercises.section, testing_exercises.subsection" in sql
+    assert "order by testing_exercises.section, testing_exercises.subsection" in sql
 
 
-async def test_get_subsection_names_returns_distinct_ordered_subsections():
-    session = FakeAsyncSession(
-        [FakeExecuteResult(scalar_values=["Past Simple", "Present Simple"])]
-    )
+async def test_add_exercises_inserts_batch_with_one_statement():
+    session = FakeAsyncSession([FakeExecuteResult()])
     repo = _TestingRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.get_subsection_names("Grammar")
+    await repo.add_exercises("Grammar", "Present Simple", [("He works", "works")])
 
-    assert result == ["Past Simple", "Present Simple"]
+    assert len(session.executed_statements) == 1
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "select distinct" in sql
-    assert "testing_exercises.section = 'grammar'" in sql
-    assert "order by testing_exercises.subsection" in sql
+    assert sql.startswith("insert into testing_exercises")
+    assert "coalesce(max(testing_exercises.id)" in sql
+    assert "'he works'" in sql
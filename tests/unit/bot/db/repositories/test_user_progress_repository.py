@@ -10,46 +10,57 @@ from tests.fakes import (
 )
 
 
-async def test_update_progress_attempt_filters_by_user_and_exercise_key():
-    session = FakeAsyncSession([FakeExecuteResult(rowcount=1)])
+async def test_record_attempt_upserts_progress_and_updates_points_at_once():
+    attempt = row(first_try=True, points=11)
+    session = FakeAsyncSession([FakeExecuteResult(one_value=attempt)])
     repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.update_progress_attempt(
+    result = await repo.record_attempt(
         user_id=123,
         exercise_type="Testing",
         section="Grammar",
         subsection="Present Simple",
         exercise_id=5,
         success=True,
+        today=date(2026, 5, 1),
     )
 
-    assert result == 1
+    assert result is attempt
     session.begin.assert_called_once_with()
+    assert len(session.executed_statements) == 1
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "update user_progress" in sql
-    assert "user_progress.user_id = 123" in sql
-    assert "user_progress.exercise_type = 'testing'" in sql
-    assert "user_progress.exercise_section = 'grammar'" in sql
-    assert "user_progress.exercise_subsection = 'present simple'" in sql
-    assert "user_progress.exercise_id = 5" in sql
+    assert "with attempted as" in sql
+    assert "insert into user_progress" in sql
+    assert "123, 'testing', 'grammar', 'present simple', 5, 1, true" in sql
+    assert (
+        "on conflict (user_id, exercise_type, exercise_section,"
+        " exercise_subsection, exercise_id) do update" in sql
+    )
+    assert "attempts = (user_progress.attempts + 1)" in sql
+    assert "returning xmax = 0 as inserted" in sql
+    assert "update users set points=(users.points + 1)" in sql
+    assert "where users.user_id = 123" in sql
+    assert "returning (select attempted.inserted" in sql
+    assert "as first_try, users.points" in sql
 
 
-async def test_count_success_testing_adds_first_try_filter_when_requested():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=2)])
+async def test_record_attempt_decrements_points_on_failure():
+    session = FakeAsyncSession([FakeExecuteResult()])
     repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.count_success_testing(
+    result = await repo.record_attempt(
         user_id=123,
+        exercise_type="Testing",
         section="Grammar",
         subsection="Present Simple",
-        first_try_only=True,
+        exercise_id=5,
+        success=False,
+        today=date(2026, 5, 1),
     )
 
-    assert result == 2
+    assert result is None
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "from user_progress" in sql
-    assert "user_progress.success is true" in sql
-    assert "user_progress.attempts = 1" in sql
+    assert "update users set points=(users.points + -1)" in sql
 
 
 async def test_count_by_type_in_interval_uses_closed_date_bounds():
@@ -78,63 +89,38 @@ async def test_list_users_ordered_by_points_returns_raw_rows():
     session = FakeAsyncSession([FakeExecuteResult(fetchall_values=rows)])
     repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.list_users_ordered_by_points()
+    result = await repo.list_users_ordered_by_points(offset=50, limit=50)
 
     assert result == rows
     sql = statement_sql(session.executed_statements[0]).lower()
     assert "from users" in sql
-    assert "order by users.points desc" in sql
+    assert "order by users.points desc, users.user_id" in sql
+    assert "limit 50 offset 50" in sql
 
 
-async def test_count_success_testing_without_first_try_filter():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=3)])
-    repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.count_success_testing(
-        user_id=123,
-        section="Grammar",
-        subsection="Present Simple",
-    )
-
-    assert result == 3
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "user_progress.success is true" in sql
-    assert "user_progress.attempts" not in sql
-
-
-async def test_count_success_testing_returns_zero_when_no_rows():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=None)])
-    repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.count_success_testing(
-        user_id=123,
-        section="Grammar",
-        subsection="Present Simple",
-    )
-
-    assert result == 0
-
-
-async def test_count_testing_exercises_total_counts_testing_exercises():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=12)])
+async def test_list_users_by_ids_selects_names_of_given_users():
+    rows = [row(user_id=123, full_name="One", tg_login="one")]
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=rows)])
     repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.count_testing_exercises_total("Grammar", "Present Simple")
+    result = await repo.list_users_by_ids([123, 456])
 
-    assert result == 12
+    assert result == rows
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "from testing_exercises" in sql
-    assert "testing_exercises.section = 'grammar'" in sql
-    assert "testing_exercises.subsection = 'present simple'" in sql
+    assert "users.user_id in (123, 456)" in sql
+    assert "users.points" not in sql
 
 
-async def test_count_testing_exercises_total_returns_zero_when_no_rows():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=None)])
+async def test_stream_points_reads_user_points_through_cursor():
+    rows = [row(user_id=123, points=10)]
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=rows)])
     repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.count_testing_exercises_total("Grammar", "Present Simple")
+    result = [r async for r in repo.stream_points(batch_size=200)]
 
-    assert result == 0
+    assert result == rows
+    stmt = session.stream.await_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 200
 
 
 async def test_count_by_type_in_interval_returns_zero_when_no_rows():
@@ -151,33 +137,6 @@ async def test_count_by_type_in_interval_returns_zero_when_no_rows():
     assert result == 0
 
 
-async def test_add_progress_entry_adds_orm_object_inside_transaction():
-    from tests.factories import build_user_progress
-
-    entry = build_user_progress(user_id=123)
-    session = FakeAsyncSession()
-    repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
-
-    await repo.add_progress_entry(entry)
-
-    session.begin.assert_called_once_with()
-    session.add.assert_called_once_with(entry)
-
-
-async def test_update_user_points_increments_points_inside_transaction():
-    session = FakeAsyncSession([FakeExecuteResult()])
-    repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
-
-    await repo.update_user_points(123, 5)
-
-    session.begin.assert_called_once_with()
-    session.execute.assert_awaited_once()
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "update users" in sql
-    assert "users.user_id = 123" in sql
-    assert "points=" in sql.replace(" ", "")
-
-
 async def test_delete_progress_by_subsection_filters_by_user_section_subsection():
     session = FakeAsyncSession([FakeExecuteResult()])
     repo = UserProgressRepository(session_maker=FakeSessionMaker(session))
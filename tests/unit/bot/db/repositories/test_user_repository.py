@@ -6,6 +6,7 @@ from tests.fakes import (
     FakeAsyncSession,
     FakeExecuteResult,
     FakeSessionMaker,
+    row,
     statement_sql,
 )
 
@@ -23,17 +24,59 @@ async def test_get_by_user_id_filters_by_telegram_user_id():
     assert "users.user_id = 123" in sql
 
 
-async def test_list_all_returns_users_ordered_by_internal_id():
-    users = [build_user(id_=1), build_user(id_=2, user_id=456)]
-    session = FakeAsyncSession([FakeExecuteResult(scalar_values=users)])
+async def test_list_page_reads_next_page_after_id():
+    rows = [row(id=11, user_id=123), row(id=12, user_id=456)]
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=rows)])
     repo = UserRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.list_all()
+    result = await repo.list_page(21, after_id=10)
 
-    assert result == users
+    assert result == rows
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "from users" in sql
+    assert "users.tg_login" in sql
+    assert "users.id > 10" in sql
+    assert "order by users.id\n limit 21" in sql
+
+
+async def test_list_page_reads_previous_page_backwards_and_restores_order():
+    rows = [row(id=9, user_id=456), row(id=8, user_id=123)]
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=rows)])
+    repo = UserRepository(session_maker=FakeSessionMaker(session))
+
+    result = await repo.list_page(21, before_id=10)
+
+    assert [r.id for r in result] == [8, 9]
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert "users.id < 10" in sql
+    assert "order by users.id desc" in sql
+
+
+async def test_list_page_searches_by_login_prefix_or_telegram_id():
+    session = FakeAsyncSession([FakeExecuteResult(), FakeExecuteResult()])
+    repo = UserRepository(session_maker=FakeSessionMaker(session))
+
+    await repo.list_page(21, query="@Mark")
+    await repo.list_page(21, query="123")
+
+    login_sql = statement_sql(session.executed_statements[0]).lower()
+    assert "lower(users.tg_login) like 'mark' || '%'" in login_sql
+    assert "users.user_id =" not in login_sql
+    id_sql = statement_sql(session.executed_statements[1]).lower()
+    assert "users.user_id = 123 or (lower(users.tg_login) like '123' || '%'" in id_sql
+
+
+async def test_list_ids_page_uses_keyset_on_internal_id():
+    rows = [row(id=11, user_id=123), row(id=12, user_id=456)]
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=rows)])
+    repo = UserRepository(session_maker=FakeSessionMaker(session))
+
+    result = await repo.list_ids_page(after_id=10, limit=2)
+
+    assert result == rows
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert "users.id > 10" in sql
     assert "order by users.id" in sql
+    assert "limit 2" in sql
 
 
 async def test_add_user_adds_orm_object_inside_transaction():
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, time
 
 from bot.db.repositories.user_words_learning import UserWordsLearningRepository
 from tests.factories import build_new_word, build_user_word_learning
@@ -6,62 +6,123 @@ from tests.fakes import (
     FakeAsyncSession,
     FakeExecuteResult,
     FakeSessionMaker,
+    row,
     statement_sql,
 )
 
 
-async def test_words_to_learn_today_filters_by_user_and_due_date():
-    entry = build_user_word_learning(user_id=123)
-    session = FakeAsyncSession([FakeExecuteResult(scalar_values=[entry])])
+async def test_due_words_selects_plain_columns_due_by_today():
+    word = row(
+        section="Vocabulary",
+        subsection="Travel",
+        exercise_id=8,
+        russian="дом",
+        english="house",
+    )
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=[word])])
     repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.words_to_learn_today(123)
+    result = await repo.due_words(123, date(2026, 5, 1))
 
-    assert result == [entry]
+    assert result == [word]
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "from user_words_learning" in sql
+    assert "new_words.russian, new_words.english" in sql
+    assert "join new_words on" in sql
     assert "user_words_learning.user_id = 123" in sql
-    assert "user_words_learning.next_review_date <=" in sql
+    assert "user_words_learning.next_review_date <= '2026-05-01'" in sql
+
+
+async def test_count_due_in_reminder_slots_groups_due_words_by_user():
+    rows = [row(user_id=123, due=4)]
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=rows)])
+    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
+
+    result = await repo.count_due_in_reminder_slots(
+        [(time(9, 30), "+3"), (time(4, 30), "-2")], date(2026, 5, 1)
+    )
+
+    assert result == rows
+    assert len(session.executed_statements) == 1
+    sql = statement_sql(session.executed_statements[0]).lower()
+    assert "join users on users.user_id = user_words_learning.user_id" in sql
+    assert "(users.reminder_time, users.time_zone) in" in sql
+    assert "('09:30:00', '+3')" in sql
+    assert "user_words_learning.next_review_date <= '2026-05-01'" in sql
+    assert "group by user_words_learning.user_id" in sql
 
 
-async def test_learning_info_filters_by_user_and_composite_word_key():
-    entry = build_user_word_learning(user_id=123, exercise_id=8)
-    session = FakeAsyncSession([FakeExecuteResult(scalar_values=[entry])])
+async def test_count_due_in_reminder_slots_skips_query_without_slots():
+    session = FakeAsyncSession()
     repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
 
-    result = await repo.learning_info(
+    assert await repo.count_due_in_reminder_slots([], date(2026, 5, 1)) == []
+    assert session.executed_statements == []
+
+
+async def test_record_answer_updates_only_answering_users_word_and_points():
+    session = FakeAsyncSession([FakeExecuteResult(scalar_value=11)])
+    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
+
+    points = await repo.record_answer(
         user_id=123,
         section="Vocabulary",
         subsection="Travel",
         exercise_id=8,
+        success=True,
+        today=date(2026, 5, 1),
     )
 
-    assert result is entry
+    assert points == 11
+    session.begin.assert_called_once_with()
+    assert len(session.executed_statements) == 1
     sql = statement_sql(session.executed_statements[0]).lower()
+    assert "with answered as" in sql
+    assert "update user_words_learning" in sql
     assert "user_words_learning.user_id = 123" in sql
     assert "user_words_learning.section = 'vocabulary'" in sql
     assert "user_words_learning.subsection = 'travel'" in sql
     assert "user_words_learning.exercise_id = 8" in sql
+    assert "success=(user_words_learning.success + 1)" in sql
+    assert "power(1.7, user_words_learning.success + 1)" in sql
+    assert "returning user_words_learning.user_id" in sql
+    assert "update users set points=(users.points + 1)" in sql
+    assert "returning users.points" in sql
 
 
-async def test_update_learning_progress_updates_review_state_by_word_key():
-    session = FakeAsyncSession([FakeExecuteResult()])
+async def test_record_answer_failure_reviews_tomorrow_and_decrements_points():
+    session = FakeAsyncSession([FakeExecuteResult(rowcount=1)])
     repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
 
-    await repo.update_learning_progress(
+    await repo.record_answer(
+        user_id=123,
         section="Vocabulary",
         subsection="Travel",
         exercise_id=8,
-        success_value=2,
-        next_review_date=date(2026, 5, 1),
+        success=False,
+        today=date(2026, 5, 1),
     )
 
-    session.begin.assert_called_once_with()
     sql = statement_sql(session.executed_statements[0]).lower()
-    assert "update user_words_learning" in sql
-    assert "user_words_learning.section = 'vocabulary'" in sql
-    assert "user_words_learning.subsection = 'travel'" in sql
-    assert "user_words_learning.exercise_id = 8" in sql
+    assert "success=user_words_learning.success" in sql
+    assert "cast('2026-05-02' as date)" in sql
+    assert "power(" not in sql
+    assert "update users set points=(users.points + -1)" in sql
+
+
+async def test_record_answer_returns_none_when_word_is_not_in_learning():
+    session = FakeAsyncSession([FakeExecuteResult(scalar_value=None)])
+    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
+
+    points = await repo.record_answer(
+        user_id=123,
+        section="Vocabulary",
+        subsection="Travel",
+        exercise_id=8,
+        success=True,
+        today=date(2026, 5, 1),
+    )
+
+    assert points is None
 
 
 async def test_add_user_words_learning_entries_adds_all_inside_transaction():
@@ -93,36 +154,6 @@ async def test_list_new_words_filters_by_section_and_subsection():
     assert "order by new_words.id" in sql
 
 
-async def test_all_words_by_section_subsection_filters_by_user_and_subsection():
-    entry = build_user_word_learning(user_id=123, subsection="Travel")
-    session = FakeAsyncSession([FakeExecuteResult(scalar_values=[entry])])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.all_words_by_section_subsection(
-        user_id=123,
-        section="Vocabulary",
-        subsection="Travel",
-    )
-
-    assert result == [entry]
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "user_words_learning.user_id = 123" in sql
-    assert "user_words_learning.section = 'vocabulary'" in sql
-    assert "user_words_learning.subsection = 'travel'" in sql
-
-
-async def test_all_words_by_user_filters_by_user_only():
-    entry = build_user_word_learning(user_id=123)
-    session = FakeAsyncSession([FakeExecuteResult(scalar_values=[entry])])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.all_words_by_user(123)
-
-    assert result == [entry]
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "user_words_learning.user_id = 123" in sql
-
-
 async def test_count_active_learning_returns_zero_when_no_rows():
     session = FakeAsyncSession([FakeExecuteResult(scalar_value=None)])
     repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
@@ -144,21 +175,6 @@ async def test_count_active_learning_filters_by_user_and_success_le():
     assert "user_words_learning.success <= 2" in sql
 
 
-async def test_count_active_in_subsection_filters_by_subsection():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=4)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.count_active_in_subsection(
-        user_id=123, subsection="Travel", learning_rate=3
-    )
-
-    assert result == 4
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "user_words_learning.subsection = 'travel'" in sql
-    assert "user_words_learning.user_id = 123" in sql
-    assert "user_words_learning.success <= 3" in sql
-
-
 async def test_count_learned_filters_by_success_ge():
     session = FakeAsyncSession([FakeExecuteResult(scalar_value=8)])
     repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
@@ -215,99 +231,33 @@ async def test_distinct_subsections_returns_user_subsections():
     assert "user_words_learning.user_id = 123" in sql
 
 
-async def test_count_learned_in_subsection_filters_subsection_and_success_ge():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=6)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.count_learned_in_subsection(
-        user_id=123, subsection="Travel", learned_rate=5
+async def test_subsection_stats_aggregates_all_subsections_in_one_query():
+    stats = row(
+        subsection="Travel",
+        learned=1,
+        active=2,
+        today=3,
+        total=4,
+        success=5,
+        attempts=6,
     )
+    session = FakeAsyncSession([FakeExecuteResult(fetchall_values=[stats])])
+    session_maker = FakeSessionMaker(session)
+    repo = UserWordsLearningRepository(session_maker=session_maker)
 
-    assert result == 6
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "user_words_learning.subsection = 'travel'" in sql
-    assert "user_words_learning.user_id = 123" in sql
-    assert "user_words_learning.success >= 5" in sql
-
-
-async def test_count_today_in_subsection_filters_by_due_date():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=2)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.count_today_in_subsection(123, "Travel")
-
-    assert result == 2
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "user_words_learning.subsection = 'travel'" in sql
-    assert "user_words_learning.user_id = 123" in sql
-    assert "user_words_learning.next_review_date <=" in sql
-
-
-async def test_count_total_in_subsection_returns_count():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=9)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.count_total_in_subsection(123, "Travel")
-
-    assert result == 9
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "user_words_learning.subsection = 'travel'" in sql
-    assert "user_words_learning.user_id = 123" in sql
-
-
-async def test_sum_success_in_subsection_returns_zero_when_none():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=None)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.sum_success_in_subsection(123, "Travel")
-
-    assert result == 0
-
-
-async def test_sum_success_in_subsection_returns_sum():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=14)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.sum_success_in_subsection(123, "Travel")
+    result = await repo.subsection_stats(user_id=123, active_rate=3, learned_rate=5)
 
-    assert result == 14
+    assert result == [stats]
+    assert session_maker.calls == 1
+    assert len(session.executed_statements) == 1
     sql = statement_sql(session.executed_statements[0]).lower()
+    assert "filter (where user_words_learning.success >= 5)" in sql
+    assert "filter (where user_words_learning.success <= 3)" in sql
+    assert "filter (where user_words_learning.next_review_date <=" in sql
     assert "sum(user_words_learning.success)" in sql
-    assert "user_words_learning.subsection = 'travel'" in sql
-    assert "user_words_learning.user_id = 123" in sql
-
-
-async def test_sum_attempts_in_subsection_returns_sum():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=20)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.sum_attempts_in_subsection(123, "Travel")
-
-    assert result == 20
-    sql = statement_sql(session.executed_statements[0]).lower()
     assert "sum(user_words_learning.attempts)" in sql
-
-
-async def test_sum_attempts_in_subsection_returns_zero_when_none():
-    session = FakeAsyncSession([FakeExecuteResult(scalar_value=None)])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    result = await repo.sum_attempts_in_subsection(123, "Travel")
-
-    assert result == 0
-
-
-async def test_update_user_points_increments_points_inside_transaction():
-    session = FakeAsyncSession([FakeExecuteResult()])
-    repo = UserWordsLearningRepository(session_maker=FakeSessionMaker(session))
-
-    await repo.update_user_points(123, 7)
-
-    session.begin.assert_called_once_with()
-    session.execute.assert_awaited_once()
-    sql = statement_sql(session.executed_statements[0]).lower()
-    assert "update users" in sql
-    assert "users.user_id = 123" in sql
+    assert "user_words_learning.user_id = 123" in sql
+    assert "group by user_words_learning.subsection" in sql
 
 
 async def test_max_custom_word_id_returns_zero_when_none():
@@ -0,0 +1,130 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from bot.db.models import User
+from bot.db.repositories.user import UserRepository
+from bot.db.unit_of_work import UnitOfWork, after_commit
+from tests.fakes import FakeAsyncSession, FakeExecuteResult, FakeSessionMaker
+
+
+async def test_repositories_share_one_session_per_unit_of_work():
+    session = FakeAsyncSession([FakeExecuteResult(), FakeExecuteResult()])
+    session_maker = FakeSessionMaker(session)
+
+    async with UnitOfWork(session_maker) as uow:
+        await UserRepository(uow).set_timezone(123, "+3")
+        await UserRepository(uow).set_reminder_time(123, None)
+
+    assert session_maker.calls == 1
+    assert len(session.executed_statements) == 2
+    session.begin.assert_not_called()
+    session.commit.assert_awaited_once_with()
+    session.close.assert_awaited_once_with()
+
+
+async def test_unit_of_work_without_queries_does_not_open_session():
+    session_maker = FakeSessionMaker(FakeAsyncSession())
+
+    async with UnitOfWork(session_maker):
+        pass
+
+    assert session_maker.calls == 0
+
+
+async def test_unit_of_work_rolls_back_when_handler_fails():
+    session = FakeAsyncSession([FakeExecuteResult()])
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(FakeSessionMaker(session)) as uow:
+            async with uow() as shared:
+                await shared.execute(select(User))
+            raise RuntimeError("handler failed")
+
+    session.commit.assert_not_awaited()
+    session.rollback.assert_awaited_once_with()
+    session.close.assert_awaited_once_with()
+
+
+async def test_unit_of_work_rolls_back_and_reraises_failed_commit():
+    session = FakeAsyncSession([FakeExecuteResult()])
+    session.commit = AsyncMock(side_effect=SQLAlchemyError("serialization failure"))
+
+    with pytest.raises(SQLAlchemyError):
+        async with UnitOfWork(FakeSessionMaker(session)) as uow:
+            async with uow() as shared:
+                await shared.execute(select(User))
+
+    session.rollback.assert_awaited_once_with()
+    session.close.assert_awaited_once_with()
+
+
+async def test_savepoint_nests_in_shared_session_and_keeps_transaction():
+    session = FakeAsyncSession([FakeExecuteResult()])
+
+    async with UnitOfWork(FakeSessionMaker(session)) as uow:
+        with pytest.raises(RuntimeError):
+            async with uow.savepoint():
+                raise RuntimeError("duplicate word")
+        async with uow() as shared:
+            await shared.execute(select(User))
+
+    session.begin_nested.assert_called_once_with()
+    session.commit.assert_awaited_once_with()
+    session.rollback.assert_not_awaited()
+
+
+async def test_after_commit_callbacks_run_once_the_commit_succeeds():
+    session = FakeAsyncSession([FakeExecuteResult()])
+    events = []
+    session.commit = AsyncMock(side_effect=lambda: events.append("commit"))
+
+    async def refresh():
+        events.append("refresh")
+
+    async with UnitOfWork(FakeSessionMaker(session)) as uow:
+        async with uow() as shared:
+            await shared.execute(select(User))
+        await after_commit(uow, refresh)
+        await after_commit(uow, lambda: events.append("invalidate"))
+        assert events == []
+
+    assert events == ["commit", "refresh", "invalidate"]
+
+
+async def test_after_commit_callbacks_are_dropped_on_rollback():
+    session = FakeAsyncSession([FakeExecuteResult()])
+    callback = MagicMock()
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(FakeSessionMaker(session)) as uow:
+            async with uow() as shared:
+                await shared.execute(select(User))
+            uow.after_commit(callback)
+            raise RuntimeError("handler failed")
+
+    callback.assert_not_called()
+
+
+async def test_failing_after_commit_callback_does_not_fail_the_commit():
+    session = FakeAsyncSession([FakeExecuteResult()])
+    callback = MagicMock()
+
+    async with UnitOfWork(FakeSessionMaker(session)) as uow:
+        async with uow() as shared:
+            await shared.execute(select(User))
+        uow.after_commit(MagicMock(side_effect=ConnectionError("redis is down")))
+        uow.after_commit(callback)
+
+    session.commit.assert_awaited_once_with()
+    callback.assert_called_once_with()
+
+
+async def test_after_commit_without_unit_of_work_runs_right_away():
+    callback = AsyncMock()
+
+    await after_commit(None, callback)
+
+    callback.assert_awaited_once_with()
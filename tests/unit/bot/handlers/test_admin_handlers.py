@@ -1,8 +1,10 @@
 from datetime import date, datetime
+from io import BytesIO
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from aiogram.exceptions import TelegramBadRequest
+from sqlalchemy.exc import IntegrityError
 
 from bot.handlers import admin_handlers
 from bot.handlers.admin_handlers import (
@@ -19,12 +21,18 @@ from bot.handlers.admin_handlers import (
     admin_edit_sentence_testing,
     admin_edit_words,
     admin_exit,
+    admin_leaderboard_page,
+    admin_searching_user,
     admin_testing_management,
+    admin_users_page,
     admin_words_management,
     sure_delete_broadcast,
 )
 from bot.lexicon import AdminMenuButtons
+from bot.services.content_import import ImportReport
+from bot.services.user import UsersPage
 from bot.states import AdminFSM, UserFSM
+from tests.fakes import AsyncTransactionContext
 from tests.helpers import FakeCallback, FakeMessage, FakeState
 
 
@@ -33,6 +41,13 @@ def _message_admin_command():
     return next(h.callback for h in handlers if h.callback.__name__ == "admin_command")
 
 
+def _unit_of_work():
+    return SimpleNamespace(
+        savepoint=MagicMock(return_value=AsyncTransactionContext()),
+        commit=AsyncMock(),
+    )
+
+
 def _kb_patch():
     return patch(
         "bot.handlers.admin_handlers.keyboard_builder",
@@ -101,22 +116,117 @@ async def test_admin_testing_management_routes_crud_actions_to_expected_states()
         state.set_state.assert_awaited_once_with(expected_state)
 
 
-async def test_admin_adding_sentence_testing_parses_multiline_input():
+async def test_admin_adding_sentence_testing_imports_multiline_input():
     message = FakeMessage(text="He works=+=works\nShe runs=+=runs")
     state = FakeState({"admin_section": "Tenses", "admin_subsection": "Present Simple"})
-    testing_service = SimpleNamespace(add_testing_exercise=AsyncMock())
+    content_import_service = SimpleNamespace(
+        import_testing=AsyncMock(return_value=ImportReport(added=2))
+    )
+
+    unit_of_work = _unit_of_work()
 
     with _kb_patch():
-        await admin_adding_sentence_testing(message, state, testing_service)
+        await admin_adding_sentence_testing(
+            message, state, content_import_service, unit_of_work
+        )
 
-    assert testing_service.add_testing_exercise.await_count == 2
-    testing_service.add_testing_exercise.assert_any_await(
-        section="Tenses",
-        subsection="Present Simple",
-        test="He works",
-        answer="works",
+    content_import_service.import_testing.assert_awaited_once_with(
+        "Tenses", "Present Simple", ["He works=+=works", "She runs=+=runs"]
+    )
+    unit_of_work.commit.assert_awaited_once()
+    assert "2 упражнения" in message.answer.await_args.args[0]
+
+
+async def test_admin_adding_sentence_testing_asks_to_resend_when_commit_conflicts():
+    message = FakeMessage(text="He works=+=works")
+    state = FakeState({"admin_section": "Tenses", "admin_subsection": "Present Simple"})
+    content_import_service = SimpleNamespace(
+        import_testing=AsyncMock(return_value=ImportReport(added=1))
+    )
+    unit_of_work = _unit_of_work()
+    unit_of_work.commit.side_effect = IntegrityError(
+        "INSERT", {}, Exception("duplicate key")
     )
 
+    with _kb_patch():
+        await admin_adding_sentence_testing(
+            message, state, content_import_service, unit_of_work
+        )
+
+    message.answer.assert_awaited_once()
+    text = message.answer.await_args.args[0]
+    assert "ещё раз" in text
+    assert "Успешно" not in text
+
+
+async def test_admin_adding_sentence_testing_reads_uploaded_document():
+    message = FakeMessage()
+    message.document = SimpleNamespace(file_name="tests.tsv")
+    message.bot = SimpleNamespace(
+        download=AsyncMock(return_value=BytesIO("He works\tworks\n".encode()))
+    )
+    state = FakeState({"admin_section": "Tenses", "admin_subsection": "Present Simple"})
+    content_import_service = SimpleNamespace(
+        import_testing=AsyncMock(
+            return_value=ImportReport(added=0, errors=[(2, "нет разделителя")])
+        )
+    )
+
+    with _kb_patch():
+        await admin_adding_sentence_testing(
+            message, state, content_import_service, _unit_of_work()
+        )
+
+    message.bot.download.assert_awaited_once_with(message.document)
+    content_import_service.import_testing.assert_awaited_once_with(
+        "Tenses", "Present Simple", ["He works=+=works"]
+    )
+    assert "2: нет разделителя" in message.answer.await_args.args[0]
+
+
+async def test_admin_adding_sentence_testing_explains_encoding_of_unreadable_document():
+    message = FakeMessage()
+    message.document = SimpleNamespace(file_name="tests.csv")
+    message.bot = SimpleNamespace(
+        download=AsyncMock(return_value=BytesIO("Дом,house\n".encode("cp1251")))
+    )
+    state = FakeState({"admin_section": "Tenses", "admin_subsection": "Present Simple"})
+    content_import_service = SimpleNamespace(import_testing=AsyncMock())
+
+    with _kb_patch():
+        await admin_adding_sentence_testing(
+            message, state, content_import_service, _unit_of_work()
+        )
+
+    content_import_service.import_testing.assert_not_awaited()
+    text = message.answer.await_args.args[0]
+    assert "Не удалось прочитать файл" in text
+    assert "UTF-8" in text
+
+
+async def test_admin_adding_words_reports_failed_download():
+    message = FakeMessage()
+    message.document = SimpleNamespace(file_name="words.csv")
+    message.bot = SimpleNamespace(
+        download=AsyncMock(
+            side_effect=TelegramBadRequest(
+                method=MagicMock(), message="file is too big"
+            )
+        )
+    )
+    state = FakeState({"admin_section": "Vocabulary", "admin_subsection": "Travel"})
+    content_import_service = SimpleNamespace(import_words=AsyncMock())
+
+    with _kb_patch():
+        await admin_adding_words(
+            message, state, content_import_service, _unit_of_work()
+        )
+
+    content_import_service.import_words.assert_not_awaited()
+    text = message.answer.await_args.args[0]
+    assert "Не удалось скачать файл" in text
+    assert "UTF-8" in text
+
 
 async def test_admin_edit_sentence_testing_uses_selected_index_and_resets_state():
     message = FakeMessage(text="He runs=+=runs")
@@ -128,9 +238,10 @@ async def test_admin_edit_sentence_testing_uses_selected_index_and_resets_state(
         }
     )
     testing_service = SimpleNamespace(edit_testing_exercise=AsyncMock())
+    unit_of_work = _unit_of_work()
 
     with _kb_patch():
-        await admin_edit_sentence_testing(message, state, testing_service)
+        await admin_edit_sentence_testing(message, state, testing_service, unit_of_work)
 
     testing_service.edit_testing_exercise.assert_awaited_once_with(
         section="Tenses",
@@ -139,9 +250,32 @@ async def test_admin_edit_sentence_testing_uses_selected_index_and_resets_state(
         answer="runs",
         index=7,
     )
+    unit_of_work.savepoint.assert_called_once_with()
+    unit_of_work.commit.assert_awaited_once_with()
     state.set_state.assert_awaited_once_with(AdminFSM.default)
 
 
+async def test_admin_edit_sentence_testing_does_not_commit_failed_edit():
+    message = FakeMessage(text="He runs=+=runs")
+    state = FakeState(
+        {
+            "admin_section": "Tenses",
+            "admin_subsection": "Present Simple",
+            "index_testing_edit": 7,
+        }
+    )
+    testing_service = SimpleNamespace(
+        edit_testing_exercise=AsyncMock(side_effect=RuntimeError("no such exercise"))
+    )
+    unit_of_work = _unit_of_work()
+
+    with _kb_patch():
+        await admin_edit_sentence_testing(message, state, testing_service, unit_of_work)
+
+    unit_of_work.commit.assert_not_awaited()
+    assert "no such exercise" in message.answer.await_args.args[0]
+
+
 async def test_admin_deleting_sentence_testing_accepts_comma_separated_indexes():
     message = FakeMessage(text="1,2,3")
     state = FakeState({"admin_section": "Tenses", "admin_subsection": "Present Simple"})
@@ -176,6 +310,7 @@ async def test_admin_adding_words_to_user_parses_and_notifies_user():
         get_user=AsyncMock(return_value={"full_name": "John"})
     )
     learning_service = SimpleNamespace(admin_add_words_to_learning=AsyncMock())
+    unit_of_work = _unit_of_work()
 
     with (
         _kb_patch(),
@@ -187,13 +322,16 @@ async def test_admin_adding_words_to_user_parses_and_notifies_user():
             return_value=SimpleNamespace(russian="дом", english="house"),
         ),
     ):
-        await admin_adding_words_to_user(message, state, user_service, learning_service)
+        await admin_adding_words_to_user(
+            message, state, user_service, learning_service, unit_of_work
+        )
 
     learning_service.admin_add_words_to_learning.assert_awaited_once_with(
         user_id=555,
         russian="дом",
         english="house",
     )
+    unit_of_work.commit.assert_awaited_once_with()
     notify.assert_awaited_once()
 
 
@@ -216,24 +354,22 @@ async def test_admin_words_management_routes_crud_actions_to_expected_states():
         state.set_state.assert_awaited_once_with(expected_state)
 
 
-async def test_admin_adding_words_parses_multiline_input():
+async def test_admin_adding_words_imports_multiline_input():
     message = FakeMessage(text="дом=+=house\nкот=+=cat")
     state = FakeState({"admin_section": "Vocabulary", "admin_subsection": "Travel"})
-    new_words_service = SimpleNamespace(add_new_words_exercise=AsyncMock())
+    content_import_service = SimpleNamespace(
+        import_words=AsyncMock(return_value=ImportReport(added=2))
+    )
 
-    with (
-        _kb_patch(),
-        patch(
-            "bot.handlers.admin_handlers.check_line",
-            side_effect=[
-                SimpleNamespace(russian="дом", english="house"),
-                SimpleNamespace(russian="кот", english="cat"),
-            ],
-        ),
-    ):
-        await admin_adding_words(message, state, new_words_service)
+    unit_of_work = _unit_of_work()
+
+    with _kb_patch():
+        await admin_adding_words(message, state, content_import_service, unit_of_work)
 
-    assert new_words_service.add_new_words_exercise.await_count == 2
+    content_import_service.import_words.assert_awaited_once_with(
+        "Vocabulary", "Travel", ["дом=+=house", "кот=+=cat"]
+    )
+    unit_of_work.commit.assert_awaited_once()
 
 
 async def test_admin_edit_words_uses_selected_index_and_resets_state():
@@ -246,6 +382,7 @@ async def test_admin_edit_words_uses_selected_index_and_resets_state():
         }
     )
     new_words_service = SimpleNamespace(edit_new_words_exercise=AsyncMock())
+    unit_of_work = _unit_of_work()
 
     with (
         _kb_patch(),
@@ -254,7 +391,7 @@ async def test_admin_edit_words_uses_selected_index_and_resets_state():
             return_value=SimpleNamespace(russian="дом", english="house"),
         ),
     ):
-        await admin_edit_words(message, state, new_words_service)
+        await admin_edit_words(message, state, new_words_service, unit_of_work)
 
     new_words_service.edit_new_words_exercise.assert_awaited_once_with(
         section="Vocabulary",
@@ -263,6 +400,7 @@ async def test_admin_edit_words_uses_selected_index_and_resets_state():
         english="house",
         index=9,
     )
+    unit_of_work.commit.assert_awaited_once_with()
     state.set_state.assert_awaited_once_with(AdminFSM.default)
 
 
@@ -339,3 +477,85 @@ async def test_admin_activity_uses_injected_daily_statistics_service():
         end_date=today,
     )
     callback.message.answer.assert_awaited_once()
+
+
+async def test_admin_leaderboard_page_shows_requested_page_with_navigation():
+    callback = FakeCallback(data="leaderboard_page:50")
+    user = {
+        "rank": "51",
+        "user_id": "1",
+        "full_name": "One",
+        "tg_login": "one",
+        "points": "3",
+    }
+    user_progress_service = SimpleNamespace(
+        get_leaderboard_page=AsyncMock(return_value=([user], 120))
+    )
+
+    with _kb_patch() as keyboard_builder:
+        await admin_leaderboard_page(callback, user_progress_service)
+
+    user_progress_service.get_leaderboard_page.assert_awaited_once_with(
+        offset=50, medals_rank=True
+    )
+    text = callback.message.edit_text.await_args.args[0]
+    assert "(120)" in text
+    assert "One" in text
+    pages = keyboard_builder.await_args.kwargs
+    assert pages["leaderboard_page:0"] == AdminMenuButtons.PREV_PAGE
+    assert pages["leaderboard_page:100"] == AdminMenuButtons.NEXT_PAGE
+
+
+def _users_page(*ids, has_prev=False, has_next=False):
+    users = [
+        {"id": i, "user_id": 100 + i, "full_name": f"U{i}", "tg_login": f"u{i}"}
+        for i in ids
+    ]
+    return UsersPage(users=users, has_prev=has_prev, has_next=has_next)
+
+
+async def test_admin_users_page_goes_back_with_keyset_and_saved_query():
+    callback = FakeCallback(data="users_page:prev:21")
+    state = FakeState({"admin_users_query": "mark"})
+    user_service = SimpleNamespace(
+        get_users_page=AsyncMock(
+            return_value=_users_page(1, 2, has_prev=False, has_next=True)
+        )
+    )
+
+    with patch(
+        "bot.handlers.admin_handlers.keyboard_builder_users",
+        new=AsyncMock(return_value="kb"),
+    ) as keyboard_builder_users:
+        await admin_users_page(callback, state, user_service)
+
+    user_service.get_users_page.assert_awaited_once_with(
+        after_id=None, before_id=21, query="mark"
+    )
+    navigation = keyboard_builder_users.await_args.kwargs
+    assert navigation == {
+        "users_page:next:2": AdminMenuButtons.NEXT_PAGE,
+        "search_user": AdminMenuButtons.SEARCH_USER,
+    }
+    callback.message.edit_text.assert_awaited_once_with(
+        "Результаты поиска «mark»:", reply_markup="kb"
+    )
+
+
+async def test_admin_searching_user_saves_query_and_shows_first_page():
+    message = FakeMessage(text=" @mark ")
+    state = FakeState()
+    user_service = SimpleNamespace(get_users_page=AsyncMock(return_value=_users_page()))
+
+    with patch(
+        "bot.handlers.admin_handlers.keyboard_builder_users",
+        new=AsyncMock(return_value="kb"),
+    ):
+        await admin_searching_user(message, state, user_service)
+
+    assert (await state.get_data())["admin_users_query"] == "@mark"
+    user_service.get_users_page.assert_awaited_once_with(
+        after_id=None, before_id=None, query="@mark"
+    )
+    message.answer.assert_awaited_once_with("Никого не нашлось", reply_markup="kb")
+    state.set_state.assert_awaited_once_with(AdminFSM.see_user_management)
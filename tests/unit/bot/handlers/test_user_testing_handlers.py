@@ -1,6 +1,11 @@
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
+from bot.cache.testing_progress import (
+    PendingProgress,
+    TestingProgress as _TestingProgress,
+)
+from bot.db.unit_of_work import UnitOfWork
 from bot.handlers.user_testing_handlers import (
     choosing_section_testing,
     chose_subsection_testing,
@@ -9,7 +14,10 @@ from bot.handlers.user_testing_handlers import (
     start_again_testing,
 )
 from bot.lexicon import MessageTexts
+from bot.services.testing import TestingService as _TestingService
+from bot.services.user_progress import UserProgressService
 from bot.states import TestingFSM
+from tests.fakes import FakeAsyncSession, FakeRedis, FakeSessionMaker
 from tests.helpers import FakeCallback, FakeMessage, FakeState
 
 
@@ -49,9 +57,7 @@ async def test_chose_subsection_serves_exercise_and_saves_answer_state():
     testing_service = SimpleNamespace(
         get_random_testing_exercise=AsyncMock(return_value=("Q?", "answer", 5))
     )
-    user_progress_service = SimpleNamespace(
-        get_counts_completed_exercises_testing=AsyncMock()
-    )
+    user_progress_service = SimpleNamespace()
 
     await chose_subsection_testing(
         callback,
@@ -75,11 +81,10 @@ async def test_chose_subsection_renders_completion_when_no_exercises_left():
     callback = FakeCallback()
     state = FakeState({"section": "Grammar", "subsection": "Present Simple"})
     testing_service = SimpleNamespace(
-        get_random_testing_exercise=AsyncMock(return_value=None)
-    )
-    user_progress_service = SimpleNamespace(
-        get_counts_completed_exercises_testing=AsyncMock(return_value=(1, 2, 5))
+        get_random_testing_exercise=AsyncMock(return_value=None),
+        get_completion_counts=AsyncMock(return_value=(1, 2, 5)),
     )
+    user_progress_service = SimpleNamespace()
 
     with patch(
         "bot.handlers.user_testing_handlers.keyboard_builder",
@@ -105,7 +110,6 @@ async def test_in_process_accepts_correct_answer_ignoring_case_and_spaces():
     )
     user_progress_service = SimpleNamespace(
         mark_exercise_completed=AsyncMock(return_value=True),
-        get_counts_completed_exercises_testing=AsyncMock(),
     )
     daily_statistics_service = SimpleNamespace(update=AsyncMock())
 
@@ -169,11 +173,11 @@ async def test_in_process_reports_completion_after_last_correct_answer():
     message = FakeMessage(text="do not", user_id=123, username="test_user")
     state = make_state()
     testing_service = SimpleNamespace(
-        get_random_testing_exercise=AsyncMock(return_value=None)
+        get_random_testing_exercise=AsyncMock(return_value=None),
+        get_completion_counts=AsyncMock(return_value=(2, 4, 5)),
     )
     user_progress_service = SimpleNamespace(
         mark_exercise_completed=AsyncMock(return_value=False),
-        get_counts_completed_exercises_testing=AsyncMock(return_value=(2, 4, 5)),
     )
     daily_statistics_service = SimpleNamespace(update=AsyncMock())
 
@@ -194,7 +198,7 @@ async def test_in_process_reports_completion_after_last_correct_answer():
             daily_statistics_service,
         )
 
-    user_progress_service.get_counts_completed_exercises_testing.assert_awaited_once_with(
+    testing_service.get_completion_counts.assert_awaited_once_with(
         user_id=123,
         section="Grammar",
         subsection="Present Simple",
@@ -208,7 +212,6 @@ async def test_start_again_confirm_resets_progress_before_new_exercise():
     state = FakeState({"section": "Grammar", "subsection": "Present Simple"})
     user_progress_service = SimpleNamespace(
         delete_progress_by_subsection=AsyncMock(),
-        get_counts_completed_exercises_testing=AsyncMock(),
     )
     testing_service = SimpleNamespace(
         get_random_testing_exercise=AsyncMock(return_value=("Q?", "answer", 1))
@@ -242,9 +245,7 @@ async def test_see_answer_reveals_answer_then_serves_next_exercise():
             "current_answer": "do not",
         }
     )
-    user_progress_service = SimpleNamespace(
-        get_counts_completed_exercises_testing=AsyncMock(),
-    )
+    user_progress_service = SimpleNamespace()
     testing_service = SimpleNamespace(
         get_random_testing_exercise=AsyncMock(return_value=("Next?", "answer", 9))
     )
@@ -268,3 +269,62 @@ async def test_see_answer_reveals_answer_then_serves_next_exercise():
     sleep_mock.assert_awaited_once_with(3)
     assert "Правильный ответ" in callback.message.edit_text.await_args_list[0].args[0]
     callback.message.answer.assert_awaited_once_with("Next?")
+
+
+async def test_solving_last_exercise_reports_completion_before_commit():
+    message = FakeMessage(text="do not", user_id=123, username="test_user")
+    state = FakeState(
+        {
+            "section": "Grammar",
+            "subsection": "Present Simple",
+            "current_id": 2,
+            "current_answer": "Do not",
+        }
+    )
+    progress = _TestingProgress(FakeRedis())
+    await progress.fill_exercises("Grammar", "Present Simple", [1, 2], 0)
+    await progress.fill_user(123, "Grammar", "Present Simple", [(1, True)], 0)
+    daily_statistics_service = SimpleNamespace(update=AsyncMock())
+
+    with (
+        patch(
+            "bot.handlers.user_testing_handlers.keyboard_builder",
+            new=AsyncMock(return_value="kb"),
+        ),
+        patch(
+            "bot.handlers.user_testing_handlers.send_message_to_admin", new=AsyncMock()
+        ),
+    ):
+        async with UnitOfWork(FakeSessionMaker(FakeAsyncSession())) as uow:
+            pending_progress = PendingProgress()
+            await in_process_testing(
+                message,
+                state,
+                _TestingService(
+                    repository=SimpleNamespace(),
+                    progress=progress,
+                    unit_of_work=uow,
+                    pending_progress=pending_progress,
+                ),
+                UserProgressService(
+                    repository=SimpleNamespace(
+                        record_attempt=AsyncMock(
+                            return_value=SimpleNamespace(first_try=True, points=2)
+                        )
+                    ),
+                    testing_progress=progress,
+                    unit_of_work=uow,
+                    pending_progress=pending_progress,
+                ),
+                daily_statistics_service,
+            )
+            snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+
+    text = message.answer.await_args.args[0]
+    assert MessageTexts.ALL_EXERCISES_COMPLETED in text
+    assert "<b>2 из 2</b>" in text
+    assert "С первой попытки: <b>2</b>" in text
+    # the bitmaps themselves change only once the answer is committed
+    assert snapshot.done == {1}
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    assert snapshot.done == {1, 2}
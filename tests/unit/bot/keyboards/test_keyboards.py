@@ -62,7 +62,7 @@ async def test_keyboard_builder_words_learning_adds_answer_options_and_unknown_b
     ]
 
 
-async def test_keyboard_builder_users_adds_user_buttons_and_exit():
+async def test_keyboard_builder_users_adds_user_buttons_navigation_and_exit():
     users = (
         {
             "id": 1,
@@ -78,10 +78,13 @@ async def test_keyboard_builder_users_adds_user_buttons_and_exit():
         },
     )
 
-    markup = await keyboard_builder_users(users)
+    markup = await keyboard_builder_users(
+        users, **{"users_page:next:2": AdminMenuButtons.NEXT_PAGE}
+    )
 
     assert button_pairs(markup) == [
         ("1. @one [User One][123]", "123"),
         ("2. @two [User Two][456]", "456"),
+        (AdminMenuButtons.NEXT_PAGE, "users_page:next:2"),
         (AdminMenuButtons.EXIT, AdminMenuButtons.EXIT),
     ]
@@ -1,5 +1,8 @@
 from unittest.mock import AsyncMock, patch
 
+import pytest
+
+from bot.db.unit_of_work import UnitOfWork
 from bot.middlewares.services import ServicesMiddleware
 from bot.services.daily_statistics import DailyStatisticsService
 from bot.services.new_words import NewWordsService
@@ -7,6 +10,18 @@ from bot.services.testing import TestingService as _TestingService
 from bot.services.user import UserService
 from bot.services.user_progress import UserProgressService
 from bot.services.user_words_learning import UserWordsLearningService
+from tests.fakes import (
+    FakeAsyncSession,
+    FakeExecuteResult,
+    FakeRedis,
+    FakeSessionMaker,
+)
+
+
+@pytest.fixture(autouse=True)
+def redis():
+    with patch("bot.middlewares.services.get_redis", return_value=FakeRedis()):
+        yield
 
 
 async def test_services_middleware_injects_all_services_and_calls_handler():
@@ -22,6 +37,7 @@ async def test_services_middleware_injects_all_services_and_calls_handler():
 
     assert result == "handled"
     assert data["existing"] == "value"
+    assert isinstance(data["unit_of_work"], UnitOfWork)
     assert isinstance(data["testing_service"], _TestingService)
     assert isinstance(data["user_progress_service"], UserProgressService)
     assert isinstance(data["user_service"], UserService)
@@ -29,3 +45,38 @@ async def test_services_middleware_injects_all_services_and_calls_handler():
     assert isinstance(data["user_words_learning_service"], UserWordsLearningService)
     assert isinstance(data["daily_statistics_service"], DailyStatisticsService)
     handler.assert_awaited_once()
+
+
+async def test_services_middleware_commits_update_once_in_shared_session():
+    session = FakeAsyncSession([FakeExecuteResult(), FakeExecuteResult()])
+    session_maker = FakeSessionMaker(session)
+
+    async def handler(event, data):
+        await data["user_service"].set_timezone(123, "+3")
+        await data["user_service"].set_reminder_time(123, None)
+
+    with patch(
+        "bot.middlewares.services.get_session_maker", return_value=session_maker
+    ):
+        await ServicesMiddleware()(handler, event=object(), data={})
+
+    assert session_maker.calls == 1
+    session.commit.assert_awaited_once_with()
+
+
+async def test_services_middleware_rolls_back_when_handler_raises():
+    session = FakeAsyncSession([FakeExecuteResult()])
+
+    async def handler(event, data):
+        await data["user_service"].set_timezone(123, "+3")
+        raise RuntimeError("boom")
+
+    with patch(
+        "bot.middlewares.services.get_session_maker",
+        return_value=FakeSessionMaker(session),
+    ):
+        with pytest.raises(RuntimeError):
+            await ServicesMiddleware()(handler, event=object(), data={})
+
+    session.commit.assert_not_awaited()
+    session.rollback.assert_awaited_once_with()
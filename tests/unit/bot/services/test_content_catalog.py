@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from bot.services.content_catalog import ContentCatalog
+from tests.fakes import FakeRedis, row
+
+
+def make_repo():
+    return SimpleNamespace(
+        count_by_subsection=AsyncMock(
+            return_value=[
+                row(section="Grammar", subsection="Past Simple", count=4),
+                row(section="Grammar", subsection="Present Simple", count=5),
+                row(section="Vocabulary", subsection="Travel", count=8),
+            ]
+        )
+    )
+
+
+async def test_catalog_serves_navigation_from_one_load():
+    repo = make_repo()
+    catalog = ContentCatalog(lambda: repo, "testing", FakeRedis())
+
+    sections = await catalog.sections()
+    subsections = await catalog.subsections("Grammar")
+    count = await catalog.count("Grammar", "Present Simple")
+
+    assert sections == ["Grammar", "Vocabulary"]
+    assert subsections == ["Past Simple", "Present Simple"]
+    assert count == 5
+    assert await catalog.subsections("Unknown") == []
+    assert await catalog.count("Grammar", "Unknown") == 0
+    repo.count_by_subsection.assert_awaited_once_with()
+
+
+async def test_invalidate_reloads_on_next_read():
+    repo = make_repo()
+    catalog = ContentCatalog(lambda: repo, "testing", FakeRedis())
+    await catalog.ensure_loaded()
+
+    await catalog.invalidate()
+    await catalog.sections()
+
+    assert repo.count_by_subsection.await_count == 2
+
+
+async def test_catalog_reloads_after_refresh_interval():
+    repo = make_repo()
+    catalog = ContentCatalog(lambda: repo, "testing", FakeRedis())
+    catalog.REFRESH_SECONDS = 0
+    await catalog.ensure_loaded()
+
+    await catalog.sections()
+
+    assert repo.count_by_subsection.await_count == 2
+
+
+async def test_invalidation_in_one_process_reloads_the_others():
+    redis = FakeRedis()
+    repo = make_repo()
+    writer = ContentCatalog(lambda: repo, "testing", redis)
+    reader = ContentCatalog(lambda: repo, "testing", redis)
+    other = ContentCatalog(lambda: repo, "new_words", redis)
+    await reader.ensure_loaded()
+    await other.ensure_loaded()
+
+    await writer.invalidate()
+    await reader.sections()
+    await other.sections()
+
+    assert redis.data["catalog:testing:version"] == b"1"
+    assert repo.count_by_subsection.await_count == 3
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from bot.services.content_import import (
+    ContentImportService,
+    ImportReport,
+    document_lines,
+)
+
+
+def make_service():
+    new_words_repo = SimpleNamespace(add_exercises=AsyncMock())
+    testing_repo = SimpleNamespace(add_exercises=AsyncMock())
+    distractors = SimpleNamespace(invalidate=AsyncMock())
+    service = ContentImportService(
+        new_words_repository=new_words_repo,
+        testing_repository=testing_repo,
+        distractors=distractors,
+        words_catalog=SimpleNamespace(invalidate=AsyncMock()),
+        tests_catalog=SimpleNamespace(invalidate=AsyncMock()),
+    )
+    return service, new_words_repo, testing_repo, distractors
+
+
+async def test_import_words_inserts_valid_lines_at_once_and_reports_the_rest():
+    service, new_words_repo, _, distractors = make_service()
+
+    report = await service.import_words(
+        "Vocabulary",
+        "Travel",
+        ["Дом=+=House", "", "Train | Поезд", "no separator", "Дом=+=Дом"],
+    )
+
+    new_words_repo.add_exercises.assert_awaited_once_with(
+        "Vocabulary", "Travel", [("Дом", "House"), ("Поезд", "Train")]
+    )
+    assert report.added == 2
+    assert [number for number, _ in report.errors] == [4, 5]
+    distractors.invalidate.assert_called_once_with()
+
+
+async def test_import_words_rejects_too_long_fields():
+    service, new_words_repo, _, distractors = make_service()
+
+    report = await service.import_words("V", "T", ["Дом=+=" + "a" * 257])
+
+    assert report == ImportReport(added=0, errors=[(1, report.errors[0][1])])
+    assert "256" in report.errors[0][1]
+    new_words_repo.add_exercises.assert_awaited_once_with("V", "T", [])
+    distractors.invalidate.assert_not_called()
+
+
+async def test_import_testing_validates_separator_and_strips_nbsp():
+    service, _, testing_repo, _ = make_service()
+
+    report = await service.import_testing(
+        "Grammar",
+        "Present Simple",
+        ["She ___ tea=+=drinks\xa0", "broken line", "a=+=b=+=c", "=+=answer"],
+    )
+
+    testing_repo.add_exercises.assert_awaited_once_with(
+        "Grammar", "Present Simple", [("She ___ tea", "drinks")]
+    )
+    assert report.added == 1
+    assert [number for number, _ in report.errors] == [2, 3, 4]
+
+
+def test_document_lines_reads_csv_and_tsv_rows():
+    csv_data = '﻿Дом,House\n"Hello, world",Привет\nonly one\n'.encode()
+    tsv_data = "She ___ tea\tdrinks\n".encode()
+
+    assert document_lines(csv_data, "Words.CSV") == [
+        "Дом=+=House",
+        "Hello, world=+=Привет",
+        "only one",
+    ]
+    assert document_lines(tsv_data, "grammar.tsv") == ["She ___ tea=+=drinks"]
+
+
+def test_document_lines_reads_other_files_as_plain_lines():
+    assert document_lines("a=+=b\nc|d".encode(), "words.txt") == ["a=+=b", "c|d"]
@@ -2,63 +2,101 @@ from datetime import date
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
-from bot.services.daily_statistics import DailyStatisticsService
+from bot.services.daily_statistics import DailyStatisticsBuffer, DailyStatisticsService
+
+TODAY = date(2026, 4, 28)
 
 
 def make_repo(**overrides):
     defaults = {
-        "get_by_date": AsyncMock(return_value=object()),
-        "create_blank_for_date": AsyncMock(),
-        "increment_field": AsyncMock(),
+        "add_counts": AsyncMock(),
         "aggregate": AsyncMock(return_value={}),
     }
     defaults.update(overrides)
     return SimpleNamespace(**defaults)
 
 
+def make_service(repo):
+    return DailyStatisticsService(
+        repository=repo, buffer=DailyStatisticsBuffer(repository=repo)
+    )
+
+
 async def test_update_ignores_unknown_update_type():
     repo = make_repo()
-    service = DailyStatisticsService(repository=repo)
+    service = make_service(repo)
 
     await service.update("unknown")
+    await service._buffer.flush()
 
-    repo.get_by_date.assert_not_awaited()
-    repo.create_blank_for_date.assert_not_awaited()
-    repo.increment_field.assert_not_awaited()
+    repo.add_counts.assert_not_awaited()
 
 
-async def test_update_creates_missing_daily_row_before_incrementing():
-    repo = make_repo(get_by_date=AsyncMock(return_value=None))
-    service = DailyStatisticsService(repository=repo)
+async def test_update_buffers_without_touching_database():
+    repo = make_repo()
+    service = make_service(repo)
 
     await service.update("new_words")
-
-    repo.get_by_date.assert_awaited_once()
-    today = repo.get_by_date.await_args.args[0]
-    repo.create_blank_for_date.assert_awaited_once_with(today)
-    repo.increment_field.assert_awaited_once_with(today, "total_new_words")
-
-
-async def test_update_increments_existing_daily_row():
-    existing_stats = object()
-    repo = make_repo(get_by_date=AsyncMock(return_value=existing_stats))
-    service = DailyStatisticsService(repository=repo)
-
+    await service.update("new_words")
     await service.update("testing_exercises")
 
-    repo.create_blank_for_date.assert_not_awaited()
-    today = repo.get_by_date.await_args.args[0]
-    repo.increment_field.assert_awaited_once_with(today, "total_testing_exercises")
+    repo.add_counts.assert_not_awaited()
+    await service._buffer.flush()
+    repo.add_counts.assert_awaited_once()
+    day, counts = repo.add_counts.await_args.args
+    assert day == date.today()
+    assert counts == {"total_new_words": 2, "total_testing_exercises": 1}
 
 
-async def test_get_delegates_to_repository_aggregate():
+async def test_get_flushes_buffer_before_aggregating():
     start_date = date(2026, 1, 1)
     end_date = date(2026, 1, 31)
-    expected = {"total_new_words": 3}
+    expected = {"new_words": 3}
     repo = make_repo(aggregate=AsyncMock(return_value=expected))
-    service = DailyStatisticsService(repository=repo)
+    service = make_service(repo)
+    await service.update("new_user")
 
     result = await service.get(start_date, end_date)
 
     assert result == expected
+    repo.add_counts.assert_awaited_once()
     repo.aggregate.assert_awaited_once_with(start_date, end_date)
+
+
+async def test_flush_writes_one_upsert_per_day_and_empties_buffer():
+    repo = make_repo()
+    buffer = DailyStatisticsBuffer(repository=repo)
+    buffer.add(TODAY, "new_users")
+    buffer.add(date(2026, 4, 29), "new_users", 2)
+
+    await buffer.flush()
+    await buffer.flush()
+
+    assert [call.args for call in repo.add_counts.await_args_list] == [
+        (TODAY, {"new_users": 1}),
+        (date(2026, 4, 29), {"new_users": 2}),
+    ]
+
+
+async def test_flush_keeps_counts_when_write_fails():
+    repo = make_repo(add_counts=AsyncMock(side_effect=[RuntimeError("db down"), None]))
+    buffer = DailyStatisticsBuffer(repository=repo)
+    buffer.add(TODAY, "total_new_words")
+
+    await buffer.flush()
+    buffer.add(TODAY, "total_new_words")
+    await buffer.flush()
+
+    assert repo.add_counts.await_args.args == (TODAY, {"total_new_words": 2})
+
+
+async def test_stop_flushes_remaining_counts():
+    repo = make_repo()
+    buffer = DailyStatisticsBuffer(repository=repo)
+    buffer.start()
+    buffer.add(TODAY, "total_irregular_verbs")
+
+    await buffer.stop()
+
+    repo.add_counts.assert_awaited_once_with(TODAY, {"total_irregular_verbs": 1})
+    assert buffer._task is None
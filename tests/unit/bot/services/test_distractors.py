@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from bot.services.distractors import DistractorIndex
+from tests.fakes import FakeRedis, row
+
+
+def make_repo(words):
+    return SimpleNamespace(
+        list_russian_words=AsyncMock(
+            return_value=[
+                row(section=section, subsection=subsection, russian=russian)
+                for section, subsection, russian in words
+            ]
+        )
+    )
+
+
+WORDS = [
+    ("Vocabulary", "Travel", "дом"),
+    ("Vocabulary", "Travel", "поезд"),
+    ("Vocabulary", "Travel", "самолет"),
+    ("Vocabulary", "Travel", "корабль"),
+    ("Vocabulary", "Food", "яблоко"),
+    ("Vocabulary", "Food", "молоко"),
+    ("123", "123", "секрет"),
+]
+
+
+def first_draws(pool, k):
+    return list(pool[:k])
+
+
+async def test_sample_uses_same_subsection_pool_without_correct_answer():
+    index = DistractorIndex(repository=make_repo(WORDS), redis=FakeRedis())
+    await index.ensure_loaded()
+
+    with patch("bot.services.distractors.random.sample", side_effect=first_draws):
+        options = index.sample("Vocabulary", "Travel", exclude="Дом")
+
+    assert options == ["Поезд", "Самолет", "Корабль"]
+
+
+async def test_sample_falls_back_to_shared_pool_for_small_subsections():
+    index = DistractorIndex(repository=make_repo(WORDS), redis=FakeRedis())
+    await index.ensure_loaded()
+
+    options = index.sample("Vocabulary", "Food", exclude="Яблоко")
+
+    assert len(options) == 3
+    assert "Яблоко" not in options
+    assert "Секрет" not in options
+
+
+async def test_sample_returns_fewer_options_when_vocabulary_is_tiny():
+    index = DistractorIndex(repository=make_repo(WORDS[:2]), redis=FakeRedis())
+    await index.ensure_loaded()
+
+    assert index.sample("Vocabulary", "Travel", exclude="Дом") == ["Поезд"]
+
+
+async def test_sample_draws_only_a_few_positions_from_large_pools():
+    words = [("Vocabulary", "Big", f"слово{i}") for i in range(10_000)]
+    index = DistractorIndex(repository=make_repo(words), redis=FakeRedis())
+    await index.ensure_loaded()
+
+    with patch(
+        "bot.services.distractors.random.sample", side_effect=first_draws
+    ) as sample:
+        index.sample("Vocabulary", "Big", exclude="Слово0")
+
+    assert sample.call_args.kwargs == {"k": 4}
+
+
+async def test_ensure_loaded_reads_words_once_until_invalidated():
+    repo = make_repo(WORDS)
+    index = DistractorIndex(repository=repo, redis=FakeRedis())
+
+    await index.ensure_loaded()
+    await index.ensure_loaded()
+    await index.invalidate()
+    await index.ensure_loaded()
+
+    assert repo.list_russian_words.await_count == 2
+
+
+async def test_ensure_loaded_refreshes_after_ttl():
+    repo = make_repo(WORDS)
+    index = DistractorIndex(repository=repo, redis=FakeRedis())
+
+    with patch("bot.services.distractors.time.monotonic", return_value=0):
+        await index.ensure_loaded()
+    with patch(
+        "bot.services.distractors.time.monotonic",
+        return_value=DistractorIndex.REFRESH_SECONDS,
+    ):
+        await index.ensure_loaded()
+
+    assert repo.list_russian_words.await_count == 2
+
+
+async def test_invalidate_in_one_process_reloads_the_others():
+    redis = FakeRedis()
+    repo = make_repo(WORDS)
+    index = DistractorIndex(repository=repo, redis=redis)
+    other = DistractorIndex(repository=make_repo(WORDS), redis=redis)
+    await index.ensure_loaded()
+
+    await other.invalidate()
+    await index.ensure_loaded()
+    await index.ensure_loaded()
+
+    assert repo.list_russian_words.await_count == 2
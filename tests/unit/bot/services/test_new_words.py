@@ -1,9 +1,11 @@
 from types import SimpleNamespace
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 from bot.db.models import NewWords
+from bot.db.unit_of_work import UnitOfWork
 from bot.services.new_words import NewWordsService
 from tests.factories import build_new_word
+from tests.fakes import FakeAsyncSession, FakeSessionMaker
 
 
 def make_repo(**overrides):
@@ -20,9 +22,23 @@ def make_repo(**overrides):
     return SimpleNamespace(**defaults)
 
 
+def make_catalog(**overrides):
+    defaults = {
+        "subsections": AsyncMock(return_value=[]),
+        "count": AsyncMock(return_value=0),
+        "invalidate": AsyncMock(),
+    }
+    defaults.update(overrides)
+    return SimpleNamespace(**defaults)
+
+
 async def test_add_new_words_exercise_uses_next_id():
     repo = make_repo(get_max_exercise_id=AsyncMock(return_value=4))
-    service = NewWordsService(repository=repo)
+    service = NewWordsService(
+        repository=repo,
+        distractors=MagicMock(invalidate=AsyncMock()),
+        catalog=make_catalog(),
+    )
 
     await service.add_new_words_exercise(
         section="Vocabulary",
@@ -51,7 +67,7 @@ async def test_get_new_words_exercises_formats_text_and_casts_subsection():
             ]
         )
     )
-    service = NewWordsService(repository=repo)
+    service = NewWordsService(repository=repo, catalog=make_catalog())
 
     result = await service.get_new_words_exercises(123)
 
@@ -59,12 +75,13 @@ async def test_get_new_words_exercises_formats_text_and_casts_subsection():
     assert result == "1) поезд – train\n2) самолет – plane\n"
 
 
-async def test_count_and_subsections_delegate_to_repository():
-    repo = make_repo(
-        count_exercises=AsyncMock(return_value=8),
-        get_subsection_names=AsyncMock(return_value=["Travel"]),
+async def test_count_and_subsections_come_from_catalog():
+    repo = make_repo()
+    catalog = make_catalog(
+        count=AsyncMock(return_value=8),
+        subsections=AsyncMock(return_value=["Travel"]),
     )
-    service = NewWordsService(repository=repo)
+    service = NewWordsService(repository=repo, catalog=catalog)
 
     count = await service.get_count_new_words_exercises_in_subsection(
         "Vocabulary",
@@ -74,13 +91,35 @@ async def test_count_and_subsections_delegate_to_repository():
 
     assert count == 8
     assert subsections == ["Travel"]
-    repo.count_exercises.assert_awaited_once_with("Vocabulary", "Travel")
-    repo.get_subsection_names.assert_awaited_once_with("Vocabulary")
+    catalog.count.assert_awaited_once_with("Vocabulary", "Travel")
+    catalog.subsections.assert_awaited_once_with("Vocabulary")
+    repo.get_subsection_names.assert_not_awaited()
+
+
+async def test_personal_sections_bypass_catalog():
+    repo = make_repo(
+        count_exercises=AsyncMock(return_value=3),
+        get_subsection_names=AsyncMock(return_value=["123"]),
+    )
+    catalog = make_catalog()
+    service = NewWordsService(repository=repo, catalog=catalog)
+
+    count = await service.get_count_new_words_exercises_in_subsection("123", "123")
+    subsections = await service.get_subsection_names("123")
+
+    assert count == 3
+    assert subsections == ["123"]
+    catalog.count.assert_not_awaited()
+    catalog.subsections.assert_not_awaited()
 
 
 async def test_edit_and_delete_delegate_to_repository():
     repo = make_repo()
-    service = NewWordsService(repository=repo)
+    service = NewWordsService(
+        repository=repo,
+        distractors=MagicMock(invalidate=AsyncMock()),
+        catalog=make_catalog(),
+    )
 
     await service.edit_new_words_exercise(
         "Vocabulary",
@@ -99,3 +138,36 @@ async def test_edit_and_delete_delegate_to_repository():
         "ship",
     )
     repo.delete_exercise.assert_awaited_once_with("Vocabulary", "Travel", 2)
+
+
+async def test_content_changes_invalidate_distractor_index():
+    distractors = MagicMock(invalidate=AsyncMock())
+    service = NewWordsService(
+        repository=make_repo(), distractors=distractors, catalog=make_catalog()
+    )
+
+    await service.add_new_words_exercise("Vocabulary", "Travel", "поезд", "train")
+    await service.edit_new_words_exercise("Vocabulary", "Travel", "корабль", "ship", 2)
+    await service.delete_new_words_exercise("Vocabulary", "Travel", 2)
+
+    assert distractors.invalidate.call_count == 3
+
+
+async def test_indexes_are_invalidated_after_the_commit():
+    distractors = MagicMock(invalidate=AsyncMock())
+    catalog = make_catalog()
+    unit_of_work = UnitOfWork(FakeSessionMaker(FakeAsyncSession()))
+    service = NewWordsService(
+        repository=make_repo(),
+        distractors=distractors,
+        catalog=catalog,
+        unit_of_work=unit_of_work,
+    )
+
+    await service.delete_new_words_exercise("Vocabulary", "Travel", 2)
+    distractors.invalidate.assert_not_called()
+    catalog.invalidate.assert_not_awaited()
+
+    await unit_of_work.commit()
+    distractors.invalidate.assert_called_once_with()
+    catalog.invalidate.assert_awaited_once_with()
@@ -1,9 +1,11 @@
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
+from bot.cache.testing_progress import TestingProgress as _TestingProgress
 from bot.db.models import TestingExercise as _TestingExercise
 from bot.services.testing import TestingService as _TestingService
 from tests.factories import build_testing_exercise
+from tests.fakes import FakeRedis, row
 
 
 def make_repo(**overrides):
@@ -12,9 +14,9 @@ def make_repo(**overrides):
         "add_exercise": AsyncMock(),
         "list_exercises": AsyncMock(return_value=[]),
         "count_exercises": AsyncMock(return_value=0),
-        "get_available_exercises": AsyncMock(return_value=[]),
-        "get_section_names": AsyncMock(return_value=[]),
-        "get_subsection_names": AsyncMock(return_value=[]),
+        "get_exercise": AsyncMock(return_value=None),
+        "list_exercise_ids": AsyncMock(return_value=[]),
+        "list_solved": AsyncMock(return_value=[]),
         "update_exercise": AsyncMock(),
         "delete_exercise": AsyncMock(),
     }
@@ -22,9 +24,20 @@ def make_repo(**overrides):
     return SimpleNamespace(**defaults)
 
 
+def make_catalog(**overrides):
+    defaults = {
+        "sections": AsyncMock(return_value=[]),
+        "subsections": AsyncMock(return_value=[]),
+        "count": AsyncMock(return_value=0),
+        "invalidate": AsyncMock(),
+    }
+    defaults.update(overrides)
+    return SimpleNamespace(**defaults)
+
+
 async def test_add_testing_exercise_uses_next_id_and_strips_nbsp():
     repo = make_repo(get_max_exercise_id=AsyncMock(return_value=7))
-    service = _TestingService(repository=repo)
+    service = _TestingService(repository=repo, catalog=make_catalog())
 
     await service.add_testing_exercise(
         section="Grammar",
@@ -53,7 +66,7 @@ async def test_get_testing_exercises_formats_human_readable_text():
             ]
         )
     )
-    service = _TestingService(repository=repo)
+    service = _TestingService(repository=repo, catalog=make_catalog())
 
     result = await service.get_testing_exercises("Present Simple")
 
@@ -61,27 +74,35 @@ async def test_get_testing_exercises_formats_human_readable_text():
     assert result == "1) I .... Ответ: am\n\n2) He .... Ответ: is\n\n"
 
 
-async def test_get_random_testing_exercise_returns_none_when_empty():
-    repo = make_repo(get_available_exercises=AsyncMock(return_value=[]))
-    service = _TestingService(repository=repo)
+async def test_get_random_testing_exercise_returns_none_when_all_solved():
+    repo = make_repo(
+        list_exercise_ids=AsyncMock(return_value=[1, 2]),
+        list_solved=AsyncMock(
+            return_value=[
+                row(exercise_id=1, first_try=True),
+                row(exercise_id=2, first_try=False),
+            ]
+        ),
+    )
+    service = _TestingService(repository=repo, catalog=make_catalog())
 
     result = await service.get_random_testing_exercise("Grammar", "Past Simple", 123)
 
     assert result is None
-    repo.get_available_exercises.assert_awaited_once_with(
-        "Grammar",
-        "Past Simple",
-        123,
-    )
+    repo.list_solved.assert_awaited_once_with(123, "Grammar", "Past Simple")
+    repo.get_exercise.assert_not_awaited()
 
 
-async def test_get_random_testing_exercise_returns_selected_exercise():
-    first = build_testing_exercise(exercise_id=1, test="I ...", answer="am")
+async def test_get_random_testing_exercise_loads_chosen_unsolved_exercise():
     second = build_testing_exercise(exercise_id=2, test="He ...", answer="is")
-    repo = make_repo(get_available_exercises=AsyncMock(return_value=[first, second]))
-    service = _TestingService(repository=repo)
+    repo = make_repo(
+        list_exercise_ids=AsyncMock(return_value=[1, 2, 3]),
+        list_solved=AsyncMock(return_value=[row(exercise_id=1, first_try=True)]),
+        get_exercise=AsyncMock(return_value=second),
+    )
+    service = _TestingService(repository=repo, catalog=make_catalog())
 
-    with patch("bot.services.testing.random.choice", return_value=second):
+    with patch("bot.services.testing.random.choice", return_value=2) as choice:
         result = await service.get_random_testing_exercise(
             "Grammar",
             "Present Simple",
@@ -89,15 +110,61 @@ async def test_get_random_testing_exercise_returns_selected_exercise():
         )
 
     assert result == ("He ...", "is", 2)
+    choice.assert_called_once_with([2, 3])
+    repo.get_exercise.assert_awaited_once_with("Grammar", "Present Simple", 2)
+
+
+async def test_progress_bitmaps_are_built_once_then_answer_from_redis():
+    repo = make_repo(
+        list_exercise_ids=AsyncMock(return_value=[1, 2, 3]),
+        list_solved=AsyncMock(return_value=[row(exercise_id=1, first_try=True)]),
+    )
+    progress = _TestingProgress(FakeRedis())
+    service = _TestingService(
+        repository=repo, catalog=make_catalog(), progress=progress
+    )
+
+    assert await service.get_completion_counts(123, "Grammar", "Present Simple") == (
+        1,
+        1,
+        3,
+    )
+    await progress.mark_done(123, "Grammar", "Present Simple", 3, first_try=False)
+    counts = await service.get_completion_counts(123, "Grammar", "Present Simple")
+
+    assert counts == (1, 2, 3)
+    repo.list_exercise_ids.assert_awaited_once()
+    repo.list_solved.assert_awaited_once()
 
 
-async def test_count_and_names_delegate_to_repository():
+async def test_deleted_exercise_is_skipped_after_rebuilding_ids():
+    exercise = build_testing_exercise(exercise_id=3, test="We ...", answer="are")
     repo = make_repo(
-        count_exercises=AsyncMock(return_value=5),
-        get_section_names=AsyncMock(return_value=["Grammar"]),
-        get_subsection_names=AsyncMock(return_value=["Present Simple"]),
+        list_exercise_ids=AsyncMock(side_effect=[[2, 3], [3]]),
+        get_exercise=AsyncMock(side_effect=[None, exercise]),
+    )
+    progress = _TestingProgress(FakeRedis())
+    service = _TestingService(
+        repository=repo, catalog=make_catalog(), progress=progress
+    )
+
+    with patch("bot.services.testing.random.choice", side_effect=[2, 3]):
+        result = await service.get_random_testing_exercise(
+            "Grammar", "Present Simple", 123
+        )
+
+    assert result == ("We ...", "are", 3)
+    assert repo.list_exercise_ids.await_count == 2
+
+
+async def test_count_and_names_come_from_catalog():
+    repo = make_repo()
+    catalog = make_catalog(
+        count=AsyncMock(return_value=5),
+        sections=AsyncMock(return_value=["Grammar"]),
+        subsections=AsyncMock(return_value=["Present Simple"]),
     )
-    service = _TestingService(repository=repo)
+    service = _TestingService(repository=repo, catalog=catalog)
 
     count = await service.get_count_testing_exercises_in_subsection(
         "Grammar",
@@ -109,14 +176,24 @@ async def test_count_and_names_delegate_to_repository():
     assert count == 5
     assert sections == ["Grammar"]
     assert subsections == ["Present Simple"]
-    repo.count_exercises.assert_awaited_once_with("Grammar", "Present Simple")
-    repo.get_section_names.assert_awaited_once_with()
-    repo.get_subsection_names.assert_awaited_once_with("Grammar")
+    catalog.count.assert_awaited_once_with("Grammar", "Present Simple")
+    catalog.subsections.assert_awaited_once_with("Grammar")
+    repo.count_exercises.assert_not_awaited()
+
+
+async def test_add_and_delete_invalidate_catalog():
+    catalog = make_catalog()
+    service = _TestingService(repository=make_repo(), catalog=catalog)
+
+    await service.add_testing_exercise("Grammar", "Present Simple", "He works", "works")
+    await service.delete_testing_exercise("Grammar", "Present Simple", 1)
+
+    assert catalog.invalidate.call_count == 2
 
 
 async def test_edit_and_delete_delegate_to_repository():
     repo = make_repo()
-    service = _TestingService(repository=repo)
+    service = _TestingService(repository=repo, catalog=make_catalog())
 
     await service.edit_testing_exercise(
         "Grammar",
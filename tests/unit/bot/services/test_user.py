@@ -2,9 +2,11 @@ from datetime import datetime, time
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
+from bot.cache.leaderboard import Leaderboard
 from bot.db.models import User
 from bot.services.user import UserService
 from tests.factories import build_user
+from tests.fakes import FakeRedis
 
 
 def make_repo(**overrides):
@@ -15,7 +17,7 @@ def make_repo(**overrides):
         "delete_by_user_id": AsyncMock(),
         "set_timezone": AsyncMock(),
         "set_reminder_time": AsyncMock(),
-        "list_all": AsyncMock(return_value=[]),
+        "list_ids_page": AsyncMock(return_value=[]),
     }
     defaults.update(overrides)
     return SimpleNamespace(**defaults)
@@ -102,17 +104,51 @@ async def test_get_user_maps_model_to_dict():
     }
 
 
-async def test_get_all_users_maps_models_to_tuple_of_dicts():
-    user = build_user(user_id=123, full_name="Mark", tg_login="mark_login")
-    repo = make_repo(list_all=AsyncMock(return_value=[user]))
+def user_rows(*ids):
+    return [
+        SimpleNamespace(id=i, user_id=100 + i, full_name=f"U{i}", tg_login=f"u{i}")
+        for i in ids
+    ]
+
+
+async def test_get_users_page_first_page_detects_next_page():
+    repo = make_repo(list_page=AsyncMock(return_value=user_rows(1, 2, 3)))
+    service = UserService(repository=repo)
+
+    page = await service.get_users_page(limit=2)
+
+    assert [u["id"] for u in page.users] == [1, 2]
+    assert page.users[0] == {
+        "id": 1,
+        "user_id": 101,
+        "full_name": "U1",
+        "tg_login": "u1",
+    }
+    assert (page.has_prev, page.has_next) == (False, True)
+    repo.list_page.assert_awaited_once_with(
+        3, after_id=None, before_id=None, query=None
+    )
+
+
+async def test_get_users_page_last_page_after_id():
+    repo = make_repo(list_page=AsyncMock(return_value=user_rows(3)))
+    service = UserService(repository=repo)
+
+    page = await service.get_users_page(after_id=2, limit=2, query="u")
+
+    assert [u["id"] for u in page.users] == [3]
+    assert (page.has_prev, page.has_next) == (True, False)
+    repo.list_page.assert_awaited_once_with(3, after_id=2, before_id=None, query="u")
+
+
+async def test_get_users_page_backwards_drops_extra_leading_row():
+    repo = make_repo(list_page=AsyncMock(return_value=user_rows(1, 2, 3)))
     service = UserService(repository=repo)
 
-    result = await service.get_all_users()
+    page = await service.get_users_page(before_id=4, limit=2)
 
-    assert isinstance(result, tuple)
-    assert result[0]["user_id"] == 123
-    assert result[0]["full_name"] == "Mark"
-    repo.list_all.assert_awaited_once_with()
+    assert [u["id"] for u in page.users] == [2, 3]
+    assert (page.has_prev, page.has_next) == (True, True)
 
 
 async def test_get_user_info_text_returns_none_when_user_missing():
@@ -178,3 +214,27 @@ async def test_mutating_user_methods_delegate_to_repository():
     repo.delete_by_user_id.assert_awaited_once_with(123)
     repo.set_timezone.assert_awaited_once_with(123, "UTC")
     repo.set_reminder_time.assert_awaited_once_with(123, time(9, 30))
+
+
+async def test_get_user_ids_page_returns_id_pairs():
+    repo = make_repo(
+        list_ids_page=AsyncMock(return_value=[SimpleNamespace(id=11, user_id=123)])
+    )
+    service = UserService(repository=repo)
+
+    result = await service.get_user_ids_page(after_id=10, limit=500)
+
+    assert result == [(11, 123)]
+    repo.list_ids_page.assert_awaited_once_with(10, 500)
+
+
+async def test_add_and_delete_user_keep_leaderboard_in_sync():
+    repo = make_repo(get_by_user_id=AsyncMock(return_value=None))
+    leaderboard = Leaderboard(FakeRedis())
+    service = UserService(repository=repo, leaderboard=leaderboard)
+
+    await service.add_user(123, "Mark", "mark_login")
+    assert await leaderboard.page(0, 10) == [(123, 0)]
+
+    await service.delete_user(123)
+    assert await leaderboard.total() == 0
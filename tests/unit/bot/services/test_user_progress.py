@@ -2,9 +2,14 @@ from datetime import date, datetime
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
-from bot.db.models import UserProgress
+import pytest
+
+from bot.cache.leaderboard import Leaderboard
+from bot.cache.testing_progress import TestingProgress as _TestingProgress
+from bot.db.unit_of_work import UnitOfWork
 from bot.services.user_progress import UserProgressService
 from tests.factories import build_user
+from tests.fakes import FakeAsyncSession, FakeRedis, FakeSessionMaker
 
 
 class FixedDatetime(datetime):
@@ -13,27 +18,36 @@ class FixedDatetime(datetime):
         return cls(2026, 4, 28, 12, 0)
 
 
+def stream_rows(rows):
+    async def stream(*args, **kwargs):
+        for row in rows:
+            yield row
+
+    return stream
+
+
 def make_repo(**overrides):
     defaults = {
-        "update_progress_attempt": AsyncMock(return_value=0),
-        "update_user_points": AsyncMock(),
-        "add_progress_entry": AsyncMock(),
+        "record_attempt": AsyncMock(return_value=None),
         "delete_progress_by_subsection": AsyncMock(),
-        "count_success_testing": AsyncMock(return_value=0),
-        "count_testing_exercises_total": AsyncMock(return_value=0),
         "count_by_type_in_interval": AsyncMock(return_value=0),
         "get_user_points": AsyncMock(return_value=0),
         "count_users_with_points_greater": AsyncMock(return_value=0),
         "total_users": AsyncMock(return_value=0),
         "list_users_ordered_by_points": AsyncMock(return_value=[]),
+        "list_users_by_ids": AsyncMock(return_value=[]),
+        "stream_points": stream_rows([]),
     }
     defaults.update(overrides)
     return SimpleNamespace(**defaults)
 
 
-async def test_mark_exercise_completed_creates_progress_on_first_attempt():
-    repo = make_repo(update_progress_attempt=AsyncMock(return_value=0))
-    service = UserProgressService(repository=repo)
+async def test_mark_exercise_completed_records_attempt_in_one_call():
+    repo = make_repo(
+        record_attempt=AsyncMock(return_value=SimpleNamespace(first_try=True, points=7))
+    )
+    leaderboard = Leaderboard(FakeRedis())
+    service = UserProgressService(repository=repo, leaderboard=leaderboard)
 
     result = await service.mark_exercise_completed(
         user_id=123,
@@ -45,29 +59,24 @@ async def test_mark_exercise_completed_creates_progress_on_first_attempt():
     )
 
     assert result is True
-    repo.update_progress_attempt.assert_awaited_once_with(
+    repo.record_attempt.assert_awaited_once_with(
         123,
         "Testing",
         "Grammar",
         "Present Simple",
         5,
         True,
+        date.today(),
+    )
+    assert await leaderboard.page(0, 10) == [(123, 7)]
+
+
+async def test_mark_exercise_completed_reports_repeated_attempt():
+    repo = make_repo(
+        record_attempt=AsyncMock(
+            return_value=SimpleNamespace(first_try=False, points=6)
+        )
     )
-    repo.update_user_points.assert_awaited_once_with(123, 1)
-    repo.add_progress_entry.assert_awaited_once()
-    entry = repo.add_progress_entry.await_args.args[0]
-    assert isinstance(entry, UserProgress)
-    assert entry.user_id == 123
-    assert entry.exercise_type == "Testing"
-    assert entry.exercise_section == "Grammar"
-    assert entry.exercise_subsection == "Present Simple"
-    assert entry.exercise_id == 5
-    assert entry.attempts == 1
-    assert entry.success is True
-
-
-async def test_mark_exercise_completed_skips_entry_on_existing_progress():
-    repo = make_repo(update_progress_attempt=AsyncMock(return_value=1))
     service = UserProgressService(repository=repo)
 
     result = await service.mark_exercise_completed(
@@ -80,8 +89,6 @@ async def test_mark_exercise_completed_skips_entry_on_existing_progress():
     )
 
     assert result is False
-    repo.update_user_points.assert_awaited_once_with(123, -1)
-    repo.add_progress_entry.assert_not_awaited()
 
 
 async def test_delete_progress_by_subsection_delegates_to_repository():
@@ -97,38 +104,6 @@ async def test_delete_progress_by_subsection_delegates_to_repository():
     )
 
 
-async def test_get_counts_completed_exercises_testing_returns_counts():
-    repo = make_repo(
-        count_success_testing=AsyncMock(side_effect=[2, 4]),
-        count_testing_exercises_total=AsyncMock(return_value=10),
-    )
-    service = UserProgressService(repository=repo)
-
-    result = await service.get_counts_completed_exercises_testing(
-        123,
-        "Grammar",
-        "Present Simple",
-    )
-
-    assert result == (2, 4, 10)
-    repo.count_success_testing.assert_any_await(
-        123,
-        "Grammar",
-        "Present Simple",
-        first_try_only=True,
-    )
-    repo.count_success_testing.assert_any_await(
-        123,
-        "Grammar",
-        "Present Simple",
-        first_try_only=False,
-    )
-    repo.count_testing_exercises_total.assert_awaited_once_with(
-        "Grammar",
-        "Present Simple",
-    )
-
-
 async def test_get_activity_by_user_formats_known_interval(monkeypatch):
     monkeypatch.setattr("bot.services.user_progress.datetime", FixedDatetime)
     repo = make_repo(count_by_type_in_interval=AsyncMock(side_effect=[1, 2, 3]))
@@ -245,18 +220,22 @@ async def test_get_user_points_delegates_to_repository():
     repo.get_user_points.assert_awaited_once_with(123)
 
 
-async def test_get_all_users_ranks_and_points_maps_users():
+async def test_get_leaderboard_page_maps_users_from_database():
     users = [
         build_user(user_id=1, full_name="One", tg_login="one", points=30),
         build_user(user_id=2, full_name="Two", tg_login="two", points=20),
         build_user(user_id=3, full_name="Three", tg_login="three", points=10),
         build_user(user_id=4, full_name="Four", tg_login="four", points=5),
     ]
-    repo = make_repo(list_users_ordered_by_points=AsyncMock(return_value=users))
+    repo = make_repo(
+        list_users_ordered_by_points=AsyncMock(return_value=users),
+        total_users=AsyncMock(return_value=4),
+    )
     service = UserProgressService(repository=repo)
 
-    result = await service.get_all_users_ranks_and_points(medals_rank=True)
+    result, total = await service.get_leaderboard_page(medals_rank=True)
 
+    assert total == 4
     assert result == [
         {
             "rank": "🥇",
@@ -287,3 +266,136 @@ async def test_get_all_users_ranks_and_points_maps_users():
             "points": "5",
         },
     ]
+
+
+async def test_get_leaderboard_page_reads_ranks_from_leaderboard():
+    repo = make_repo(
+        stream_points=stream_rows(
+            [
+                SimpleNamespace(user_id=1, points=30),
+                SimpleNamespace(user_id=2, points=20),
+                SimpleNamespace(user_id=3, points=10),
+            ]
+        ),
+        list_users_by_ids=AsyncMock(
+            return_value=[
+                SimpleNamespace(user_id=2, full_name="Two", tg_login="two"),
+                SimpleNamespace(user_id=3, full_name="Three", tg_login="three"),
+            ]
+        ),
+    )
+    service = UserProgressService(repository=repo, leaderboard=Leaderboard(FakeRedis()))
+
+    result, total = await service.get_leaderboard_page(offset=1, limit=2)
+
+    assert total == 3
+    assert [(u["rank"], u["full_name"], u["points"]) for u in result] == [
+        ("2", "Two", "20"),
+        ("3", "Three", "10"),
+    ]
+    repo.list_users_by_ids.assert_awaited_once_with([2, 3])
+    repo.list_users_ordered_by_points.assert_not_awaited()
+
+
+async def test_get_user_rank_and_total_uses_leaderboard_and_shares_ties():
+    repo = make_repo(
+        stream_points=stream_rows(
+            [
+                SimpleNamespace(user_id=1, points=30),
+                SimpleNamespace(user_id=2, points=20),
+                SimpleNamespace(user_id=3, points=20),
+            ]
+        )
+    )
+    service = UserProgressService(repository=repo, leaderboard=Leaderboard(FakeRedis()))
+
+    assert await service.get_user_rank_and_total(3) == (2, 3)
+    assert await service.get_user_rank_and_total(1, medals_rank=True) == ("🥇", 3)
+    repo.count_users_with_points_greater.assert_not_awaited()
+
+
+async def test_get_user_rank_and_total_reads_database_when_rebuild_is_dropped():
+    leaderboard = Leaderboard(FakeRedis())
+
+    async def stream_points():
+        yield SimpleNamespace(user_id=1, points=30)
+        # an answer committed while the rows were read
+        await leaderboard.set_points(2, 40)
+
+    repo = make_repo(
+        stream_points=stream_points,
+        get_user_points=AsyncMock(return_value=30),
+        count_users_with_points_greater=AsyncMock(return_value=1),
+        total_users=AsyncMock(return_value=2),
+    )
+    service = UserProgressService(repository=repo, leaderboard=leaderboard)
+
+    assert await service.get_user_rank_and_total(1) == (2, 2)
+    assert not await leaderboard.is_built()
+
+
+async def test_get_user_rank_and_total_adds_unranked_user_to_leaderboard():
+    repo = make_repo(get_user_points=AsyncMock(return_value=0))
+    leaderboard = Leaderboard(FakeRedis())
+    service = UserProgressService(repository=repo, leaderboard=leaderboard)
+
+    result = await service.get_user_rank_and_total(123)
+
+    assert result == (1, 1)
+    assert await leaderboard.page(0, 10) == [(123, 0)]
+
+
+async def test_testing_answers_update_progress_bitmaps():
+    repo = make_repo(
+        record_attempt=AsyncMock(return_value=SimpleNamespace(first_try=True, points=1))
+    )
+    progress = _TestingProgress(FakeRedis())
+    await progress.fill_user(123, "Grammar", "Present Simple", [], 0)
+    service = UserProgressService(repository=repo, testing_progress=progress)
+
+    await service.mark_exercise_completed(
+        user_id=123,
+        exercise_type="Testing",
+        subsection="Present Simple",
+        section="Grammar",
+        exercise_id=5,
+        success=True,
+    )
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    await service.delete_progress_by_subsection(123, "Grammar", "Present Simple")
+
+    assert snapshot.done == {5}
+    assert snapshot.first_try == {5}
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    assert snapshot.done is None
+
+
+async def test_answer_reaches_progress_bitmaps_only_when_committed():
+    repo = make_repo(
+        record_attempt=AsyncMock(return_value=SimpleNamespace(first_try=True, points=1))
+    )
+    progress = _TestingProgress(FakeRedis())
+    await progress.fill_user(123, "Grammar", "Present Simple", [], 0)
+
+    async def answer(exercise_id):
+        async with UnitOfWork(FakeSessionMaker(FakeAsyncSession())) as uow:
+            service = UserProgressService(
+                repository=repo, testing_progress=progress, unit_of_work=uow
+            )
+            await service.mark_exercise_completed(
+                user_id=123,
+                exercise_type="Testing",
+                subsection="Present Simple",
+                section="Grammar",
+                exercise_id=exercise_id,
+                success=True,
+            )
+            if exercise_id == 4:
+                raise RuntimeError("reply failed")
+
+    with pytest.raises(RuntimeError):
+        await answer(4)
+    await answer(5)
+
+    snapshot = await progress.snapshot(123, "Grammar", "Present Simple")
+    assert snapshot.done == {5}
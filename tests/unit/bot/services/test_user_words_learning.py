@@ -1,31 +1,28 @@
-from datetime import date, timedelta
+from datetime import UTC, date, datetime
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from bot.cache.leaderboard import Leaderboard
+from bot.cache.review_queue import ReviewQueueCache
 from bot.db.models import NewWords, UserWordsLearning
+from bot.db.unit_of_work import UnitOfWork
 from bot.services.user_words_learning import UserWordsLearningService
-from tests.factories import build_new_word, build_user_word_learning
+from bot.services.utils import reminder_slots
+from tests.factories import build_new_word
+from tests.fakes import FakeAsyncSession, FakeRedis, FakeSessionMaker, row
 
 
 def make_repo(**overrides):
     defaults = {
-        "words_to_learn_today": AsyncMock(return_value=[]),
-        "all_words_by_section_subsection": AsyncMock(return_value=[]),
-        "all_words_by_user": AsyncMock(return_value=[]),
+        "due_words": AsyncMock(return_value=[]),
         "count_active_learning": AsyncMock(return_value=0),
         "count_learned": AsyncMock(return_value=0),
         "count_all_by_user": AsyncMock(return_value=0),
         "count_all_today_by_user": AsyncMock(return_value=0),
+        "count_due_in_reminder_slots": AsyncMock(return_value=[]),
         "distinct_subsections": AsyncMock(return_value=[]),
-        "count_learned_in_subsection": AsyncMock(return_value=0),
-        "count_active_in_subsection": AsyncMock(return_value=0),
-        "count_today_in_subsection": AsyncMock(return_value=0),
-        "count_total_in_subsection": AsyncMock(return_value=0),
-        "sum_success_in_subsection": AsyncMock(return_value=0),
-        "sum_attempts_in_subsection": AsyncMock(return_value=0),
-        "learning_info": AsyncMock(return_value=None),
-        "update_user_points": AsyncMock(),
-        "update_learning_progress": AsyncMock(),
+        "subsection_stats": AsyncMock(return_value=[]),
+        "record_answer": AsyncMock(return_value=1),
         "list_new_words": AsyncMock(return_value=[]),
         "add_user_words_learning_entries": AsyncMock(),
         "max_custom_word_id": AsyncMock(return_value=0),
@@ -36,66 +33,50 @@ def make_repo(**overrides):
     return SimpleNamespace(**defaults)
 
 
-def learning_entry(
+def due_word(
     *,
     exercise_id: int,
     russian: str,
     english: str,
     section: str = "Vocabulary",
     subsection: str = "Travel",
-    success: int = 0,
-    attempts: int = 0,
-) -> UserWordsLearning:
-    word = build_new_word(
+):
+    return row(
         section=section,
         subsection=subsection,
         exercise_id=exercise_id,
         russian=russian,
         english=english,
     )
-    return build_user_word_learning(
-        section=section,
-        subsection=subsection,
-        exercise_id=exercise_id,
-        success=success,
-        attempts=attempts,
-        new_word=word,
+
+
+def make_distractors(options=("Поезд", "Самолет", "Корабль")):
+    return SimpleNamespace(
+        ensure_loaded=AsyncMock(),
+        sample=MagicMock(return_value=list(options)),
+        invalidate=AsyncMock(),
     )
 
 
 async def test_get_random_word_exercise_returns_none_when_no_words_today():
-    repo = make_repo(words_to_learn_today=AsyncMock(return_value=[]))
-    service = UserWordsLearningService(repository=repo)
+    repo = make_repo(due_words=AsyncMock(return_value=[]))
+    distractors = make_distractors()
+    service = UserWordsLearningService(repository=repo, distractors=distractors)
 
     result = await service.get_random_word_exercise(123)
 
     assert result is None
-    repo.words_to_learn_today.assert_awaited_once_with(123)
-    repo.all_words_by_section_subsection.assert_not_awaited()
+    repo.due_words.assert_awaited_once_with(123, date.today())
+    distractors.ensure_loaded.assert_not_awaited()
 
 
-async def test_get_random_word_exercise_uses_same_subsection_options():
-    target = learning_entry(exercise_id=1, russian="дом", english="house")
-    same_subsection_words = [
-        target,
-        learning_entry(exercise_id=2, russian="поезд", english="train"),
-        learning_entry(exercise_id=3, russian="самолет", english="plane"),
-        learning_entry(exercise_id=4, russian="корабль", english="ship"),
-    ]
-    repo = make_repo(
-        words_to_learn_today=AsyncMock(return_value=[target]),
-        all_words_by_section_subsection=AsyncMock(return_value=same_subsection_words),
-    )
-    service = UserWordsLearningService(repository=repo)
+async def test_get_random_word_exercise_samples_options_from_distractor_index():
+    target = due_word(exercise_id=1, russian="дом", english="house")
+    repo = make_repo(due_words=AsyncMock(return_value=[target]))
+    distractors = make_distractors()
+    service = UserWordsLearningService(repository=repo, distractors=distractors)
 
-    with (
-        patch("bot.services.user_words_learning.random.choice", return_value=target),
-        patch(
-            "bot.services.user_words_learning.random.sample",
-            side_effect=lambda options, k: options[:k],
-        ),
-    ):
-        result = await service.get_random_word_exercise(123)
+    result = await service.get_random_word_exercise(123)
 
     assert result == {
         "russian": "Дом",
@@ -105,49 +86,107 @@ async def test_get_random_word_exercise_uses_same_subsection_options():
         "exercise_id": 1,
         "options": ["Поезд", "Самолет", "Корабль"],
     }
-    repo.all_words_by_user.assert_not_awaited()
+    distractors.ensure_loaded.assert_awaited_once_with()
+    distractors.sample.assert_called_once_with("Vocabulary", "Travel", exclude="Дом")
 
 
-async def test_get_random_word_exercise_falls_back_to_all_user_words():
-    target = learning_entry(exercise_id=1, russian="дом", english="house")
-    same_subsection_words = [
-        target,
-        learning_entry(exercise_id=2, russian="поезд", english="train"),
+async def test_get_random_word_exercise_builds_review_queue_once():
+    words = [
+        due_word(exercise_id=1, russian="дом", english="house"),
+        due_word(exercise_id=2, russian="поезд", english="train"),
     ]
-    all_words = same_subsection_words + [
-        learning_entry(
-            exercise_id=3,
-            russian="яблоко",
-            english="apple",
-            section="Vocabulary",
-            subsection="Food",
-        ),
-        learning_entry(
-            exercise_id=4,
-            russian="молоко",
-            english="milk",
-            section="Vocabulary",
-            subsection="Food",
-        ),
+    repo = make_repo(due_words=AsyncMock(return_value=words))
+    queue = ReviewQueueCache(FakeRedis())
+    service = UserWordsLearningService(
+        repository=repo, review_queue=queue, distractors=make_distractors(["Лес"])
+    )
+
+    with patch("bot.services.user_words_learning.random.shuffle"):
+        first = await service.get_random_word_exercise(123)
+        second = await service.get_random_word_exercise(123)
+
+    assert first["exercise_id"] == 1
+    assert first["options"] == ["Лес"]
+    assert second == first
+    repo.due_words.assert_awaited_once_with(123, date.today())
+    assert await service.get_count_all_exercises_for_today_by_user(123) == 2
+    repo.count_all_today_by_user.assert_not_awaited()
+
+
+async def test_set_progress_pops_answered_word_from_review_queue():
+    words = [
+        due_word(exercise_id=1, russian="дом", english="house"),
+        due_word(exercise_id=2, russian="поезд", english="train"),
     ]
+    repo = make_repo(due_words=AsyncMock(return_value=words))
+    queue = ReviewQueueCache(FakeRedis())
+    service = UserWordsLearningService(
+        repository=repo, review_queue=queue, distractors=make_distractors()
+    )
+
+    with patch("bot.services.user_words_learning.random.shuffle"):
+        await service.get_random_word_exercise(123)
+    await service.set_progress(123, "Vocabulary", "Travel", 1, success=False)
+    next_exercise = await service.get_random_word_exercise(123)
+    await service.set_progress(123, "Vocabulary", "Travel", 2, success=True)
+
+    assert next_exercise["exercise_id"] == 2
+    assert await service.get_random_word_exercise(123) is None
+    assert await service.get_count_all_exercises_for_today_by_user(123) == 0
+    repo.due_words.assert_awaited_once_with(123, date.today())
+
+
+async def test_add_words_to_learning_invalidates_review_queue():
     repo = make_repo(
-        words_to_learn_today=AsyncMock(return_value=[target]),
-        all_words_by_section_subsection=AsyncMock(return_value=same_subsection_words),
-        all_words_by_user=AsyncMock(return_value=all_words),
+        list_new_words=AsyncMock(return_value=[build_new_word(exercise_id=1)]),
+    )
+    queue = ReviewQueueCache(FakeRedis())
+    service = UserWordsLearningService(
+        repository=repo, review_queue=queue, distractors=make_distractors()
+    )
+
+    assert await service.get_random_word_exercise(123) is None
+    await service.add_words_to_learning("Vocabulary", "Travel", 123)
+    await service.get_random_word_exercise(123)
+
+    assert repo.due_words.await_count == 2
+
+
+async def test_review_queue_is_dropped_only_when_new_words_are_committed():
+    repo = make_repo(
+        list_new_words=AsyncMock(return_value=[build_new_word(exercise_id=1)]),
+    )
+    queue = ReviewQueueCache(FakeRedis())
+    await queue.fill(123, date.today(), [])
+
+    async with UnitOfWork(FakeSessionMaker(FakeAsyncSession())) as uow:
+        service = UserWordsLearningService(
+            repository=repo,
+            review_queue=queue,
+            distractors=make_distractors(),
+            unit_of_work=uow,
+        )
+        await service.add_words_to_learning("Vocabulary", "Travel", 123)
+        assert await queue.is_built(123, date.today())
+
+    assert not await queue.is_built(123, date.today())
+
+
+async def test_get_due_counts_to_remind_maps_grouped_rows_by_user():
+    repo = make_repo(
+        count_due_in_reminder_slots=AsyncMock(
+            return_value=[row(user_id=123, due=4), row(user_id=456, due=1)]
+        )
     )
     service = UserWordsLearningService(repository=repo)
+    minute = datetime(2026, 5, 1, 6, 30, tzinfo=UTC)
 
-    with (
-        patch("bot.services.user_words_learning.random.choice", return_value=target),
-        patch(
-            "bot.services.user_words_learning.random.sample",
-            side_effect=lambda options, k: options[:k],
-        ),
-    ):
-        result = await service.get_random_word_exercise(123)
+    result = await service.get_due_counts_to_remind(minute)
 
-    assert result["options"] == ["Поезд", "Яблоко", "Молоко"]
-    repo.all_words_by_user.assert_awaited_once_with(123)
+    assert result == {123: 4, 456: 1}
+    repo.count_due_in_reminder_slots.assert_awaited_once_with(
+        reminder_slots(minute), date.today()
+    )
 
 
 async def test_get_added_subsections_by_user_delegates_to_repo():
@@ -183,13 +222,28 @@ async def test_count_methods_delegate_with_learning_rates():
 
 async def test_get_user_stats_calculates_success_rate():
     repo = make_repo(
-        distinct_subsections=AsyncMock(return_value=["Travel", "Food"]),
-        count_learned_in_subsection=AsyncMock(side_effect=[1, 0]),
-        count_active_in_subsection=AsyncMock(side_effect=[2, 3]),
-        count_today_in_subsection=AsyncMock(side_effect=[4, 5]),
-        count_total_in_subsection=AsyncMock(side_effect=[10, 12]),
-        sum_success_in_subsection=AsyncMock(side_effect=[3, 0]),
-        sum_attempts_in_subsection=AsyncMock(side_effect=[6, 0]),
+        subsection_stats=AsyncMock(
+            return_value=[
+                row(
+                    subsection="Travel",
+                    learned=1,
+                    active=2,
+                    today=4,
+                    total=10,
+                    success=3,
+                    attempts=6,
+                ),
+                row(
+                    subsection="Food",
+                    learned=0,
+                    active=3,
+                    today=5,
+                    total=12,
+                    success=0,
+                    attempts=0,
+                ),
+            ]
+        )
     )
     service = UserWordsLearningService(repository=repo)
 
@@ -211,47 +265,52 @@ async def test_get_user_stats_calculates_success_rate():
             "success_rate": 0,
         },
     }
+    repo.subsection_stats.assert_awaited_once_with(123, 3, 5)
 
 
-async def test_set_progress_skips_writes_when_learning_info_missing():
-    repo = make_repo(learning_info=AsyncMock(return_value=None))
+async def test_set_progress_success_records_answer_in_one_repository_call():
+    repo = make_repo()
     service = UserWordsLearningService(repository=repo)
 
     await service.set_progress(123, "Vocabulary", "Travel", 1, success=True)
 
-    repo.update_user_points.assert_not_awaited()
-    repo.update_learning_progress.assert_not_awaited()
+    repo.record_answer.assert_awaited_once_with(
+        123, "Vocabulary", "Travel", 1, True, date.today()
+    )
 
 
-async def test_set_progress_success_increments_points_and_success_count():
-    info = learning_entry(exercise_id=1, russian="дом", english="house", success=1)
-    repo = make_repo(learning_info=AsyncMock(return_value=info))
-    service = UserWordsLearningService(repository=repo)
+async def test_set_progress_writes_new_points_to_leaderboard():
+    repo = make_repo(record_answer=AsyncMock(return_value=12))
+    leaderboard = Leaderboard(FakeRedis())
+    service = UserWordsLearningService(repository=repo, leaderboard=leaderboard)
 
     await service.set_progress(123, "Vocabulary", "Travel", 1, success=True)
 
-    repo.update_user_points.assert_awaited_once_with(123, 1)
-    repo.update_learning_progress.assert_awaited_once()
-    args = repo.update_learning_progress.await_args.args
-    assert args[:4] == ("Vocabulary", "Travel", 1, 2)
-    assert isinstance(args[4], date)
-    assert args[4] >= date.today() + timedelta(days=1)
+    assert await leaderboard.page(0, 10) == [(123, 12)]
 
 
-async def test_set_progress_failure_decrements_points_and_reviews_tomorrow():
-    info = learning_entry(exercise_id=1, russian="дом", english="house", success=1)
-    repo = make_repo(learning_info=AsyncMock(return_value=info))
+async def test_set_progress_writes_points_only_when_committed():
+    repo = make_repo(record_answer=AsyncMock(return_value=12))
+    leaderboard = Leaderboard(FakeRedis())
+
+    async with UnitOfWork(FakeSessionMaker(FakeAsyncSession())) as uow:
+        service = UserWordsLearningService(
+            repository=repo, leaderboard=leaderboard, unit_of_work=uow
+        )
+        await service.set_progress(123, "Vocabulary", "Travel", 1, success=True)
+        assert await leaderboard.page(0, 10) == []
+
+    assert await leaderboard.page(0, 10) == [(123, 12)]
+
+
+async def test_set_progress_failure_records_failed_answer():
+    repo = make_repo()
     service = UserWordsLearningService(repository=repo)
 
     await service.set_progress(123, "Vocabulary", "Travel", 1, success=False)
 
-    repo.update_user_points.assert_awaited_once_with(123, -1)
-    repo.update_learning_progress.assert_awaited_once_with(
-        "Vocabulary",
-        "Travel",
-        1,
-        1,
-        date.today() + timedelta(days=1),
+    repo.record_answer.assert_awaited_once_with(
+        123, "Vocabulary", "Travel", 1, False, date.today()
     )
 
 
@@ -285,7 +344,8 @@ async def test_add_words_to_learning_creates_entries_for_new_words():
 
 async def test_admin_add_words_to_learning_creates_custom_word_and_entry():
     repo = make_repo(max_custom_word_id=AsyncMock(return_value=4))
-    service = UserWordsLearningService(repository=repo)
+    distractors = make_distractors()
+    service = UserWordsLearningService(repository=repo, distractors=distractors)
 
     await service.admin_add_words_to_learning("дом", "house", 123)
 
@@ -305,3 +365,4 @@ async def test_admin_add_words_to_learning_creates_custom_word_and_entry():
     assert entry.section == "123"
     assert entry.subsection == "123"
     assert entry.exercise_id == 5
+    distractors.invalidate.assert_called_once_with()
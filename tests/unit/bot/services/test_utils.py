@@ -1,11 +1,13 @@
-from datetime import date, timedelta
+from datetime import UTC, date, datetime, time, timedelta
 
 import pytest
 
 from bot.services.utils import (
+    MAX_INTERVAL_DAYS,
     calculate_next_interval,
     calculate_next_review_date,
     calculate_success_rate,
+    reminder_slots,
 )
 
 
@@ -39,3 +41,21 @@ def test_calculate_next_review_date_never_returns_today_or_past():
     result = calculate_next_review_date(success_attempts=0, total_attempts=10)
 
     assert result >= date.today() + timedelta(days=1)
+
+
+def test_calculate_next_review_date_caps_interval():
+    result = calculate_next_review_date(success_attempts=100, total_attempts=100)
+
+    assert result == date.today() + timedelta(days=MAX_INTERVAL_DAYS)
+
+
+def test_reminder_slots_convert_utc_minute_to_local_time_per_offset():
+    slots = reminder_slots(datetime(2026, 5, 1, 6, 30, 15, tzinfo=UTC))
+
+    assert (time(9, 30), "+3") in slots
+    assert (time(9, 30), "3") in slots
+    assert (time(4, 30), "-2") in slots
+    assert (time(6, 30), "+0") in slots
+    assert (time(18, 30), "+12") in slots
+    assert (time(18, 30), "-12") in slots
+    assert len(slots) == 25 + 13  # unsigned spellings of 0..+12
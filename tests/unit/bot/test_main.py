@@ -1,6 +1,9 @@
+from contextlib import ExitStack
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
 from bot import main
 
 
@@ -11,15 +14,45 @@ class DummyDispatcher:
             middleware=SimpleNamespace(register=MagicMock()),
         )
         self.include_routers = MagicMock()
+        self.resolve_used_update_types = MagicMock(
+            return_value=["message", "callback_query"]
+        )
+
+
+def startup_patches(stack: ExitStack, bot) -> None:
+    for target, kwargs in {
+        "bot.main.init_async_session": {},
+        "bot.main.init_redis": {"return_value": object()},
+        "bot.main.HashRedisStorage": {"return_value": object()},
+        "bot.main.init_bot_instance": {"new": AsyncMock()},
+        "bot.main.get_bot_instance": {"new": AsyncMock(return_value=bot)},
+        "bot.main.Dispatcher": {"new": DummyDispatcher},
+        "bot.main.ServicesMiddleware": {"return_value": object()},
+        "bot.main.ErrorHandlingMiddleware": {"return_value": object()},
+        "bot.main.set_main_menu": {"new": AsyncMock()},
+        "bot.main.scheduler": {},
+        "bot.main.reminder_dispatcher": {},
+        "bot.main.daily_statistics_buffer": {},
+        "bot.main.schedule_reminders": {"new": AsyncMock()},
+        "bot.main.scheduler_leadership": {},
+        "bot.main.broadcast_job_store": {},
+        "bot.main.testing_catalog": {"new": MagicMock(ensure_loaded=AsyncMock())},
+        "bot.main.new_words_catalog": {"new": MagicMock(ensure_loaded=AsyncMock())},
+        "bot.main.send_message_to_admin": {"new": AsyncMock()},
+    }.items():
+        stack.enter_context(patch(target, **kwargs))
 
 
 async def test_startup_logs_reminder_scheduling_error_and_continues():
     bot = SimpleNamespace(delete_webhook=AsyncMock())
     scheduler = SimpleNamespace(start=MagicMock())
+    testing_catalog = SimpleNamespace(ensure_loaded=AsyncMock())
+    new_words_catalog = SimpleNamespace(ensure_loaded=AsyncMock())
 
     with (
         patch("bot.main.init_async_session") as init_async_session,
-        patch("bot.main.RedisStorage.from_url", return_value=object()),
+        patch("bot.main.init_redis", return_value=object()),
+        patch("bot.main.HashRedisStorage", return_value=object()),
         patch("bot.main.init_bot_instance", new=AsyncMock()),
         patch("bot.main.get_bot_instance", new=AsyncMock(return_value=bot)),
         patch("bot.main.Dispatcher", new=DummyDispatcher),
@@ -27,10 +60,15 @@ async def test_startup_logs_reminder_scheduling_error_and_continues():
         patch("bot.main.ErrorHandlingMiddleware", return_value=object()),
         patch("bot.main.set_main_menu", new=AsyncMock()),
         patch("bot.main.scheduler", new=scheduler),
+        patch("bot.main.reminder_dispatcher") as reminder_dispatcher,
+        patch("bot.main.daily_statistics_buffer") as daily_statistics_buffer,
         patch(
             "bot.main.schedule_reminders",
             new=AsyncMock(side_effect=RuntimeError("users table missing")),
         ),
+        patch("bot.main.scheduler_leadership") as scheduler_leadership,
+        patch("bot.main.testing_catalog", new=testing_catalog),
+        patch("bot.main.new_words_catalog", new=new_words_catalog),
         patch("bot.main.send_message_to_admin", new=AsyncMock()),
         patch("bot.main.logger") as logger,
     ):
@@ -39,7 +77,187 @@ async def test_startup_logs_reminder_scheduling_error_and_continues():
     assert startup_bot is bot
     assert isinstance(dispatcher, DummyDispatcher)
     init_async_session.assert_called_once()
-    scheduler.start.assert_called_once()
+    scheduler.start.assert_called_once_with(paused=True)
+    reminder_dispatcher.start.assert_called_once_with()
+    daily_statistics_buffer.start.assert_called_once_with()
+    scheduler_leadership.start.assert_called_once_with()
+    testing_catalog.ensure_loaded.assert_awaited_once_with()
+    new_words_catalog.ensure_loaded.assert_awaited_once_with()
     logger.exception.assert_called_once_with(
         "Failed to schedule reminders during startup"
     )
+
+
+def test_build_dispatcher_wraps_services_in_error_handling():
+    errors, services = object(), object()
+
+    with (
+        patch("bot.main.Dispatcher", new=DummyDispatcher),
+        patch("bot.main.ErrorHandlingMiddleware", return_value=errors),
+        patch("bot.main.ServicesMiddleware", return_value=services),
+    ):
+        dispatcher = main.build_dispatcher(storage := object())
+
+    assert dispatcher.storage is storage
+    assert [
+        call.args[0] for call in dispatcher.update.middleware.register.call_args_list
+    ] == [errors, services]
+    routers = dispatcher.include_routers.call_args.args
+    assert routers[0] is main.user_commands_router
+    assert routers[-1] is main.fallback_router
+
+
+async def test_startup_sets_webhook_with_secret_in_webhook_mode():
+    bot = SimpleNamespace(delete_webhook=AsyncMock(), set_webhook=AsyncMock())
+
+    with ExitStack() as stack:
+        startup_patches(stack, bot)
+        stack.enter_context(
+            patch.object(main.settings, "webhook_url", "https://bot.example/webhook")
+        )
+        stack.enter_context(patch.object(main.settings, "webhook_secret", "s3cret"))
+        await main.startup()
+
+    bot.set_webhook.assert_awaited_once_with(
+        "https://bot.example/webhook",
+        secret_token="s3cret",
+        allowed_updates=["message", "callback_query"],
+    )
+    bot.delete_webhook.assert_not_awaited()
+
+
+async def test_startup_requires_secret_in_webhook_mode():
+    bot = SimpleNamespace(delete_webhook=AsyncMock(), set_webhook=AsyncMock())
+
+    with ExitStack() as stack:
+        startup_patches(stack, bot)
+        stack.enter_context(
+            patch.object(main.settings, "webhook_url", "https://bot.example/webhook")
+        )
+        stack.enter_context(patch.object(main.settings, "webhook_secret", None))
+        with pytest.raises(RuntimeError, match="WEBHOOK_SECRET"):
+            await main.startup()
+
+    bot.set_webhook.assert_not_awaited()
+
+
+async def test_main_serves_webhook_through_bounded_queue():
+    bot = SimpleNamespace()
+    dispatcher = SimpleNamespace(start_polling=AsyncMock())
+    queue = SimpleNamespace(start=MagicMock(), stop=AsyncMock())
+
+    with (
+        patch("bot.main.startup", new=AsyncMock(return_value=(bot, dispatcher))),
+        patch("bot.main.shutdown", new=AsyncMock()) as shutdown,
+        patch("bot.main.UpdateQueue", return_value=queue) as update_queue,
+        patch("bot.main.run_webhook", new=AsyncMock()) as run_webhook,
+        patch.object(main.settings, "webhook_url", "https://bot.example/webhook"),
+        patch.object(main.settings, "webhook_secret", "s3cret"),
+    ):
+        await main.main()
+
+    assert update_queue.call_args.args == (dispatcher, bot)
+    run_webhook.assert_awaited_once()
+    assert run_webhook.await_args.args == (bot, queue)
+    assert run_webhook.await_args.kwargs["secret"] == "s3cret"
+    queue.start.assert_called_once_with()
+    queue.stop.assert_awaited_once_with()
+    dispatcher.start_polling.assert_not_awaited()
+    shutdown.assert_awaited_once_with(bot)
+
+
+async def test_receiver_serves_webhook_into_update_stream():
+    bot = SimpleNamespace()
+    dispatcher = SimpleNamespace(start_polling=AsyncMock())
+    stream = object()
+
+    with (
+        patch("bot.main.startup", new=AsyncMock(return_value=(bot, dispatcher))),
+        patch("bot.main.shutdown", new=AsyncMock()),
+        patch("bot.main.get_redis"),
+        patch("bot.main.UpdateStream", return_value=stream),
+        patch("bot.main.run_webhook", new=AsyncMock()) as run_webhook,
+        patch.object(main.settings, "bot_role", "receiver"),
+        patch.object(main.settings, "webhook_url", "https://bot.example/webhook"),
+        patch.object(main.settings, "webhook_secret", "s3cret"),
+    ):
+        await main.main()
+
+    assert run_webhook.await_args.args == (bot, stream)
+    dispatcher.start_polling.assert_not_awaited()
+
+
+async def test_receiver_polls_into_update_stream():
+    bot = SimpleNamespace()
+    dispatcher = SimpleNamespace(
+        start_polling=AsyncMock(),
+        resolve_used_update_types=MagicMock(return_value=["message"]),
+    )
+    stream = object()
+
+    with (
+        patch("bot.main.startup", new=AsyncMock(return_value=(bot, dispatcher))),
+        patch("bot.main.shutdown", new=AsyncMock()),
+        patch("bot.main.get_redis"),
+        patch("bot.main.UpdateStream", return_value=stream),
+        patch("bot.main.poll_into_stream", new=AsyncMock()) as poll_into_stream,
+        patch.object(main.settings, "bot_role", "receiver"),
+        patch.object(main.settings, "webhook_url", None),
+    ):
+        await main.main()
+
+    poll_into_stream.assert_awaited_once_with(bot, stream, ["message"])
+    dispatcher.start_polling.assert_not_awaited()
+
+
+async def test_worker_consumes_its_partitions():
+    bot = SimpleNamespace()
+    dispatcher = SimpleNamespace(start_polling=AsyncMock())
+    worker = SimpleNamespace(run=AsyncMock())
+
+    with (
+        patch("bot.main.startup", new=AsyncMock(return_value=(bot, dispatcher))),
+        patch("bot.main.shutdown", new=AsyncMock()),
+        patch("bot.main.get_redis"),
+        patch("bot.main.UpdateStream") as update_stream,
+        patch("bot.main.StreamWorker", return_value=worker) as stream_worker,
+        patch("bot.main.stop_on_signals"),
+        patch.object(main.settings, "bot_role", "worker"),
+        patch.object(main.settings, "stream_partitions", 4),
+        patch.object(main.settings, "worker_partitions", [1, 3]),
+    ):
+        await main.main()
+
+    stream_worker.assert_called_once_with(
+        update_stream.return_value, dispatcher, bot, [1, 3]
+    )
+    worker.run.assert_awaited_once()
+    dispatcher.start_polling.assert_not_awaited()
+
+
+async def test_worker_startup_leaves_webhook_alone():
+    bot = SimpleNamespace(delete_webhook=AsyncMock(), set_webhook=AsyncMock())
+
+    with ExitStack() as stack:
+        startup_patches(stack, bot)
+        stack.enter_context(patch.object(main.settings, "bot_role", "worker"))
+        await main.startup()
+
+        bot.delete_webhook.assert_not_awaited()
+        bot.set_webhook.assert_not_awaited()
+        main.scheduler.start.assert_called_once_with(paused=True)
+        main.scheduler_leadership.start.assert_called_once_with()
+
+
+async def test_receiver_startup_skips_background_jobs():
+    bot = SimpleNamespace(delete_webhook=AsyncMock())
+
+    with ExitStack() as stack:
+        startup_patches(stack, bot)
+        stack.enter_context(patch.object(main.settings, "bot_role", "receiver"))
+        await main.startup()
+
+        bot.delete_webhook.assert_awaited_once_with(drop_pending_updates=True)
+        main.scheduler.start.assert_not_called()
+        main.scheduler_leadership.start.assert_not_called()
+        main.testing_catalog.ensure_loaded.assert_not_awaited()
@@ -0,0 +1,223 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+import pytest
+
+from bot.cache.broadcasts import BroadcastCheckpoints
+from bot.utils import broadcast
+from bot.utils.broadcast import BroadcastEngine, BroadcastReport
+from bot.utils.rate_limit import TokenBucket
+from tests.fakes import FakeRedis
+
+
+def make_user_service(user_ids):
+    rows = [(index, user_id) for index, user_id in enumerate(user_ids, start=1)]
+
+    async def get_user_ids_page(after_id, limit):
+        return [row for row in rows if row[0] > after_id][:limit]
+
+    return SimpleNamespace(get_user_ids_page=AsyncMock(side_effect=get_user_ids_page))
+
+
+def make_engine(bot, user_ids, redis=None, **kwargs):
+    checkpoints = BroadcastCheckpoints(redis or FakeRedis())
+    engine = BroadcastEngine(
+        bot=bot,
+        checkpoints=checkpoints,
+        user_service=make_user_service(user_ids),
+        limiter=TokenBucket(rate=1000),
+        **kwargs,
+    )
+    return engine, checkpoints
+
+
+def _forbidden_error() -> TelegramForbiddenError:
+    return TelegramForbiddenError(method=SimpleNamespace(), message="forbidden")
+
+
+async def test_run_sends_text_to_every_user_page_by_page():
+    bot = SimpleNamespace(send_message=AsyncMock())
+    engine, checkpoints = make_engine(bot, [11, 22, 33])
+    engine.PAGE_SIZE = 2
+
+    report = await engine.run("b1", "hello")
+
+    assert report == BroadcastReport(sent=3)
+    assert sorted(call.args[0] for call in bot.send_message.await_args_list) == [
+        11,
+        22,
+        33,
+    ]
+    assert engine._user_service.get_user_ids_page.await_count == 3
+    assert await checkpoints.active_ids() == []
+    assert await checkpoints.runner("b1") is None
+
+
+async def test_run_limits_messages_in_flight():
+    in_flight = 0
+    peak = 0
+
+    async def send_message(user_id, text):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+
+    bot = SimpleNamespace(send_message=AsyncMock(side_effect=send_message))
+    engine, _ = make_engine(bot, range(1, 21), concurrency=3)
+
+    await engine.run("b1", "hello")
+
+    assert peak == 3
+
+
+async def test_run_counts_blocked_and_failed_users():
+    errors = {
+        22: _forbidden_error(),
+        33: TelegramBadRequest(method=SimpleNamespace(), message="chat not found"),
+    }
+
+    async def send_message(user_id, text):
+        if user_id in errors:
+            raise errors[user_id]
+
+    bot = SimpleNamespace(send_message=AsyncMock(side_effect=send_message))
+    engine, _ = make_engine(bot, [11, 22, 33])
+
+    report = await engine.run("b1", "hello")
+
+    assert report == BroadcastReport(sent=1, blocked=1, failed=1)
+
+
+async def test_retry_after_pauses_senders_and_retries():
+    bot = SimpleNamespace(
+        send_message=AsyncMock(
+            side_effect=[
+                TelegramRetryAfter(
+                    method=SimpleNamespace(), message="flood", retry_after=5
+                ),
+                None,
+            ]
+        )
+    )
+    engine, _ = make_engine(bot, [11])
+
+    with patch("bot.utils.broadcast.asyncio.sleep", new=AsyncMock()) as sleep:
+        report = await engine.run("b1", "hello")
+
+    assert report == BroadcastReport(sent=1)
+    assert bot.send_message.await_count == 2
+    sleep.assert_awaited_once()
+    assert 4 < sleep.await_args.args[0] <= 5
+
+
+async def test_run_resumes_after_checkpointed_page():
+    redis = FakeRedis()
+    bot = SimpleNamespace(send_message=AsyncMock())
+    engine, checkpoints = make_engine(bot, [11, 22, 33], redis=redis)
+    await checkpoints.start("b1", "original")
+    await checkpoints.save("b1", 2, sent=2, blocked=0, failed=0)
+
+    report = await engine.run("b1", "ignored")
+
+    bot.send_message.assert_awaited_once_with(33, text="original")
+    assert report == BroadcastReport(sent=3)
+
+
+async def test_run_skips_broadcast_leased_by_another_runner():
+    bot = SimpleNamespace(send_message=AsyncMock())
+    engine, checkpoints = make_engine(bot, [11, 22])
+    await checkpoints.lease("b1", "other-worker").acquire()
+
+    assert await engine.run("b1", "hello") is None
+
+    bot.send_message.assert_not_awaited()
+    assert await checkpoints.runner("b1") == "other-worker"
+
+
+async def test_run_stops_when_the_lease_is_lost():
+    redis = FakeRedis()
+
+    async def send_message(user_id, text):
+        # the lease expired and another runner took the broadcast over
+        redis.data["leader:broadcast:b1"] = b"other-worker"
+
+    bot = SimpleNamespace(send_message=AsyncMock(side_effect=send_message))
+    engine, checkpoints = make_engine(bot, [11, 22, 33], redis=redis)
+    engine.PAGE_SIZE = 1
+
+    assert await engine.run("b1", "hello") is None
+
+    bot.send_message.assert_awaited_once_with(11, text="hello")
+    assert (await checkpoints.load("b1"))["last_id"] == 0
+    assert await checkpoints.runner("b1") == "other-worker"
+
+
+async def test_run_broadcast_reports_to_admin():
+    report = BroadcastReport(sent=5, blocked=1, failed=0)
+    engine = SimpleNamespace(run=AsyncMock(return_value=report))
+
+    with (
+        patch(
+            "bot.utils.broadcast.get_bot_instance",
+            new=AsyncMock(return_value=SimpleNamespace()),
+        ),
+        patch("bot.utils.broadcast.get_redis", return_value=FakeRedis()),
+        patch("bot.utils.broadcast.BroadcastEngine", return_value=engine),
+        patch(
+            "bot.utils.broadcast.send_message_to_admin", new=AsyncMock()
+        ) as send_to_admin,
+    ):
+        assert await broadcast.run_broadcast("hi", "b1") is report
+
+    engine.run.assert_awaited_once_with("b1", "hi")
+    text = send_to_admin.await_args.args[0]
+    assert "5" in text and "1" in text
+
+
+async def test_run_broadcast_raises_when_bot_unavailable():
+    with (
+        patch("bot.utils.broadcast.get_bot_instance", new=AsyncMock(return_value=None)),
+        pytest.raises(Exception, match="Bot instance is not available"),
+    ):
+        await broadcast.run_broadcast("hi")
+
+
+async def test_resume_broadcasts_restarts_active_broadcasts():
+    redis = FakeRedis()
+    checkpoints = BroadcastCheckpoints(redis)
+    await checkpoints.start("b1", "hello")
+
+    with (
+        patch("bot.utils.broadcast.get_redis", return_value=redis),
+        patch("bot.utils.broadcast.run_broadcast", new=AsyncMock()) as run_broadcast,
+    ):
+        await broadcast.resume_broadcasts()
+        await asyncio.gather(*broadcast._background_tasks)
+
+    run_broadcast.assert_awaited_once_with("hello", "b1")
+
+
+async def test_resume_broadcasts_skips_broadcasts_being_sent():
+    redis = FakeRedis()
+    checkpoints = BroadcastCheckpoints(redis)
+    for broadcast_id in ("b1", "b2", "b3"):
+        await checkpoints.start(broadcast_id, "hello")
+    await checkpoints.lease("b2", "other-worker").acquire()
+
+    with (
+        patch("bot.utils.broadcast.get_redis", return_value=redis),
+        patch("bot.utils.broadcast._running_broadcasts", {"b1"}),
+        patch("bot.utils.broadcast.run_broadcast", new=AsyncMock()) as run_broadcast,
+    ):
+        await broadcast.resume_broadcasts()
+        await asyncio.gather(*broadcast._background_tasks)
+
+    run_broadcast.assert_awaited_once_with("hello", "b3")
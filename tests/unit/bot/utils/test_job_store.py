@@ -0,0 +1,208 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from apscheduler.events import EVENT_JOB_SUBMITTED
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import pytest
+
+from bot.utils.job_store import PostgresJobStore
+
+
+class FakeScheduledJobRepository:
+    def __init__(self) -> None:
+        self.rows: dict[str, tuple[float | None, bytes]] = {}
+        self.calls: list[tuple] = []
+        self.failures = 0
+
+    async def _call(self, *call) -> None:
+        self.calls.append(call)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("db down")
+
+    async def get_all(self):
+        await self._call("get_all")
+        return [(job_id, state) for job_id, (_, state) in self.rows.items()]
+
+    async def save(self, job_id, next_run_time, job_state):
+        await self._call("save", job_id)
+        self.rows[job_id] = (next_run_time, job_state)
+
+    async def delete(self, job_id):
+        await self._call("delete", job_id)
+        self.rows.pop(job_id, None)
+
+    async def delete_all(self):
+        await self._call("delete_all")
+        self.rows.clear()
+
+
+def make_scheduler(repository):
+    store = PostgresJobStore(repository)
+    scheduler = AsyncIOScheduler(jobstores={"default": store})
+    scheduler.start(paused=True)
+    return scheduler, store
+
+
+def add_broadcast(scheduler, job_id, minutes=10):
+    return scheduler.add_job(
+        asyncio.sleep,
+        trigger="date",
+        run_date=datetime.now(timezone.utc) + timedelta(minutes=minutes),
+        args=[0],
+        id=job_id,
+    )
+
+
+async def test_changes_are_written_in_order():
+    repository = FakeScheduledJobRepository()
+    scheduler, store = make_scheduler(repository)
+
+    add_broadcast(scheduler, "first")
+    add_broadcast(scheduler, "second")
+    scheduler.remove_job("first")
+    await store.flush()
+
+    assert repository.calls == [
+        ("save", "first"),
+        ("save", "second"),
+        ("delete", "first"),
+    ]
+    assert list(repository.rows) == ["second"]
+    scheduler.shutdown(wait=False)
+
+
+async def test_adding_a_job_does_not_wait_for_the_database():
+    repository = FakeScheduledJobRepository()
+    scheduler, store = make_scheduler(repository)
+
+    add_broadcast(scheduler, "first")
+
+    assert repository.calls == []
+    assert store.lookup_job("first") is not None
+    await store.flush()
+    scheduler.shutdown(wait=False)
+
+
+async def test_load_restores_jobs_stored_by_another_process():
+    repository = FakeScheduledJobRepository()
+    other, other_store = make_scheduler(repository)
+    add_broadcast(other, "theirs")
+    await other_store.flush()
+    scheduler, store = make_scheduler(repository)
+    add_broadcast(scheduler, "stale")
+    await store.flush()
+    del repository.rows["stale"]
+
+    await store.load()
+
+    [job] = store.get_all_jobs()
+    assert job.id == "theirs"
+    assert job.func is asyncio.sleep
+    assert job._scheduler is scheduler
+    other.shutdown(wait=False)
+    scheduler.shutdown(wait=False)
+
+
+async def test_load_keeps_changes_queued_after_it():
+    repository = FakeScheduledJobRepository()
+    scheduler, store = make_scheduler(repository)
+
+    loading = asyncio.create_task(store.load())
+    await asyncio.sleep(0)
+    add_broadcast(scheduler, "new")
+    await loading
+
+    assert store.lookup_job("new") is not None
+    await store.flush()
+    assert list(repository.rows) == ["new"]
+    scheduler.shutdown(wait=False)
+
+
+async def test_failing_save_is_retried_then_dropped():
+    repository = FakeScheduledJobRepository()
+    repository.failures = PostgresJobStore.MAX_ATTEMPTS + 1
+    scheduler, store = make_scheduler(repository)
+
+    with (
+        patch.object(PostgresJobStore, "RETRY_SECONDS", 0),
+        patch("bot.utils.job_store.logger") as logger,
+    ):
+        add_broadcast(scheduler, "lost")
+        add_broadcast(scheduler, "kept")
+        await store.flush()
+
+    assert repository.calls.count(("save", "lost")) == PostgresJobStore.MAX_ATTEMPTS
+    assert logger.exception.call_count == PostgresJobStore.MAX_ATTEMPTS + 1
+    assert list(repository.rows) == ["kept"]
+    scheduler.shutdown(wait=False)
+
+
+async def test_failing_removal_is_retried_until_written():
+    repository = FakeScheduledJobRepository()
+    scheduler, store = make_scheduler(repository)
+    add_broadcast(scheduler, "cancelled")
+    await store.flush()
+    repository.failures = PostgresJobStore.MAX_ATTEMPTS + 1
+
+    with (
+        patch.object(PostgresJobStore, "RETRY_SECONDS", 0),
+        patch("bot.utils.job_store.logger"),
+    ):
+        scheduler.remove_job("cancelled")
+        await store.flush()
+
+    assert repository.calls.count(("delete", "cancelled")) == (
+        PostgresJobStore.MAX_ATTEMPTS + 2
+    )
+    assert repository.rows == {}
+    scheduler.shutdown(wait=False)
+
+
+async def test_due_jobs_run_only_if_still_in_the_table():
+    repository = FakeScheduledJobRepository()
+    scheduler, store = make_scheduler(repository)
+    submitted = []
+    scheduler.add_listener(
+        lambda event: submitted.append(event.job_id), EVENT_JOB_SUBMITTED
+    )
+    add_broadcast(scheduler, "cancelled", minutes=0)
+    add_broadcast(scheduler, "kept", minutes=0)
+    await store.flush()
+    del repository.rows["cancelled"]  # deleted by another replica
+
+    scheduler.resume()
+    await asyncio.sleep(0.05)
+
+    assert submitted == ["kept"]
+    assert store.lookup_job("cancelled") is None
+    assert repository.calls.count(("get_all",)) == 1
+    scheduler.shutdown(wait=False)
+
+
+async def test_load_raises_when_table_cannot_be_read():
+    repository = FakeScheduledJobRepository()
+    scheduler, store = make_scheduler(repository)
+    add_broadcast(scheduler, "kept")
+    await store.flush()
+    repository.failures = 1
+
+    with pytest.raises(ConnectionError):
+        await store.load()
+
+    assert store.lookup_job("kept") is not None
+    scheduler.shutdown(wait=False)
+
+
+async def test_shutdown_keeps_jobs_in_the_table():
+    repository = FakeScheduledJobRepository()
+    scheduler, store = make_scheduler(repository)
+    add_broadcast(scheduler, "kept")
+
+    await store.stop()
+    scheduler.shutdown(wait=False)
+    await asyncio.sleep(0)  # the scheduler shuts down in the next loop iteration
+
+    assert list(repository.rows) == ["kept"]
+    assert store.get_all_jobs() == []
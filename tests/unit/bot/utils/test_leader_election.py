@@ -0,0 +1,106 @@
+from unittest.mock import AsyncMock, patch
+
+from redis.exceptions import ConnectionError
+
+from bot.cache.leader_lock import LeaderLock
+from bot.utils.leader_election import LeaderElection
+from tests.fakes import FakeRedis
+
+
+def make_election(redis, owner):
+    return LeaderElection(
+        "scheduler",
+        on_elected=AsyncMock(),
+        on_demoted=AsyncMock(),
+        lock=LeaderLock(redis, "scheduler", owner, LeaderElection.LEASE_SECONDS),
+    )
+
+
+async def test_only_one_replica_is_elected():
+    redis = FakeRedis()
+    first, second = make_election(redis, "first"), make_election(redis, "second")
+
+    await first.step()
+    await second.step()
+    await first.step()
+
+    assert first.is_leader
+    assert not second.is_leader
+    first._on_elected.assert_awaited_once_with()
+    second._on_elected.assert_not_awaited()
+
+
+async def test_follower_takes_over_expired_lease():
+    redis = FakeRedis()
+    first, second = make_election(redis, "first"), make_election(redis, "second")
+    await first.step()
+
+    await redis.delete("leader:scheduler")
+    await second.step()
+
+    assert second.is_leader
+    second._on_elected.assert_awaited_once_with()
+
+
+async def test_leader_steps_down_when_lease_was_taken():
+    redis = FakeRedis()
+    first, second = make_election(redis, "first"), make_election(redis, "second")
+    await first.step()
+    await redis.delete("leader:scheduler")
+    await second.step()
+
+    await first.step()
+
+    assert not first.is_leader
+    first._on_demoted.assert_awaited_once_with()
+
+
+async def test_leader_keeps_leading_through_short_redis_outage():
+    redis = FakeRedis()
+    election = make_election(redis, "first")
+    await election.step()
+
+    with patch.object(redis, "eval", AsyncMock(side_effect=ConnectionError())):
+        await election.step()
+
+    assert election.is_leader
+    election._on_demoted.assert_not_awaited()
+
+
+async def test_leader_steps_down_when_lease_may_have_expired():
+    redis = FakeRedis()
+    election = make_election(redis, "first")
+    await election.step()
+    election._valid_until = 0.0
+
+    with patch.object(redis, "eval", AsyncMock(side_effect=ConnectionError())):
+        await election.step()
+
+    assert not election.is_leader
+    election._on_demoted.assert_awaited_once_with()
+
+
+async def test_stop_hands_leadership_over():
+    redis = FakeRedis()
+    first, second = make_election(redis, "first"), make_election(redis, "second")
+    first.start()
+    await first.step()
+
+    await first.stop()
+    await second.step()
+
+    assert not first.is_leader
+    first._on_demoted.assert_awaited_once_with()
+    assert second.is_leader
+
+
+async def test_failing_callback_does_not_stop_election():
+    redis = FakeRedis()
+    election = make_election(redis, "first")
+    election._on_elected.side_effect = RuntimeError("boom")
+
+    with patch("bot.utils.leader_election.logger") as logger:
+        await election.step()
+
+    assert election.is_leader
+    logger.exception.assert_called_once_with("Failed to take over as scheduler leader")
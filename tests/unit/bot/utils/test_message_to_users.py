@@ -1,8 +1,7 @@
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from aiogram.exceptions import TelegramForbiddenError
-import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
 
 from bot.lexicon import MessageTexts
 from bot.utils import message_to_users
@@ -12,29 +11,13 @@ def _forbidden_error() -> TelegramForbiddenError:
     return TelegramForbiddenError(method=SimpleNamespace(), message="forbidden")
 
 
-async def test_send_message_to_all_users_sends_text_to_each_user():
-    bot = SimpleNamespace(send_message=AsyncMock())
-    user_service = SimpleNamespace(
-        get_all_users=AsyncMock(
-            return_value=[
-                {"user_id": 123},
-                {"user_id": 456},
-            ]
-        )
-    )
+async def test_send_message_to_all_users_delegates_to_broadcast_engine():
+    with patch(
+        "bot.utils.message_to_users.run_broadcast", new=AsyncMock()
+    ) as run_broadcast:
+        await message_to_users.send_message_to_all_users("hello", broadcast_id="b1")
 
-    with (
-        patch(
-            "bot.utils.message_to_users.get_bot_instance",
-            new=AsyncMock(return_value=bot),
-        ),
-        patch("bot.utils.message_to_users.UserService", return_value=user_service),
-    ):
-        await message_to_users.send_message_to_all_users("hello")
-
-    bot.send_message.assert_any_await(123, text="hello")
-    bot.send_message.assert_any_await(456, text="hello")
-    assert bot.send_message.await_count == 2
+    run_broadcast.assert_awaited_once_with("hello", "b1")
 
 
 async def test_send_message_to_user_without_learning_button_sends_plain_text():
@@ -98,38 +81,25 @@ async def test_send_reminder_to_user_skips_message_when_no_words_due():
     bot.send_message.assert_not_awaited()
 
 
-async def test_send_message_to_all_users_raises_when_bot_unavailable():
-    user_service = SimpleNamespace(get_all_users=AsyncMock(return_value=[]))
+async def test_send_reminder_to_user_uses_known_count_without_query():
+    bot = SimpleNamespace(send_message=AsyncMock())
 
     with (
         patch(
             "bot.utils.message_to_users.get_bot_instance",
-            new=AsyncMock(return_value=None),
+            new=AsyncMock(return_value=bot),
         ),
-        patch("bot.utils.message_to_users.UserService", return_value=user_service),
-        pytest.raises(Exception, match="Bot instance is not available"),
-    ):
-        await message_to_users.send_message_to_all_users("hi")
-
-
-async def test_send_message_to_all_users_logs_error_when_user_blocks_bot():
-    bot = SimpleNamespace(send_message=AsyncMock(side_effect=_forbidden_error()))
-    user_service = SimpleNamespace(
-        get_all_users=AsyncMock(return_value=[{"user_id": 123}])
-    )
-
-    with (
+        patch("bot.utils.message_to_users.UserWordsLearningService") as service_cls,
         patch(
-            "bot.utils.message_to_users.get_bot_instance",
-            new=AsyncMock(return_value=bot),
+            "bot.utils.message_to_users.keyboard_builder",
+            new=AsyncMock(return_value=object()),
         ),
-        patch("bot.utils.message_to_users.UserService", return_value=user_service),
-        patch.object(message_to_users.logger, "error") as error_log,
     ):
-        await message_to_users.send_message_to_all_users("hi")
+        await message_to_users.send_reminder_to_user(123, 5)
 
-    error_log.assert_called_once()
-    assert "broadcast" in error_log.call_args.args[0]
+    service_cls.assert_not_called()
+    bot.send_message.assert_awaited_once()
+    assert "5 слов" in bot.send_message.await_args.kwargs["text"]
 
 
 async def test_send_message_to_user_logs_error_when_user_blocks_bot():
@@ -175,6 +145,28 @@ async def test_send_reminder_to_user_logs_error_when_user_blocks_bot():
     assert "user 123" in error_log.call_args.args[0]
 
 
+async def test_send_reminder_to_user_pauses_limiter_and_retries_after_flood_control():
+    flood = TelegramRetryAfter(method=SimpleNamespace(), message="flood", retry_after=5)
+    bot = SimpleNamespace(send_message=AsyncMock(side_effect=[flood, None]))
+    limiter = SimpleNamespace(pause=MagicMock(), acquire=AsyncMock())
+
+    with (
+        patch(
+            "bot.utils.message_to_users.get_bot_instance",
+            new=AsyncMock(return_value=bot),
+        ),
+        patch(
+            "bot.utils.message_to_users.keyboard_builder",
+            new=AsyncMock(return_value=object()),
+        ),
+    ):
+        await message_to_users.send_reminder_to_user(123, 2, limiter=limiter)
+
+    limiter.pause.assert_called_once_with(5)
+    limiter.acquire.assert_awaited_once()
+    assert bot.send_message.await_count == 2
+
+
 async def test_send_reminder_to_user_sends_due_words_message_with_keyboard():
     bot = SimpleNamespace(send_message=AsyncMock())
     keyboard = object()
@@ -0,0 +1,36 @@
+from unittest.mock import AsyncMock, patch
+
+from bot.utils.rate_limit import TokenBucket
+
+
+async def test_acquire_allows_burst_up_to_capacity_without_waiting():
+    bucket = TokenBucket(rate=10, capacity=3)
+
+    with patch("bot.utils.rate_limit.asyncio.sleep", new=AsyncMock()) as sleep:
+        for _ in range(3):
+            await bucket.acquire()
+
+    sleep.assert_not_awaited()
+
+
+async def test_acquire_waits_for_refill_when_bucket_is_empty():
+    clock = iter([0.0, 0.0, 0.0, 0.1])
+    with patch("bot.utils.rate_limit.time.monotonic", side_effect=lambda: next(clock)):
+        bucket = TokenBucket(rate=10, capacity=1)
+        with patch("bot.utils.rate_limit.asyncio.sleep", new=AsyncMock()) as sleep:
+            await bucket.acquire()
+            await bucket.acquire()
+
+    sleep.assert_awaited_once()
+    assert sleep.await_args.args[0] == 0.1
+
+
+async def test_pause_holds_tokens_until_it_ends():
+    clock = iter([0.0, 0.0, 0.0, 5.0])
+    with patch("bot.utils.rate_limit.time.monotonic", side_effect=lambda: next(clock)):
+        bucket = TokenBucket(rate=10, capacity=3)
+        bucket.pause(5)
+        with patch("bot.utils.rate_limit.asyncio.sleep", new=AsyncMock()) as sleep:
+            await bucket.acquire()
+
+    sleep.assert_awaited_once_with(5.0)
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from bot.utils.rate_limit import TokenBucket
+from bot.utils.reminders import ReminderDispatcher
+
+NOW = datetime(2026, 5, 1, 6, 30, 42, tzinfo=UTC)
+
+
+def make_service(due_counts=None):
+    return SimpleNamespace(
+        get_due_counts_to_remind=AsyncMock(return_value=due_counts or {})
+    )
+
+
+async def test_tick_queries_current_minute_and_sends_through_workers():
+    send = AsyncMock()
+    dispatcher = ReminderDispatcher(send=send, limiter=TokenBucket(rate=1000))
+    service = make_service({123: 4, 456: 1})
+
+    dispatcher.start()
+    queued = await dispatcher.tick(now=NOW, user_words_learning_service=service)
+    await asyncio.wait_for(dispatcher._queue.join(), timeout=1)
+    await dispatcher.stop()
+
+    assert queued == 2
+    service.get_due_counts_to_remind.assert_awaited_once_with(
+        datetime(2026, 5, 1, 6, 30, tzinfo=UTC)
+    )
+    assert sorted(call.args for call in send.await_args_list) == [(123, 4), (456, 1)]
+
+
+async def test_tick_skips_minute_already_dispatched():
+    dispatcher = ReminderDispatcher(send=AsyncMock())
+    service = make_service({123: 4})
+
+    await dispatcher.tick(now=NOW, user_words_learning_service=service)
+    queued = await dispatcher.tick(
+        now=NOW.replace(second=59), user_words_learning_service=service
+    )
+
+    assert queued == 0
+    service.get_due_counts_to_remind.assert_awaited_once()
+
+
+async def test_late_tick_catches_up_on_missed_minutes():
+    dispatcher = ReminderDispatcher(send=AsyncMock())
+    service = make_service()
+
+    await dispatcher.tick(now=NOW, user_words_learning_service=service)
+    await dispatcher.tick(
+        now=NOW.replace(minute=33), user_words_learning_service=service
+    )
+
+    minutes = [
+        call.args[0].minute for call in service.get_due_counts_to_remind.await_args_list
+    ]
+    assert minutes == [30, 31, 32, 33]
+
+
+async def test_tick_after_long_gap_only_dispatches_current_minute():
+    dispatcher = ReminderDispatcher(send=AsyncMock())
+    service = make_service()
+
+    await dispatcher.tick(now=NOW, user_words_learning_service=service)
+    await dispatcher.tick(now=NOW.replace(hour=9), user_words_learning_service=service)
+
+    assert service.get_due_counts_to_remind.await_count == 2
+
+
+async def test_worker_keeps_running_after_failed_send():
+    send = AsyncMock(side_effect=[RuntimeError("blocked"), None])
+    dispatcher = ReminderDispatcher(
+        send=send, limiter=TokenBucket(rate=1000), workers=1
+    )
+
+    dispatcher.start()
+    await dispatcher.tick(
+        now=NOW, user_words_learning_service=make_service({123: 1, 456: 2})
+    )
+    await asyncio.wait_for(dispatcher._queue.join(), timeout=1)
+    await dispatcher.stop()
+
+    assert send.await_count == 2
@@ -1,5 +1,4 @@
-from datetime import datetime, time, timedelta, timezone
-from types import SimpleNamespace
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from apscheduler.triggers.date import DateTrigger
@@ -7,44 +6,22 @@ from apscheduler.triggers.date import DateTrigger
 from bot.utils import scheduling
 
 
-async def test_schedule_reminders_removes_old_jobs_and_schedules_configured_users():
-    user_service = SimpleNamespace(
-        get_all_users=AsyncMock(
-            return_value=[
-                {
-                    "user_id": 123,
-                    "tg_login": "one",
-                    "reminder_time": time(9, 30),
-                    "time_zone": "3",
-                },
-                {
-                    "user_id": 456,
-                    "tg_login": "two",
-                    "reminder_time": None,
-                    "time_zone": "3",
-                },
-            ]
-        )
-    )
+async def test_schedule_reminders_adds_single_minute_dispatcher_job():
     scheduler_mock = MagicMock()
 
-    with (
-        patch("bot.utils.scheduling.UserService", return_value=user_service),
-        patch("bot.utils.scheduling.scheduler", scheduler_mock),
-    ):
+    with patch("bot.utils.scheduling.scheduler", scheduler_mock):
         await scheduling.schedule_reminders()
 
-    scheduler_mock.remove_all_jobs.assert_called_once_with(jobstore="reminders")
+    scheduler_mock.remove_all_jobs.assert_not_called()
     scheduler_mock.add_job.assert_called_once()
     kwargs = scheduler_mock.add_job.call_args.kwargs
-    assert kwargs["func"] is scheduling.send_reminder_to_user
+    assert kwargs["func"] == scheduling.reminder_dispatcher.tick
     assert kwargs["trigger"] == "cron"
-    assert kwargs["hour"] == 9
-    assert kwargs["minute"] == 30
-    assert kwargs["timezone"] == timezone(timedelta(hours=3))
-    assert kwargs["kwargs"] == {"user_id": 123}
+    assert kwargs["minute"] == "*"
     assert kwargs["jobstore"] == "reminders"
-    assert kwargs["name"] == "Reminder for @one (123)"
+    assert kwargs["id"] == "reminders:dispatch"
+    assert kwargs["replace_existing"] is True
+    assert kwargs["max_instances"] == 1
 
 
 async def test_schedule_broadcast_adds_date_trigger_in_utc_plus_three():
@@ -60,7 +37,8 @@ async def test_schedule_broadcast_adds_date_trigger_in_utc_plus_three():
     kwargs = scheduler_mock.add_job.call_args.kwargs
     assert kwargs["func"] is scheduling.send_message_to_all_users
     assert isinstance(kwargs["trigger"], DateTrigger)
-    assert kwargs["kwargs"] == {"text": "Hello"}
+    assert kwargs["kwargs"]["text"] == "Hello"
+    assert kwargs["kwargs"]["broadcast_id"]
     assert kwargs["jobstore"] == "broadcasts"
     assert kwargs["name"] == "Broadcast 18:15 (UTC+3) 28.04.2026"
 
@@ -72,3 +50,41 @@ async def test_delete_scheduled_broadcasts_removes_broadcast_jobs():
         await scheduling.delete_scheduled_broadcasts()
 
     scheduler_mock.remove_all_jobs.assert_called_once_with(jobstore="broadcasts")
+
+
+async def test_scheduler_leader_loads_and_resumes_jobs_and_broadcasts():
+    scheduler_mock = MagicMock()
+    job_store = MagicMock(load=AsyncMock())
+
+    with (
+        patch("bot.utils.scheduling.scheduler", scheduler_mock),
+        patch("bot.utils.scheduling.broadcast_job_store", job_store),
+        patch("bot.utils.scheduling.resume_broadcasts", AsyncMock()) as resume,
+    ):
+        await scheduling._lead_scheduler()
+        await scheduling._follow_scheduler()
+
+    job_store.load.assert_awaited_once_with()
+    kwargs = scheduler_mock.add_job.call_args.kwargs
+    assert kwargs["func"] is job_store.load
+    assert kwargs["jobstore"] == "reminders"
+    assert kwargs["id"] == "broadcasts:sync"
+    scheduler_mock.resume.assert_called_once_with()
+    resume.assert_awaited_once_with()
+    scheduler_mock.pause.assert_called_once_with()
+
+
+async def test_scheduler_leader_resumes_even_if_broadcasts_fail_to_load():
+    scheduler_mock = MagicMock()
+    job_store = MagicMock(load=AsyncMock(side_effect=RuntimeError("db down")))
+
+    with (
+        patch("bot.utils.scheduling.scheduler", scheduler_mock),
+        patch("bot.utils.scheduling.broadcast_job_store", job_store),
+        patch("bot.utils.scheduling.resume_broadcasts", AsyncMock()),
+        patch("bot.utils.scheduling.logger") as logger,
+    ):
+        await scheduling._lead_scheduler()
+
+    logger.exception.assert_called_once_with("Failed to load scheduled broadcasts")
+    scheduler_mock.resume.assert_called_once_with()
@@ -1,8 +1,16 @@
 from enum import Enum
-from types import SimpleNamespace
-from unittest.mock import AsyncMock
+from unittest.mock import patch
 
-from bot.utils.state_data_updater import update_state_data
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from bot.cache.fsm_storage import HashRedisStorage
+from bot.states import WordsLearningFSM
+from bot.utils.state_data_updater import get_state_values, update_state_data
+from tests.fakes import FakeRedis
+
+KEY = StorageKey(bot_id=1, chat_id=123, user_id=123)
 
 
 class Mode(Enum):
@@ -10,18 +18,60 @@ class Mode(Enum):
 
 
 async def test_update_state_data_merges_existing_data_and_enum_names():
-    state = SimpleNamespace(
-        get_data=AsyncMock(return_value={"user_id": 123}),
-        set_data=AsyncMock(),
-    )
+    state = FSMContext(MemoryStorage(), KEY)
+    await state.set_data({"user_id": 123})
 
     await update_state_data(state, mode=Mode.TRAINING, subsection="Travel")
 
-    state.get_data.assert_awaited_once_with()
-    state.set_data.assert_awaited_once_with(
-        {
-            "user_id": 123,
-            "mode": "TRAINING",
-            "subsection": "Travel",
-        }
+    assert await state.get_data() == {
+        "user_id": 123,
+        "mode": "TRAINING",
+        "subsection": "Travel",
+    }
+    assert await state.get_state() is None
+
+
+async def test_update_state_data_sets_new_state_on_any_storage():
+    state = FSMContext(MemoryStorage(), KEY)
+
+    await update_state_data(
+        state, new_state=WordsLearningFSM.selected_subsection, subsection="Travel"
     )
+
+    assert await state.get_state() == WordsLearningFSM.selected_subsection.state
+    assert await state.get_data() == {"subsection": "Travel"}
+
+
+async def test_update_state_data_writes_fields_and_state_in_one_round_trip():
+    redis = FakeRedis()
+    state = FSMContext(HashRedisStorage(redis), KEY)
+    await state.set_data({"user_id": 123, "subsection": "Food"})
+
+    with patch.object(redis, "pipeline", wraps=redis.pipeline) as pipeline:
+        with patch.object(redis, "hgetall", side_effect=AssertionError):
+            await update_state_data(
+                state,
+                new_state=WordsLearningFSM.selected_subsection,
+                mode=Mode.TRAINING,
+                subsection="Travel",
+            )
+
+    pipeline.assert_called_once_with(transaction=True)
+    assert await state.get_data() == {
+        "user_id": 123,
+        "mode": "TRAINING",
+        "subsection": "Travel",
+    }
+    assert await state.get_state() == WordsLearningFSM.selected_subsection.state
+
+
+async def test_get_state_values_returns_none_for_missing_keys():
+    for storage in (MemoryStorage(), HashRedisStorage(FakeRedis())):
+        state = FSMContext(storage, KEY)
+        await state.set_data({"section": "Food", "options": ["a", "b"]})
+
+        assert await get_state_values(state, "options", "missing", "section") == [
+            ["a", "b"],
+            None,
+            "Food",
+        ]
@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from aiogram import Bot
+import pytest
+
+from bot.cache.update_stream import StreamEntry, UpdateStream
+from bot.utils.leader_election import LeaderElection
+from bot.utils.update_streaming import StreamWorker, poll_into_stream
+from tests.fakes import FakeRedis
+from tests.helpers.aiogram import message_update
+
+
+@pytest.fixture
+def bot():
+    return Bot(token="1234567890:test-token")
+
+
+async def make_stream(partitions=1):
+    stream = UpdateStream(FakeRedis(), partitions)
+    for partition in range(partitions):
+        await stream.ensure_group(partition)
+    return stream
+
+
+def recording_dispatcher(handled, stopped=None, expected=None, delays=None):
+    async def feed_update(_bot, update):
+        await asyncio.sleep((delays or {}).get(update.message.from_user.id, 0))
+        handled.append((update.message.from_user.id, update.message.text))
+        if stopped is not None and len(handled) == expected:
+            stopped.set()
+
+    return SimpleNamespace(feed_update=feed_update)
+
+
+async def test_worker_handles_pending_updates_before_new_ones(bot):
+    stream = await make_stream()
+    await stream.offer(message_update(1, text="crashed", user_id=5))
+    await stream.read(0, count=10, block_ms=0)  # read, never acknowledged
+    await stream.offer(message_update(2, text="new", user_id=5))
+    handled, stopped = [], asyncio.Event()
+    worker = StreamWorker(
+        stream, recording_dispatcher(handled, stopped, 2), bot, partitions=[0]
+    )
+
+    with patch("bot.utils.leader_election.get_redis", return_value=stream._redis):
+        await asyncio.wait_for(worker.run(stopped), timeout=1)
+
+    assert handled == [(5, "crashed"), (5, "new")]
+    assert await stream.read_pending(0, count=10) == []
+    assert "leader:partition:0" not in stream._redis.data
+
+
+async def test_worker_takes_over_partition_once_its_lease_expires(bot):
+    stream = await make_stream()
+    redis = stream._redis
+    await redis.set("leader:partition:0", "crashed-worker", px=30_000)
+    await stream.offer(message_update(1, text="hi", user_id=5))
+    handled, stopped = [], asyncio.Event()
+    worker = StreamWorker(
+        stream, recording_dispatcher(handled, stopped, 1), bot, partitions=[0]
+    )
+
+    with (
+        patch("bot.utils.leader_election.get_redis", return_value=redis),
+        patch.object(LeaderElection, "RENEW_SECONDS", 0.01),
+    ):
+        run = asyncio.create_task(worker.run(stopped))
+        await asyncio.sleep(0.05)
+        assert handled == []
+
+        del redis.data["leader:partition:0"]  # the lease expired
+        await asyncio.wait_for(run, timeout=1)
+
+    assert handled == [(5, "hi")]
+
+
+async def test_batch_keeps_order_per_user_and_interleaves_users(bot):
+    stream = await make_stream()
+    for update_id, user_id in enumerate([1, 2, 1, 2, 1]):
+        await stream.offer(
+            message_update(update_id, text=str(update_id), user_id=user_id)
+        )
+    handled = []
+    # user 1 is slow, so user 2 finishes first if users run concurrently
+    dispatcher = recording_dispatcher(handled, delays={1: 0.01})
+    worker = StreamWorker(stream, dispatcher, bot, partitions=[0])
+
+    await worker.handle_batch(0, await stream.read(0, count=10, block_ms=0))
+
+    assert [text for user, text in handled if user == 1] == ["0", "2", "4"]
+    assert [text for user, text in handled if user == 2] == ["1", "3"]
+    assert handled[0] == (2, "1")
+    assert await stream.read_pending(0, count=10) == []
+
+
+async def test_failed_update_is_acknowledged(bot):
+    stream = await make_stream()
+    await stream.offer(message_update(1, text="boom"))
+    dispatcher = SimpleNamespace(feed_update=AsyncMock(side_effect=RuntimeError()))
+    worker = StreamWorker(stream, dispatcher, bot, partitions=[0])
+
+    await worker.handle_batch(0, await stream.read(0, count=10, block_ms=0))
+
+    dispatcher.feed_update.assert_awaited_once()
+    assert await stream.read_pending(0, count=10) == []
+
+
+async def test_update_delivered_too_often_is_dropped(bot):
+    stream = UpdateStream(FakeRedis(), 1)
+    stream.ack = AsyncMock()
+    dispatcher = SimpleNamespace(feed_update=AsyncMock())
+    worker = StreamWorker(stream, dispatcher, bot, partitions=[0])
+    payload = message_update(1, text="poison").model_dump_json()
+
+    await worker.handle_batch(
+        0,
+        [
+            StreamEntry(b"1-0", payload, StreamWorker.MAX_DELIVERIES + 1),
+            StreamEntry(b"2-0", b"not an update"),
+        ],
+    )
+
+    dispatcher.feed_update.assert_not_awaited()
+    assert [call.args for call in stream.ack.await_args_list] == [
+        (0, b"1-0"),
+        (0, b"2-0"),
+    ]
+
+
+async def test_poll_into_stream_advances_offset_after_storing():
+    stream = SimpleNamespace(offer=AsyncMock(side_effect=[True, OSError(), True]))
+    first, second = message_update(10, text="a"), message_update(11, text="b")
+    bot = SimpleNamespace(
+        get_updates=AsyncMock(
+            side_effect=[[first, second], [second], asyncio.CancelledError()]
+        )
+    )
+
+    with (
+        patch("bot.utils.update_streaming.asyncio.sleep", new=AsyncMock()),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await poll_into_stream(bot, stream, ["message"])
+
+    offsets = [call.kwargs["offset"] for call in bot.get_updates.await_args_list]
+    # storing update 11 failed, so it is fetched again
+    assert offsets == [None, 11, 12]
+    assert [call.args[0] for call in stream.offer.await_args_list] == [
+        first,
+        second,
+        second,
+    ]
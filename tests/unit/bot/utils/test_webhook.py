@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from aiogram import Bot
+from aiohttp.test_utils import TestClient as _TestClient, TestServer as _TestServer
+import pytest
+
+from bot.utils.webhook import SECRET_HEADER, UpdateQueue, build_webhook_app
+from tests.helpers.aiogram import message_update
+
+SECRET = "s3cret"
+
+
+def make_dispatcher():
+    return SimpleNamespace(feed_update=AsyncMock())
+
+
+@pytest.fixture
+def bot():
+    return Bot(token="1234567890:test-token")
+
+
+async def post_update(client, update_id, secret=SECRET):
+    update = message_update(update_id, text="hello")
+    return await client.post(
+        "/webhook",
+        data=update.model_dump_json(exclude_none=True),
+        headers={SECRET_HEADER: secret, "Content-Type": "application/json"},
+    )
+
+
+async def test_webhook_feeds_update_to_dispatcher(bot):
+    dispatcher = make_dispatcher()
+    queue = UpdateQueue(dispatcher, bot)
+    queue.start()
+
+    async with _TestClient(
+        _TestServer(build_webhook_app(bot, queue, "/webhook", SECRET))
+    ) as client:
+        response = await post_update(client, 7)
+    await queue.stop()
+
+    assert response.status == 200
+    dispatcher.feed_update.assert_awaited_once()
+    fed_bot, update = dispatcher.feed_update.await_args.args
+    assert fed_bot is bot
+    assert update.update_id == 7
+    assert update.message.text == "hello"
+
+
+async def test_webhook_rejects_wrong_secret(bot):
+    dispatcher = make_dispatcher()
+    queue = UpdateQueue(dispatcher, bot)
+
+    async with _TestClient(
+        _TestServer(build_webhook_app(bot, queue, "/webhook", SECRET))
+    ) as client:
+        wrong = await post_update(client, 1, secret="guess")
+        missing = await client.post("/webhook", json={"update_id": 2})
+
+    assert wrong.status == 401
+    assert missing.status == 401
+    assert await queue.offer(message_update(3, text="x"))  # nothing was queued before
+
+
+async def test_webhook_rejects_malformed_update(bot):
+    queue = UpdateQueue(make_dispatcher(), bot)
+
+    async with _TestClient(
+        _TestServer(build_webhook_app(bot, queue, "/webhook", SECRET))
+    ) as client:
+        response = await client.post(
+            "/webhook", data="not json", headers={SECRET_HEADER: SECRET}
+        )
+
+    assert response.status == 400
+
+
+async def test_webhook_refuses_updates_beyond_max_in_flight(bot):
+    queue = UpdateQueue(make_dispatcher(), bot, max_in_flight=2)
+
+    async with _TestClient(
+        _TestServer(build_webhook_app(bot, queue, "/webhook", SECRET))
+    ) as client:
+        statuses = [(await post_update(client, i)).status for i in range(3)]
+
+    assert statuses == [200, 200, 503]
+
+
+async def test_stop_handles_accepted_updates_first(bot):
+    handled = []
+
+    async def feed_update(_bot, update):
+        await asyncio.sleep(0)
+        handled.append(update.update_id)
+
+    queue = UpdateQueue(SimpleNamespace(feed_update=feed_update), bot, workers=2)
+    for update_id in range(5):
+        await queue.offer(message_update(update_id, text="x"))
+    queue.start()
+    await queue.stop()
+
+    assert sorted(handled) == [0, 1, 2, 3, 4]
+
+
+async def test_worker_survives_failing_update(bot):
+    dispatcher = make_dispatcher()
+    dispatcher.feed_update.side_effect = [RuntimeError("boom"), None]
+    queue = UpdateQueue(dispatcher, bot, workers=1)
+    await queue.offer(message_update(1, text="x"))
+    await queue.offer(message_update(2, text="y"))
+
+    queue.start()
+    await queue.stop()
+
+    assert dispatcher.feed_update.await_count == 2